@@ -0,0 +1,179 @@
+"""
+Haamujen suunnanvalintojen ajoitus aikabudjetilla.
+Kun monta haamua saapuu ruudun keskelle samalla askeleella, jokainen ajaisi reitinhakunsa
+samaan aikaan ja askeleen kesto piikkaisi. Ajoittaja käy haamut läpi pelaajaa lähimmästä
+alkaen ja laskee päätöksiä vain askelkohtaisen budjetin verran. Framen yhteisen
+reittisuunnitelman (plan_ghost_moves) vastaukset ovat valmiita, joten niitä ei lykätä;
+suunnitelman kesto kirjataan budjettiin (charge). Lykätty haamu käyttää aiemmin samasta
+tilanteesta laskettua suuntaa tai jatkaa viimeisintä suuntaansa seuraavaan ruudun
+keskipisteeseen asti, jossa se kysyy uudelleen.
+"""
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from constants import ALL_DIRECTION_CODES, DIRECTION_DX, DIRECTION_DY, OPPOSITE_DIRECTION
+from level import Level
+from pathfinding import MoveRequest
+
+
+class AIScheduler:
+    """Askelkohtainen budjetti haamujen suunnanvalinnoille ja sen tilastot."""
+
+    def __init__(self, budget_ms: float, always_compute: int = 1):
+        """
+        Alustaa ajoittajan.
+
+        Args:
+            budget_ms: Suunnanvalintoihin käytettävä aika askelta kohden millisekunteina
+            always_compute: Näin monta pelaajaa lähintä kysyjää lasketaan aina budjetista riippumatta
+        """
+        self.budget = budget_ms / 1000.0
+        self.always_compute = always_compute
+
+        # Haamukohtaiset aiemmat päätökset: (ruutu x, ruutu y, suunta, moodi) -> suunta
+        self._memory: Dict[object, Dict[Tuple, int]] = {}
+        self._ghosts: Sequence = ()
+
+        # Kuluvan askeleen tila
+        self._spent: float = 0.0
+        self._computed_this_frame: int = 0
+        self._deferred_this_frame: int = 0
+
+        # Tilastot
+        self.frames: int = 0
+        self.requests: int = 0
+        self.computed: int = 0
+        self.planned: int = 0
+        self.deferred: int = 0
+        self.memory_hits: int = 0
+        self.queue_depth: int = 0
+        self.max_queue_depth: int = 0
+        self.compute_time: float = 0.0
+        self.max_frame_time: float = 0.0
+
+    def begin_frame(self, ghosts: Sequence, player_pos: Tuple[float, float]) -> List[int]:
+        """
+        Aloittaa askeleen ja palauttaa haamujen päivitysjärjestyksen.
+
+        Args:
+            ghosts: Simulaation haamulista
+            player_pos: Pelaajan positio (x, y)
+
+        Returns:
+            Haamujen indeksit pelaajaa lähimmästä kaukaisimpaan
+        """
+        if ghosts is not self._ghosts:
+            # Uusi taso tai uudet haamut: vanhat päätökset eivät enää päde
+            self._ghosts = ghosts
+            self._memory = {}
+        self._spent = 0.0
+        self._computed_this_frame = 0
+        self._deferred_this_frame = 0
+
+        player_x, player_y = player_pos
+        return sorted(range(len(ghosts)),
+                      key=lambda i: (ghosts[i].x - player_x) ** 2 + (ghosts[i].y - player_y) ** 2)
+
+    def end_frame(self) -> None:
+        """Päättää askeleen ja kirjaa jonon syvyyden (tällä askeleella lykätyt haamut)."""
+        self.frames += 1
+        self.queue_depth = self._deferred_this_frame
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self.max_frame_time = max(self.max_frame_time, self._spent)
+
+    def charge(self, seconds: float) -> None:
+        """
+        Kirjaa askeleen budjettiin muualla tehdyn reitinhaun (framen yhteinen suunnitelma).
+
+        Args:
+            seconds: Käytetty aika sekunteina
+        """
+        self._spent += seconds
+        self.compute_time += seconds
+
+    def decide(self, ghost, level: Level, tile_x: int, tile_y: int, player_pos: Tuple[float, float],
+               player_direction: int, global_mode: str,
+               planned: Optional[Dict[MoveRequest, Optional[Tuple[int, int]]]] = None) -> int:
+        """
+        Palauttaa haamun suunnan: framen suunnitelmasta, laskettuna jos budjettia on jäljellä,
+        muuten lykättynä.
+
+        Args:
+            ghost: Haamu joka on ruudun keskellä
+            level: Nykyinen taso
+            tile_x: Haamun ruutu x
+            tile_y: Haamun ruutu y
+            player_pos: Pelaajan positio
+            player_direction: Pelaajan liikkumissuunnan koodi
+            global_mode: Globaali moodi
+            planned: Framen valmiiksi lasketut reitit (ks. plan_ghost_moves)
+
+        Returns:
+            Suuntakoodi
+        """
+        self.requests += 1
+        key = (tile_x, tile_y, ghost.direction, ghost.mode)
+        memory = self._memory.get(ghost)
+        if memory is None:
+            memory = self._memory[ghost] = {}
+
+        if planned and ghost.path_request(level, tile_x, tile_y, player_pos, player_direction) in planned:
+            # Vastaus on jo laskettu yhteisessä suunnitelmassa: ei lykätä eikä kuluteta budjettia
+            direction = ghost._choose_direction(level, tile_x, tile_y, player_pos, player_direction,
+                                                global_mode, planned)
+            self.planned += 1
+            memory[key] = direction
+            return direction
+
+        if self._computed_this_frame < self.always_compute or self._spent < self.budget:
+            start = time.perf_counter()
+            direction = ghost._choose_direction(level, tile_x, tile_y, player_pos, player_direction, global_mode)
+            elapsed = time.perf_counter() - start
+            self._spent += elapsed
+            self.compute_time += elapsed
+            self._computed_this_frame += 1
+            self.computed += 1
+            memory[key] = direction
+            return direction
+
+        # Lykätty: aiempi päätös samasta tilanteesta tai viimeisin suunta
+        self.deferred += 1
+        self._deferred_this_frame += 1
+        direction = memory.get(key)
+        if direction is not None:
+            self.memory_hits += 1
+            return direction
+        return _keep_going(ghost.direction, level, tile_x, tile_y)
+
+    def summary(self) -> str:
+        """Palauttaa tilastot yhtenä rivinä."""
+        frames = max(self.frames, 1)
+        return (f"AI: {self.planned} planned, {self.computed} computed, {self.deferred} deferred "
+                f"({self.memory_hits} from memory), queue depth {self.queue_depth} "
+                f"(max {self.max_queue_depth}), {self.compute_time / frames * 1000:.3f} ms/frame "
+                f"(max {self.max_frame_time * 1000:.3f} ms, budget {self.budget * 1000:.3f} ms)")
+
+
+def _keep_going(direction: int, level: Level, tile_x: int, tile_y: int) -> int:
+    """
+    Halpa varasuunta ilman reitinhakua: jatka suoraan, muuten ensimmäinen avoin sivusuunta,
+    muuten U-käännös.
+
+    Args:
+        direction: Nykyinen suuntakoodi
+        level: Taso
+        tile_x: Ruutu x
+        tile_y: Ruutu y
+
+    Returns:
+        Suuntakoodi
+    """
+    if level.is_valid_position(tile_x + DIRECTION_DX[direction], tile_y + DIRECTION_DY[direction]):
+        return direction
+    opposite = OPPOSITE_DIRECTION[direction]
+    for code in ALL_DIRECTION_CODES:
+        if code != opposite and level.is_valid_position(tile_x + DIRECTION_DX[code], tile_y + DIRECTION_DY[code]):
+            return code
+    if level.is_valid_position(tile_x + DIRECTION_DX[opposite], tile_y + DIRECTION_DY[opposite]):
+        return opposite
+    return direction
@@ -10,15 +10,29 @@ from typing import Optional
 class AudioManager:
     """Hallinnoi pelin ääniefektit."""
     
-    def __init__(self):
-        """Alustaa äänimanagerin."""
-        # Alusta pygame mixer
-        pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
-        pygame.mixer.init()
+    def __init__(self, enabled: bool = True):
+        """
+        Alustaa äänimanagerin.
         
+        Args:
+            enabled: False = mixeriä ei alusteta lainkaan (headless-ajot)
+        """
         self.sample_rate = 22050
         self.sounds = {}
-        self.enabled = True
+        self.enabled = enabled
+        
+        if not self.enabled:
+            return
+        
+        # Alusta pygame mixer
+        pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            # Ei äänilaitetta - jatka ilman ääniä
+            print(f"Audio disabled: {e}")
+            self.enabled = False
+            return
         
         # Luo ääniefektit
         self._create_sounds()
@@ -253,8 +267,9 @@ class AudioManager:
         Args:
             enabled: True = äänet päällä, False = äänet pois
         """
-        self.enabled = enabled
+        self.enabled = enabled and bool(self.sounds)
     
     def stop_all(self) -> None:
         """Pysäyttää kaikki äänet."""
-        pygame.mixer.stop()
+        if pygame.mixer.get_init():
+            pygame.mixer.stop()
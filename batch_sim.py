@@ -0,0 +1,712 @@
+"""
+N rinnakkaisen pelin vektorisoitu simulaatio NumPylla.
+Struct-of-arrays: pelaajien ja haamujen positiot, suunnat, moodit ja ajastimet
+sekä pellettibittikartta jokaiselle pelille. Säännöt vastaavat Player.update-,
+Ghost.update- ja Simulation._check_collisions-polkuja.
+"""
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import (
+    SUBPIXEL, MOVE_TIME_BASE, TILE_FP, HALF_TILE_FP, COLLISION_DISTANCE_FP_SQ, INITIAL_LIVES, MAX_LEVEL,
+    PLAYER_SPEED, GHOST_SPEED_CHASE, GHOST_SPEED_SCATTER, GHOST_SPEED_FRIGHT, GHOST_SPEED_EATEN,
+    SPEED_INCREASE_PER_LEVEL, FRIGHTENED_DURATION, MODE_SCHEDULE_LEVEL_1,
+    PELLET_POINTS, POWER_PELLET_POINTS, GHOST_CHAIN_POINTS,
+    DIR_NONE, DIRECTION_DX, DIRECTION_DY, DIRECTION_CODES, OPPOSITE_DIRECTION
+)
+from level import Level
+from rng import StreamBank
+from sim import DEFAULT_LEVEL_FILE, GHOST_PERSONALITIES
+from utils import substeps, time_units
+
+
+# Suuntakoodit: samat kuin entiteeteillä (constants.DIRECTION_VECTORS), NO_INPUT = ei syötettä
+NO_INPUT: int = -1
+DIR_DX = np.array(DIRECTION_DX, dtype=np.int64)
+DIR_DY = np.array(DIRECTION_DY, dtype=np.int64)
+DIR_OPPOSITE = np.array(OPPOSITE_DIRECTION, dtype=np.int64)
+
+# Haamujen moodikoodit
+MODE_SCATTER: int = 0
+MODE_CHASE: int = 1
+MODE_FRIGHTENED: int = 2
+MODE_EATEN: int = 3
+MODE_SPEEDS = np.array(
+    [GHOST_SPEED_SCATTER, GHOST_SPEED_CHASE, GHOST_SPEED_FRIGHT, GHOST_SPEED_EATEN], dtype=np.float64
+)
+
+# Moodiaikataulu taulukkoina
+_SCHEDULE_MODES = np.array([0 if name == "SCATTER" else 1 for name, _ in MODE_SCHEDULE_LEVEL_1], dtype=np.int64)
+_SCHEDULE_DURATIONS = np.array([duration for _, duration in MODE_SCHEDULE_LEVEL_1], dtype=np.float64)
+
+# EATEN-tilan kotiinpaluuaika (kuten Ghost-luokassa)
+_EATEN_HOME_TIME: float = 3.0
+
+def direction_code(direction: Optional[Tuple[int, int]]) -> int:
+    """
+    Muuntaa (dx, dy)-suunnan suuntakoodiksi.
+
+    Args:
+        direction: Suunta, DIRECTION_NONE tai None (= ei syötettä)
+
+    Returns:
+        Koodi 0-3, DIR_NONE tai NO_INPUT
+    """
+    if direction is None:
+        return NO_INPUT
+    return DIRECTION_CODES[direction]
+
+
+def wall_grid(level: Level) -> np.ndarray:
+    """
+    Tason seinät bool-taulukkona (korkeus, leveys).
+
+    Args:
+        level: Taso
+
+    Returns:
+        True seinäruuduissa
+    """
+    return np.array(
+        [[not level.is_valid_position(x, y) for x in range(level.width)] for y in range(level.height)],
+        dtype=bool
+    )
+
+
+def walkable_mask(walls: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray) -> np.ndarray:
+    """
+    Level.is_valid_position vektorisoituna (tason ulkopuoli ei ole kuljettavaa).
+
+    Args:
+        walls: wall_grid-taulukko
+        tile_x: Ruutujen x-koordinaatit
+        tile_y: Ruutujen y-koordinaatit
+
+    Returns:
+        True kuljettavissa ruuduissa
+    """
+    height, width = walls.shape
+    inside = (tile_x >= 0) & (tile_x < width) & (tile_y >= 0) & (tile_y < height)
+    walkable = np.zeros(tile_x.shape, dtype=bool)
+    walkable[inside] = ~walls[tile_y[inside], tile_x[inside]]
+    return walkable
+
+
+def step_distances(speed: np.ndarray, dt: float, remainder: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """utils.step_distance vektorisoituna: (matka alipikseleinä, uusi jakojäännös)."""
+    # np.rint pyöristää kuten round() (puolikkaat parilliseen)
+    return np.divmod(np.rint(speed * SUBPIXEL).astype(np.int64) * time_units(dt) + remainder, MOVE_TIME_BASE)
+
+
+def move_along_grid(x: np.ndarray, y: np.ndarray, direction: np.ndarray, distance: np.ndarray,
+                    walls: np.ndarray, arrive) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    utils.move_along_grid vektorisoituna.
+    Kierroksia ajetaan niin kauan kuin jokin entiteetti saavuttaa keskipisteen jäljellä
+    olevalla matkalla; saapujat päättävät suuntansa yhdellä arrive-kutsulla per kierros.
+
+    Args:
+        x: X-koordinaatit alipikseleinä
+        y: Y-koordinaatit alipikseleinä
+        direction: Suuntakoodit
+        distance: Kuljettavat matkat alipikseleinä
+        walls: wall_grid-taulukko
+        arrive: Kutsu (rivit, ruutu x, ruutu y, suunnat) -> uudet suunnat
+
+    Returns:
+        (x, y, direction) liikkeen jälkeen
+    """
+    x, y, direction, distance = x.copy(), y.copy(), direction.copy(), distance.copy()
+    asked = np.zeros(x.size, dtype=bool)
+    pending = np.arange(x.size)
+    while pending.size:
+        px, py, pd = x[pending], y[pending], direction[pending]
+        tile_x = px // TILE_FP
+        tile_y = py // TILE_FP
+        center_x = tile_x * TILE_FP + HALF_TILE_FP
+        center_y = tile_y * TILE_FP + HALF_TILE_FP
+        dx, dy = DIR_DX[pd], DIR_DY[pd]
+
+        # Matka seuraavaan keskipisteeseen liikesuunnassa
+        offset = (px % TILE_FP - HALF_TILE_FP) * dx + (py % TILE_FP - HALF_TILE_FP) * dy
+        moving = pd != DIR_NONE
+        behind = moving & (offset < 0)
+        ahead = moving & ~behind & walkable_mask(walls, tile_x + dx, tile_y + dy)
+        travelling = behind | ahead
+        gap = np.where(behind, -offset, TILE_FP - offset)
+
+        # Matka loppuu ennen keskipistettä
+        short = travelling & (distance[pending] < gap)
+        rows = pending[short]
+        x[rows] = px[short] + dx[short] * distance[rows]
+        y[rows] = py[short] + dy[short] * distance[rows]
+
+        # Paikallaan ja suunta jo kysytty: jää keskipisteeseen
+        settled = ~travelling & asked[pending]
+        rows = pending[settled]
+        x[rows] = center_x[settled]
+        y[rows] = center_y[settled]
+
+        # Saavutaan keskipisteeseen (tai kysytään paikallaan ollessa) ja valitaan jatkosuunta
+        reaching = travelling & ~short
+        distance[pending[reaching]] -= gap[reaching]
+        arriving = reaching | (~travelling & ~asked[pending])
+        rows = pending[arriving]
+        arrive_x = np.where(ahead, tile_x + dx, tile_x)[arriving]
+        arrive_y = np.where(ahead, tile_y + dy, tile_y)[arriving]
+        x[rows] = arrive_x * TILE_FP + HALF_TILE_FP
+        y[rows] = arrive_y * TILE_FP + HALF_TILE_FP
+        direction[rows] = arrive(rows, arrive_x, arrive_y, pd[arriving])
+        asked[rows] = True
+        pending = rows
+    return x, y, direction
+
+
+def build_next_step_table(level: Level) -> np.ndarray:
+    """
+    Laskee next_step-funktion vastaukset kaikille (kielletty suunta, lähtö, kohde) -yhdistelmille.
+    Jokaisesta lähtöruudusta ajetaan sama BFS kuin next_step:ssä ja kirjataan
+    ensimmäinen askel jokaiseen kohteeseen, joten tulokset ovat identtiset.
+
+    Args:
+        level: Taso
+
+    Returns:
+        int8-taulukko muotoa (5, leveys * korkeus, leveys * (korkeus + 2)).
+        Kohdeindeksi on (y + 1) * leveys + x, y välillä [-1, korkeus].
+        -1 tarkoittaa että next_step palauttaisi None.
+    """
+    width, height = level.width, level.height
+    table = np.full((5, width * height, width * (height + 2)), -1, dtype=np.int8)
+    walkable = [[level.is_valid_position(x, y) for x in range(width)] for y in range(height)]
+
+    def is_walkable(x: int, y: int) -> bool:
+        return 0 <= y < height and 0 <= x < width and walkable[y][x]
+
+    for start_y in range(height):
+        for start_x in range(width):
+            if not walkable[start_y][start_x]:
+                continue
+            start = (start_x, start_y)
+            start_index = start_y * width + start_x
+
+            for forbid in range(5):
+                row = table[forbid, start_index]
+                found = set()
+                first_step: Dict[Tuple[int, int], int] = {}
+                visited = {start}
+                queue = deque([start])
+
+                while queue:
+                    current = queue.popleft()
+                    for code in range(4):
+                        next_x = current[0] + int(DIR_DX[code])
+                        next_y = current[1] + int(DIR_DY[code])
+                        # Tunneli-wrap kuten _wrap_tunnel_position
+                        if next_x < 0:
+                            next_x = width - 1
+                        elif next_x >= width:
+                            next_x = 0
+                        next_tile = (next_x, next_y)
+                        step = code if current == start else first_step[current]
+
+                        # Kohdetarkistus tehdään ennen läpikuljettavuutta (kuten next_step)
+                        if next_tile != start and next_tile not in found and -1 <= next_y <= height:
+                            found.add(next_tile)
+                            row[(next_y + 1) * width + next_x] = step
+
+                        if (is_walkable(next_x, next_y) and next_tile not in visited and
+                                code != forbid):
+                            visited.add(next_tile)
+                            first_step[next_tile] = step
+                            queue.append(next_tile)
+
+    return table
+
+
+class BatchSimulation:
+    """N itsenäistä peliä NumPy-taulukoissa, askel kaikille kerralla."""
+
+    def __init__(self, num_games: int, seeds: Optional[Sequence[int]] = None,
+                 level_file: str = DEFAULT_LEVEL_FILE,
+                 next_step_table: Optional[np.ndarray] = None):
+        """
+        Alustaa pelit ja lataa ensimmäisen tason jokaiseen.
+
+        Args:
+            num_games: Pelien määrä
+            seeds: Pelikohtaiset siemenet (oletuksena 0..N-1)
+            level_file: Tason tiedoston polku
+            next_step_table: Valmiiksi laskettu build_next_step_table-tulos (jaettavissa)
+        """
+        self.num_games = num_games
+        self.seeds = list(seeds) if seeds is not None else list(range(num_games))
+        if len(self.seeds) != num_games:
+            raise ValueError("seeds must have one entry per game")
+
+        # Staattinen tasodata
+        self.level_file = level_file
+        self.level = Level(level_file)
+        self.width = self.level.width
+        self.height = self.level.height
+        self.walls = wall_grid(self.level)
+        self.next_step_table = (next_step_table if next_step_table is not None
+                                else build_next_step_table(self.level))
+
+        spawns = self.level.get_ghost_spawns()
+        self.num_slots = min(MAX_LEVEL, len(spawns))
+        self.ghost_spawn_x = np.array([x for x, _ in spawns[:self.num_slots]], dtype=np.int64)
+        self.ghost_spawn_y = np.array([y for _, y in spawns[:self.num_slots]], dtype=np.int64)
+        self.player_spawn = self.level.get_player_spawn()
+        home_x, home_y = self.level.ghost_home_tile()
+        self._home_goal = (home_y + 1) * self.width + home_x
+
+        # Kotikulmat persoonan mukaan (kuten Ghost._get_home_corner)
+        corner_goals = []
+        for slot in range(self.num_slots):
+            personality = GHOST_PERSONALITIES[slot % len(GHOST_PERSONALITIES)]
+            if personality == "blinky":
+                corner = (self.width - 1, 0)
+            elif personality == "pinky":
+                corner = (0, 0)
+            else:
+                corner = (0, self.height - 1)
+            corner_goals.append((corner[1] + 1) * self.width + corner[0])
+        self._corner_goals = np.array(corner_goals, dtype=np.int64)
+
+        # Pellettipohjat aktiivisten haamujen määrän mukaan (set_active_ghosts)
+        base_pellets = np.zeros((self.height, self.width), dtype=bool)
+        for x, y in self.level.pellets:
+            base_pellets[y, x] = True
+        self._power_template = np.zeros((self.height, self.width), dtype=bool)
+        for x, y in self.level.power_pellets:
+            self._power_template[y, x] = True
+        self._pellet_templates = []
+        for active in range(self.num_slots + 1):
+            template = base_pellets.copy()
+            for x, y in spawns[active:]:
+                template[y, x] = True
+            self._pellet_templates.append(template)
+
+        n, g = num_games, self.num_slots
+
+        # Pelaajat (positiot alipikseleinä kuten Player.fx/fy)
+        self.player_x = np.zeros(n, dtype=np.int64)
+        self.player_y = np.zeros(n, dtype=np.int64)
+        self.player_remainder = np.zeros(n, dtype=np.int64)
+        self.player_dir = np.full(n, DIR_NONE, dtype=np.int64)
+        self.player_desired = np.full(n, DIR_NONE, dtype=np.int64)
+        self.player_speed = np.zeros(n, dtype=np.float64)
+
+        # Haamut (N, G)
+        self.ghost_x = np.zeros((n, g), dtype=np.int64)
+        self.ghost_y = np.zeros((n, g), dtype=np.int64)
+        self.ghost_remainder = np.zeros((n, g), dtype=np.int64)
+        self.ghost_dir = np.zeros((n, g), dtype=np.int64)
+        self.ghost_mode = np.zeros((n, g), dtype=np.int64)
+        self.fright_timer = np.zeros((n, g), dtype=np.float64)
+        self.eaten_timer = np.zeros((n, g), dtype=np.float64)
+        self.ghost_active = np.zeros((n, g), dtype=bool)
+
+        # Pelletit
+        self.pellets = np.zeros((n, self.height, self.width), dtype=bool)
+        self.power_pellets = np.zeros((n, self.height, self.width), dtype=bool)
+        self.pellets_left = np.zeros(n, dtype=np.int64)
+
+        # Pelitiedot
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lives = np.full(n, INITIAL_LIVES, dtype=np.int64)
+        self.current_level = np.ones(n, dtype=np.int64)
+        self.speed_multiplier = np.ones(n, dtype=np.float64)
+        self.mode_timer = np.zeros(n, dtype=np.float64)
+        self.mode_index = np.zeros(n, dtype=np.int64)
+        self.global_mode = np.zeros(n, dtype=np.int64)
+        self.ghost_chain = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.game_complete = np.zeros(n, dtype=bool)
+
+        # Tilastot
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.pellets_eaten = np.zeros(n, dtype=np.int64)
+        self.ghosts_eaten = np.zeros(n, dtype=np.int64)
+        self.deaths = np.zeros(n, dtype=np.int64)
+
+        # Pelikohtaiset satunnaisvirrat (samat kuin StreamRandom(seed) skalaaripolussa)
+        self.streams = StreamBank(self.seeds)
+
+        self._load_level(np.arange(n))
+
+    # ------------------------------------------------------------------
+    # Apufunktiot
+    # ------------------------------------------------------------------
+
+    def _is_walkable(self, tile_x: np.ndarray, tile_y: np.ndarray) -> np.ndarray:
+        """Level.is_valid_position vektorisoituna."""
+        return walkable_mask(self.walls, tile_x, tile_y)
+
+    def _reset_ghosts(self, games: np.ndarray) -> None:
+        """Ghost.reset_position kaikille aktiivisille haamuille annetuissa peleissä."""
+        for slot in range(self.num_slots):
+            active = games[self.ghost_active[games, slot]]
+            if active.size == 0:
+                continue
+            self.ghost_x[active, slot] = self.ghost_spawn_x[slot] * TILE_FP + HALF_TILE_FP
+            self.ghost_y[active, slot] = self.ghost_spawn_y[slot] * TILE_FP + HALF_TILE_FP
+            self.ghost_remainder[active, slot] = 0
+            self.ghost_dir[active, slot] = (self.streams.draw(active) * 4).astype(np.int64)
+            self.ghost_mode[active, slot] = MODE_SCATTER
+            self.fright_timer[active, slot] = 0.0
+            self.eaten_timer[active, slot] = 0.0
+
+    def _reset_player(self, games: np.ndarray) -> None:
+        """Player.reset_position."""
+        spawn_x, spawn_y = self.player_spawn
+        self.player_x[games] = spawn_x * TILE_FP + HALF_TILE_FP
+        self.player_y[games] = spawn_y * TILE_FP + HALF_TILE_FP
+        self.player_remainder[games] = 0
+        self.player_dir[games] = DIR_NONE
+        self.player_desired[games] = DIR_NONE
+
+    def _reset_mode_timer(self, games: np.ndarray) -> None:
+        """Palauttaa moodiaikataulun alkuun."""
+        self.mode_timer[games] = 0.0
+        self.mode_index[games] = 0
+        self.global_mode[games] = _SCHEDULE_MODES[0]
+
+    def _load_level(self, games: np.ndarray) -> None:
+        """Simulation.load_level annetuille peleille (nykyisen tason mukaan)."""
+        if games.size == 0:
+            return
+        levels = self.current_level[games]
+        self.speed_multiplier[games] = 1.0 + (levels - 1) * SPEED_INCREASE_PER_LEVEL
+        self.player_speed[games] = PLAYER_SPEED * self.speed_multiplier[games]
+        self._reset_player(games)
+
+        active_counts = np.minimum(levels, self.num_slots)
+        self.ghost_active[games] = np.arange(self.num_slots)[None, :] < active_counts[:, None]
+
+        # Haamut luodaan järjestyksessä - jokainen arpoo aloitussuuntansa
+        for slot in range(self.num_slots):
+            active = games[self.ghost_active[games, slot]]
+            if active.size == 0:
+                continue
+            self.ghost_x[active, slot] = self.ghost_spawn_x[slot] * TILE_FP + HALF_TILE_FP
+            self.ghost_y[active, slot] = self.ghost_spawn_y[slot] * TILE_FP + HALF_TILE_FP
+            self.ghost_remainder[active, slot] = 0
+            self.ghost_dir[active, slot] = (self.streams.draw(active) * 4).astype(np.int64)
+            self.ghost_mode[active, slot] = MODE_SCATTER
+            self.fright_timer[active, slot] = 0.0
+            self.eaten_timer[active, slot] = 0.0
+
+        for game, active_count in zip(games, active_counts):
+            self.pellets[game] = self._pellet_templates[active_count]
+            self.power_pellets[game] = self._power_template
+        self.pellets_left[games] = (self.pellets[games].sum(axis=(1, 2)) +
+                                    self.power_pellets[games].sum(axis=(1, 2)))
+
+        self._reset_mode_timer(games)
+        self.ghost_chain[games] = 0
+
+    # ------------------------------------------------------------------
+    # Askel
+    # ------------------------------------------------------------------
+
+    def step(self, dt: float, directions: Optional[np.ndarray] = None) -> None:
+        """
+        Etenee kaikkia käynnissä olevia pelejä yhden aika-askeleen.
+        Pitkät askeleet ajetaan sääntöaskelina kuten Simulation.step (utils.substeps).
+
+        Args:
+            dt: Aika-askel sekunteina
+            directions: Pelaajien suuntakoodit (N,), NO_INPUT = ei uutta syötettä
+        """
+        for tick_dt in substeps(dt):
+            running = np.flatnonzero(~(self.game_over | self.game_complete))
+            if running.size == 0:
+                return
+            self._tick(running, tick_dt, directions)
+            directions = None
+
+    def _tick(self, running: np.ndarray, dt: float, directions: Optional[np.ndarray]) -> None:
+        """
+        Ajaa yhden sääntöaskeleen käynnissä oleville peleille.
+
+        Args:
+            running: Käynnissä olevat pelit
+            dt: Sääntöaskeleen pituus sekunteina
+            directions: Pelaajien suuntakoodit (N,), tai None
+        """
+        self.ticks[running] += 1
+
+        self._update_mode_timer(running, dt)
+
+        if directions is not None:
+            directions = np.asarray(directions, dtype=np.int64)[running]
+            has_input = directions != NO_INPUT
+            self.player_desired[running[has_input]] = directions[has_input]
+
+        self._update_players(running, dt)
+        for slot in range(self.num_slots):
+            self._update_ghost_slot(running, slot, dt)
+        self._check_collisions(running)
+
+        # Tarkista voittoehdot
+        alive = running[~self.game_over[running]]
+        cleared = alive[self.pellets_left[alive] == 0]
+        if cleared.size:
+            finished = cleared[self.current_level[cleared] >= MAX_LEVEL]
+            self.game_complete[finished] = True
+            advancing = cleared[self.current_level[cleared] < MAX_LEVEL]
+            self.current_level[advancing] += 1
+            self._load_level(advancing)
+
+    def _update_mode_timer(self, games: np.ndarray, dt: float) -> None:
+        """Simulation._update_mode_timer vektorisoituna."""
+        self.mode_timer[games] += dt
+        schedule_length = len(_SCHEDULE_DURATIONS)
+        index = self.mode_index[games]
+        in_schedule = index < schedule_length
+        durations = _SCHEDULE_DURATIONS[np.minimum(index, schedule_length - 1)]
+        switching = games[in_schedule & (self.mode_timer[games] >= durations)]
+        if switching.size == 0:
+            return
+
+        self.mode_timer[switching] = 0.0
+        self.mode_index[switching] += 1
+        still = switching[self.mode_index[switching] < schedule_length]
+        new_modes = _SCHEDULE_MODES[self.mode_index[still]]
+        changed = still[new_modes != self.global_mode[still]]
+        if changed.size == 0:
+            return
+
+        new_mode = _SCHEDULE_MODES[self.mode_index[changed]]
+        self.global_mode[changed] = new_mode
+        # Ghost.set_mode: SCATTER/CHASE-haamut vaihtavat moodia ja kääntyvät
+        modes = self.ghost_mode[changed]
+        flip = self.ghost_active[changed] & (modes <= MODE_CHASE) & (modes != new_mode[:, None])
+        rows, slots = np.nonzero(flip)
+        games_to_flip = changed[rows]
+        self.ghost_mode[games_to_flip, slots] = new_mode[rows]
+        self.ghost_dir[games_to_flip, slots] = DIR_OPPOSITE[self.ghost_dir[games_to_flip, slots]]
+
+    def _update_players(self, games: np.ndarray, dt: float) -> None:
+        """Player.update vektorisoituna."""
+
+        def arrive(rows: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray,
+                   direction: np.ndarray) -> np.ndarray:
+            # Pellettien syönti keskipisteessä
+            arriving = games[rows]
+            ate_pellet = self.pellets[arriving, tile_y, tile_x]
+            ate_power = ~ate_pellet & self.power_pellets[arriving, tile_y, tile_x]
+
+            pellet_games = arriving[ate_pellet]
+            self.pellets[pellet_games, tile_y[ate_pellet], tile_x[ate_pellet]] = False
+            self.score[pellet_games] += PELLET_POINTS
+            self.pellets_left[pellet_games] -= 1
+            self.pellets_eaten[pellet_games] += 1
+
+            power_games = arriving[ate_power]
+            if power_games.size:
+                self.power_pellets[power_games, tile_y[ate_power], tile_x[ate_power]] = False
+                self.score[power_games] += POWER_PELLET_POINTS
+                self.pellets_left[power_games] -= 1
+                self.pellets_eaten[power_games] += 1
+                self._frighten(power_games)
+
+            # Haluttu suunta jos auki, muuten jatka tai pysähdy
+            desired = self.player_desired[arriving]
+            turn = (desired != DIR_NONE) & self._is_walkable(tile_x + DIR_DX[desired], tile_y + DIR_DY[desired])
+            keep = (direction != DIR_NONE) & self._is_walkable(tile_x + DIR_DX[direction],
+                                                               tile_y + DIR_DY[direction])
+            return np.where(turn, desired, np.where(keep, direction, DIR_NONE))
+
+        distance, self.player_remainder[games] = step_distances(
+            self.player_speed[games], dt, self.player_remainder[games]
+        )
+        (self.player_x[games], self.player_y[games], self.player_dir[games]) = move_along_grid(
+            self.player_x[games], self.player_y[games], self.player_dir[games], distance, self.walls, arrive
+        )
+
+    def _frighten(self, games: np.ndarray) -> None:
+        """Power-pelletin callback: Ghost.set_frightened kaikille ei-EATEN-haamuille."""
+        frighten = self.ghost_active[games] & (self.ghost_mode[games] != MODE_EATEN)
+        rows, slots = np.nonzero(frighten)
+        target = games[rows]
+        self.ghost_mode[target, slots] = MODE_FRIGHTENED
+        self.fright_timer[target, slots] = FRIGHTENED_DURATION
+        self.ghost_dir[target, slots] = DIR_OPPOSITE[self.ghost_dir[target, slots]]
+        self.ghost_chain[games] = 0
+
+    def _update_ghost_slot(self, running: np.ndarray, slot: int, dt: float) -> None:
+        """Ghost.update yhdelle haamupaikalle kaikissa peleissä."""
+        games = running[self.ghost_active[running, slot]]
+        if games.size == 0:
+            return
+
+        # FRIGHTENED- ja EATEN-ajastimet
+        mode = self.ghost_mode[games, slot]
+        frightened = games[mode == MODE_FRIGHTENED]
+        self.fright_timer[frightened, slot] -= dt
+        expired = frightened[self.fright_timer[frightened, slot] <= 0]
+        self.ghost_mode[expired, slot] = self.global_mode[expired]
+        self.fright_timer[expired, slot] = 0.0
+
+        eaten = games[self.ghost_mode[games, slot] == MODE_EATEN]
+        self.eaten_timer[eaten, slot] -= dt
+        expired = eaten[self.eaten_timer[eaten, slot] <= 0]
+        self.ghost_mode[expired, slot] = self.global_mode[expired]
+        self.eaten_timer[expired, slot] = 0.0
+
+        def arrive(rows: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray,
+                   direction: np.ndarray) -> np.ndarray:
+            # Suunnanvalinta jokaisessa saavutetussa keskipisteessä
+            arriving = games[rows]
+            self.ghost_dir[arriving, slot] = direction
+            return self._choose_directions(arriving, slot, tile_x, tile_y)
+
+        speed = MODE_SPEEDS[self.ghost_mode[games, slot]] * self.speed_multiplier[games]
+        distance, self.ghost_remainder[games, slot] = step_distances(
+            speed, dt, self.ghost_remainder[games, slot]
+        )
+        (self.ghost_x[games, slot], self.ghost_y[games, slot], self.ghost_dir[games, slot]) = move_along_grid(
+            self.ghost_x[games, slot], self.ghost_y[games, slot], self.ghost_dir[games, slot], distance,
+            self.walls, arrive
+        )
+
+    def _choose_directions(self, games: np.ndarray, slot: int,
+                           tile_x: np.ndarray, tile_y: np.ndarray) -> np.ndarray:
+        """Ghost._choose_direction vektorisoituna (-1 = satunnainen kelvollinen suunta)."""
+        mode = self.ghost_mode[games, slot]
+        direction = self.ghost_dir[games, slot]
+        start = tile_y * self.width + tile_x
+        result = np.full(games.size, -1, dtype=np.int64)
+
+        player_tile_x = self.player_x[games] // TILE_FP
+        player_tile_y = self.player_y[games] // TILE_FP
+
+        # FRIGHTENED: get_flee_direction (suurin Manhattan-etäisyys, ensimmäinen voittaa)
+        frightened = mode == MODE_FRIGHTENED
+        if frightened.any():
+            best_distance = np.full(int(frightened.sum()), -1, dtype=np.int64)
+            best = np.full(best_distance.size, -1, dtype=np.int64)
+            fx, fy = tile_x[frightened], tile_y[frightened]
+            px, py = player_tile_x[frightened], player_tile_y[frightened]
+            for code in range(4):
+                nx = fx + DIR_DX[code]
+                nx = np.where(nx < 0, self.width - 1, np.where(nx >= self.width, 0, nx))
+                ny = fy + DIR_DY[code]
+                distance = np.abs(nx - px) + np.abs(ny - py)
+                better = self._is_walkable(nx, ny) & (distance > best_distance)
+                best_distance = np.where(better, distance, best_distance)
+                best = np.where(better, code, best)
+            result[frightened] = best
+
+        # EATEN: next_step kotiin ilman kieltoa
+        eaten = mode == MODE_EATEN
+        if eaten.any():
+            result[eaten] = self.next_step_table[DIR_NONE, start[eaten], self._home_goal]
+
+        # SCATTER: kotikulmaan, ei U-käännöstä
+        scatter = mode == MODE_SCATTER
+        if scatter.any():
+            forbid = DIR_OPPOSITE[direction[scatter]]
+            result[scatter] = self.next_step_table[forbid, start[scatter], self._corner_goals[slot]]
+
+        # CHASE: persoonan mukainen kohde
+        chase = mode == MODE_CHASE
+        if chase.any():
+            target_x = player_tile_x[chase]
+            target_y = player_tile_y[chase]
+            if GHOST_PERSONALITIES[slot % len(GHOST_PERSONALITIES)] == "pinky":
+                player_dir = self.player_dir[games[chase]]
+                target_x = target_x + DIR_DX[player_dir] * 4
+                target_y = target_y + DIR_DY[player_dir] * 4
+            reachable = (target_x >= 0) & (target_x < self.width) & (target_y >= -1) & (target_y <= self.height)
+            goal = (target_y + 1) * self.width + target_x
+            forbid = DIR_OPPOSITE[direction[chase]]
+            chase_result = np.full(target_x.size, -1, dtype=np.int64)
+            chase_result[reachable] = self.next_step_table[
+                forbid[reachable], start[chase][reachable], goal[reachable]
+            ]
+            result[chase] = chase_result
+
+        needs_random = result < 0
+        if needs_random.any():
+            result[needs_random] = self._random_valid_directions(
+                games[needs_random], tile_x[needs_random], tile_y[needs_random], direction[needs_random]
+            )
+        return result
+
+    def _random_valid_directions(self, games: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray,
+                                 direction: np.ndarray) -> np.ndarray:
+        """Ghost._get_random_valid_direction vektorisoituna."""
+        opposite = DIR_OPPOSITE[direction]
+        candidates = np.zeros((games.size, 4), dtype=bool)
+        for code in range(4):
+            walkable = self._is_walkable(tile_x + DIR_DX[code], tile_y + DIR_DY[code])
+            candidates[:, code] = walkable & (opposite != code)
+
+        # Jos ei muita vaihtoehtoja, salli U-käännös
+        count = candidates.sum(axis=1)
+        only_reverse = (count == 0) & self._is_walkable(tile_x + DIR_DX[opposite], tile_y + DIR_DY[opposite])
+        candidates[only_reverse, opposite[only_reverse]] = True
+        count = candidates.sum(axis=1)
+
+        # Jos vieläkään ei vaihtoehtoja, pysy paikallaan (ei arvontaa)
+        result = direction.copy()
+        drawing = count > 0
+        if drawing.any():
+            picks = (self.streams.draw(games[drawing]) * count[drawing]).astype(np.int64)
+            cumulative = np.cumsum(candidates[drawing], axis=1) - 1
+            result[drawing] = np.argmax(
+                candidates[drawing] & (cumulative == picks[:, None]), axis=1
+            )
+        return result
+
+    def _check_collisions(self, running: np.ndarray) -> None:
+        """Simulation._check_collisions vektorisoituna (haamupaikat järjestyksessä)."""
+        # Pelaajan positio otetaan ennen silmukkaa kuten skalaaripolussa
+        player_x = self.player_x.copy()
+        player_y = self.player_y.copy()
+        alive = running
+
+        for slot in range(self.num_slots):
+            games = alive[self.ghost_active[alive, slot]]
+            if games.size == 0:
+                continue
+            distance_sq = ((player_x[games] - self.ghost_x[games, slot]) ** 2 +
+                           (player_y[games] - self.ghost_y[games, slot]) ** 2)
+            hit = games[distance_sq < COLLISION_DISTANCE_FP_SQ]
+            if hit.size == 0:
+                continue
+
+            mode = self.ghost_mode[hit, slot]
+
+            # Syö haamu
+            eat = hit[mode == MODE_FRIGHTENED]
+            if eat.size:
+                self.ghost_mode[eat, slot] = MODE_EATEN
+                self.eaten_timer[eat, slot] = _EATEN_HOME_TIME
+                self.fright_timer[eat, slot] = 0.0
+                chain = self.ghost_chain[eat]
+                scoring = chain < len(GHOST_CHAIN_POINTS)
+                chain_points = np.array(GHOST_CHAIN_POINTS, dtype=np.int64)
+                self.score[eat[scoring]] += chain_points[chain[scoring]]
+                self.ghost_chain[eat[scoring]] += 1
+                self.ghosts_eaten[eat] += 1
+
+            # Pelaaja kuolee
+            die = hit[(mode != MODE_FRIGHTENED) & (mode != MODE_EATEN)]
+            if die.size:
+                self.lives[die] -= 1
+                self.deaths[die] += 1
+                over = die[self.lives[die] <= 0]
+                self.game_over[over] = True
+                respawn = die[self.lives[die] > 0]
+                self._reset_player(respawn)
+                self._reset_ghosts(respawn)
+                self.ghost_chain[respawn] = 0
+                self._reset_mode_timer(respawn)
+                alive = alive[~self.game_over[alive]]
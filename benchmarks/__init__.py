@@ -0,0 +1,4 @@
+"""
+Suorituskykymittaukset.
+Ajetaan projektin juuresta: python -m benchmarks (ks. python -m benchmarks --help).
+"""
@@ -0,0 +1,112 @@
+"""
+Komentorivi: python -m benchmarks [--filter TEKSTI] [--json TIEDOSTO] [--baseline TIEDOSTO] ...
+Palauttaa koodin 1 jos jonkin mittauksen mediaani (--check-p95: myös p95) hidastui perustasoon
+nähden yli rajan.
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List, Optional
+
+# Mittaukset ajetaan ilman näyttöä ja äänilaitetta (pygame luetaan vasta tämän jälkeen)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from benchmarks import cases
+from benchmarks.harness import build_report, compare, format_table, load_report, measure, save_report
+
+
+DEFAULT_BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _parse_threshold(value: str) -> Dict[str, float]:
+    """Lukee mittauskohtaisen rajan muodossa NIMI=PROSENTTI."""
+    name, _, pct = value.rpartition("=")
+    if not name:
+        raise argparse.ArgumentTypeError(f"invalid threshold: {value!r} (expected NAME=PCT)")
+    try:
+        return {name: float(pct)}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid threshold: {value!r} (expected NAME=PCT)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Ajaa mittaukset, kirjoittaa raportin ja vertaa perustasoon."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time key Maze Chomp operations and check for regressions")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed samples per benchmark")
+    parser.add_argument("--json", metavar="FILE", help="Write the machine-readable report to FILE")
+    parser.add_argument("--baseline", metavar="FILE", default=DEFAULT_BASELINE,
+                        help="Baseline report to compare against (default benchmarks/baseline.json)")
+    parser.add_argument("--no-compare", action="store_true", help="Do not compare against the baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=25.0, metavar="PCT",
+                        help="Allowed slowdown in percent (default 25)")
+    parser.add_argument("--threshold-for", type=_parse_threshold, action="append", default=[],
+                        metavar="NAME=PCT", help="Per-benchmark threshold (repeatable)")
+    parser.add_argument("--check-p95", action="store_true",
+                        help="Also fail on p95 slowdowns (single slow samples make p95 noisy)")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    try:
+        benchmarks = [b for b in cases.all_benchmarks() if args.filter in b.name]
+        if args.list:
+            for benchmark in benchmarks:
+                print(benchmark.name)
+            return 0
+
+        results = []
+        for benchmark in benchmarks:
+            results.append(measure(benchmark, repeat=args.repeat))
+            print(f"  {benchmark.name}: {results[-1].median_ms:.4f} ms", file=sys.stderr)
+    finally:
+        cases.cleanup()
+        pygame.quit()
+
+    report = build_report(results)
+    baseline = None
+    if not args.no_compare and not args.update_baseline and os.path.exists(args.baseline):
+        baseline = load_report(args.baseline)
+    print(format_table(results, baseline))
+
+    if args.json:
+        save_report(report, args.json)
+        print(f"Report written to {args.json}")
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            # Säilytä perustasoon tallennetut mittauskohtaiset rajat ja muut mittaukset
+            previous = load_report(args.baseline)
+            report["thresholds"] = previous.get("thresholds", {})
+            merged = dict(previous.get("results", {}))
+            merged.update(report["results"])
+            report["results"] = merged
+        save_report(report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        return 0
+
+    overrides: Dict[str, float] = {}
+    for entry in args.threshold_for:
+        overrides.update(entry)
+    metrics = ("median_ms", "p95_ms") if args.check_p95 else ("median_ms",)
+    regressions = compare(report, baseline, args.threshold, overrides, metrics)
+    for regression in regressions:
+        print(f"REGRESSION {regression.name} {regression.metric}: {regression.baseline:.4f} -> "
+              f"{regression.current:.4f} ms ({regression.change_pct:+.1f}%, limit {regression.limit_pct:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
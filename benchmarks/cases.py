@@ -0,0 +1,405 @@
+"""
+Mitattavat operaatiot: tason lataus, reitinhaku, haamujen päivitys (myös yhteisellä
+suunnitelmalla ja AI-budjetilla), piirto, HUD, kokonainen PlayState-frame, äänten alustus,
+simulaatioaskel (myös ECS-prototyypillä ja tiivisteellä), tilannekuvat, tapahtumaohjattu ajo,
+erä-, parvi- ja ympäristöaskel sekä ennakoivan botin päätös. Jokainen mitataan sekä mukana
+tulevalla tasolla että generoidulla isolla sokkelolla, kun operaatio riippuu tason koosta.
+"""
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pygame
+
+from constants import (
+    TILE, SCALE, SIM_TICK_RATE, WINDOW_WIDTH, WINDOW_HEIGHT, DIR_RIGHT, COLLISION_DISTANCE, MAX_LEVEL,
+    ALL_DIRECTIONS
+)
+from level import Level
+from ghost import Ghost
+from pathfinding import next_step, bfs_shortest_path, plan_ghost_moves
+from spatial_hash import SpatialHash
+from sim import DEFAULT_LEVEL_FILE, Simulation
+from benchmarks.harness import Benchmark
+from benchmarks.mazes import generate_maze, write_maze
+
+
+# Generoidun sokkelon koko (pariton) ja reitinhakukyselyjen määrä per näyte
+LARGE_MAZE_SIZE: Tuple[int, int] = (101, 61)
+PATH_QUERIES: int = 50
+GHOST_COUNTS: Tuple[int, ...] = (4, 32, 128)
+
+
+# Generoitu sokkelotiedosto (luodaan ensimmäisellä käytöllä)
+_LARGE_MAZE_FILE = None
+
+
+def _maze_files() -> Dict[str, str]:
+    """Palauttaa mitattavat tasotiedostot nimen mukaan (generoitu sokkelo luodaan kerran)."""
+    global _LARGE_MAZE_FILE
+    if _LARGE_MAZE_FILE is None:
+        _LARGE_MAZE_FILE = write_maze(generate_maze(*LARGE_MAZE_SIZE, seed=1))
+    return {"shipped": DEFAULT_LEVEL_FILE, "large": _LARGE_MAZE_FILE}
+
+
+def cleanup() -> None:
+    """Poistaa generoidun sokkelotiedoston."""
+    global _LARGE_MAZE_FILE
+    if _LARGE_MAZE_FILE is not None and os.path.exists(_LARGE_MAZE_FILE):
+        os.remove(_LARGE_MAZE_FILE)
+    _LARGE_MAZE_FILE = None
+
+
+def _open_tiles(level: Level) -> List[Tuple[int, int]]:
+    """Kuljettavat ruudut."""
+    return [(x, y) for y in range(level.height) for x in range(level.width) if level.is_valid_position(x, y)]
+
+
+def _query_pairs(level: Level, count: int, seed: int = 0) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Satunnaiset (alku, maali) -parit reitinhakuun."""
+    rng = random.Random(seed)
+    tiles = _open_tiles(level)
+    return [(rng.choice(tiles), rng.choice(tiles)) for _ in range(count)]
+
+
+def _level_load(path: str) -> Benchmark:
+    """Tason lataus tiedostosta."""
+    return Benchmark(f"level_load[{_label(path)}]", lambda: path, lambda p: Level(p), number=20)
+
+
+def _next_step(path: str) -> Benchmark:
+    """Haamujen käyttämä next_step-reitinhaku satunnaisille ruutupareille."""
+    def setup():
+        level = Level(path)
+        return level, _query_pairs(level, PATH_QUERIES)
+
+    def run(state):
+        level, pairs = state
+        for start, goal in pairs:
+            next_step(level, start, goal)
+
+    return Benchmark(f"next_step[{_label(path)}]x{PATH_QUERIES}", setup, run)
+
+
+def _bfs_path(path: str) -> Benchmark:
+    """Koko polun BFS satunnaisille ruutupareille."""
+    def setup():
+        level = Level(path)
+        return level, _query_pairs(level, PATH_QUERIES)
+
+    def run(state):
+        level, pairs = state
+        for start, goal in pairs:
+            bfs_shortest_path(start, goal, level)
+
+    return Benchmark(f"bfs_shortest_path[{_label(path)}]x{PATH_QUERIES}", setup, run)
+
+
+def _ghost_update(path: str, count: int) -> Benchmark:
+    """Yksi Ghost.update-kierros count haamulle satunnaisissa ruuduissa (CHASE)."""
+    dt = 1.0 / SIM_TICK_RATE
+
+    def setup():
+        level = Level(path)
+        rng = random.Random(0)
+        tiles = _open_tiles(level)
+        ghosts = [Ghost(*rng.choice(tiles), i % 4, ("blinky", "pinky")[i % 2], rng) for i in range(count)]
+        player_x, player_y = level.get_player_spawn()
+        player_pos = ((player_x + 0.5) * TILE, (player_y + 0.5) * TILE)
+        return level, ghosts, player_pos
+
+    def run(state):
+        level, ghosts, player_pos = state
+        for ghost in ghosts:
+            ghost.update(dt, level, player_pos, DIR_RIGHT, "CHASE")
+
+    # Suunnanvalinta tehdään vain ruudun keskellä, joten näyte kattaa yhden ruudun matkan
+    return Benchmark(f"ghost_update[{_label(path)}]x{count}", setup, run, number=TILE)
+
+
+def _ghost_update_planned(path: str, count: int, budget_ms: float = 0.0) -> Benchmark:
+    """
+    Ghost.update-kierros kuten Simulationissa: ensin askeleen yhteinen plan_ghost_moves-suunnitelma,
+    budjetilla lisäksi AIScheduler (lähimmät ensin, suunnitelman aika veloitetaan budjetista).
+    """
+    from ai_scheduler import AIScheduler
+    dt = 1.0 / SIM_TICK_RATE
+
+    def setup():
+        level = Level(path)
+        rng = random.Random(0)
+        tiles = _open_tiles(level)
+        ghosts = [Ghost(*rng.choice(tiles), i % 4, ("blinky", "pinky")[i % 2], rng) for i in range(count)]
+        player_x, player_y = level.get_player_spawn()
+        player_pos = ((player_x + 0.5) * TILE, (player_y + 0.5) * TILE)
+        scheduler = AIScheduler(budget_ms) if budget_ms > 0 else None
+        return level, ghosts, player_pos, scheduler
+
+    def run(state):
+        level, ghosts, player_pos, scheduler = state
+        order = range(len(ghosts)) if scheduler is None else scheduler.begin_frame(ghosts, player_pos)
+        requests = [request for request in (ghost.upcoming_request(dt, level, player_pos, DIR_RIGHT, "CHASE")
+                                            for ghost in ghosts) if request is not None]
+        plan = plan_ghost_moves(level, requests)
+        if scheduler is not None:
+            scheduler.charge(plan.seconds)
+        planned = dict(zip(requests, plan.directions))
+        for index in order:
+            ghosts[index].update(dt, level, player_pos, DIR_RIGHT, "CHASE", scheduler, planned=planned)
+        if scheduler is not None:
+            scheduler.end_frame()
+
+    name = "ghost_update_budget" if budget_ms > 0 else "ghost_update_planned"
+    return Benchmark(f"{name}[{_label(path)}]x{count}", setup, run, number=TILE)
+
+
+def _collisions(path: str, count: int) -> Benchmark:
+    """Törmäystarkistuksen lähikysely pelaajan ympäriltä (kuten Simulation._check_collisions)."""
+
+    def setup():
+        level = Level(path)
+        rng = random.Random(0)
+        tiles = _open_tiles(level)
+        ghosts = [Ghost(*rng.choice(tiles), i % 4, ("blinky", "pinky")[i % 2], rng) for i in range(count)]
+        spatial = SpatialHash()
+        spatial.rebuild(ghosts)
+        player_x, player_y = level.get_player_spawn()
+        player_pos = ((player_x + 0.5) * TILE, (player_y + 0.5) * TILE)
+        return ghosts, spatial, player_pos
+
+    def run(state):
+        ghosts, spatial, player_pos = state
+        spatial.within(player_pos[0], player_pos[1], COLLISION_DISTANCE)
+
+    return Benchmark(f"collisions[{_label(path)}]x{count}", setup, run, number=500)
+
+
+def _level_draw(path: str) -> Benchmark:
+    """Seinien ja pellettien piirto täydellä skaalauksella."""
+    def setup():
+        level = Level(path)
+        return level, pygame.Surface((level.width * TILE * SCALE, level.height * TILE * SCALE))
+
+    def run(state):
+        level, surface = state
+        level.draw(surface, SCALE)
+
+    return Benchmark(f"level_draw[{_label(path)}]", setup, run, number=20)
+
+
+def _hud_draw() -> Benchmark:
+    """HUD-palkin piirto."""
+    from hud import HUD
+
+    def setup():
+        return HUD(), pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def run(state):
+        hud, surface = state
+        hud.draw(surface, 12340, 3, 2, 150, "CHASE")
+
+    return Benchmark("hud_draw", setup, run, number=50)
+
+
+def _play_frame() -> Benchmark:
+    """Kokonainen headless-frame: PlayState.update (autopilotti) + render."""
+    from audio import AudioManager
+    from controllers import AutopilotController
+    from game_state import PlayState, GameStateType
+    from hud import HUD
+    dt = 1.0 / SIM_TICK_RATE
+
+    def setup():
+        state = PlayState(HUD(), AudioManager(enabled=False), controller=AutopilotController())
+        state.sim.verbose = False
+        state.sim.reset(0)
+        return state, pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def run(state):
+        play_state, surface = state
+        if play_state.update(dt) in (GameStateType.GAME_OVER, GameStateType.COMPLETE_VICTORY):
+            play_state.sim.reset(0)
+        play_state.render(surface)
+
+    return Benchmark("play_frame[update+render]", setup, run, number=10)
+
+
+def _audio_startup() -> Benchmark:
+    """AudioManagerin alustus: mixer ja kaikkien ääniefektien synteesi."""
+    from audio import AudioManager
+
+    def run(_):
+        AudioManager(enabled=True)
+        pygame.mixer.quit()
+
+    return Benchmark("audio_startup", lambda: None, run)
+
+
+def _sim_tick(kind: str) -> Benchmark:
+    """
+    Simulation.step viimeisellä tasolla satunnaisilla syötteillä (elämät eivät lopu).
+    kind: "scalar", "hashed" (lisäksi sim.state_hash joka askeleella) tai "ecs" (EcsSimulation).
+    """
+    from ecs import EcsSimulation
+    dt = 1.0 / SIM_TICK_RATE
+
+    def setup():
+        sim_class = EcsSimulation if kind == "ecs" else Simulation
+        sim = sim_class(seed=0, start_level=MAX_LEVEL)
+        sim.lives = sys.maxsize
+        return sim, random.Random(0)
+
+    def run(state):
+        sim, inputs = state
+        sim.step(dt, inputs.choice(ALL_DIRECTIONS) if inputs.random() < 0.05 else None)
+        if kind == "hashed":
+            sim.state_hash
+
+    return Benchmark(f"sim_tick[{kind}]", setup, run, number=60)
+
+
+def _full_hash() -> Benchmark:
+    """Zobrist-tiivisteen laskenta alusta (vertailukohta inkrementaaliselle, ks. sim_tick[hashed])."""
+    from zobrist import compute_hash
+
+    def setup():
+        return Simulation(seed=0, start_level=MAX_LEVEL)
+
+    return Benchmark("state_hash[full]", setup, compute_hash, number=20)
+
+
+def _snapshot() -> Benchmark:
+    """Tilannekuvan otto ja palautus (hakupuut ja tallenteiden hypyt)."""
+    def setup():
+        sim = Simulation(seed=0)
+        inputs = random.Random(0)
+        for _ in range(1500):
+            sim.step(1.0 / SIM_TICK_RATE, inputs.choice(ALL_DIRECTIONS) if inputs.random() < 0.05 else None)
+        return sim, sim.snapshot()
+
+    def run(state):
+        sim, data = state
+        sim.restore(data)
+        sim.snapshot()
+
+    return Benchmark("snapshot[capture+restore]", setup, run, number=100)
+
+
+def _idle_game(event_driven: bool, ticks: int = 600) -> Benchmark:
+    """Syötteetön peli ticks tikkiä tapahtumaohjatusti (EventDrivenRunner) tai tikki kerrallaan."""
+    from event_sim import EventDrivenRunner
+
+    def setup():
+        sim = Simulation(seed=0)
+        return sim, sim.snapshot()
+
+    def run(state):
+        sim, start = state
+        sim.restore(start)
+        if event_driven:
+            EventDrivenRunner(sim).run(None, ticks)
+        else:
+            for _ in range(ticks):
+                sim.step(1.0 / SIM_TICK_RATE)
+
+    return Benchmark(f"idle_game[{'event' if event_driven else 'fixed'}]x{ticks}", setup, run)
+
+
+def _batch_step(games: int = 256) -> Benchmark:
+    """Yksi BatchSimulation-askel games pelille satunnaisilla syötteillä."""
+    from batch_sim import BatchSimulation, NO_INPUT
+
+    def setup():
+        inputs = np.random.default_rng(0)
+        codes = [np.where(inputs.random(games) < 0.05, inputs.integers(0, 4, games), NO_INPUT) for _ in range(64)]
+        return BatchSimulation(games, list(range(games))), codes, [0]
+
+    def run(state):
+        batch, codes, tick = state
+        batch.step(1.0 / SIM_TICK_RATE, codes[tick[0] % len(codes)])
+        tick[0] += 1
+
+    return Benchmark(f"batch_step[shipped]x{games}", setup, run, number=10)
+
+
+def _swarm_step(path: str, count: int = 1000) -> Benchmark:
+    """Yksi SwarmSimulation-askel count haamulla (elämät eivät lopu)."""
+    from swarm import SwarmConfig, SwarmSimulation
+
+    def setup():
+        sim = SwarmSimulation(SwarmConfig(count=count), path, seed=0)
+        sim.lives = sys.maxsize
+        return sim, random.Random(0)
+
+    def run(state):
+        sim, inputs = state
+        sim.step(1.0 / SIM_TICK_RATE, inputs.choice(ALL_DIRECTIONS) if inputs.random() < 0.05 else None)
+
+    return Benchmark(f"swarm_step[{_label(path)}]x{count}", setup, run, number=10)
+
+
+def _env_step() -> Benchmark:
+    """MazeChompEnv.step satunnaisilla toiminnoilla (reset jakson päättyessä)."""
+    from env import MazeChompEnv, NUM_ACTIONS
+
+    def setup():
+        env = MazeChompEnv()
+        env.reset(seed=0)
+        return env, random.Random(0)
+
+    def run(state):
+        env, actions = state
+        _, _, terminated, truncated, _ = env.step(actions.randrange(NUM_ACTIONS))
+        if terminated or truncated:
+            env.reset()
+
+    return Benchmark("env_step", setup, run, number=60)
+
+
+def _lookahead_decision(rollouts: int = 16) -> Benchmark:
+    """Ennakoivan botin yksi päätös kiinteällä jatkomäärällä pelaajan aloitusruudussa."""
+    from lookahead import LookaheadController
+
+    def setup():
+        return Simulation(seed=0), LookaheadController(rollouts=rollouts)
+
+    def run(state):
+        sim, controller = state
+        controller.reset()
+        controller.next_direction(sim)
+
+    return Benchmark(f"lookahead_decision[rollouts={rollouts}]", setup, run)
+
+
+def _label(path: str) -> str:
+    """Tasotiedoston nimi mittauksen nimeen."""
+    for name, maze_path in _maze_files().items():
+        if maze_path == path:
+            return name
+    return os.path.basename(path)
+
+
+def all_benchmarks() -> List[Benchmark]:
+    """
+    Palauttaa kaikki mittaukset.
+
+    Returns:
+        Mittaukset suoritusjärjestyksessä
+    """
+    paths = list(_maze_files().values())
+    benchmarks: List[Benchmark] = []
+    benchmarks += [_level_load(path) for path in paths]
+    benchmarks += [_next_step(path) for path in paths]
+    benchmarks += [_bfs_path(path) for path in paths]
+    benchmarks += [_ghost_update(path, count) for path in paths for count in GHOST_COUNTS]
+    benchmarks += [_ghost_update_planned(paths[-1], GHOST_COUNTS[-1]),
+                   _ghost_update_planned(paths[-1], GHOST_COUNTS[-1], budget_ms=0.5)]
+    benchmarks += [_collisions(paths[-1], count) for count in GHOST_COUNTS]
+    benchmarks += [_level_draw(path) for path in paths]
+    benchmarks += [_hud_draw(), _play_frame(), _audio_startup()]
+    benchmarks += [_sim_tick("scalar"), _sim_tick("hashed"), _sim_tick("ecs"), _full_hash(), _snapshot()]
+    benchmarks += [_idle_game(False), _idle_game(True)]
+    benchmarks += [_batch_step(), _swarm_step(paths[-1]), _env_step(), _lookahead_decision()]
+    return benchmarks
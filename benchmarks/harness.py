@@ -0,0 +1,223 @@
+"""
+Mittauskehys: ajastus (mediaani/p95), muistivaraukset, JSON-raportti ja vertailu perustasoon.
+"""
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+
+class Benchmark(NamedTuple):
+    """Yksi mitattava operaatio."""
+    name: str
+    setup: Callable[[], Any]            # Palauttaa tilan jota run käyttää (ei ajasteta)
+    run: Callable[[Any], None]          # Ajastettava operaatio
+    number: int = 1                     # run-kutsuja per näyte (nopeille operaatioille)
+    teardown: Optional[Callable[[Any], None]] = None
+
+
+class BenchmarkResult(NamedTuple):
+    """Yhden mittauksen tulos (ajat millisekunteina per run-kutsu)."""
+    name: str
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    samples: int
+    number: int
+    alloc_bytes: int                    # Yhden run-kutsun jälkeen varattuna jääneet tavut
+    alloc_blocks: int                   # Yhden run-kutsun jälkeen varattuna jääneet lohkot
+    peak_bytes: int                     # Yhden run-kutsun muistihuippu (tavua)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Palauttaa tuloksen JSON-muodossa (ilman nimeä)."""
+        data = self._asdict()
+        del data["name"]
+        return data
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Palauttaa lähimmän järjestyssijan persentiilin."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(benchmark: Benchmark, repeat: int = 30, warmup: int = 2) -> BenchmarkResult:
+    """
+    Mittaa operaation.
+    Ajat mitataan ilman tracemallocia; varaukset mitataan erillisellä ajolla.
+
+    Args:
+        benchmark: Mitattava operaatio
+        repeat: Näytteiden määrä
+        warmup: Lämmittelykierrokset ennen mittausta
+
+    Returns:
+        Tulos
+    """
+    state = benchmark.setup()
+    try:
+        for _ in range(warmup):
+            benchmark.run(state)
+
+        samples = []
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for _ in range(benchmark.number):
+                    benchmark.run(state)
+                samples.append((time.perf_counter() - start) / benchmark.number)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        # Varaukset: yksi erillinen ajo tracemallocin kanssa (net = jäljelle jäänyt, peak = huippu)
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            benchmark.run(state)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        gc.collect()
+        alloc_bytes = current - base
+        alloc_blocks = sys.getallocatedblocks() - blocks_before
+    finally:
+        if benchmark.teardown is not None:
+            benchmark.teardown(state)
+
+    return BenchmarkResult(
+        name=benchmark.name,
+        median_ms=statistics.median(samples) * 1000.0,
+        p95_ms=_percentile(samples, 0.95) * 1000.0,
+        min_ms=min(samples) * 1000.0,
+        samples=repeat,
+        number=benchmark.number,
+        alloc_bytes=alloc_bytes,
+        alloc_blocks=alloc_blocks,
+        peak_bytes=max(0, peak - base),
+    )
+
+
+def build_report(results: List[BenchmarkResult]) -> Dict[str, Any]:
+    """
+    Kokoaa koneluettavan raportin.
+
+    Args:
+        results: Mittausten tulokset
+
+    Returns:
+        JSON-yhteensopiva sanakirja
+    """
+    try:
+        import pygame
+        pygame_version = pygame.version.ver
+    except ImportError:
+        pygame_version = None
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pygame": pygame_version,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": {result.name: result.to_dict() for result in results},
+    }
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """Kirjoittaa raportin JSON-tiedostoon."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Lukee raportin tai perustason JSON-tiedostosta."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Regression(NamedTuple):
+    """Perustasoon verrattuna hidastunut mittaus."""
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    limit_pct: float
+
+    @property
+    def change_pct(self) -> float:
+        """Muutos prosentteina perustasoon."""
+        return (self.current / self.baseline - 1.0) * 100.0 if self.baseline else float("inf")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold_pct: float = 25.0,
+            overrides: Optional[Dict[str, float]] = None,
+            metrics: tuple = ("median_ms", "p95_ms")) -> List[Regression]:
+    """
+    Vertaa raporttia perustasoon.
+    Raja luetaan järjestyksessä: overrides, perustason "thresholds"-kenttä, threshold_pct.
+
+    Args:
+        report: Nykyinen raportti
+        baseline: Perustaso (sama muoto, valinnainen "thresholds": {nimi: prosentti})
+        threshold_pct: Oletusraja prosentteina
+        overrides: Mittauskohtaiset rajat komentoriviltä
+        metrics: Verrattavat tunnusluvut
+
+    Returns:
+        Rajan ylittäneet mittaukset
+    """
+    limits = dict(baseline.get("thresholds", {}))
+    limits.update(overrides or {})
+
+    regressions = []
+    for name, current in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        limit = limits.get(name, threshold_pct)
+        for metric in metrics:
+            if metric not in reference:
+                continue
+            if current[metric] > reference[metric] * (1.0 + limit / 100.0):
+                regressions.append(Regression(name, metric, reference[metric], current[metric], limit))
+    return regressions
+
+
+def format_table(results: List[BenchmarkResult], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Muotoilee tulokset taulukoksi.
+
+    Args:
+        results: Tulokset
+        baseline: Valinnainen perustaso muutosprosenttia varten
+
+    Returns:
+        Tulostettava teksti
+    """
+    header = f"{'benchmark':<34} {'median ms':>10} {'p95 ms':>10} {'peak KiB':>9} {'net KiB':>8}"
+    if baseline is not None:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        line = (f"{result.name:<34} {result.median_ms:>10.4f} {result.p95_ms:>10.4f} "
+                f"{result.peak_bytes / 1024:>9.1f} {result.alloc_bytes / 1024:>8.1f}")
+        if baseline is not None:
+            reference = baseline.get("results", {}).get(result.name)
+            if reference and reference.get("median_ms"):
+                line += f" {(result.median_ms / reference['median_ms'] - 1.0) * 100:>+7.1f}%"
+            else:
+                line += f" {'new':>8}"
+        lines.append(line)
+    return "\n".join(lines)
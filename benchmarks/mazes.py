@@ -0,0 +1,87 @@
+"""
+Generoidut sokkelot mittauksia varten.
+Sokkelo on samaa tekstimuotoa kuin level1/level1.txt, joten se ladataan tavallisella Level-luokalla.
+"""
+import os
+import random
+import tempfile
+from typing import List, Optional
+
+from constants import (
+    WALL_CHAR, PELLET_CHAR, POWER_PELLET_CHAR, PLAYER_SPAWN_CHAR, GHOST_SPAWN_CHAR
+)
+
+
+def generate_maze(width: int, height: int, seed: int = 0, loop_chance: float = 0.1,
+                  ghosts: int = 4) -> List[str]:
+    """
+    Generoi sokkelon satunnaisella syvyyshaulla ja avaa osan seinistä silmukoiksi.
+
+    Args:
+        width: Leveys ruutuina (pariton)
+        height: Korkeus ruutuina (pariton)
+        seed: Siemen
+        loop_chance: Todennäköisyys avata sisäseinä (umpikujia vähemmän)
+        ghosts: Haamujen aloituspaikkojen määrä
+
+    Returns:
+        Tason rivit
+    """
+    rng = random.Random(seed)
+    grid = [[WALL_CHAR] * width for _ in range(height)]
+
+    # Syvyyshaku parittomissa ruuduissa
+    stack = [(1, 1)]
+    grid[1][1] = PELLET_CHAR
+    while stack:
+        x, y = stack[-1]
+        options = [(dx, dy) for dx, dy in ((0, -2), (-2, 0), (0, 2), (2, 0))
+                   if 0 < x + dx < width - 1 and 0 < y + dy < height - 1
+                   and grid[y + dy][x + dx] == WALL_CHAR]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = rng.choice(options)
+        grid[y + dy // 2][x + dx // 2] = PELLET_CHAR
+        grid[y + dy][x + dx] = PELLET_CHAR
+        stack.append((x + dx, y + dy))
+
+    # Silmukat
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            if grid[y][x] == WALL_CHAR and rng.random() < loop_chance:
+                horizontal = grid[y][x - 1] != WALL_CHAR and grid[y][x + 1] != WALL_CHAR
+                vertical = grid[y - 1][x] != WALL_CHAR and grid[y + 1][x] != WALL_CHAR
+                if horizontal != vertical:
+                    grid[y][x] = PELLET_CHAR
+
+    # Erikoisruudut: power-pelletit kulmiin, pelaaja keskelle, haamut sen lähelle
+    open_tiles = [(x, y) for y in range(height) for x in range(width) if grid[y][x] != WALL_CHAR]
+    for corner_x, corner_y in ((1, 1), (width - 2, 1), (1, height - 2), (width - 2, height - 2)):
+        x, y = min(open_tiles, key=lambda tile: abs(tile[0] - corner_x) + abs(tile[1] - corner_y))
+        grid[y][x] = POWER_PELLET_CHAR
+
+    center = min(open_tiles, key=lambda tile: abs(tile[0] - width // 2) + abs(tile[1] - height // 2))
+    grid[center[1]][center[0]] = PLAYER_SPAWN_CHAR
+    by_distance = sorted(open_tiles, key=lambda tile: abs(tile[0] - center[0]) + abs(tile[1] - center[1]))
+    for x, y in by_distance[1 + ghosts:1 + 2 * ghosts]:
+        grid[y][x] = GHOST_SPAWN_CHAR
+
+    return ["".join(row) for row in grid]
+
+
+def write_maze(lines: List[str], directory: Optional[str] = None) -> str:
+    """
+    Kirjoittaa sokkelon tiedostoon.
+
+    Args:
+        lines: Tason rivit
+        directory: Hakemisto (oletuksena järjestelmän väliaikaishakemisto)
+
+    Returns:
+        Tiedoston polku
+    """
+    handle, path = tempfile.mkstemp(prefix="maze_", suffix=".txt", dir=directory)
+    with os.fdopen(handle, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
@@ -6,12 +6,42 @@ from typing import Tuple
 
 # Ikkunan ja ruudukon mitat
 TILE: int = 16  # Logiikan ruutukoko pikseleinä
+SUBPIXEL: int = 256  # Entiteettien positiot tallennetaan kokonaislukuina 1/SUBPIXEL pikselin yksiköissä
+TILE_FP: int = TILE * SUBPIXEL
+HALF_TILE_FP: int = TILE_FP // 2
 SCALE: int = 2  # Skaalauskerroin renderöintiin (pienennetty)
 HUD_HEIGHT: int = 40  # HUD:in korkeus
 WINDOW_WIDTH: int = 22 * TILE * SCALE  # 704 pikseliä
 WINDOW_HEIGHT: int = 18 * TILE * SCALE + HUD_HEIGHT  # 576 + 40 = 616 pikseliä
 FPS: int = 60
 
+# Renderöi pelialue loogisella resoluutiolla (TILE) ja skaalaa kerran ikkunan kokoon
+LOGICAL_RENDER: bool = False
+
+# Kiinteä simulaatioaskel (tikkiä sekunnissa) ja kiinniottoraja
+SIM_TICK_RATE: int = 60
+MAX_SIM_STEPS_PER_FRAME: int = 5  # Näin monta askelta per frame, ylimenevä aika pudotetaan
+
+# Liikkeen aikayksiköt sekunnissa: aika-askel pyöristetään näihin yksiköihin ja askelmatkan
+# jakojäännös kulkee niissä. Jokainen kokonainen millisekunti ja tavalliset virkistystaajuudet
+# (30, 60, 90, 120, 144, 240 Hz) ovat tasan yksiköitä, joten reitti ei riipu askeleen pituudesta
+MOVE_TIME_BASE: int = 72000
+
+# Pisin sääntöaskel aikayksiköinä: pidemmät askeleet jaetaan tämän mittaisiin osiin, joten
+# törmäykset ja ajastimet tarkistetaan SIM_TICK_RATE-tahdissa askeleen pituudesta riippumatta
+MAX_SUBSTEP_UNITS: int = MOVE_TIME_BASE // SIM_TICK_RATE
+
+# Haamujen suunnanvalintojen aikabudjetti askelta kohden (ms, 0 = ei ajoittajaa, deterministinen)
+AI_BUDGET_MS: float = 0.0
+
+# Soak-ajon pelin enimmäispituus pelisekunteina, jonka jälkeen uusi peli alkaa seuraavalta tasolta
+# (0 = pelit pelataan loppuun)
+SOAK_GAME_SECONDS: float = 60.0
+
+# Tallenteiden tilannekuvaväli (tikkeinä) ja pikakelauksen renderöintiväli (frameina)
+REPLAY_SNAPSHOT_INTERVAL: int = SIM_TICK_RATE * 30
+FAST_FORWARD_RENDER_EVERY: int = 16
+
 # Värit (RGB)
 BLACK: Tuple[int, int, int] = (0, 0, 0)
 WHITE: Tuple[int, int, int] = (255, 255, 255)
@@ -72,10 +102,16 @@ GHOST_CHAIN_POINTS: list[int] = [200, 400, 800, 1600]
 # Pelaajan aloitusarvot
 INITIAL_LIVES: int = 3
 
+# Viimeinen taso (tämän jälkeen peli on läpäisty)
+MAX_LEVEL: int = 6
+
 # Fonttikoko
 FONT_SIZE: int = 24
 HUD_FONT_SIZE: int = 20
 
+# Tekstipintojen välimuistin maksimikoko
+TEXT_CACHE_SIZE: int = 128
+
 # Suunnat (dx, dy)
 DIRECTION_NONE: Tuple[int, int] = (0, 0)
 DIRECTION_UP: Tuple[int, int] = (0, -1)
@@ -88,12 +124,32 @@ ALL_DIRECTIONS: list[Tuple[int, int]] = [
     DIRECTION_UP, DIRECTION_LEFT, DIRECTION_DOWN, DIRECTION_RIGHT
 ]
 
+# Suuntakoodit entiteettien sisäiseen tilaan (ALL_DIRECTIONS-järjestys + ei suuntaa)
+DIR_UP: int = 0
+DIR_LEFT: int = 1
+DIR_DOWN: int = 2
+DIR_RIGHT: int = 3
+DIR_NONE: int = 4
+ALL_DIRECTION_CODES: Tuple[int, ...] = (DIR_UP, DIR_LEFT, DIR_DOWN, DIR_RIGHT)
+
+# Hakutaulut suuntakoodin mukaan (jaetut tuplet, ei varauksia kuumissa poluissa)
+DIRECTION_VECTORS: Tuple[Tuple[int, int], ...] = tuple(ALL_DIRECTIONS) + (DIRECTION_NONE,)
+DIRECTION_DX: Tuple[int, ...] = tuple(vector[0] for vector in DIRECTION_VECTORS)
+DIRECTION_DY: Tuple[int, ...] = tuple(vector[1] for vector in DIRECTION_VECTORS)
+OPPOSITE_DIRECTION: Tuple[int, ...] = (DIR_DOWN, DIR_RIGHT, DIR_UP, DIR_LEFT, DIR_NONE)
+DIRECTION_CODES: dict[Tuple[int, int], int] = {
+    vector: code for code, vector in enumerate(DIRECTION_VECTORS)
+}
+
+# Pelaajan suun siirtymä keskipisteestä suunnan mukaan (loogisina pikseleinä)
+PLAYER_MOUTH_OFFSET: int = 4
+MOUTH_OFFSETS: Tuple[Tuple[int, int], ...] = tuple(
+    (dx * PLAYER_MOUTH_OFFSET, dy * PLAYER_MOUTH_OFFSET) for dx, dy in DIRECTION_VECTORS
+)
+
 # Tunnelin sijainnit (y-koordinaatti)
 TUNNEL_Y: int = 10
 
-# Tarkkuus liikkeen keskittämiseen
-SNAP_THRESHOLD: float = 2.0  # Pikseliä
-
 # Kartan merkit
 WALL_CHAR: str = '#'
 PELLET_CHAR: str = '.'
@@ -104,6 +160,16 @@ EMPTY_CHAR: str = ' '
 
 # Törmäysetäisyys
 COLLISION_DISTANCE: float = TILE * 0.6
+COLLISION_DISTANCE_SQ: float = COLLISION_DISTANCE * COLLISION_DISTANCE  # Vertailu ilman neliöjuurta
+COLLISION_DISTANCE_FP: int = round(COLLISION_DISTANCE * SUBPIXEL)
+COLLISION_DISTANCE_FP_SQ: int = COLLISION_DISTANCE_FP * COLLISION_DISTANCE_FP  # Alipikseleinä, kokonaisluvut
+
+# Zobrist-tiivisteen ajastinlokeron koko sekunteina (ks. zobrist.py)
+ZOBRIST_TIMER_BUCKET: float = 0.25
+
+# Profiloijan liukuva ikkuna (frameina) ja overlayn päivitysväli
+PROFILER_WINDOW: int = 240
+PROFILER_REFRESH_FRAMES: int = 15
 
 # Ghost-ketjupisteiden näyttöaika
 GHOST_POINTS_DISPLAY_TIME: float = 1.0
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Pelaajan ohjaimet.
+PlayState kysyy jokaisella simulaatioaskeleella ohjaimelta pelaajan halutun suunnan, joten
+näppäimistön voi korvata botilla (autopilotti soak- ja kuormitustesteihin).
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from constants import ALL_DIRECTIONS, DIRECTION_VECTORS, OPPOSITE_DIRECTION, TILE
+from ghost import GhostMode
+
+if TYPE_CHECKING:
+    from level import Level
+    from sim import Simulation
+
+
+# Etäisyys ruutuun johon ei päästä
+_UNREACHABLE: int = 1 << 30
+
+
+class PlayerController(ABC):
+    """Abstrakti ohjain: antaa pelaajan halutun suunnan simulaation tilan perusteella."""
+
+    @abstractmethod
+    def next_direction(self, sim: "Simulation") -> Optional[Tuple[int, int]]:
+        """
+        Palauttaa seuraavan askeleen syötteen.
+
+        Args:
+            sim: Simulaatio
+
+        Returns:
+            Haluttu suunta (dx, dy), tai None jos ei uutta syötettä
+        """
+        pass
+
+    def reset(self) -> None:
+        """Nollaa ohjaimen tilan uutta peliä varten."""
+        pass
+
+
+class KeyboardController(PlayerController):
+    """Lukee suunnan nuolinäppäimistä tai WASD:sta."""
+
+    def next_direction(self, sim: "Simulation") -> Optional[Tuple[int, int]]:
+        """Palauttaa painettujen näppäinten suunnan."""
+        import pygame
+        from player import direction_from_keys
+        return direction_from_keys(pygame.key.get_pressed())
+
+
+class AutopilotController(PlayerController):
+    """
+    Ahne botti: kulkee lähintä turvallista pellettiä kohti ja väistää vaarallisia haamuja.
+    Ruutu on turvallinen jos pelaaja ehtii sinne selvästi ennen lähintä haamua. Haamujen
+    etäisyyskenttä (BFS kaikista vaarallisista haamuista) lasketaan uudelleen vain kun haamujen
+    ruudut muuttuvat, ja päätös tehdään vain kun pelaajan ruutu, pelletit tai kenttä muuttuvat.
+    """
+
+    def __init__(self, safety_margin: int = 2, fright_margin: float = 1.0, min_region: int = 8):
+        """
+        Alustaa autopilotin.
+
+        Args:
+            safety_margin: Montako ruutua ennen haamua pelaajan pitää ehtiä ruutuun
+            fright_margin: Pelästynyttä haamua pidetään vaarallisena kun pelkoa on jäljellä alle tämän (s)
+            min_region: Turvallisten ruutujen vähimmäismäärä suunnassa johon lähdetään
+        """
+        self.safety_margin = safety_margin
+        self.fright_margin = fright_margin
+        self.min_region = min_region
+        self.reset()
+
+    def reset(self) -> None:
+        """Tyhjentää välimuistit."""
+        self._level: "Optional[Level]" = None
+        self._neighbors: List[List[Tuple[int, Tuple[int, int]]]] = []
+        self._ghost_key: Optional[Tuple] = None
+        self._ghost_distance: List[int] = []
+        self._decision_key: Optional[Tuple] = None
+        self._decision: Optional[Tuple[int, int]] = None
+
+    def next_direction(self, sim: "Simulation") -> Optional[Tuple[int, int]]:
+        """Palauttaa suunnan kohti lähintä turvallista pellettiä (tai pakosuunnan)."""
+        level = sim.level
+        player = sim.player
+        if level is None or player is None:
+            return None
+        if level is not self._level:
+            self._build_graph(level)
+
+        width = level.width
+        tile_x = int(player.x // TILE) % width
+        tile_y = int(player.y // TILE)
+        if not 0 <= tile_y < level.height:
+            return None
+
+        ghost_key = tuple(
+            (int(ghost.y // TILE) * width + int(ghost.x // TILE) % width, ghost.direction)
+            for ghost in sim.ghosts if self._is_dangerous(ghost)
+        )
+        if ghost_key != self._ghost_key:
+            self._ghost_key = ghost_key
+            self._ghost_distance = self._distance_field(ghost_key)
+
+        tile = tile_y * width + tile_x
+        decision_key = (tile, level.pellets_left(), ghost_key)
+        if decision_key != self._decision_key:
+            self._decision_key = decision_key
+            self._decision = self._choose(level, tile)
+        return self._decision
+
+    def _is_dangerous(self, ghost) -> bool:
+        """Voiko haamu tappaa pelaajan lähiaikoina."""
+        if ghost.mode == GhostMode.EATEN:
+            return False
+        if ghost.mode == GhostMode.FRIGHTENED:
+            return ghost.fright_timer < self.fright_margin
+        return True
+
+    def _build_graph(self, level: "Level") -> None:
+        """Laskee kuljettavien ruutujen naapurilistat (tunnelit huomioiden)."""
+        self._level = level
+        width, height = level.width, level.height
+        self._neighbors = [[] for _ in range(width * height)]
+        for y in range(height):
+            for x in range(width):
+                if not level.is_valid_position(x, y):
+                    continue
+                for direction in ALL_DIRECTIONS:
+                    next_x = (x + direction[0]) % width
+                    next_y = y + direction[1]
+                    if 0 <= next_y < height and level.is_valid_position(next_x, next_y):
+                        self._neighbors[y * width + x].append((next_y * width + next_x, direction))
+        self._ghost_key = None
+        self._decision_key = None
+
+    def _distance_field(self, ghosts: Tuple[Tuple[int, int], ...]) -> List[int]:
+        """
+        Monilähteinen BFS haamujen ruuduista. Haamu ei käänny ensimmäisellä askeleella
+        takaisin (kuten next_step), joten poispäin menevä haamu ei varjosta ruutuja takanaan.
+
+        Args:
+            ghosts: Haamujen (ruutuindeksi, suuntakoodi)
+
+        Returns:
+            Etäisyys lähimpään haamuun jokaiselle ruudulle (_UNREACHABLE jos ei löydy)
+        """
+        neighbors = self._neighbors
+        distance = [_UNREACHABLE] * len(neighbors)
+        queue = deque()
+        for tile, direction in ghosts:
+            if not 0 <= tile < len(distance):
+                continue
+            distance[tile] = 0
+            reverse = DIRECTION_VECTORS[OPPOSITE_DIRECTION[direction]]
+            for next_tile, step in neighbors[tile]:
+                if step != reverse and distance[next_tile] > 1:
+                    distance[next_tile] = 1
+                    queue.append(next_tile)
+
+        while queue:
+            tile = queue.popleft()
+            next_distance = distance[tile] + 1
+            for next_tile, _ in neighbors[tile]:
+                if distance[next_tile] > next_distance:
+                    distance[next_tile] = next_distance
+                    queue.append(next_tile)
+        return distance
+
+    def _choose(self, level: "Level", start: int) -> Optional[Tuple[int, int]]:
+        """
+        Valitsee naapurin:
+        1. lyhin turvallinen reitti pellettiin suuntiin joista pääsee riittävän suureen turvalliseen
+           alueeseen (ei umpikujiin joiden suulle haamu ehtii),
+        2. muuten lyhin turvallinen reitti power-pellettiin (umpikujakin kelpaa, koska haamut pelästyvät),
+        3. muuten suunta jonka turva-alue on suurin.
+        """
+        ghost_distance = self._ghost_distance
+        regions = [(self._safe_region(next_tile), next_tile, direction)
+                   for next_tile, direction in self._neighbors[start]]
+        if not regions:
+            return None
+
+        open_regions = [(next_tile, direction) for region, next_tile, direction in regions
+                        if region >= self.min_region]
+        direction = self._path_to(level, start, open_regions, level.pellets | level.power_pellets,
+                                  self.safety_margin)
+        if direction is None:
+            # Power-pelletille riittää että pelaaja ehtii perille ennen haamuja
+            all_regions = [(next_tile, direction) for _, next_tile, direction in regions]
+            direction = self._path_to(level, start, all_regions, level.power_pellets, 0)
+        if direction is None:
+            direction = max(regions, key=lambda entry: (entry[0], ghost_distance[entry[1]]))[2]
+        return direction
+
+    def _path_to(self, level: "Level", start: int, first_steps: List[Tuple[int, Tuple[int, int]]],
+                 targets: set, margin: int) -> Optional[Tuple[int, int]]:
+        """
+        BFS vain ruutujen kautta joihin pelaaja ehtii margin ruutua ennen haamuja.
+
+        Args:
+            level: Taso
+            start: Pelaajan ruutu
+            first_steps: Sallitut ensimmäiset askeleet (ruutu, suunta)
+            targets: Kohderuudut (x, y)
+            margin: Vaadittu etumatka ruutuina
+
+        Returns:
+            Ensimmäisen askeleen suunta lähimpään kohteeseen, tai None
+        """
+        if not targets:
+            return None
+        width = level.width
+        ghost_distance = self._ghost_distance
+        neighbors = self._neighbors
+
+        visited = {start: 0}
+        queue = deque()
+        for next_tile, direction in first_steps:
+            if ghost_distance[next_tile] > 1 + margin:
+                visited[next_tile] = 1
+                queue.append((next_tile, direction))
+        while queue:
+            tile, first = queue.popleft()
+            if (tile % width, tile // width) in targets:
+                return first
+            next_distance = visited[tile] + 1
+            for next_tile, _ in neighbors[tile]:
+                if next_tile not in visited and ghost_distance[next_tile] > next_distance + margin:
+                    visited[next_tile] = next_distance
+                    queue.append((next_tile, first))
+        return None
+
+    def _safe_region(self, first: int) -> int:
+        """
+        Montako ruutua (korkeintaan min_region) pelaaja ehtii saavuttaa ennen haamuja
+        lähtemällä ruutuun first.
+        """
+        ghost_distance = self._ghost_distance
+        if ghost_distance[first] <= 1:
+            return 0
+        neighbors = self._neighbors
+        # Lähtöruutuun saa palata (umpikujasta pääsee takaisin jos haamu on kaukana)
+        visited = {first: 1}
+        queue = deque([first])
+        count = 1
+        while queue and count < self.min_region:
+            tile = queue.popleft()
+            next_distance = visited[tile] + 1
+            for next_tile, _ in neighbors[tile]:
+                if next_tile not in visited and ghost_distance[next_tile] > next_distance:
+                    visited[next_tile] = next_distance
+                    count += 1
+                    queue.append(next_tile)
+        return count
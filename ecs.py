@@ -0,0 +1,698 @@
+"""
+Entiteetti-komponentti-ydin taulukkopohjaisilla komponenteilla.
+Entiteetti on pelkkä indeksi World-varastoon; jokainen komponentti (sijainti, liike,
+moodi ja ajastimet, AI, renderöinti) on NumPy-taulukko. Systeemit käsittelevät kerralla
+kaikki annetut entiteetit: liike, ajastimet, AI, törmäykset ja piirto. Uusi entiteettityyppi
+(hedelmä, lisähaamut) on uusi KIND-koodi eikä uusi luokka.
+
+EcsSimulation ajaa samat säännöt kuin Simulation, joten pelit ovat tikki tikiltä identtiset
+(tarkistus: tests/test_ecs.py). Sisäinen prototyyppi, jota peli ei käytä: jokaisen NumPy-kutsun
+kiinteä hinta tekee tikistä tavallisen tason muutamalla haamulla noin 5x hitaamman kuin Simulationissa.
+"""
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from batch_sim import (
+    DIR_DX, DIR_DY, DIR_OPPOSITE, MODE_SCATTER, MODE_CHASE, MODE_FRIGHTENED, MODE_EATEN, MODE_SPEEDS,
+    wall_grid, walkable_mask, step_distances, move_along_grid
+)
+from constants import (
+    TILE, SUBPIXEL, TILE_FP, HALF_TILE_FP, SCALE, COLLISION_DISTANCE_FP_SQ,
+    PLAYER_COLOR, PLAYER_SPEED, GHOST_COLORS, FRIGHTENED_BLUE, FRIGHTENED_BLINK,
+    FRIGHTENED_DURATION, FRIGHTENED_BLINK_LAST, ALL_DIRECTION_CODES,
+    DIR_NONE, DIRECTION_DX, DIRECTION_DY, DIRECTION_VECTORS, DIRECTION_CODES, OPPOSITE_DIRECTION,
+    MOUTH_OFFSETS
+)
+from ghost import GhostMode
+from level import Level
+from pathfinding import MoveRequest, get_flee_direction, plan_ghost_moves
+from sim import DEFAULT_LEVEL_FILE, Simulation
+from utils import FixedPosition, tile_center_fixed
+
+if TYPE_CHECKING:
+    import pygame
+
+
+# Entiteettityypit
+KIND_PLAYER: int = 0
+KIND_GHOST: int = 1
+
+# Komponentit: nimi -> (dtype, alkion muoto). Uusi komponentti on uusi rivi tähän.
+COMPONENTS: Dict[str, Tuple[type, Tuple[int, ...]]] = {
+    "kind": (np.int64, ()),
+    # Sijainti alipikseleinä (ks. FixedPosition) ja aloitusruutu
+    "fx": (np.int64, ()),
+    "fy": (np.int64, ()),
+    "prev_fx": (np.int64, ()),
+    "prev_fy": (np.int64, ()),
+    "spawn_x": (np.int64, ()),
+    "spawn_y": (np.int64, ()),
+    # Liike: suuntakoodit, askelmatkan jakojäännös, nopeus ja tason nopeuskerroin
+    "direction": (np.int64, ()),
+    "desired_direction": (np.int64, ()),
+    "move_remainder": (np.int64, ()),
+    "speed": (np.float64, ()),
+    "speed_multiplier": (np.float64, ()),
+    # Moodi (batch_sim.MODE_*) ja ajastimet
+    "mode": (np.int64, ()),
+    "fright_timer": (np.float64, ()),
+    "eaten_home_timer": (np.float64, ()),
+    # AI: persoonan indeksi PERSONALITIES-listaan
+    "personality": (np.int64, ()),
+    # Renderöinti
+    "color": (np.uint8, (3,)),
+    "radius": (np.int64, ()),
+}
+
+# Haamujen persoonat indekseinä
+PERSONALITIES: List[str] = ["blinky", "pinky", "clyde", "inky"]
+
+# Moodikoodit GhostMode-arvoiksi ja takaisin (sama järjestys kuin batch_sim ja snapshot)
+_GHOST_MODES: Tuple[GhostMode, ...] = (GhostMode.SCATTER, GhostMode.CHASE, GhostMode.FRIGHTENED, GhostMode.EATEN)
+_MODE_CODES: Dict[GhostMode, int] = {mode: code for code, mode in enumerate(_GHOST_MODES)}
+
+# EATEN-tilan kotiinpaluuaika (kuten Ghost.set_eaten)
+_EATEN_HOME_TIME: float = 3.0
+
+
+class World:
+    """
+    Komponenttivarasto (struct-of-arrays).
+    Taulukot kasvavat tuplaamalla ja vapautetut indeksit kierrätetään, joten entiteetin
+    lisääminen ei luo olioita. Systeemit saavat entiteetit indeksitaulukkona (query).
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Alustaa tyhjän maailman.
+
+        Args:
+            capacity: Taulukoiden alkukoko
+        """
+        self.capacity: int = 0
+        # Käytettyjen indeksien yläraja ja kierrätettävät indeksit
+        self.count: int = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self._free: List[int] = []
+        for name, (dtype, shape) in COMPONENTS.items():
+            setattr(self, name, np.zeros((0,) + shape, dtype=dtype))
+        self._grow(capacity)
+
+    def _grow(self, capacity: int) -> None:
+        """Kasvattaa kaikki komponenttitaulukot annettuun kokoon."""
+        for name in ("alive",) + tuple(COMPONENTS):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def clear(self) -> None:
+        """Poistaa kaikki entiteetit (taulukot säilyvät)."""
+        self.alive[:] = False
+        self.count = 0
+        self._free = []
+
+    def create(self, kind: int, tile_x: int, tile_y: int, **components) -> int:
+        """
+        Luo entiteetin ruudun keskelle.
+
+        Args:
+            kind: Entiteettityyppi (KIND_*)
+            tile_x: Aloitusruutu x
+            tile_y: Aloitusruutu y
+            **components: Muiden komponenttien alkuarvot (oletuksena nolla, suunnat DIR_NONE)
+
+        Returns:
+            Entiteetin indeksi
+        """
+        if self._free:
+            entity = self._free.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow(self.capacity * 2)
+            entity = self.count
+            self.count += 1
+
+        for name in COMPONENTS:
+            getattr(self, name)[entity] = 0
+        center_x, center_y = tile_center_fixed(tile_x, tile_y)
+        self.alive[entity] = True
+        self.kind[entity] = kind
+        self.fx[entity] = self.prev_fx[entity] = center_x
+        self.fy[entity] = self.prev_fy[entity] = center_y
+        self.spawn_x[entity] = tile_x
+        self.spawn_y[entity] = tile_y
+        self.direction[entity] = self.desired_direction[entity] = DIR_NONE
+        self.speed_multiplier[entity] = 1.0
+        for name, value in components.items():
+            if name not in COMPONENTS:
+                raise ValueError(f"Unknown component: {name}")
+            getattr(self, name)[entity] = value
+        return entity
+
+    def destroy(self, entity: int) -> None:
+        """
+        Poistaa entiteetin; indeksi kierrätetään seuraavalle create-kutsulle.
+
+        Args:
+            entity: Entiteetin indeksi
+        """
+        if self.alive[entity]:
+            self.alive[entity] = False
+            self._free.append(entity)
+
+    def query(self, kind: Optional[int] = None) -> np.ndarray:
+        """
+        Palauttaa elävät entiteetit indeksijärjestyksessä.
+
+        Args:
+            kind: Vain tämän tyypin entiteetit (None = kaikki)
+
+        Returns:
+            int64-indeksitaulukko
+        """
+        alive = self.alive[:self.count]
+        if kind is not None:
+            alive = alive & (self.kind[:self.count] == kind)
+        return np.flatnonzero(alive)
+
+
+# ----------------------------------------------------------------------
+# Systeemit
+# ----------------------------------------------------------------------
+
+def current_speeds(world: World, ids: np.ndarray) -> np.ndarray:
+    """
+    Entiteettien nopeudet (pikseliä sekunnissa).
+    Haamujen nopeus tulee moodin mukaan taulukosta, muiden speed-komponentista.
+
+    Args:
+        world: Maailma
+        ids: Entiteetit
+
+    Returns:
+        float64-nopeudet
+    """
+    speed = world.speed[ids].copy()
+    ghosts = world.kind[ids] == KIND_GHOST
+    speed[ghosts] = MODE_SPEEDS[world.mode[ids[ghosts]]] * world.speed_multiplier[ids[ghosts]]
+    return speed
+
+
+def timer_system(world: World, ids: np.ndarray, dt: float, global_mode: int) -> None:
+    """
+    Vähentää FRIGHTENED- ja EATEN-ajastimia; päättyneet palaavat globaaliin moodiin (kuten Ghost.update).
+
+    Args:
+        world: Maailma
+        ids: Entiteetit
+        dt: Aika-askel sekunteina
+        global_mode: MODE_SCATTER tai MODE_CHASE
+    """
+    frightened = ids[world.mode[ids] == MODE_FRIGHTENED]
+    world.fright_timer[frightened] -= dt
+    done = frightened[world.fright_timer[frightened] <= 0]
+    world.mode[done] = global_mode
+    world.fright_timer[done] = 0.0
+
+    eaten = ids[world.mode[ids] == MODE_EATEN]
+    world.eaten_home_timer[eaten] -= dt
+    done = eaten[world.eaten_home_timer[eaten] <= 0]
+    world.mode[done] = global_mode
+    world.eaten_home_timer[done] = 0.0
+
+
+def movement_system(world: World, ids: np.ndarray, speed: np.ndarray, dt: float, walls: np.ndarray,
+                    arrive: Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], np.ndarray]) -> None:
+    """
+    Liikuttaa entiteettejä käytäviä pitkin (batch_sim.move_along_grid).
+    Saapujat järjestetään kierroksittain indeksijärjestykseen, joten satunnaisvedot tapahtuvat
+    samassa järjestyksessä kuin olioittain päivitettäessä, kun entiteetti saavuttaa korkeintaan
+    yhden keskipisteen askeleessa (aina SIM_TICK_RATE-taajuudella).
+
+    Args:
+        world: Maailma
+        ids: Entiteetit
+        speed: Nopeudet pikseleinä sekunnissa (current_speeds)
+        dt: Aika-askel sekunteina
+        walls: wall_grid-taulukko
+        arrive: Kutsu (entiteetit, ruutu x, ruutu y, suunnat) -> uudet suunnat
+    """
+    world.prev_fx[ids] = world.fx[ids]
+    world.prev_fy[ids] = world.fy[ids]
+    distance, world.move_remainder[ids] = step_distances(speed, dt, world.move_remainder[ids])
+
+    def arrive_rows(rows: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray,
+                    directions: np.ndarray) -> np.ndarray:
+        return arrive(ids[rows], tile_x, tile_y, directions)
+
+    world.fx[ids], world.fy[ids], world.direction[ids] = move_along_grid(
+        world.fx[ids], world.fy[ids], world.direction[ids], distance, walls, arrive_rows)
+
+
+def _random_valid_direction(world: World, entity: int, level: Level, tile_x: int, tile_y: int, rng) -> int:
+    """Ghost._get_random_valid_direction: ei U-käännöstä ellei pakko, muuten pysy suunnassa."""
+    direction = int(world.direction[entity])
+    opposite = OPPOSITE_DIRECTION[direction]
+    possible = [code for code in ALL_DIRECTION_CODES if code != opposite and level.is_valid_position(
+        tile_x + DIRECTION_DX[code], tile_y + DIRECTION_DY[code])]
+    if not possible and level.is_valid_position(tile_x + DIRECTION_DX[opposite], tile_y + DIRECTION_DY[opposite]):
+        possible = [opposite]
+    if not possible:
+        return direction
+    return rng.choice(possible)
+
+
+def _home_corner(personality: int, level: Level) -> Tuple[int, int]:
+    """Ghost._get_home_corner."""
+    name = PERSONALITIES[personality]
+    if name == "blinky":
+        return (level.width - 1, 0)
+    if name == "pinky":
+        return (0, 0)
+    return (0, level.height - 1)
+
+
+def _chase_target(personality: int, player_tile: Tuple[int, int], player_direction: int) -> Tuple[int, int]:
+    """Ghost._get_chase_target: Pinky tähtää 4 ruutua pelaajan eteen, muut pelaajan ruutuun."""
+    if PERSONALITIES[personality] == "pinky":
+        return (player_tile[0] + DIRECTION_DX[player_direction] * 4,
+                player_tile[1] + DIRECTION_DY[player_direction] * 4)
+    return player_tile
+
+
+def _scatter_request(world, entity, level, tile, player_tile, player_direction):
+    return MoveRequest(tile, _home_corner(int(world.personality[entity]), level),
+                       DIRECTION_VECTORS[OPPOSITE_DIRECTION[int(world.direction[entity])]])
+
+
+def _chase_request(world, entity, level, tile, player_tile, player_direction):
+    return MoveRequest(tile, _chase_target(int(world.personality[entity]), player_tile, player_direction),
+                       DIRECTION_VECTORS[OPPOSITE_DIRECTION[int(world.direction[entity])]])
+
+
+def _eaten_request(world, entity, level, tile, player_tile, player_direction):
+    return MoveRequest(tile, level.ghost_home_tile())
+
+
+# Moodikoodin mukainen reittikysely (Ghost.path_request); FRIGHTENED pakenee ilman reittihakua
+_REQUESTS = (_scatter_request, _chase_request, None, _eaten_request)
+
+
+def ghost_ai_system(world: World, ids: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray, level: Level,
+                    player_tile: Tuple[int, int], player_direction: int, rng) -> np.ndarray:
+    """
+    Valitsee keskipisteeseen saapuneiden haamujen suunnat (Ghost._choose_direction).
+    Reittikyselyt haetaan moodikoodilla _REQUESTS-taulukosta ja ratkaistaan yhdellä
+    plan_ghost_moves-kutsulla; satunnaiset varasuunnat arvotaan indeksijärjestyksessä.
+
+    Args:
+        world: Maailma
+        ids: Saapuneet haamut (direction-komponentti = saapumissuunta)
+        tile_x: Saapumisruudut x
+        tile_y: Saapumisruudut y
+        level: Taso
+        player_tile: Pelaajan ruutu
+        player_direction: Pelaajan liikkumissuunnan koodi
+        rng: Pelin satunnaislähde
+
+    Returns:
+        Uudet suuntakoodit
+    """
+    arrivals = list(zip(ids.tolist(), tile_x.tolist(), tile_y.tolist(), world.mode[ids].tolist()))
+    requests = {row: _REQUESTS[mode](world, entity, level, (x, y), player_tile, player_direction)
+                for row, (entity, x, y, mode) in enumerate(arrivals) if mode != MODE_FRIGHTENED}
+    planned = dict(zip(requests, plan_ghost_moves(level, list(requests.values())).directions))
+
+    directions = np.empty(ids.size, dtype=np.int64)
+    for row, (entity, x, y, mode) in enumerate(arrivals):
+        step = planned[row] if row in planned else get_flee_direction((x, y), player_tile, level)
+        if step is None:
+            directions[row] = _random_valid_direction(world, entity, level, x, y, rng)
+        else:
+            directions[row] = DIRECTION_CODES[step]
+    return directions
+
+
+def collision_system(world: World, entity: int, ids: np.ndarray) -> np.ndarray:
+    """
+    Entiteetit joiden keskipiste on törmäysetäisyyden sisällä (kokonaislukuneliöetäisyys alipikseleinä).
+
+    Args:
+        world: Maailma
+        entity: Entiteetti jota vastaan verrataan (pelaaja)
+        ids: Verrattavat entiteetit
+
+    Returns:
+        Osuneet entiteetit indeksijärjestyksessä
+    """
+    dx = world.fx[ids] - world.fx[entity]
+    dy = world.fy[ids] - world.fy[entity]
+    return ids[dx * dx + dy * dy < COLLISION_DISTANCE_FP_SQ]
+
+
+def render_system(world: World, surface: "pygame.Surface", alpha: float = 1.0, scale: int = SCALE) -> None:
+    """
+    Piirtää kaikki entiteetit joilla on säde (kuten Player.draw ja Ghost.draw).
+    Interpolaatio, värit ja silmien/suun paikat lasketaan taulukkoina; vain piirtokutsut ovat per entiteetti.
+
+    Args:
+        world: Maailma
+        surface: Pinta jolle piirretään
+        alpha: Interpolaatiokerroin edellisen ja nykyisen askeleen välillä
+        scale: Renderöinnin skaalauskerroin
+    """
+    import pygame
+
+    ids = world.query()
+    ids = ids[world.radius[ids] > 0]
+    x = world.fx[ids] / SUBPIXEL
+    y = world.fy[ids] / SUBPIXEL
+    prev_x = world.prev_fx[ids] / SUBPIXEL
+    prev_y = world.prev_fy[ids] / SUBPIXEL
+
+    # Interpolaatio; tunnelihypyt piirretään suoraan uuteen paikkaan
+    jumped = (np.abs(x - prev_x) > TILE) | (np.abs(y - prev_y) > TILE)
+    draw_x = np.where(jumped, x, prev_x + (x - prev_x) * alpha)
+    draw_y = np.where(jumped, y, prev_y + (y - prev_y) * alpha)
+    render_x = (draw_x * scale).astype(np.int64)
+    render_y = (draw_y * scale).astype(np.int64)
+
+    # Värit moodin mukaan (vain haamuilla on moodikohtainen väri)
+    kind = world.kind[ids]
+    mode = world.mode[ids]
+    color = world.color[ids].astype(np.int64)
+    ghost = kind == KIND_GHOST
+    frightened = ghost & (mode == MODE_FRIGHTENED)
+    fright_timer = world.fright_timer[ids]
+    blinking = frightened & (fright_timer <= FRIGHTENED_BLINK_LAST) & (
+        (fright_timer / 0.2).astype(np.int64) % 2 == 1)
+    color[frightened] = FRIGHTENED_BLUE
+    color[blinking] = FRIGHTENED_BLINK
+    eaten = ghost & (mode == MODE_EATEN)
+    color[eaten] //= 3
+
+    radius = world.radius[ids] * scale
+
+    # Silmät haamuille (ei EATEN-tilassa), suu pelaajalle liikesuuntaan
+    eyes = ghost & ~eaten
+    direction = world.direction[ids]
+    mouth = (kind == KIND_PLAYER) & (direction != DIR_NONE)
+
+    # Entiteetti kerrallaan indeksijärjestyksessä, jotta päällekkäisyydet piirtyvät kuten olioilla
+    offset = 2 * scale
+    for rx, ry, rgb, r, has_eyes, has_mouth, code in zip(
+            render_x.tolist(), render_y.tolist(), color.tolist(), radius.tolist(),
+            eyes.tolist(), mouth.tolist(), direction.tolist()):
+        pygame.draw.circle(surface, rgb, (rx, ry), r)
+        if has_eyes:
+            for eye_x in (rx - offset, rx + offset):
+                pygame.draw.circle(surface, (255, 255, 255), (eye_x, ry - offset), 2 * scale)
+            for eye_x in (rx - offset, rx + offset):
+                pygame.draw.circle(surface, (0, 0, 0), (eye_x, ry - offset), scale)
+        if has_mouth:
+            mouth_x, mouth_y = MOUTH_OFFSETS[code]
+            pygame.draw.circle(surface, (0, 0, 0), (rx + mouth_x * scale, ry + mouth_y * scale), 2 * scale)
+
+
+# ----------------------------------------------------------------------
+# Näkymät ohjaimille, boteille ja tilannekuville
+# ----------------------------------------------------------------------
+
+def _component(name: str, cast: type) -> property:
+    """Ominaisuus joka lukee ja kirjoittaa entiteetin komponenttia."""
+    def getter(self):
+        return cast(getattr(self.world, name)[self.entity])
+
+    def setter(self, value) -> None:
+        getattr(self.world, name)[self.entity] = value
+
+    return property(getter, setter)
+
+
+class EntityView(FixedPosition):
+    """
+    Yhden entiteetin näkymä komponenttitaulukoihin.
+    Antaa Player/Ghost-olioiden kentät (fx, x, get_tile_position, ...) ohjaimille, boteille
+    ja SnapshotCodecille; systeemit eivät käytä näkymiä.
+    """
+
+    __slots__ = ("world", "entity")
+
+    fx = _component("fx", int)
+    fy = _component("fy", int)
+    prev_fx = _component("prev_fx", int)
+    prev_fy = _component("prev_fy", int)
+    move_remainder = _component("move_remainder", int)
+    desired_direction = _component("desired_direction", int)
+    speed_multiplier = _component("speed_multiplier", float)
+    radius = _component("radius", int)
+
+    def __init__(self, world: World, entity: int):
+        """
+        Args:
+            world: Maailma
+            entity: Entiteetin indeksi
+        """
+        self.world = world
+        self.entity = entity
+
+    def get_position(self) -> Tuple[float, float]:
+        """Positio (x, y) pikseleinä."""
+        return (self.x, self.y)
+
+    def get_tile_position(self) -> Tuple[int, int]:
+        """Ruutu (tile_x, tile_y)."""
+        return (self.fx // TILE_FP, self.fy // TILE_FP)
+
+
+class PlayerView(EntityView):
+    """Pelaajaentiteetin näkymä (Player-yhteensopivat kentät)."""
+
+    __slots__ = ()
+
+    current_direction = _component("direction", int)
+    speed = _component("speed", float)
+
+    def get_direction(self) -> Tuple[int, int]:
+        """Liikkumissuunta (dx, dy)."""
+        return DIRECTION_VECTORS[self.current_direction]
+
+    def is_moving(self) -> bool:
+        """True jos pelaaja liikkuu."""
+        return self.current_direction != DIR_NONE
+
+
+class GhostView(EntityView):
+    """Haamuentiteetin näkymä (Ghost-yhteensopivat kentät)."""
+
+    __slots__ = ()
+
+    direction = _component("direction", int)
+    fright_timer = _component("fright_timer", float)
+    eaten_home_timer = _component("eaten_home_timer", float)
+
+    @property
+    def mode(self) -> GhostMode:
+        """Käyttäytymistila."""
+        return _GHOST_MODES[self.world.mode[self.entity]]
+
+    @mode.setter
+    def mode(self, mode: GhostMode) -> None:
+        self.world.mode[self.entity] = _MODE_CODES[mode]
+
+    @property
+    def personality(self) -> str:
+        """Persoonan nimi."""
+        return PERSONALITIES[self.world.personality[self.entity]]
+
+    @property
+    def color(self) -> Tuple[int, int, int]:
+        """Perusväri."""
+        return tuple(self.world.color[self.entity].tolist())
+
+    def current_speed(self) -> float:
+        """Nopeus pikseleinä sekunnissa moodin mukaan."""
+        return float(current_speeds(self.world, np.array([self.entity]))[0])
+
+
+# ----------------------------------------------------------------------
+# Simulaatio
+# ----------------------------------------------------------------------
+
+class EcsSimulation(Simulation):
+    """
+    Simulation jonka pelaaja ja haamut ovat World-entiteettejä ja säännöt systeemejä.
+    sim.player ja sim.ghosts ovat näkymiä, joten ohjaimet, botit, tallenteet ja tilannekuvat
+    toimivat sellaisenaan. Haamujen ajoittajaa (ai_scheduler) ei käytetä: ghost_ai_system ratkaisee
+    kaikki askeleen reittikyselyt yhdellä suunnitelmalla.
+    """
+
+    def __init__(self, level_file: str = DEFAULT_LEVEL_FILE, **kwargs):
+        """
+        Alustaa simulaation.
+
+        Args:
+            level_file: Tason tiedoston polku
+            **kwargs: Muut Simulation-parametrit
+        """
+        self.world = World()
+        self.walls: Optional[np.ndarray] = None
+        self.player_ids = np.zeros(0, dtype=np.int64)
+        self.ghost_ids = np.zeros(0, dtype=np.int64)
+        super().__init__(level_file, **kwargs)
+
+    def _global_mode(self) -> int:
+        """Globaali moodi moodikoodina."""
+        return MODE_SCATTER if self.current_mode == "SCATTER" else MODE_CHASE
+
+    def _spawn_player(self, speed_multiplier: float) -> None:
+        """Tyhjentää maailman uutta tasoa varten ja luo pelaajaentiteetin."""
+        world = self.world
+        world.clear()
+        self.walls = wall_grid(self.level)
+        spawn_x, spawn_y = self.level.get_player_spawn()
+        player = world.create(KIND_PLAYER, spawn_x, spawn_y, speed=PLAYER_SPEED * speed_multiplier,
+                              color=PLAYER_COLOR, radius=6)
+        self.player_ids = np.array([player], dtype=np.int64)
+        self.player = PlayerView(world, player)
+
+    def _spawn_ghosts(self, speed_multiplier: float) -> None:
+        """Luo haamuentiteetit spawn-paikkoihin (samat säännöt ja satunnaisvedot kuin Simulation)."""
+        world = self.world
+        ghost_spawns = self.level.get_ghost_spawns()
+        ids = []
+        for i in range(min(self.current_level, len(ghost_spawns))):
+            ghost_x, ghost_y = ghost_spawns[i]
+            personality = self.ghost_personalities[i % len(self.ghost_personalities)]
+            direction = self.rng.choice(ALL_DIRECTION_CODES)
+            ids.append(world.create(KIND_GHOST, ghost_x, ghost_y, direction=direction, desired_direction=direction,
+                                    speed_multiplier=speed_multiplier, mode=MODE_SCATTER,
+                                    personality=PERSONALITIES.index(personality),
+                                    color=GHOST_COLORS[i % len(GHOST_COLORS)], radius=6))
+        self.ghost_ids = np.array(ids, dtype=np.int64)
+        self.ghosts = [GhostView(world, ghost) for ghost in ids]
+
+        if self.verbose:
+            print(f"Level {self.current_level}: Created {len(self.ghosts)} ghosts")
+
+        self.level.set_active_ghosts(len(self.ghosts))
+        self.ghost_hash.rebuild(self.ghosts)
+
+    def _update_player(self, dt: float, direction: Optional[Tuple[int, int]]) -> Tuple[int, str]:
+        """Liikuttaa pelaajaa; keskipisteissä syödään pelletit ja valitaan suunta."""
+        world = self.world
+        players = self.player_ids
+        if direction is not None:
+            world.desired_direction[players] = DIRECTION_CODES[direction]
+
+        level = self.level
+        walls = self.walls
+        eaten = [0, ""]
+
+        def arrive(ids: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray, directions: np.ndarray) -> np.ndarray:
+            for entity, x, y in zip(ids.tolist(), tile_x.tolist(), tile_y.tolist()):
+                points, pellet_type = level.eat_pellet_at(x, y)
+                if pellet_type:
+                    eaten[0] += points
+                    if eaten[1] != "pellet":
+                        eaten[1] = pellet_type
+                    if pellet_type == "pellet":
+                        self._on_pellet_eaten(x, y)
+                    else:
+                        self._on_power_pellet_eaten()
+
+            # Haluttu suunta jos auki, muuten nykyinen jos auki, muuten pysähdy
+            desired = world.desired_direction[ids]
+            turn = (desired != DIR_NONE) & walkable_mask(
+                walls, tile_x + DIR_DX[desired], tile_y + DIR_DY[desired])
+            keep = (directions != DIR_NONE) & walkable_mask(
+                walls, tile_x + DIR_DX[directions], tile_y + DIR_DY[directions])
+            return np.where(turn, desired, np.where(keep, directions, DIR_NONE))
+
+        movement_system(world, players, current_speeds(world, players), dt, walls, arrive)
+        return (eaten[0], eaten[1])
+
+    def _update_ghosts(self, dt: float) -> None:
+        """Ajastimet, liike ja keskipisteiden suunnanvalinnat kaikille haamuille kerralla."""
+        world = self.world
+        ghosts = self.ghost_ids
+        timer_system(world, ghosts, dt, self._global_mode())
+
+        level = self.level
+        walls = self.walls
+        player = self.player
+        player_tile = player.get_tile_position()
+        player_direction = player.current_direction
+
+        def arrive(ids: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray, directions: np.ndarray) -> np.ndarray:
+            # U-käännöksen kielto lasketaan saapumissuunnasta
+            world.direction[ids] = directions
+            return ghost_ai_system(world, ids, tile_x, tile_y, level, player_tile, player_direction, self.rng)
+
+        movement_system(world, ghosts, current_speeds(world, ghosts), dt, walls, arrive)
+
+    def _check_collisions(self) -> None:
+        """Pelaajan kosketukset haamujen indeksijärjestyksessä (kuten Simulation._check_collisions)."""
+        world = self.world
+        player = int(self.player_ids[0])
+        ghosts = self.ghost_ids
+
+        start = 0
+        while True:
+            for entity in collision_system(world, player, ghosts[start:]).tolist():
+                mode = world.mode[entity]
+                if mode == MODE_FRIGHTENED:
+                    world.mode[entity] = MODE_EATEN
+                    world.eaten_home_timer[entity] = _EATEN_HOME_TIME
+                    world.fright_timer[entity] = 0.0
+                    self._award_ghost_points(int(world.fx[entity] // TILE_FP), int(world.fy[entity] // TILE_FP))
+                elif mode != MODE_EATEN:
+                    self._player_die()
+                    if self.game_over:
+                        return
+                    # Haamut palasivat aloituspaikoilleen: loput tarkistetaan uusista positioista
+                    start = int(np.searchsorted(ghosts, entity)) + 1
+                    break
+            else:
+                return
+
+    def _frighten_ghosts(self) -> None:
+        """FRIGHTENED kaikille paitsi EATEN-haamuille; suunta kääntyy."""
+        world = self.world
+        ghosts = self.ghost_ids
+        ghosts = ghosts[world.mode[ghosts] != MODE_EATEN]
+        world.mode[ghosts] = MODE_FRIGHTENED
+        world.fright_timer[ghosts] = FRIGHTENED_DURATION
+        world.direction[ghosts] = DIR_OPPOSITE[world.direction[ghosts]]
+
+    def _on_mode_changed(self, new_mode: str) -> None:
+        """SCATTER/CHASE-haamut vaihtavat moodia ja kääntyvät."""
+        world = self.world
+        ghosts = self.ghost_ids
+        code = MODE_SCATTER if new_mode == "SCATTER" else MODE_CHASE
+        mode = world.mode[ghosts]
+        ghosts = ghosts[((mode == MODE_SCATTER) | (mode == MODE_CHASE)) & (mode != code)]
+        world.mode[ghosts] = code
+        world.direction[ghosts] = DIR_OPPOSITE[world.direction[ghosts]]
+
+    def _respawn(self) -> None:
+        """Palauttaa pelaajan ja haamut aloitusruutuihinsa."""
+        world = self.world
+        ids = np.concatenate([self.player_ids, self.ghost_ids])
+        world.fx[ids] = world.prev_fx[ids] = world.spawn_x[ids] * TILE_FP + HALF_TILE_FP
+        world.fy[ids] = world.prev_fy[ids] = world.spawn_y[ids] * TILE_FP + HALF_TILE_FP
+        world.move_remainder[ids] = 0
+
+        world.direction[self.player_ids] = DIR_NONE
+        world.desired_direction[self.player_ids] = DIR_NONE
+
+        ghosts = self.ghost_ids
+        directions = [self.rng.choice(ALL_DIRECTION_CODES) for _ in range(ghosts.size)]
+        world.direction[ghosts] = directions
+        world.desired_direction[ghosts] = directions
+        world.mode[ghosts] = MODE_SCATTER
+        world.fright_timer[ghosts] = 0.0
+        world.eaten_home_timer[ghosts] = 0.0
@@ -0,0 +1,387 @@
+"""
+Gym-tyylinen ympäristö agenttien koulutukseen.
+MazeChompEnv tarjoaa reset(seed)/step(action)-rajapinnan simulaatioytimen päälle,
+VectorEnv ajaa useita ympäristöjä aliprosesseissa ja jakaa havainnot jaetun muistin kautta.
+"""
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants import ALL_DIRECTIONS, SIM_TICK_RATE, TILE
+from ghost import GhostMode
+from level import Level
+from rng import derive_seed
+from sim import DEFAULT_LEVEL_FILE, Simulation
+
+
+# Toiminnot: 0-3 = ALL_DIRECTIONS (ylös, vasen, alas, oikea), 4 = ei uutta syötettä
+ACTIONS: List[Optional[Tuple[int, int]]] = list(ALL_DIRECTIONS) + [None]
+NUM_ACTIONS: int = len(ACTIONS)
+
+# Havainnon kanavat (C, korkeus, leveys)
+OBS_CHANNELS: List[str] = [
+    "walls", "pellets", "power_pellets",
+    "ghost_scatter", "ghost_chase", "ghost_frightened", "ghost_eaten",
+    "player",
+]
+_GHOST_CHANNEL: Dict[GhostMode, int] = {
+    GhostMode.SCATTER: OBS_CHANNELS.index("ghost_scatter"),
+    GhostMode.CHASE: OBS_CHANNELS.index("ghost_chase"),
+    GhostMode.FRIGHTENED: OBS_CHANNELS.index("ghost_frightened"),
+    GhostMode.EATEN: OBS_CHANNELS.index("ghost_eaten"),
+}
+_PLAYER_CHANNEL: int = OBS_CHANNELS.index("player")
+
+# Oletuspituus: 5 minuuttia pelaajan aikaa
+DEFAULT_MAX_STEPS: int = SIM_TICK_RATE * 300
+
+
+class MazeChompEnv:
+    """Yksi peli step/reset-rajapinnalla (gymnasium-tyylinen paluuarvo)."""
+
+    def __init__(self, level_file: str = DEFAULT_LEVEL_FILE, frame_skip: int = 1,
+                 max_steps: int = DEFAULT_MAX_STEPS, death_penalty: float = 0.0):
+        """
+        Alustaa ympäristön. Taso luetaan kerran ja kopioidaan jokaiseen peliin.
+
+        Args:
+            level_file: Tason tiedoston polku
+            frame_skip: Montako simulaatiotikkiä yksi step() ajaa samalla toiminnolla
+            max_steps: Jakson maksimipituus step-kutsuina (truncated)
+            death_penalty: Palkkiosta vähennettävä määrä jokaisesta kuolemasta
+        """
+        self.level_template = Level(level_file)
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.death_penalty = death_penalty
+        self.dt = 1.0 / SIM_TICK_RATE
+
+        self.width = self.level_template.width
+        self.height = self.level_template.height
+        self.observation_shape: Tuple[int, int, int] = (len(OBS_CHANNELS), self.height, self.width)
+
+        # Seinäkanava on sama kaikilla tasoilla
+        self._walls = np.array(
+            [[self.level_template.is_wall(x, y) for x in range(self.width)] for y in range(self.height)],
+            dtype=np.uint8
+        )
+
+        self.sim: Optional[Simulation] = None
+        self.steps: int = 0
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Aloittaa uuden pelin.
+
+        Args:
+            seed: Pelin satunnaisvirran siemen (None = uusi satunnainen siemen, näkyy info['seed']:ssä)
+
+        Returns:
+            (havainto, info)
+        """
+        self.sim = Simulation(seed=seed, level_template=self.level_template)
+        self.steps = 0
+        return self.observe(), self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """
+        Suorittaa toiminnon frame_skip tikin ajan.
+
+        Args:
+            action: Toiminnon indeksi (ks. ACTIONS)
+
+        Returns:
+            (havainto, palkkio, terminated, truncated, info)
+        """
+        obs, reward, terminated, truncated = self.step_into(action, None)
+        return obs, reward, terminated, truncated, self._info()
+
+    def step_into(self, action: int, out: Optional[np.ndarray]) -> Tuple[np.ndarray, float, bool, bool]:
+        """
+        Kuten step(), mutta kirjoittaa havainnon annettuun puskuriin eikä kokoa info-sanakirjaa.
+
+        Args:
+            action: Toiminnon indeksi
+            out: Havaintopuskuri muotoa observation_shape (None = uusi taulukko)
+
+        Returns:
+            (havainto, palkkio, terminated, truncated)
+        """
+        if self.sim is None:
+            raise RuntimeError("reset() must be called before step()")
+
+        sim = self.sim
+        direction = ACTIONS[action]
+        score_before = sim.score
+        lives_before = sim.lives
+
+        for _ in range(self.frame_skip):
+            sim.step(self.dt, direction)
+            if sim.game_over or sim.game_complete:
+                break
+
+        self.steps += 1
+        reward = float(sim.score - score_before)
+        reward -= self.death_penalty * (lives_before - sim.lives)
+        terminated = sim.game_over or sim.game_complete
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observe(out), reward, terminated, truncated
+
+    def observe(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Rakentaa havainnon kanavina (ks. OBS_CHANNELS).
+
+        Args:
+            out: Valinnainen uint8-puskuri johon kirjoitetaan
+
+        Returns:
+            Havainto muotoa (C, korkeus, leveys)
+        """
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.uint8)
+        out.fill(0)
+        out[0] = self._walls
+
+        level = self.sim.level
+        if level.pellets:
+            xs, ys = zip(*level.pellets)
+            out[1, ys, xs] = 1
+        if level.power_pellets:
+            xs, ys = zip(*level.power_pellets)
+            out[2, ys, xs] = 1
+
+        for ghost in self.sim.ghosts:
+            tile_x, tile_y = int(ghost.x // TILE), int(ghost.y // TILE)
+            if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+                out[_GHOST_CHANNEL[ghost.mode], tile_y, tile_x] = 1
+
+        player = self.sim.player
+        tile_x, tile_y = int(player.x // TILE), int(player.y // TILE)
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            out[_PLAYER_CHANNEL, tile_y, tile_x] = 1
+        return out
+
+    def _info(self) -> Dict[str, Any]:
+        """Palauttaa jakson tilatiedot."""
+        sim = self.sim
+        return {
+            "seed": sim.seed,
+            "score": sim.score,
+            "lives": sim.lives,
+            "level": sim.current_level,
+            "pellets_left": sim.level.pellets_left(),
+            "steps": self.steps,
+        }
+
+
+# ----------------------------------------------------------------------
+# Vektoroitu ympäristö
+# ----------------------------------------------------------------------
+
+# Työprosessin komennot
+_CMD_RESET = "reset"
+_CMD_STEP = "step"
+_CMD_CLOSE = "close"
+
+
+def _worker(pipe, env_indices: List[int], shm_names: Dict[str, str], num_envs: int,
+            env_kwargs: Dict[str, Any]) -> None:
+    """
+    Aliprosessi joka ajaa osan ympäristöistä.
+    Havainnot, palkkiot ja lopputilat kirjoitetaan jaettuun muistiin, putkessa kulkevat vain komennot.
+    Automaattinen reset johtaa jakson siemenen reset()-siemenestä ja jakson numerosta, joten
+    siemennetty VectorEnv toistuu samana myös ensimmäisen jakson jälkeen.
+    """
+    envs = [MazeChompEnv(**env_kwargs) for _ in env_indices]
+    # Ympäristökohtainen perussiemen (None = satunnaiset jaksot) ja jakson numero
+    base_seeds: List[Optional[int]] = [None] * len(envs)
+    episodes: List[int] = [0] * len(envs)
+    shape = envs[0].observation_shape
+    handles, arrays = _attach_buffers(shm_names, num_envs, shape)
+    obs, actions, rewards = arrays["obs"], arrays["actions"], arrays["rewards"]
+    terminated, truncated, scores = arrays["terminated"], arrays["truncated"], arrays["scores"]
+
+    try:
+        while True:
+            command, payload = pipe.recv()
+            if command == _CMD_STEP:
+                for slot, (env, index) in enumerate(zip(envs, env_indices)):
+                    _, reward, term, trunc = env.step_into(int(actions[index]), obs[index])
+                    rewards[index] = reward
+                    terminated[index] = term
+                    truncated[index] = trunc
+                    scores[index] = env.sim.score
+                    # Automaattinen reset jakson päättyessä
+                    if term or trunc:
+                        episodes[slot] += 1
+                        base = base_seeds[slot]
+                        env.reset(None if base is None else derive_seed(base, episodes[slot]))
+                        env.observe(obs[index])
+                pipe.send(None)
+            elif command == _CMD_RESET:
+                for slot, (env, index) in enumerate(zip(envs, env_indices)):
+                    base_seeds[slot] = None if payload is None else int(payload[index])
+                    episodes[slot] = 0
+                    env.reset(base_seeds[slot])
+                    env.observe(obs[index])
+                    rewards[index] = 0.0
+                    terminated[index] = False
+                    truncated[index] = False
+                    scores[index] = 0
+                pipe.send(None)
+            elif command == _CMD_CLOSE:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for handle in handles:
+            handle.close()
+        pipe.close()
+
+
+def _buffer_layout(num_envs: int, obs_shape: Tuple[int, int, int]) -> Dict[str, Tuple[tuple, np.dtype]]:
+    """Jaettujen puskureiden muodot ja tyypit."""
+    return {
+        "obs": ((num_envs,) + obs_shape, np.dtype(np.uint8)),
+        "actions": ((num_envs,), np.dtype(np.int64)),
+        "rewards": ((num_envs,), np.dtype(np.float32)),
+        "terminated": ((num_envs,), np.dtype(np.bool_)),
+        "truncated": ((num_envs,), np.dtype(np.bool_)),
+        "scores": ((num_envs,), np.dtype(np.int64)),
+    }
+
+
+def _attach_buffers(shm_names: Dict[str, str], num_envs: int, obs_shape: Tuple[int, int, int]):
+    """Liittää olemassa olevat jaetut muistialueet NumPy-taulukoiksi."""
+    handles = []
+    arrays = {}
+    for name, (shape, dtype) in _buffer_layout(num_envs, obs_shape).items():
+        handle = shared_memory.SharedMemory(name=shm_names[name])
+        handles.append(handle)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=handle.buf)
+    return handles, arrays
+
+
+class VectorEnv:
+    """
+    N ympäristöä aliprosesseissa. Havainnot luetaan jaetusta NumPy-puskurista,
+    joten step() ei picklaa havaintoja prosessien välillä.
+    """
+
+    def __init__(self, num_envs: int, num_workers: Optional[int] = None, **env_kwargs):
+        """
+        Käynnistää työprosessit.
+
+        Args:
+            num_envs: Ympäristöjen määrä
+            num_workers: Aliprosessien määrä (oletuksena min(num_envs, CPU-ytimet))
+            env_kwargs: MazeChompEnv-parametrit
+        """
+        self.num_envs = num_envs
+        self.num_workers = max(1, min(num_workers or mp.cpu_count(), num_envs))
+        self.observation_shape = MazeChompEnv(**env_kwargs).observation_shape
+        self.closed = False
+
+        # Jaetut puskurit
+        self._handles: List[shared_memory.SharedMemory] = []
+        shm_names: Dict[str, str] = {}
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (shape, dtype) in _buffer_layout(num_envs, self.observation_shape).items():
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            handle = shared_memory.SharedMemory(create=True, size=size)
+            self._handles.append(handle)
+            shm_names[name] = handle.name
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=handle.buf)
+        self.observations = arrays["obs"]
+        self._actions = arrays["actions"]
+        self.rewards = arrays["rewards"]
+        self.terminated = arrays["terminated"]
+        self.truncated = arrays["truncated"]
+        self.scores = arrays["scores"]
+
+        # Jaa ympäristöt työprosesseille tasaisesti
+        self._pipes = []
+        self._processes = []
+        for worker_index in range(self.num_workers):
+            indices = list(range(worker_index, num_envs, self.num_workers))
+            parent_pipe, child_pipe = mp.Pipe()
+            process = mp.Process(
+                target=_worker,
+                args=(child_pipe, indices, shm_names, num_envs, env_kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def reset(self, seeds: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Aloittaa kaikki pelit alusta.
+
+        Args:
+            seeds: Ympäristökohtaiset siemenet (None = satunnaiset); myöhempien jaksojen
+                siemenet johdetaan näistä (rng.derive_seed)
+
+        Returns:
+            Havainnot muotoa (N, C, korkeus, leveys) (jaettu puskuri)
+        """
+        payload = list(seeds) if seeds is not None else None
+        self._broadcast(_CMD_RESET, payload)
+        return self.observations
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Suorittaa yhden toiminnon jokaisessa ympäristössä. Päättyneet jaksot alkavat automaattisesti alusta.
+
+        Args:
+            actions: Toimintojen indeksit (N,)
+
+        Returns:
+            (havainnot, palkkiot, terminated, truncated) jaetuista puskureista
+        """
+        self._actions[:] = actions
+        self._broadcast(_CMD_STEP, None)
+        return self.observations, self.rewards, self.terminated, self.truncated
+
+    def close(self) -> None:
+        """Pysäyttää työprosessit ja vapauttaa jaetun muistin."""
+        if self.closed:
+            return
+        self.closed = True
+        for pipe in self._pipes:
+            try:
+                pipe.send((_CMD_CLOSE, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self._pipes:
+            pipe.close()
+        # Vapauta NumPy-näkymät ennen muistin sulkemista
+        self.observations = self._actions = self.rewards = None
+        self.terminated = self.truncated = self.scores = None
+        for handle in self._handles:
+            handle.close()
+            handle.unlink()
+
+    def _broadcast(self, command: str, payload) -> None:
+        """Lähettää komennon kaikille työprosesseille ja odottaa kuittaukset."""
+        for pipe in self._pipes:
+            pipe.send((command, payload))
+        for pipe in self._pipes:
+            pipe.recv()
+
+    def __enter__(self) -> "VectorEnv":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
@@ -0,0 +1,251 @@
+"""
+Tapahtumaohjattu ajo headless-peleille.
+Hahmot liikkuvat suoraan ruudun keskipisteiden välillä, joten useimmilla tikeillä ei tapahdu
+muuta kuin liikettä ja ajastimien kulumista. Tässä lasketaan analyyttisesti montako tikkiä
+on varmasti "hiljaisia" (ei keskipisteeseen saapumista, ajastimen laukeamista, moodin
+vaihtoa eikä kosketusta) ja ne ajetaan kevyellä polulla. Täysi Simulation.step ajetaan vain
+tapahtumatikeillä. Aritmetiikka on sama kuin step():ssä, joten lopputulos on identtinen.
+"""
+import math
+import sys
+from typing import Callable, List, Optional, Tuple
+
+from constants import (
+    TILE_FP, HALF_TILE_FP, COLLISION_DISTANCE_FP, DIR_NONE, DIRECTION_DX, DIRECTION_DY, SIM_TICK_RATE,
+    MOVE_TIME_BASE
+)
+from ghost import Ghost, GhostMode
+from sim import Simulation, SimEventType
+from utils import next_center, time_units, to_fixed
+
+
+# Ajastimien turvamarginaali sekunteina (liukulukujen kertymävirhe on kertaluokkia pienempi);
+# liike ja kosketus lasketaan kokonaislukuina alipikseleissä ilman marginaalia
+_MARGIN: float = 1e-6
+
+# Ohjain: kutsutaan vain tapahtumatikeillä, palauttaa suunnan tai None (ei uutta syötettä)
+Controller = Callable[[Simulation], Optional[Tuple[int, int]]]
+
+
+def _distance_to_center(fx: int, fy: int, direction: int, level) -> Optional[int]:
+    """
+    Matka seuraavaan keskipisteeseen liikesuunnassa alipikseleinä (ks. utils.next_center).
+
+    Returns:
+        Matka, tai None jos hahmo on paikallaan keskipisteessä (kysyy suunnan joka tikillä)
+    """
+    return next_center(fx, fy, direction, level)[2] or None
+
+
+def _ticks_before_arrival(distance: int, speed: int, remainder: int) -> int:
+    """
+    Montako tikkiä step_distance-askelilla kuljettu matka pysyy alle distance:n.
+    Tikin n jälkeen on kuljettu (n * speed + remainder) // MOVE_TIME_BASE, joten raja on tarkka.
+
+    Args:
+        distance: Matka keskipisteeseen alipikseleinä (> 0)
+        speed: Nopeus alipikseleinä sekunnissa kertaa tikin aikayksiköt (ks. time_units)
+        remainder: Nykyinen jakojäännös
+
+    Returns:
+        Tikkien määrä (>= 0)
+    """
+    if speed <= 0:
+        return sys.maxsize
+    return (distance * MOVE_TIME_BASE - remainder - 1) // speed
+
+
+def _player_quiet_ticks(sim: Simulation, units: int) -> int:
+    """Pelaajan hiljaiset tikit: keskipisteeseen saapuminen on aina tapahtuma."""
+    player = sim.player
+    level = sim.level
+    distance = _distance_to_center(player.fx, player.fy, player.current_direction, level)
+    if distance is not None:
+        return _ticks_before_arrival(distance, to_fixed(player.speed) * units, player.move_remainder)
+
+    if player.current_direction != DIR_NONE:
+        # Seinän edessä: seuraava kysely pysäyttää pelaajan
+        return 0
+
+    # Paikallaan: hiljainen jos haluttu suunta on kiinni eikä ruudussa ole pellettiä
+    tile_x = player.fx // TILE_FP
+    tile_y = player.fy // TILE_FP
+    desired = player.desired_direction
+    can_turn = (desired != DIR_NONE and
+                level.is_valid_position(tile_x + DIRECTION_DX[desired], tile_y + DIRECTION_DY[desired]))
+    has_pellet = (tile_x, tile_y) in level.pellets or (tile_x, tile_y) in level.power_pellets
+    return 0 if can_turn or has_pellet else sys.maxsize
+
+
+def _max_step(speed: int) -> int:
+    """Suurin yhden tikin askel alipikseleinä (jakojäännös voi lisätä yhden)."""
+    return (speed + MOVE_TIME_BASE - 1) // MOVE_TIME_BASE
+
+
+def _ghost_quiet_ticks(ghost: Ghost, level, dt: float, units: int) -> int:
+    """Haamun hiljaiset tikit: ajastimet ja keskipisteeseen saapuminen."""
+    limit = sys.maxsize
+
+    # FRIGHTENED/EATEN päättyy kun ajastin <= 0 vähennyksen jälkeen
+    if ghost.mode == GhostMode.FRIGHTENED:
+        limit = min(limit, max(0, math.floor((ghost.fright_timer - _MARGIN) / dt) - 1))
+    elif ghost.mode == GhostMode.EATEN:
+        limit = min(limit, max(0, math.floor((ghost.eaten_home_timer - _MARGIN) / dt) - 1))
+
+    # Suunnanvalinta tapahtuu vain keskipisteessä
+    distance = _distance_to_center(ghost.fx, ghost.fy, ghost.direction, level)
+    if distance is None:
+        return 0
+    return min(limit, _ticks_before_arrival(distance, to_fixed(ghost.current_speed()) * units, ghost.move_remainder))
+
+
+def quiet_ticks(sim: Simulation, dt: float) -> int:
+    """
+    Laskee montako seuraavaa tikkiä (ilman uutta syötettä) on varmasti hiljaisia.
+
+    Args:
+        sim: Simulaatio
+        dt: Aika-askel sekunteina
+
+    Returns:
+        Tikkien määrä (0 = seuraava tikki on tapahtuma)
+    """
+    if sim.game_over or sim.game_complete:
+        return 0
+    units = time_units(dt)
+
+    # Moodiaikataulun vaihto
+    limit = sys.maxsize
+    if sim.mode_index < len(sim.mode_schedule):
+        duration = sim.mode_schedule[sim.mode_index][1]
+        limit = max(0, math.floor((duration - sim.mode_timer - _MARGIN) / dt) - 1)
+
+    limit = min(limit, _player_quiet_ticks(sim, units))
+    if limit == 0:
+        return 0
+
+    # Suurin mahdollinen askel alipikseleinä (jakojäännös voi lisätä yhden)
+    player = sim.player
+    player_step = 0 if player.current_direction == DIR_NONE else _max_step(to_fixed(player.speed) * units)
+    for ghost in sim.ghosts:
+        limit = min(limit, _ghost_quiet_ticks(ghost, sim.level, dt, units))
+        if limit == 0:
+            return 0
+
+        # Kosketus: etäisyys pienenee korkeintaan molempien askelten summan verran per tikki.
+        # isqrt antaa etäisyyden alarajan kokonaislukuna, joten raja on varma ilman liukulukuja.
+        if ghost.mode != GhostMode.EATEN:
+            dx = player.fx - ghost.fx
+            dy = player.fy - ghost.fy
+            distance = math.isqrt(dx * dx + dy * dy)
+            if distance < COLLISION_DISTANCE_FP:
+                return 0
+            closing = player_step + _max_step(to_fixed(ghost.current_speed()) * units)
+            if closing > 0:
+                limit = min(limit, (distance - COLLISION_DISTANCE_FP) // closing)
+
+    return limit
+
+
+def advance_quiet(sim: Simulation, dt: float, ticks: int) -> None:
+    """
+    Ajaa hiljaiset tikit samalla aritmetiikalla kuin Simulation.step, ilman tarkistuksia.
+    Kutsujan vastuulla on että ticks <= quiet_ticks(sim, dt).
+
+    Args:
+        sim: Simulaatio
+        dt: Aika-askel
+        ticks: Tikkien määrä
+    """
+    units = time_units(dt)
+    player = sim.player
+    player_speed = to_fixed(player.speed) * units
+    player_dx = DIRECTION_DX[player.current_direction]
+    player_dy = DIRECTION_DY[player.current_direction]
+    ghosts = sim.ghosts
+    ghost_hash = sim.ghost_hash
+    # Keskipisteen ohittanut haamu ylittää ruudun rajan hiljaisten tikkien aikana:
+    # ghost_hash päivitetään samalla tikillä kuin step():ssä, jotta lokeroiden järjestys säilyy
+    ghost_moves = [(index, ghost, DIRECTION_DX[ghost.direction], DIRECTION_DY[ghost.direction],
+                    to_fixed(ghost.current_speed()) * units, ghost.mode,
+                    (ghost.fx % TILE_FP - HALF_TILE_FP) * DIRECTION_DX[ghost.direction] +
+                    (ghost.fy % TILE_FP - HALF_TILE_FP) * DIRECTION_DY[ghost.direction] >= 0)
+                   for index, ghost in enumerate(ghosts)]
+
+    for _ in range(ticks):
+        sim.mode_timer += dt
+
+        player.prev_fx = player.fx
+        player.prev_fy = player.fy
+        distance, player.move_remainder = divmod(player.move_remainder + player_speed, MOVE_TIME_BASE)
+        player.fx += player_dx * distance
+        player.fy += player_dy * distance
+
+        for index, ghost, dx, dy, speed, mode, crossing in ghost_moves:
+            ghost.prev_fx = ghost.fx
+            ghost.prev_fy = ghost.fy
+            if mode == GhostMode.FRIGHTENED:
+                ghost.fright_timer -= dt
+            elif mode == GhostMode.EATEN:
+                ghost.eaten_home_timer -= dt
+            distance, ghost.move_remainder = divmod(ghost.move_remainder + speed, MOVE_TIME_BASE)
+            ghost.fx += dx * distance
+            ghost.fy += dy * distance
+            if crossing:
+                ghost_hash.relocate(index)
+
+
+class EventDrivenRunner:
+    """Ajaa simulaatiota hypäten hiljaisten tikkien yli."""
+
+    def __init__(self, sim: Simulation, dt: float = 1.0 / SIM_TICK_RATE):
+        """
+        Alustaa ajurin.
+
+        Args:
+            sim: Simulaatio
+            dt: Kiinteä aika-askel (sama kuin tikkipohjaisessa ajossa, enintään yksi sääntöaskel)
+        """
+        self.sim = sim
+        self.dt = dt
+        self.ticks: int = 0
+        self.events: int = 0
+
+    def run(self, controller: Optional[Controller] = None, max_ticks: int = sys.maxsize,
+            on_tick: Optional[Callable[[int, Optional[Tuple[int, int]]], None]] = None,
+            stop_on: Optional[SimEventType] = None) -> List:
+        """
+        Ajaa kunnes peli päättyy, max_ticks täyttyy tai askel tuottaa stop_on-tapahtuman.
+
+        Args:
+            controller: Kutsutaan jokaisella tapahtumatikillä ennen step()-kutsua
+            max_ticks: Tikkiraja (sama mittayksikkö kuin 60 Hz -ajossa)
+            on_tick: Valinnainen kutsu (tikki, syöte) jokaisesta täydestä askeleesta
+            stop_on: Valinnainen tapahtumatyyppi jonka jälkeen ajo pysähtyy
+
+        Returns:
+            Kaikki ajon aikana syntyneet simulaatiotapahtumat
+        """
+        sim = self.sim
+        dt = self.dt
+        all_events = []
+
+        while self.ticks < max_ticks and not (sim.game_over or sim.game_complete):
+            skip = min(quiet_ticks(sim, dt), max_ticks - self.ticks)
+            if skip > 0:
+                advance_quiet(sim, dt, skip)
+                self.ticks += skip
+                if self.ticks >= max_ticks:
+                    break
+
+            direction = controller(sim) if controller is not None else None
+            if on_tick is not None:
+                on_tick(self.ticks, direction)
+            events = sim.step(dt, direction)
+            all_events.extend(events)
+            self.ticks += 1
+            self.events += 1
+            if stop_on is not None and any(event.type == stop_on for event in events):
+                break
+
+        return all_events
@@ -4,20 +4,23 @@ Hallitsee eri pelitiloja: menu, pelaaminen, game over.
 Integroitu kaikki uudet ominaisuudet: power-pelletit, haamujen tilakone, törmäykset.
 """
 import pygame
-import math
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Optional, List, Set
 from enum import Enum
 
-from constants import (
-    BLACK, INITIAL_LIVES, SPEED_INCREASE_PER_LEVEL, COLLISION_DISTANCE,
-    WINDOW_WIDTH, WINDOW_HEIGHT, MODE_SCHEDULE_LEVEL_1, FRIGHTENED_DURATION
-)
+from constants import BLACK, INITIAL_LIVES, MAX_LEVEL, TILE, SCALE, HUD_HEIGHT, LOGICAL_RENDER, AI_BUDGET_MS
 from level import Level
 from player import Player
-from ghost import Ghost, GhostMode
+from ghost import Ghost
+from sim import Simulation, SimEvent, SimEventType, DEFAULT_LEVEL_FILE
+from swarm import SwarmConfig, SwarmSimulation
 from hud import HUD
 from audio import AudioManager
+from profiler import FrameProfiler
+from replay import ReplayRecorder, ReplayPlayer
+from rng import new_seed
+from controllers import PlayerController, KeyboardController
+from ai_scheduler import AIScheduler
 
 
 class GameStateType(Enum):
@@ -60,12 +63,13 @@ class GameState(ABC):
         pass
     
     @abstractmethod
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """
         Renderöi tilan.
         
         Args:
             surface: Pinta jolle renderöidään
+            alpha: Interpolaatiokerroin edellisen ja nykyisen simulaatioaskeleen välillä
         """
         pass
 
@@ -100,220 +104,127 @@ class MenuState(GameState):
         """Päivittää valikkotilaa."""
         return None
     
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """Renderöi valikon."""
         surface.fill(BLACK)
         self.hud.draw_menu(surface)
 
 
 class PlayState(GameState):
-    """Pelaamistila."""
+    """Pelaamistila - pygame-sovitin simulaatioytimen ympärillä."""
     
-    def __init__(self, hud: HUD, audio: AudioManager):
+    def __init__(self, hud: HUD, audio: AudioManager, logical_render: bool = LOGICAL_RENDER,
+                 profiler: Optional[FrameProfiler] = None, recorder: Optional[ReplayRecorder] = None,
+                 replay: Optional[ReplayPlayer] = None, controller: Optional[PlayerController] = None,
+                 swarm: Optional[SwarmConfig] = None, level_file: str = DEFAULT_LEVEL_FILE,
+                 ai_budget_ms: float = AI_BUDGET_MS):
         """
         Alustaa pelitilan.
         
         Args:
             hud: HUD-objekti
             audio: Audiomanageri
+            logical_render: True = piirrä loogisella resoluutiolla ja skaalaa kerran
+            profiler: Alijärjestelmien ajastimet (oletuksena pois päältä)
+            recorder: Tallennin johon pelin syötteet kirjataan (simulaatio käyttää sen siementä)
+            replay: Toistettava tallenne (syötteet luetaan siitä näppäimistön sijaan)
+            controller: Pelaajan ohjain (oletuksena näppäimistö)
+            swarm: Parvitilan asetukset (None = tavalliset haamut)
+            level_file: Tason tiedoston polku
+            ai_budget_ms: Haamujen suunnanvalintojen budjetti askelta kohden (0 = ei ajoittajaa)
         """
         self.hud = hud
         self.audio = audio
-        self.level: Optional[Level] = None
-        self.player: Optional[Player] = None
-        self.ghosts: list[Ghost] = []
+        # Parvi piirretään aina loogisella resoluutiolla (iso taso skaalataan ikkunaan)
+        self.logical_render = logical_render or swarm is not None
+        self.swarm = swarm
+        self.level_file = level_file
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.recorder = recorder
+        self.replay = replay
+        self.controller = controller if controller is not None else KeyboardController()
+        
+        # Budjetoitu päätösjärjestys ei ole deterministinen, joten tallenne ja toisto ajavat ilman sitä
+        self.ai_scheduler: Optional[AIScheduler] = None
+        if ai_budget_ms > 0:
+            if recorder is not None or replay is not None:
+                print("AI budget ignored while recording or replaying (decisions must stay deterministic)")
+            else:
+                self.ai_scheduler = AIScheduler(ai_budget_ms)
         
-        # Pelitiedot
-        self.score: int = 0
-        self.lives: int = INITIAL_LIVES
-        self.current_level: int = 1
+        # Uudelleenkäytettävät renderöintipinnat
+        self._game_surface: Optional[pygame.Surface] = None
+        self._logical_surface: Optional[pygame.Surface] = None
         
         # Tauon tila
         self.paused: bool = False
         
-        # Globaali moodiajastin
-        self.mode_timer: float = 0.0
-        self.mode_schedule: list[Tuple[str, float]] = MODE_SCHEDULE_LEVEL_1.copy()
-        self.current_mode: str = "SCATTER"
-        self.mode_index: int = 0
-        
-        # Ghost-ketjupisteet
-        self.ghost_chain_count: int = 0
-        
-        # Lataa ensimmäinen taso
-        self._load_level()
-    
-    def _load_level(self) -> None:
-        """Lataa nykyisen tason."""
+        # Pelisäännöt ja tila (lataa ensimmäisen tason)
+        self.sim: Optional[Simulation] = None
+        if self.replay is not None:
+            self.sim = self.replay.sim
+            self.sim.profiler = self.profiler
+            return
         try:
-            # Lataa taso (tässä MVP:ssä aina sama taso)
-            import os
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            level_file = os.path.join(script_dir, "level1", "level1.txt")
-            self.level = Level(level_file)
-            
-            # Luo pelaaja
-            spawn_x, spawn_y = self.level.get_player_spawn()
-            self.player = Player(spawn_x, spawn_y)
-            
-            # Aseta power-pelletin signaalifunktio
-            self.player.set_power_pellet_callback(self._on_power_pellet_eaten)
-            
-            # Aseta nopeus tason mukaan
-            speed_multiplier = 1.0 + (self.current_level - 1) * SPEED_INCREASE_PER_LEVEL
-            self.player.set_speed_multiplier(speed_multiplier)
-            
-            # Luo haamut (määrä kasvaa tason mukaan)
-            self.ghosts = []
-            ghost_spawns = self.level.get_ghost_spawns()
-            personalities = ["blinky", "pinky", "clyde", "inky"]
-            
-            # Haamujen määrä: Level 1 = 1 haamu, Level 2 = 2 haamua, jne.
-            # Maksimissaan niin monta kuin spawn-paikkoja on
-            max_ghosts = min(self.current_level, len(ghost_spawns))
-            
-            for i in range(max_ghosts):
-                ghost_x, ghost_y = ghost_spawns[i]
-                personality = personalities[i % len(personalities)]
-                ghost = Ghost(ghost_x, ghost_y, i, personality)
-                ghost.set_speed_multiplier(speed_multiplier)
-                self.ghosts.append(ghost)
-            
-            print(f"Level {self.current_level}: Created {len(self.ghosts)} ghosts")
-            
-            # Aseta aktiivisten haamujen määrä (ylimääräiset spawn-paikat muuttuvat pelleteiksi)
-            self.level.set_active_ghosts(len(self.ghosts))
-            
-            # Nollaa moodiajastin
-            self.mode_timer = 0.0
-            self.mode_index = 0
-            self.current_mode = self.mode_schedule[0][0]
-            self.ghost_chain_count = 0
-                
+            seed = recorder.seed if recorder is not None else None
+            self.sim = self._create_sim(seed)
+            print(f"Game seed: {self.sim.seed}")
         except Exception as e:
             print(f"Error loading level: {e}")
-            # Return to menu if loading fails
-            return
     
-    def _on_power_pellet_eaten(self) -> None:
-        """Kutsutaan kun power-pellet syödään."""
-        # Toista power-pellet ääni
-        self.audio.play_power_pellet()
-        self.audio.play_frightened()
-        
-        # Aseta kaikki haamut FRIGHTENED-tilaan
-        for ghost in self.ghosts:
-            if ghost.mode != GhostMode.EATEN:
-                ghost.set_frightened()
-        
-        # Nollaa ghost-ketjupisteet
-        self.ghost_chain_count = 0
-    
-    def _update_mode_timer(self, dt: float) -> None:
-        """Päivittää globaalin moodiajastimen."""
-        self.mode_timer += dt
-        
-        # Tarkista pitääkö vaihtaa moodia
-        if self.mode_index < len(self.mode_schedule):
-            current_duration = self.mode_schedule[self.mode_index][1]
-            
-            if self.mode_timer >= current_duration:
-                # Vaihda moodia
-                self.mode_timer = 0.0
-                self.mode_index += 1
-                
-                if self.mode_index < len(self.mode_schedule):
-                    new_mode = self.mode_schedule[self.mode_index][0]
-                    if new_mode != self.current_mode:
-                        self.current_mode = new_mode
-                        # Käännä kaikkien haamujen suunta
-                        for ghost in self.ghosts:
-                            if ghost.mode in [GhostMode.SCATTER, GhostMode.CHASE]:
-                                ghost.set_mode(GhostMode.SCATTER if new_mode == "SCATTER" else GhostMode.CHASE)
-    
-    def _check_collisions(self) -> Optional[GameStateType]:
-        """Tarkistaa törmäykset pelaajan ja haamujen välillä."""
-        if not self.player:
-            return None
-        
-        player_pos = self.player.get_position()
-        
-        for ghost in self.ghosts:
-            ghost_pos = ghost.get_position()
-            
-            # Laske etäisyys
-            distance = math.sqrt(
-                (player_pos[0] - ghost_pos[0])**2 + 
-                (player_pos[1] - ghost_pos[1])**2
-            )
-            
-            if distance < COLLISION_DISTANCE:
-                if ghost.mode == GhostMode.FRIGHTENED:
-                    # Syö haamu
-                    self._eat_ghost(ghost)
-                elif ghost.mode not in [GhostMode.EATEN]:
-                    # Pelaaja kuolee
-                    game_over = self._player_die()
-                    if game_over == GameStateType.GAME_OVER:
-                        return game_over
-        
-        return None
-    
-    def _eat_ghost(self, ghost: Ghost) -> None:
-        """Syö haamun ja anna pisteet."""
-        # Toista haamun syömisen ääni
-        self.audio.play_eat_ghost(self.ghost_chain_count + 1)
-        
-        # Aseta haamu EATEN-tilaan
-        ghost.set_eaten()
-        
-        # Anna ketjupisteet
-        if self.ghost_chain_count < len([200, 400, 800, 1600]):
-            points = [200, 400, 800, 1600][self.ghost_chain_count]
-            self.score += points
-            
-            # Lisää ghost-pisteiden näyttö
-            ghost_tile = ghost.get_tile_position()
-            from utils import tile_center_pixels, scale_for_rendering
-            center_x, center_y = tile_center_pixels(ghost_tile[0], ghost_tile[1])
-            render_x, render_y = scale_for_rendering(center_x, center_y)
-            self.hud.add_ghost_points(render_x, render_y, self.ghost_chain_count)
-            
-            self.ghost_chain_count += 1
-    
-    def _player_die(self) -> GameStateType:
-        """Pelaaja kuolee."""
-        # Toista kuoleman ääni
-        self.audio.play_death()
-        
-        self.lives -= 1
-        
-        if self.lives <= 0:
-            # Game over
-            return GameStateType.GAME_OVER
+    def _create_sim(self, seed: Optional[int] = None, start_level: int = 1) -> Simulation:
+        """
+        Luo simulaation (parvitilassa SwarmSimulation).
         
-        # Respawn pelaaja ja haamut
-        if self.level and self.player:
-            spawn_x, spawn_y = self.level.get_player_spawn()
-            self.player.reset_position(spawn_x, spawn_y)
-            
-            # Resetoi haamut
-            for ghost in self.ghosts:
-                ghost.reset_position()
-            
-            # Nollaa FRIGHTENED ja ketjupisteet
-            self.ghost_chain_count = 0
-            for ghost in self.ghosts:
-                if ghost.mode == GhostMode.FRIGHTENED:
-                    ghost.mode = GhostMode.SCATTER
-                    ghost.fright_timer = 0.0
+        Args:
+            seed: Siemen (None = satunnainen)
+            start_level: Aloitustaso
             
-            # Resetoi moodiajastin
-            self.mode_timer = 0.0
-            self.mode_index = 0
-            self.current_mode = self.mode_schedule[0][0]
-        
-        return None
+        Returns:
+            Uusi simulaatio
+        """
+        options = dict(profiler=self.profiler, verbose=True, seed=seed, start_level=start_level)
+        if self.swarm is not None:
+            sim = SwarmSimulation(self.swarm, self.level_file, **options)
+        else:
+            sim = Simulation(self.level_file, **options)
+        sim.ai_scheduler = self.ai_scheduler
+        return sim
+    
+    @property
+    def level(self) -> Optional[Level]:
+        """Nykyinen taso."""
+        return self.sim.level if self.sim else None
+    
+    @property
+    def player(self) -> Optional[Player]:
+        """Pelaaja."""
+        return self.sim.player if self.sim else None
+    
+    @property
+    def ghosts(self) -> List[Ghost]:
+        """Haamut."""
+        return self.sim.ghosts if self.sim else []
+    
+    @property
+    def score(self) -> int:
+        """Nykyiset pisteet."""
+        return self.sim.score if self.sim else 0
+    
+    @property
+    def lives(self) -> int:
+        """Jäljellä olevat elämät."""
+        return self.sim.lives if self.sim else INITIAL_LIVES
+    
+    @property
+    def current_level(self) -> int:
+        """Nykyinen taso (1-MAX_LEVEL)."""
+        return self.sim.current_level if self.sim else 1
+    
+    @property
+    def current_mode(self) -> str:
+        """Globaali moodi ("SCATTER" tai "CHASE")."""
+        return self.sim.current_mode if self.sim else "SCATTER"
     
     def handle_event(self, event: pygame.event.Event) -> Optional[GameStateType]:
         """Käsittelee pelitilan tapahtumat."""
@@ -333,50 +244,53 @@ class PlayState(GameState):
         # Päivitä HUD
         self.hud.update(dt)
         
-        # Päivitä moodiajastin
-        self._update_mode_timer(dt)
-        
-        # Käsittele pelaajan syöte
-        keys = pygame.key.get_pressed()
-        self.player.handle_input(keys)
-        
-        # Päivitä pelaaja
-        points_earned, pellet_type = self.player.update(dt, self.level)
-        
-        # Toista ääni jos pelletti syötiin
-        if points_earned > 0 and pellet_type == "normal":
-            self.audio.play_pellet()
-        
-        self.score += points_earned
-        
-        # Päivitä haamut
-        player_pos = self.player.get_position()
-        player_direction = self.player.get_direction()
-        for ghost in self.ghosts:
-            ghost.update(dt, self.level, player_pos, player_direction, self.current_mode)
-        
-        # Tarkista törmäykset
-        collision_result = self._check_collisions()
-        if collision_result == GameStateType.GAME_OVER:
-            return collision_result
-        
-        # Tarkista voittoehdot
-        if self.level.pellets_left() == 0:
-            # Taso läpäisty!
-            self.audio.play_level_complete()
-            
-            if self.current_level >= 6:
-                # Peli läpäisty kokonaan!
-                return GameStateType.COMPLETE_VICTORY
+        # Käsittele pelaajan syöte (tai tallenteen syöte toistossa)
+        with self.profiler.section("input"):
+            if self.replay is not None and not self.replay.finished:
+                direction = self.replay.next_direction()
             else:
-                # Siirry seuraavaan tasoon
-                self.current_level += 1
-                self._load_level()  # Lataa seuraava taso
-                return GameStateType.VICTORY
+                direction = self.controller.next_direction(self.sim)
+            if self.recorder is not None:
+                self.recorder.record(self.sim, direction)
         
-        return None
+        # Aja pelisäännöt ja reagoi tapahtumiin
+        events = self.sim.step(dt, direction)
+        return self._handle_sim_events(events)
     
-    def render(self, surface: pygame.Surface) -> None:
+    def _handle_sim_events(self, events: List[SimEvent]) -> Optional[GameStateType]:
+        """
+        Muuntaa simulaation tapahtumat ääniksi, HUD-efekteiksi ja tilasiirtymiksi.
+        
+        Args:
+            events: Simulaatioaskeleen tapahtumat
+            
+        Returns:
+            Uusi pelitila tai None jos ei muutosta
+        """
+        next_state: Optional[GameStateType] = None
+        
+        for event in events:
+            if event.type == SimEventType.PELLET_EATEN:
+                self.audio.play_pellet()
+            elif event.type == SimEventType.POWER_PELLET_EATEN:
+                self.audio.play_power_pellet()
+                self.audio.play_frightened()
+            elif event.type == SimEventType.GHOST_EATEN:
+                self.audio.play_eat_ghost(event.chain + 1)
+                self.hud.add_ghost_points(event.x, event.y, event.chain)
+            elif event.type == SimEventType.PLAYER_DIED:
+                self.audio.play_death()
+            elif event.type == SimEventType.GAME_OVER:
+                next_state = GameStateType.GAME_OVER
+            elif event.type == SimEventType.LEVEL_CLEARED:
+                self.audio.play_level_complete()
+                next_state = GameStateType.VICTORY
+            elif event.type == SimEventType.GAME_COMPLETE:
+                next_state = GameStateType.COMPLETE_VICTORY
+        
+        return next_state
+    
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """Renderöi pelitilan."""
         # Tyhjennä tausta
         surface.fill(BLACK)
@@ -384,41 +298,87 @@ class PlayState(GameState):
         if not self.level or not self.player:
             return
         
-        # Piirrä taso HUD:in alapuolelle
-        # Luo väliaikainen surface pelialueelle
-        game_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT - 40))
-        game_surface.fill(BLACK)
-        
-        # Piirrä kaikki pelielementit game_surface:lle
-        self.level.draw(game_surface)
-        self.player.draw(game_surface)
-        for ghost in self.ghosts:
-            ghost.draw(game_surface)
+        # Pelialue HUD:in alapuolella
+        area_size = (surface.get_width(), surface.get_height() - HUD_HEIGHT)
+        if self._game_surface is None or self._game_surface.get_size() != area_size:
+            self._game_surface = pygame.Surface(area_size)
+        game_surface = self._game_surface
         
-        # Piirrä ghost-pisteet game_surface:lle (pelialueella)
+        # Tauolla ei interpoloida (edellinen askel ei muutu)
+        if self.paused:
+            alpha = 1.0
+        
+        if self.logical_render:
+            # Piirrä loogisella resoluutiolla ja skaalaa kerran pelialueen kokoon
+            logical_size = (self.level.width * TILE, self.level.height * TILE)
+            if self._logical_surface is None or self._logical_surface.get_size() != logical_size:
+                self._logical_surface = pygame.Surface(logical_size)
+            self._draw_entities(self._logical_surface, alpha, 1)
+            pygame.transform.scale(self._logical_surface, area_size, game_surface)
+            points_scale = area_size[0] / logical_size[0]
+        else:
+            self._draw_entities(game_surface, alpha, SCALE)
+            points_scale = SCALE
+        
+        # Piirrä ghost-pisteet game_surface:lle (pelialueella, täydellä resoluutiolla)
         for display in self.hud.ghost_points_displays:
-            display.draw(game_surface, self.hud.font)
+            display.draw(game_surface, self.hud.font, self.hud.text_cache, points_scale)
         
         # Siirrä game_surface pääsurfacelle HUD:in alapuolelle
-        surface.blit(game_surface, (0, 40))
+        surface.blit(game_surface, (0, HUD_HEIGHT))
         
         # Piirrä HUD (ilman ghost-pisteitä, koska ne piirrettiin jo)
-        self.hud.draw(surface, self.score, self.lives, self.current_level, 
-                     self.level.pellets_left(), self.current_mode)
+        with self.profiler.section("hud"):
+            self.hud.draw(surface, self.score, self.lives, self.current_level, 
+                         self.level.pellets_left(), self.current_mode)
         
         # Piirrä tauko-overlay tarvittaessa
         if self.paused:
             self.hud.draw_pause(surface)
     
     
-    def reset_game(self) -> None:
-        """Nollaa pelin alkutilaan."""
-        self.score = 0
-        self.lives = INITIAL_LIVES
-        self.current_level = 1
+    def _draw_entities(self, target: pygame.Surface, alpha: float, scale: int) -> None:
+        """
+        Piirtää tason, pelaajan ja haamut annetulle pinnalle.
+        
+        Args:
+            target: Pinta jolle piirretään
+            alpha: Interpolaatiokerroin
+            scale: Renderöinnin skaalauskerroin
+        """
+        target.fill(BLACK)
+        with self.profiler.section("level_draw"):
+            self.level.draw(target, scale)
+        with self.profiler.section("entity_draw"):
+            self.player.draw(target, alpha, scale)
+            for ghost in self.ghosts:
+                ghost.draw(target, alpha, scale)
+            if isinstance(self.sim, SwarmSimulation):
+                self.sim.swarm.draw(target, alpha, scale)
+    
+    def reset_game(self, start_level: Optional[int] = None) -> None:
+        """
+        Nollaa pelin alkutilaan.
+        
+        Args:
+            start_level: Uuden pelin aloitustaso (None = sama kuin edellisellä pelillä)
+        """
         self.paused = False
-        self.ghost_chain_count = 0
-        self._load_level()
+        # Tallenne ja toisto kattavat vain ensimmäisen pelin
+        self.recorder = None
+        self.replay = None
+        self.controller.reset()
+        if self.sim is None:
+            try:
+                self.sim = self._create_sim(start_level=start_level or 1)
+            except Exception as e:
+                print(f"Error loading level: {e}")
+            return
+        if start_level is not None:
+            self.sim.start_level = start_level
+        # Uusi peli saa oman siemenen
+        self.sim.reset(new_seed())
+        print(f"Game seed: {self.sim.seed}")
 
 
 class GameOverState(GameState):
@@ -453,7 +413,7 @@ class GameOverState(GameState):
         """Päivittää game over -tilaa."""
         return None
     
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """Renderöi game over -näytön."""
         surface.fill(BLACK)
         self.hud.draw_game_over(surface, self.final_score)
@@ -498,7 +458,7 @@ class VictoryState(GameState):
         
         return None
     
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """Renderöi voittonäytön."""
         surface.fill(BLACK)
         self.hud.draw_victory(surface, self.score, self.level)
@@ -534,7 +494,7 @@ class CompleteVictoryState(GameState):
         """Päivittää koko pelin voittotilaa."""
         return None
     
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """Renderöi koko pelin voittonäytön."""
         surface.fill(BLACK)
         self.hud.draw_complete_victory(surface, self.final_score)
@@ -543,10 +503,46 @@ class CompleteVictoryState(GameState):
 class GameStateManager:
     """Pelitilojen hallinta."""
     
-    def __init__(self):
-        """Alustaa tilamanagerin."""
+    def __init__(self, audio_enabled: bool = True, logical_render: bool = LOGICAL_RENDER,
+                 profiler: Optional[FrameProfiler] = None, recorder: Optional[ReplayRecorder] = None,
+                 replay: Optional[ReplayPlayer] = None, controller: Optional[PlayerController] = None,
+                 auto_restart: bool = False, swarm: Optional[SwarmConfig] = None,
+                 level_file: str = DEFAULT_LEVEL_FILE, ai_budget_ms: float = AI_BUDGET_MS,
+                 soak_game_seconds: float = 0.0):
+        """
+        Alustaa tilamanagerin.
+        Soak-ajoissa (auto_restart) jokainen uusi peli alkaa kierron seuraavalta tasolta
+        (1, 2, ..., MAX_LEVEL, 1, ...), jotta kaikki tasot tulevat ajetuiksi.
+        
+        Args:
+            audio_enabled: False = ei äänilaitetta (headless-ajot)
+            logical_render: True = pelialue piirretään loogisella resoluutiolla
+            profiler: Alijärjestelmien ajastimet (jaetaan pelitilalle)
+            recorder: Tallennin ensimmäiselle pelille
+            replay: Toistettava tallenne ensimmäiselle pelille
+            controller: Pelaajan ohjain kaikille peleille (None = näppäimistö)
+            auto_restart: True = aloita uusi peli heti game overin tai läpäisyn jälkeen (soak-ajot)
+            swarm: Parvitilan asetukset (None = tavalliset haamut)
+            level_file: Tason tiedoston polku
+            ai_budget_ms: Haamujen suunnanvalintojen budjetti askelta kohden (0 = ei ajoittajaa)
+            soak_game_seconds: Soak-ajossa aloita uusi peli näin monen pelisekunnin jälkeen (0 = ei rajaa)
+        """
+        self.logical_render = logical_render
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.recorder = recorder
+        self.replay = replay
+        self.controller = controller
+        self.auto_restart = auto_restart
+        self.swarm = swarm
+        self.level_file = level_file
+        self.ai_budget_ms = ai_budget_ms
+        self.soak_game_seconds = soak_game_seconds
+        self.games_started: int = 0
+        # Pelatut tasot (soak-ajon kattavuus) ja nykyisen pelin kesto
+        self.levels_reached: Set[int] = set()
+        self._game_time: float = 0.0
         self.hud = HUD()
-        self.audio = AudioManager()
+        self.audio = AudioManager(enabled=audio_enabled)
         self.current_state: GameState = MenuState(self.hud, self.audio)
         self.play_state: Optional[PlayState] = None
     
@@ -569,17 +565,47 @@ class GameStateManager:
             dt: Aikaerotus sekunteina
         """
         new_state_type = self.current_state.update(dt)
+        if self.play_state is not None and self.current_state is self.play_state:
+            self.levels_reached.add(self.play_state.current_level)
+            self._game_time += dt
+            if (new_state_type is None and self.auto_restart and self.soak_game_seconds > 0
+                    and self._game_time >= self.soak_game_seconds):
+                # Pelin aikaraja: seuraava peli alkaa kierron seuraavalta tasolta
+                self._restart_game()
+                return
+        if new_state_type is None and self.auto_restart and isinstance(
+                self.current_state, (GameOverState, CompleteVictoryState)):
+            new_state_type = GameStateType.PLAYING
         if new_state_type:
             self._change_state(new_state_type)
     
-    def render(self, surface: pygame.Surface) -> None:
+    def render(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """
         Renderöi nykyisen tilan.
         
         Args:
             surface: Pinta jolle renderöidään
+            alpha: Interpolaatiokerroin edellisen ja nykyisen simulaatioaskeleen välillä
         """
-        self.current_state.render(surface)
+        self.current_state.render(surface, alpha)
+    
+    def _next_start_level(self) -> Optional[int]:
+        """Seuraavan pelin aloitustaso: soak-ajoissa tasokierto, muuten sama kuin ennen (None)."""
+        if not self.auto_restart:
+            return None
+        return self.games_started % MAX_LEVEL + 1
+    
+    def _restart_game(self) -> None:
+        """Aloittaa uuden pelin samalla pelitilalla."""
+        self.play_state.reset_game(self._next_start_level())
+        self.current_state = self.play_state
+        self.games_started += 1
+        self._game_time = 0.0
+    
+    def start_game(self) -> None:
+        """Aloittaa uuden pelin suoraan ohittaen valikon (headless-ajot)."""
+        self.current_state = MenuState(self.hud, self.audio)
+        self._change_state(GameStateType.PLAYING)
     
     def _change_state(self, new_state_type: GameStateType) -> None:
         """
@@ -593,17 +619,26 @@ class GameStateManager:
             
         elif new_state_type == GameStateType.PLAYING:
             if isinstance(self.current_state, MenuState):
-                # Uusi peli
-                self.play_state = PlayState(self.hud, self.audio)
+                # Uusi peli (tallennin ja toisto annetaan vain ensimmäiselle pelille)
+                self.play_state = PlayState(self.hud, self.audio, self.logical_render, self.profiler,
+                                            self.recorder, self.replay, self.controller,
+                                            self.swarm, self.level_file, self.ai_budget_ms)
+                self.games_started += 1
+                self._game_time = 0.0
+                self.recorder = None
+                self.replay = None
                 self.current_state = self.play_state
             elif isinstance(self.current_state, (GameOverState, CompleteVictoryState)):
                 # Uudelleenaloitus
                 if self.play_state:
-                    self.play_state.reset_game()
-                    self.current_state = self.play_state
+                    self._restart_game()
                 else:
-                    self.play_state = PlayState(self.hud, self.audio)
+                    self.play_state = PlayState(self.hud, self.audio, self.logical_render, self.profiler,
+                                                controller=self.controller, swarm=self.swarm,
+                                                level_file=self.level_file, ai_budget_ms=self.ai_budget_ms)
                     self.current_state = self.play_state
+                    self.games_started += 1
+                    self._game_time = 0.0
             elif isinstance(self.current_state, VictoryState):
                 # Jatka samaa peliä
                 if self.play_state:
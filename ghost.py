@@ -2,22 +2,24 @@
 Haamujen AI ja liike.
 Toteutettu tilakone ja persoonat (Blinky, Pinky).
 """
-import pygame
 import random
 from enum import Enum
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional, TYPE_CHECKING
 from constants import (
-    GHOST_COLORS, TILE, SCALE, FRIGHTENED_BLUE, FRIGHTENED_BLINK,
+    GHOST_COLORS, TILE, TILE_FP, SCALE, FRIGHTENED_BLUE, FRIGHTENED_BLINK,
     GHOST_SPEED_CHASE, GHOST_SPEED_SCATTER, GHOST_SPEED_FRIGHT, GHOST_SPEED_EATEN,
-    DIRECTION_UP, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_RIGHT, ALL_DIRECTIONS,
-    FRIGHTENED_DURATION, FRIGHTENED_BLINK_LAST
+    ALL_DIRECTION_CODES, DIRECTION_DX, DIRECTION_DY, DIRECTION_VECTORS, DIRECTION_CODES,
+    OPPOSITE_DIRECTION, FRIGHTENED_DURATION, FRIGHTENED_BLINK_LAST
 )
 from utils import (
-    pixels_to_tile, tile_center_pixels, is_near_tile_center,
-    get_opposite_direction, scale_for_rendering
+    FixedPosition, pixels_to_tile, tile_center_fixed, move_along_grid, step_distance, next_center,
+    scale_for_rendering, interpolate_position
 )
 from level import Level
-from pathfinding import next_step, get_flee_direction
+from pathfinding import MoveRequest, next_step, get_flee_direction
+
+if TYPE_CHECKING:
+    import pygame
 
 
 class GhostMode(Enum):
@@ -28,10 +30,26 @@ class GhostMode(Enum):
     EATEN = "eaten"          # Syöty, palaa kotiin
 
 
-class Ghost:
+# Perusnopeus tilan mukaan (kerrotaan haamun nopeuskertoimella)
+_MODE_SPEEDS = {
+    GhostMode.SCATTER: GHOST_SPEED_SCATTER,
+    GhostMode.CHASE: GHOST_SPEED_CHASE,
+    GhostMode.FRIGHTENED: GHOST_SPEED_FRIGHT,
+    GhostMode.EATEN: GHOST_SPEED_EATEN,
+}
+
+
+class Ghost(FixedPosition):
     """Haamun hahmo ja sen AI."""
     
-    def __init__(self, start_x: int, start_y: int, color_index: int = 0, personality: str = "blinky"):
+    __slots__ = (
+        "rng", "fx", "fy", "prev_fx", "prev_fy", "move_remainder", "spawn_x", "spawn_y", "direction",
+        "color", "personality", "mode", "speed_multiplier", "fright_timer", "eaten_home_timer",
+        "radius"
+    )
+    
+    def __init__(self, start_x: int, start_y: int, color_index: int = 0, personality: str = "blinky",
+                 rng=None):
         """
         Alustaa haamun.
         
@@ -40,19 +58,29 @@ class Ghost:
             start_y: Aloitus y-koordinaatti ruutuina
             color_index: Värin indeksi GHOST_COLORS-listasta
             personality: Haamun persoona ("blinky", "pinky", "clyde", "inky")
+            rng: Satunnaislähde jolla on choice()-metodi (oletuksena haamun oma random.Random)
         """
-        # Sijoita haamun ruudun keskelle
-        center_x, center_y = tile_center_pixels(start_x, start_y)
-        self.x: float = center_x
-        self.y: float = center_y
+        # Satunnaislähde suunnanvalintoihin (yleensä pelin jaettu virta)
+        self.rng = rng if rng is not None else random.Random()
+        
+        # Sijoita haamun ruudun keskelle (alipikseleinä, ks. FixedPosition)
+        center_x, center_y = tile_center_fixed(start_x, start_y)
+        self.fx: int = center_x
+        self.fy: int = center_y
+        
+        # Edellisen simulaatioaskeleen positio (renderöinnin interpolaatiota varten)
+        self.prev_fx: int = center_x
+        self.prev_fy: int = center_y
+        
+        # Askelmatkan jakojäännös (step_distance)
+        self.move_remainder: int = 0
         
         # Aloituspaikka (respawn-kohtaa varten)
         self.spawn_x: int = start_x
         self.spawn_y: int = start_y
         
-        # Liikkumissuunta
-        self.direction: Tuple[int, int] = random.choice(ALL_DIRECTIONS)
-        self.desired_direction: Tuple[int, int] = self.direction
+        # Liikkumissuunta (suuntakoodi, ks. DIRECTION_VECTORS)
+        self.direction: int = self.rng.choice(ALL_DIRECTION_CODES)
         
         # Väri ja persoona
         self.color = GHOST_COLORS[color_index % len(GHOST_COLORS)]
@@ -70,10 +98,6 @@ class Ghost:
         
         # Haamun koko renderöintiä varten
         self.radius: int = 6
-        
-        # Suunnanvaihtoajastin (estää liian tiheät käännökset)
-        self.direction_change_timer: float = 0.0
-        self.min_direction_change_interval: float = 0.1  # sekuntia
     
     def current_speed(self) -> float:
         """
@@ -82,20 +106,11 @@ class Ghost:
         Returns:
             Nopeus pikseleinä sekunnissa
         """
-        base_speed = 0.0
-        if self.mode == GhostMode.FRIGHTENED:
-            base_speed = GHOST_SPEED_FRIGHT
-        elif self.mode == GhostMode.EATEN:
-            base_speed = GHOST_SPEED_EATEN
-        elif self.mode == GhostMode.SCATTER:
-            base_speed = GHOST_SPEED_SCATTER
-        else:  # CHASE
-            base_speed = GHOST_SPEED_CHASE
-        
-        return base_speed * self.speed_multiplier
+        return _MODE_SPEEDS[self.mode] * self.speed_multiplier
     
     def update(self, dt: float, level: Level, player_pos: Tuple[float, float], 
-               player_direction: Tuple[int, int], global_mode: str) -> None:
+               player_direction: int, global_mode: str, scheduler=None,
+               planned: Optional[Dict[MoveRequest, Optional[Tuple[int, int]]]] = None) -> bool:
         """
         Päivittää haamun tilan ja liikkeen.
         
@@ -103,12 +118,19 @@ class Ghost:
             dt: Aikaerotus sekunteina
             level: Nykyinen taso
             player_pos: Pelaajan positio (x, y)
-            player_direction: Pelaajan liikkumissuunta (dx, dy)
+            player_direction: Pelaajan liikkumissuunnan koodi
             global_mode: Globaali moodi ("SCATTER" tai "CHASE")
+            scheduler: Suunnanvalintojen ajoittaja (ks. ai_scheduler.py); None = päätä heti
+            planned: Framen valmiiksi lasketut reitit (ks. plan_ghost_moves); None = hae itse
+            
+        Returns:
+            True jos haamu siirtyi toiseen ruutuun
         """
-        # Päivitä ajastimet
-        self.direction_change_timer -= dt
+        # Tallenna edellinen positio interpolaatiota varten
+        self.prev_fx = self.fx
+        self.prev_fy = self.fy
         
+        # Päivitä ajastimet
         if self.mode == GhostMode.FRIGHTENED:
             self.fright_timer -= dt
             if self.fright_timer <= 0:
@@ -123,118 +145,125 @@ class Ghost:
                 self.mode = GhostMode.SCATTER if global_mode == "SCATTER" else GhostMode.CHASE
                 self.eaten_home_timer = 0.0
         
-        # Tarkista nykyinen ruutu
-        current_tile_x, current_tile_y = pixels_to_tile(self.x, self.y)
-        
-        # Jos ollaan lähellä ruudun keskustaa, voi vaihtaa suuntaa
-        if (is_near_tile_center(self.x, self.y, current_tile_x, current_tile_y) and
-            self.direction_change_timer <= 0):
-            
-            new_direction = self._choose_direction(level, current_tile_x, current_tile_y, 
-                                                 player_pos, player_direction, global_mode)
-            if new_direction != self.direction:
-                # Keskitä positio ja vaihda suuntaa
-                self.x, self.y = tile_center_pixels(current_tile_x, current_tile_y)
-                self.direction = new_direction
-                self.direction_change_timer = self.min_direction_change_interval
-        
-        # Liiku nykyiseen suuntaan
-        speed = self.current_speed()
-        move_x = self.direction[0] * speed * dt
-        move_y = self.direction[1] * speed * dt
-        
-        new_x = self.x + move_x
-        new_y = self.y + move_y
-        
-        # Tarkista törmäys seinään
-        new_tile_x, new_tile_y = pixels_to_tile(new_x, new_y)
-        
-        if level.is_valid_position(new_tile_x, new_tile_y):
-            # Liike on laillinen
-            self.x = new_x
-            self.y = new_y
-        else:
-            # Törmäys seinään - pakota suunnanvaihto
-            self.x, self.y = tile_center_pixels(current_tile_x, current_tile_y)
-            self.direction_change_timer = 0  # Salli välitön suunnanvaihto
+        start_tile_x = self.fx // TILE_FP
+        start_tile_y = self.fy // TILE_FP
+        
+        def arrive(tile_x: int, tile_y: int, direction: int) -> int:
+            # Suunta valitaan jokaisessa saavutetussa ruudun keskipisteessä
+            self.direction = direction
+            if scheduler is None:
+                return self._choose_direction(level, tile_x, tile_y,
+                                              player_pos, player_direction, global_mode, planned)
+            return scheduler.decide(self, level, tile_x, tile_y,
+                                    player_pos, player_direction, global_mode, planned)
+        
+        # Liiku käytäviä pitkin (seinän edessä haamu jää keskipisteeseen odottamaan uutta suuntaa)
+        distance, self.move_remainder = step_distance(self.current_speed(), dt, self.move_remainder)
+        self.fx, self.fy, self.direction = move_along_grid(
+            self.fx, self.fy, self.direction, distance, level, arrive)
+        return self.fx // TILE_FP != start_tile_x or self.fy // TILE_FP != start_tile_y
     
-    def _choose_direction(self, level: Level, tile_x: int, tile_y: int, 
-                         player_pos: Tuple[float, float], player_direction: Tuple[int, int],
-                         global_mode: str) -> Tuple[int, int]:
+    def upcoming_request(self, dt: float, level: Level, player_pos: Tuple[float, float],
+                         player_direction: int, global_mode: str) -> Optional[MoveRequest]:
         """
-        Valitsee haamulle uuden suunnan tilan mukaan.
+        Ennustaa update-kutsun ensimmäisen reittikyselyn muuttamatta haamun tilaa.
+        Ajastimet ja askelmatka lasketaan samoin kuin update:ssa; jos haamu saapuu
+        keskipisteeseen tällä askeleella, palautetaan siellä tehtävä kysely.
         
         Args:
+            dt: Aikaerotus sekunteina
             level: Nykyinen taso
-            tile_x: Haamun nykyinen x-ruutu
-            tile_y: Haamun nykyinen y-ruutu
             player_pos: Pelaajan positio
-            player_direction: Pelaajan liikkumissuunta
+            player_direction: Pelaajan liikkumissuunnan koodi
             global_mode: Globaali moodi
             
         Returns:
-            Uusi liikkumissuunta (dx, dy)
-        """
-        current_pos = (tile_x, tile_y)
-        
-        if self.mode == GhostMode.FRIGHTENED:
-            return self._frightened_behavior(level, current_pos, player_pos)
-        elif self.mode == GhostMode.EATEN:
-            return self._eaten_behavior(level, current_pos)
-        elif self.mode == GhostMode.SCATTER:
-            return self._scatter_behavior(level, current_pos)
-        else:  # CHASE
-            return self._chase_behavior(level, current_pos, player_pos, player_direction)
+            Kysely, tai None jos haamu ei saavu keskipisteeseen tai ei hae reittiä (FRIGHTENED)
+        """
+        mode = self.mode
+        returning = GhostMode.SCATTER if global_mode == "SCATTER" else GhostMode.CHASE
+        if mode == GhostMode.FRIGHTENED and self.fright_timer - dt <= 0:
+            mode = returning
+        elif mode == GhostMode.EATEN and self.eaten_home_timer - dt <= 0:
+            mode = returning
+        if mode == GhostMode.FRIGHTENED:
+            return None
+        
+        distance, _ = step_distance(_MODE_SPEEDS[mode] * self.speed_multiplier, dt, self.move_remainder)
+        tile_x, tile_y, gap = next_center(self.fx, self.fy, self.direction, level)
+        if distance < gap:
+            return None
+        return self.path_request(level, tile_x, tile_y, player_pos, player_direction, mode)
     
-    def _scatter_behavior(self, level: Level, current_pos: Tuple[int, int]) -> Tuple[int, int]:
+    def path_request(self, level: Level, tile_x: int, tile_y: int, player_pos: Tuple[float, float],
+                     player_direction: int, mode: Optional[GhostMode] = None) -> Optional[MoveRequest]:
         """
-        Hajautumiskäyttäytyminen - liiku kotikulmaan.
+        Muodostaa tilan mukaisen reittikyselyn keskipisteessä.
         
         Args:
             level: Nykyinen taso
-            current_pos: Nykyinen positio (x, y)
+            tile_x: Haamun x-ruutu
+            tile_y: Haamun y-ruutu
+            player_pos: Pelaajan positio
+            player_direction: Pelaajan liikkumissuunnan koodi
+            mode: Tila jolle kysely tehdään (oletuksena nykyinen)
             
         Returns:
-            Suositeltava suunta
+            Kysely, tai None FRIGHTENED-tilassa (pakosuunta ei ole reittihaku)
         """
-        # Haetaan kotikulma persoonan mukaan
-        home_corner = self._get_home_corner(level)
-        direction = next_step(level, current_pos, home_corner, 
-                            get_opposite_direction(self.direction))
+        mode = self.mode if mode is None else mode
+        current_pos = (tile_x, tile_y)
         
-        if direction is None:
-            # Jos ei löydy polkua, valitse satunnainen kelvollinen suunta
-            return self._get_random_valid_direction(level, current_pos)
+        if mode == GhostMode.FRIGHTENED:
+            return None
+        if mode == GhostMode.EATEN:
+            # Syöty haamu palaa kotiin, U-käännös sallittu
+            return MoveRequest(current_pos, level.ghost_home_tile())
         
-        return direction
+        if mode == GhostMode.SCATTER:
+            # Hajautuminen: kotikulma persoonan mukaan
+            goal = self._get_home_corner(level)
+        else:
+            # Jahtaus: kohde persoonan mukaan
+            goal = self._get_chase_target(player_pos, player_direction, level)
+        return MoveRequest(current_pos, goal, DIRECTION_VECTORS[OPPOSITE_DIRECTION[self.direction]])
     
-    def _chase_behavior(self, level: Level, current_pos: Tuple[int, int], 
-                       player_pos: Tuple[float, float], player_direction: Tuple[int, int]) -> Tuple[int, int]:
+    def _choose_direction(self, level: Level, tile_x: int, tile_y: int, 
+                         player_pos: Tuple[float, float], player_direction: int,
+                         global_mode: str,
+                         planned: Optional[Dict[MoveRequest, Optional[Tuple[int, int]]]] = None) -> int:
         """
-        Jahtauskäyttäytyminen - liiku kohti kohdetta.
+        Valitsee haamulle uuden suunnan tilan mukaan.
         
         Args:
             level: Nykyinen taso
-            current_pos: Nykyinen positio (x, y)
+            tile_x: Haamun nykyinen x-ruutu
+            tile_y: Haamun nykyinen y-ruutu
             player_pos: Pelaajan positio
-            player_direction: Pelaajan liikkumissuunta
+            player_direction: Pelaajan liikkumissuunnan koodi
+            global_mode: Globaali moodi
+            planned: Framen valmiiksi lasketut reitit; puuttuva kysely haetaan next_step:llä
             
         Returns:
-            Suositeltava suunta
+            Uuden liikkumissuunnan koodi
         """
-        # Haetaan kohde persoonan mukaan
-        target = self._get_chase_target(player_pos, player_direction, level)
-        direction = next_step(level, current_pos, target, 
-                            get_opposite_direction(self.direction))
+        request = self.path_request(level, tile_x, tile_y, player_pos, player_direction)
+        if request is None:
+            return self._frightened_behavior(level, (tile_x, tile_y), player_pos)
+        
+        if planned is not None and request in planned:
+            direction = planned[request]
+        else:
+            direction = next_step(level, *request)
         
         if direction is None:
             # Jos ei löydy polkua, valitse satunnainen kelvollinen suunta
-            return self._get_random_valid_direction(level, current_pos)
+            return self._get_random_valid_direction(level, request.start)
         
-        return direction
+        return DIRECTION_CODES[direction]
     
     def _frightened_behavior(self, level: Level, current_pos: Tuple[int, int], 
-                           player_pos: Tuple[float, int]) -> Tuple[int, int]:
+                           player_pos: Tuple[float, int]) -> int:
         """
         Pelkäävä käyttäytyminen - liiku satunnaisesti.
         
@@ -252,31 +281,11 @@ class Ghost:
                                     level)
         
         if flee_dir is not None:
-            return flee_dir
+            return DIRECTION_CODES[flee_dir]
         
         # Jos ei pakenemissuuntaa, valitse satunnainen
         return self._get_random_valid_direction(level, current_pos)
     
-    def _eaten_behavior(self, level: Level, current_pos: Tuple[int, int]) -> Tuple[int, int]:
-        """
-        Syödyn haamun käyttäytyminen - liiku kotiin.
-        
-        Args:
-            level: Nykyinen taso
-            current_pos: Nykyinen positio (x, y)
-            
-        Returns:
-            Suositeltava suunta
-        """
-        home_tile = level.ghost_home_tile()
-        direction = next_step(level, current_pos, home_tile)
-        
-        if direction is None:
-            # Jos ei löydy polkua, valitse satunnainen kelvollinen suunta
-            return self._get_random_valid_direction(level, current_pos)
-        
-        return direction
-    
     def _get_home_corner(self, level: Level) -> Tuple[int, int]:
         """
         Palauttaa haamun kotikulman persoonan mukaan.
@@ -294,14 +303,14 @@ class Ghost:
         else:
             return (0, level.height - 1)  # Alhaan-vasen (placeholder)
     
-    def _get_chase_target(self, player_pos: Tuple[float, float], player_direction: Tuple[int, int], 
+    def _get_chase_target(self, player_pos: Tuple[float, float], player_direction: int, 
                          level: Level) -> Tuple[int, int]:
         """
         Palauttaa jahtauskohteen persoonan mukaan.
         
         Args:
             player_pos: Pelaajan positio
-            player_direction: Pelaajan liikkumissuunta
+            player_direction: Pelaajan liikkumissuunnan koodi
             level: Nykyinen taso
             
         Returns:
@@ -314,14 +323,14 @@ class Ghost:
             return player_tile
         elif self.personality == "pinky":
             # Pinky: 4 ruutua pelaajan toivottuun suuntaan
-            target_x = player_tile[0] + player_direction[0] * 4
-            target_y = player_tile[1] + player_direction[1] * 4
+            target_x = player_tile[0] + DIRECTION_DX[player_direction] * 4
+            target_y = player_tile[1] + DIRECTION_DY[player_direction] * 4
             return (target_x, target_y)
         else:
             # Placeholder: satunnainen kohde
             return player_tile
     
-    def _get_random_valid_direction(self, level: Level, current_pos: Tuple[int, int]) -> Tuple[int, int]:
+    def _get_random_valid_direction(self, level: Level, current_pos: Tuple[int, int]) -> int:
         """
         Valitsee satunnaisen kelvollisen suunnan.
         
@@ -330,24 +339,22 @@ class Ghost:
             current_pos: Nykyinen positio (x, y)
             
         Returns:
-            Satunnainen kelvollinen suunta
+            Satunnaisen kelvollisen suunnan koodi
         """
         possible_directions = []
+        tile_x, tile_y = current_pos
+        opposite = OPPOSITE_DIRECTION[self.direction]
         
-        for direction in ALL_DIRECTIONS:
-            next_tile_x = current_pos[0] + direction[0]
-            next_tile_y = current_pos[1] + direction[1]
-            
-            if level.is_valid_position(next_tile_x, next_tile_y):
-                # Vältä U-käännöstä paitsi jos pakko
-                if direction != get_opposite_direction(self.direction):
-                    possible_directions.append(direction)
+        for direction in ALL_DIRECTION_CODES:
+            # Vältä U-käännöstä paitsi jos pakko
+            if direction != opposite and level.is_valid_position(
+                    tile_x + DIRECTION_DX[direction], tile_y + DIRECTION_DY[direction]):
+                possible_directions.append(direction)
         
         # Jos ei muita vaihtoehtoja, salli U-käännös
         if not possible_directions:
-            opposite = get_opposite_direction(self.direction)
-            next_tile_x = current_pos[0] + opposite[0]
-            next_tile_y = current_pos[1] + opposite[1]
+            next_tile_x = tile_x + DIRECTION_DX[opposite]
+            next_tile_y = tile_y + DIRECTION_DY[opposite]
             
             if level.is_valid_position(next_tile_x, next_tile_y):
                 possible_directions.append(opposite)
@@ -356,7 +363,7 @@ class Ghost:
         if not possible_directions:
             return self.direction
         
-        return random.choice(possible_directions)
+        return self.rng.choice(possible_directions)
     
     def set_frightened(self) -> None:
         """Asettaa haamun FRIGHTENED-tilaan."""
@@ -364,8 +371,7 @@ class Ghost:
             self.mode = GhostMode.FRIGHTENED
             self.fright_timer = FRIGHTENED_DURATION
             # Käännä suunta välittömästi
-            self.direction = get_opposite_direction(self.direction)
-            self.direction_change_timer = 0
+            self.direction = OPPOSITE_DIRECTION[self.direction]
     
     def set_eaten(self) -> None:
         """Asettaa haamun EATEN-tilaan."""
@@ -373,15 +379,20 @@ class Ghost:
         self.eaten_home_timer = 3.0  # 3 sekuntia kotiin palaamiseen
         self.fright_timer = 0.0
     
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: "pygame.Surface", alpha: float = 1.0, scale: int = SCALE) -> None:
         """
         Piirtää haamun.
         
         Args:
             surface: Pinta jolle piirretään
+            alpha: Interpolaatiokerroin edellisen ja nykyisen askeleen välillä
+            scale: Renderöinnin skaalauskerroin (1 = looginen resoluutio)
         """
-        # Skaalaa positio renderöintiä varten
-        render_x, render_y = scale_for_rendering(self.x, self.y)
+        import pygame
+        
+        # Interpoloi ja skaalaa positio renderöintiä varten
+        draw_x, draw_y = interpolate_position(self.prev_x, self.prev_y, self.x, self.y, alpha)
+        render_x, render_y = scale_for_rendering(draw_x, draw_y, scale)
         
         # Määritä väri tilan mukaan
         if self.mode == GhostMode.FRIGHTENED:
@@ -404,14 +415,14 @@ class Ghost:
         pygame.draw.circle(
             surface, color,
             (render_x, render_y),
-            self.radius * SCALE
+            self.radius * scale
         )
         
         # Piirrä silmät (ei EATEN-tilassa)
         if self.mode != GhostMode.EATEN:
-            eye_size = 2 * SCALE
-            eye_offset_x = 2 * SCALE
-            eye_offset_y = 2 * SCALE
+            eye_size = 2 * scale
+            eye_offset_x = 2 * scale
+            eye_offset_y = 2 * scale
             
             # Vasen silmä
             pygame.draw.circle(
@@ -428,7 +439,7 @@ class Ghost:
             )
             
             # Piirrä silmämunat (pienet mustat pisteet)
-            pupil_size = 1 * SCALE
+            pupil_size = 1 * scale
             pygame.draw.circle(
                 surface, (0, 0, 0),
                 (render_x - eye_offset_x, render_y - eye_offset_y),
@@ -460,12 +471,13 @@ class Ghost:
     
     def reset_position(self) -> None:
         """Palauttaa haamun aloituspaikkaan."""
-        center_x, center_y = tile_center_pixels(self.spawn_x, self.spawn_y)
-        self.x = center_x
-        self.y = center_y
-        self.direction = random.choice(ALL_DIRECTIONS)
-        self.desired_direction = self.direction
-        self.direction_change_timer = 0.0
+        center_x, center_y = tile_center_fixed(self.spawn_x, self.spawn_y)
+        self.fx = center_x
+        self.fy = center_y
+        self.prev_fx = center_x
+        self.prev_fy = center_y
+        self.move_remainder = 0
+        self.direction = self.rng.choice(ALL_DIRECTION_CODES)
         self.mode = GhostMode.SCATTER
         self.fright_timer = 0.0
         self.eaten_home_timer = 0.0
@@ -480,8 +492,7 @@ class Ghost:
         if mode != self.mode:
             self.mode = mode
             # Käännä suunta kun moodi vaihtuu
-            self.direction = get_opposite_direction(self.direction)
-            self.direction_change_timer = 0
+            self.direction = OPPOSITE_DIRECTION[self.direction]
     
     def set_speed_multiplier(self, multiplier: float) -> None:
         """
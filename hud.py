@@ -4,20 +4,79 @@ Näyttää pisteet, elämät, tason numeron ja muut pelitiedot.
 Päivitetty moodin ja ghost-ketjupisteiden näyttämiseen.
 """
 import pygame
-from typing import Optional, List, Tuple
-from constants import WHITE, YELLOW, HUD_FONT_SIZE, WINDOW_WIDTH, GHOST_CHAIN_POINTS, GHOST_POINTS_DISPLAY_TIME
+from collections import OrderedDict
+from typing import Optional, List, Tuple, Dict
+from constants import (
+    WHITE, YELLOW, HUD_FONT_SIZE, GHOST_CHAIN_POINTS, GHOST_POINTS_DISPLAY_TIME,
+    TEXT_CACHE_SIZE, SCALE
+)
+
+
+class TextCache:
+    """
+    Renderöityjen tekstipintojen välimuisti.
+    Avaimena (fontti, teksti, väri), vanhimmat poistetaan LRU-järjestyksessä.
+    """
+    
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE):
+        """
+        Alustaa välimuistin.
+        
+        Args:
+            max_size: Välimuistin maksimikoko (pintojen määrä)
+        """
+        self.max_size = max_size
+        self._surfaces: "OrderedDict[Tuple[int, str, Tuple[int, int, int]], pygame.Surface]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+    
+    def render(self, font: pygame.font.Font, text: str, 
+               color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Palauttaa renderöidyn tekstipinnan, renderöi vain jos sitä ei löydy.
+        
+        Args:
+            font: Käytettävä fontti
+            text: Renderöitävä teksti
+            color: Tekstin väri
+            
+        Returns:
+            Tekstipinta
+        """
+        key = (id(font), text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+    
+    def clear(self) -> None:
+        """Tyhjentää välimuistin."""
+        self._surfaces.clear()
+    
+    def __len__(self) -> int:
+        return len(self._surfaces)
 
 
 class GhostPointsDisplay:
     """Ghost-ketjupisteiden näyttö."""
     
-    def __init__(self, x: int, y: int, points: int, chain_count: int):
+    __slots__ = ("x", "y", "points", "chain_count", "timer", "alpha")
+    
+    def __init__(self, x: float, y: float, points: int, chain_count: int):
         """
         Alustaa ghost-pisteiden näytön.
         
         Args:
-            x: X-koordinaatti
-            y: Y-koordinaatti
+            x: X-koordinaatti (looginen, skaalaamaton)
+            y: Y-koordinaatti (looginen, skaalaamaton)
             points: Näytettävät pisteet
             chain_count: Ketjun numero (0-3)
         """
@@ -48,23 +107,30 @@ class GhostPointsDisplay:
         
         return True
     
-    def draw(self, surface: pygame.Surface, font: pygame.font.Font) -> None:
+    def draw(self, surface: pygame.Surface, font: pygame.font.Font,
+             text_cache: Optional[TextCache] = None, scale: float = SCALE) -> None:
         """
         Piirtää ghost-pisteet.
         
         Args:
             surface: Pinta jolle piirretään
             font: Käytettävä fontti
+            text_cache: Tekstivälimuisti (sama pinta jokaiselle pistearvolle)
+            scale: Loogisten koordinaattien skaalaus pinnan koordinaateiksi
         """
         if self.alpha <= 0:
             return
         
         text = f"{self.points}"
-        text_surface = font.render(text, True, YELLOW)
+        if text_cache is not None:
+            # Jaettu pinta - vain alpha vaihtuu ennen piirtoa
+            text_surface = text_cache.render(font, text, YELLOW)
+        else:
+            text_surface = font.render(text, True, YELLOW)
         text_surface.set_alpha(self.alpha)
         
         # Keskitä teksti
-        text_rect = text_surface.get_rect(center=(self.x, self.y))
+        text_rect = text_surface.get_rect(center=(int(self.x * scale), int(self.y * scale)))
         surface.blit(text_surface, text_rect)
 
 
@@ -77,6 +143,18 @@ class HUD:
         pygame.font.init()
         self.font: pygame.font.Font = pygame.font.Font(None, HUD_FONT_SIZE)
         
+        # Suuremmat otsikkofontit luodaan kerran ja käytetään uudelleen
+        self._fonts: Dict[int, pygame.font.Font] = {HUD_FONT_SIZE: self.font}
+        
+        # Tekstipintojen välimuisti
+        self.text_cache = TextCache()
+        
+        # HUD-kenttien viimeisin teksti ja pinta (renderöidään vain muuttuessa)
+        self._field_surfaces: Dict[str, Tuple[str, pygame.Surface]] = {}
+        
+        # Taukonäytön läpinäkyvä tausta
+        self._pause_overlay: Optional[pygame.Surface] = None
+        
         # HUD:in korkeus
         self.height: int = 40
         
@@ -87,13 +165,13 @@ class HUD:
         # Ghost-ketjupisteiden näytöt
         self.ghost_points_displays: List[GhostPointsDisplay] = []
     
-    def add_ghost_points(self, x: int, y: int, chain_count: int) -> None:
+    def add_ghost_points(self, x: float, y: float, chain_count: int) -> None:
         """
         Lisää ghost-ketjupisteiden näytön.
         
         Args:
-            x: X-koordinaatti
-            y: Y-koordinaatti
+            x: X-koordinaatti (looginen, skaalaamaton)
+            y: Y-koordinaatti (looginen, skaalaamaton)
             chain_count: Ketjun numero (0-3)
         """
         if 0 <= chain_count < len(GHOST_CHAIN_POINTS):
@@ -101,6 +179,57 @@ class HUD:
             display = GhostPointsDisplay(x, y, points, chain_count)
             self.ghost_points_displays.append(display)
     
+    def get_font(self, size: int) -> pygame.font.Font:
+        """
+        Palauttaa annetun kokoisen fontin (luodaan vain kerran).
+        
+        Args:
+            size: Fonttikoko
+            
+        Returns:
+            Fontti
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self._fonts[size] = font
+        return font
+    
+    def render_text(self, text: str, color: Tuple[int, int, int], 
+                    size: int = HUD_FONT_SIZE) -> pygame.Surface:
+        """
+        Renderöi tekstin välimuistin kautta.
+        
+        Args:
+            text: Teksti
+            color: Väri
+            size: Fonttikoko
+            
+        Returns:
+            Tekstipinta
+        """
+        return self.text_cache.render(self.get_font(size), text, color)
+    
+    def _render_field(self, field: str, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Renderöi HUD-kentän vain jos sen teksti on muuttunut.
+        
+        Args:
+            field: Kentän nimi
+            text: Kentän teksti
+            color: Väri
+            
+        Returns:
+            Kentän tekstipinta
+        """
+        cached = self._field_surfaces.get(field)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+        
+        text_surface = self.font.render(text, True, color)
+        self._field_surfaces[field] = (text, text_surface)
+        return text_surface
+    
     def update(self, dt: float) -> None:
         """
         Päivittää HUD:in.
@@ -127,41 +256,43 @@ class HUD:
             pellets_left: Jäljellä olevien pellettien määrä
             current_mode: Nykyinen moodi (SCATTER/CHASE/FRIGHT)
         """
+        window_width = surface.get_width()
+        
         # Piirrä HUD:in tausta
-        hud_rect = pygame.Rect(0, 0, WINDOW_WIDTH, self.height)
+        hud_rect = pygame.Rect(0, 0, window_width, self.height)
         pygame.draw.rect(surface, (0, 0, 0), hud_rect)
         
         # Piirrä raja-viiva HUD:in alle
-        pygame.draw.line(surface, WHITE, (0, self.height), (WINDOW_WIDTH, self.height), 2)
+        pygame.draw.line(surface, WHITE, (0, self.height), (window_width, self.height), 2)
         
         # Score (left)
         score_text = f"SCORE: {score:06d}"
-        score_surface = self.font.render(score_text, True, self.score_color)
+        score_surface = self._render_field("score", score_text, self.score_color)
         surface.blit(score_surface, (10, 10))
         
         # Lives (center left)
         lives_text = f"LIVES: {lives}"
-        lives_surface = self.font.render(lives_text, True, self.text_color)
+        lives_surface = self._render_field("lives", lives_text, self.text_color)
         lives_x = 200
         surface.blit(lives_surface, (lives_x, 10))
         
         # Level (center)
         level_text = f"LEVEL: {level}"
-        level_surface = self.font.render(level_text, True, self.text_color)
-        level_x = WINDOW_WIDTH // 2 - level_surface.get_width() // 2
+        level_surface = self._render_field("level", level_text, self.text_color)
+        level_x = window_width // 2 - level_surface.get_width() // 2
         surface.blit(level_surface, (level_x, 10))
         
         # Pellets remaining (right top)
         if pellets_left > 0:
             pellets_text = f"PELLETS: {pellets_left}"
-            pellets_surface = self.font.render(pellets_text, True, self.text_color)
-            pellets_x = WINDOW_WIDTH - pellets_surface.get_width() - 10
+            pellets_surface = self._render_field("pellets", pellets_text, self.text_color)
+            pellets_x = window_width - pellets_surface.get_width() - 10
             surface.blit(pellets_surface, (pellets_x, 10))
         
         # Mode (right bottom)
         mode_text = f"MODE: {current_mode}"
-        mode_surface = self.font.render(mode_text, True, self.text_color)
-        mode_x = WINDOW_WIDTH - mode_surface.get_width() - 10
+        mode_surface = self._render_field("mode", mode_text, self.text_color)
+        mode_x = window_width - mode_surface.get_width() - 10
         mode_y = 25  # Lower row
         surface.blit(mode_surface, (mode_x, mode_y))
         
@@ -175,27 +306,26 @@ class HUD:
             surface: Pinta jolle piirretään
             final_score: Lopulliset pisteet
         """
-        # Suurempi fontti otsikkolle
-        big_font = pygame.font.Font(None, 48)
+        window_width = surface.get_width()
         
         # Game Over text
         game_over_text = "GAME OVER"
-        game_over_surface = big_font.render(game_over_text, True, WHITE)
-        game_over_x = WINDOW_WIDTH // 2 - game_over_surface.get_width() // 2
+        game_over_surface = self.render_text(game_over_text, WHITE, 48)
+        game_over_x = window_width // 2 - game_over_surface.get_width() // 2
         game_over_y = 200
         surface.blit(game_over_surface, (game_over_x, game_over_y))
         
         # Final score
         score_text = f"Final Score: {final_score:06d}"
-        score_surface = self.font.render(score_text, True, self.score_color)
-        score_x = WINDOW_WIDTH // 2 - score_surface.get_width() // 2
+        score_surface = self.render_text(score_text, self.score_color)
+        score_x = window_width // 2 - score_surface.get_width() // 2
         score_y = game_over_y + 60
         surface.blit(score_surface, (score_x, score_y))
         
         # Instructions
         restart_text = "Press ENTER to restart or ESC to exit"
-        restart_surface = self.font.render(restart_text, True, self.text_color)
-        restart_x = WINDOW_WIDTH // 2 - restart_surface.get_width() // 2
+        restart_surface = self.render_text(restart_text, self.text_color)
+        restart_x = window_width // 2 - restart_surface.get_width() // 2
         restart_y = score_y + 40
         surface.blit(restart_surface, (restart_x, restart_y))
     
@@ -208,27 +338,26 @@ class HUD:
             score: Nykyiset pisteet
             level: Läpäisty taso
         """
-        # Suurempi fontti otsikkolle
-        big_font = pygame.font.Font(None, 48)
+        window_width = surface.get_width()
         
         # Victory text
         victory_text = f"LEVEL {level} COMPLETE!"
-        victory_surface = big_font.render(victory_text, True, YELLOW)
-        victory_x = WINDOW_WIDTH // 2 - victory_surface.get_width() // 2
+        victory_surface = self.render_text(victory_text, YELLOW, 48)
+        victory_x = window_width // 2 - victory_surface.get_width() // 2
         victory_y = 200
         surface.blit(victory_surface, (victory_x, victory_y))
         
         # Score
         score_text = f"Score: {score:06d}"
-        score_surface = self.font.render(score_text, True, self.score_color)
-        score_x = WINDOW_WIDTH // 2 - score_surface.get_width() // 2
+        score_surface = self.render_text(score_text, self.score_color)
+        score_x = window_width // 2 - score_surface.get_width() // 2
         score_y = victory_y + 60
         surface.blit(score_surface, (score_x, score_y))
         
         # Instructions
         continue_text = "Press ENTER to continue to next level"
-        continue_surface = self.font.render(continue_text, True, self.text_color)
-        continue_x = WINDOW_WIDTH // 2 - continue_surface.get_width() // 2
+        continue_surface = self.render_text(continue_text, self.text_color)
+        continue_x = window_width // 2 - continue_surface.get_width() // 2
         continue_y = score_y + 40
         surface.blit(continue_surface, (continue_x, continue_y))
     
@@ -240,34 +369,33 @@ class HUD:
             surface: Pinta jolle piirretään
             final_score: Lopulliset pisteet
         """
-        # Suurempi fontti otsikkolle
-        big_font = pygame.font.Font(None, 64)
+        window_width = surface.get_width()
         
         # Game completion text
         victory_text = "CONGRATULATIONS!"
-        victory_surface = big_font.render(victory_text, True, YELLOW)
-        victory_x = WINDOW_WIDTH // 2 - victory_surface.get_width() // 2
+        victory_surface = self.render_text(victory_text, YELLOW, 64)
+        victory_x = window_width // 2 - victory_surface.get_width() // 2
         victory_y = 150
         surface.blit(victory_surface, (victory_x, victory_y))
         
         # Lower text
         complete_text = "YOU COMPLETED ALL 6 LEVELS!"
-        complete_surface = self.font.render(complete_text, True, WHITE)
-        complete_x = WINDOW_WIDTH // 2 - complete_surface.get_width() // 2
+        complete_surface = self.render_text(complete_text, WHITE)
+        complete_x = window_width // 2 - complete_surface.get_width() // 2
         complete_y = victory_y + 80
         surface.blit(complete_surface, (complete_x, complete_y))
         
         # Final score
         score_text = f"Final Score: {final_score:06d}"
-        score_surface = self.font.render(score_text, True, self.score_color)
-        score_x = WINDOW_WIDTH // 2 - score_surface.get_width() // 2
+        score_surface = self.render_text(score_text, self.score_color)
+        score_x = window_width // 2 - score_surface.get_width() // 2
         score_y = complete_y + 60
         surface.blit(score_surface, (score_x, score_y))
         
         # Instructions
         restart_text = "Press ENTER to restart or ESC to return to menu"
-        restart_surface = self.font.render(restart_text, True, self.text_color)
-        restart_x = WINDOW_WIDTH // 2 - restart_surface.get_width() // 2
+        restart_surface = self.render_text(restart_text, self.text_color)
+        restart_x = window_width // 2 - restart_surface.get_width() // 2
         restart_y = score_y + 60
         surface.blit(restart_surface, (restart_x, restart_y))
     
@@ -278,27 +406,26 @@ class HUD:
         Args:
             surface: Pinta jolle piirretään
         """
-        # Suurempi fontti otsikkolle
-        big_font = pygame.font.Font(None, 72)
+        window_width = surface.get_width()
         
         # Pelin nimi
         title_text = "MAZE CHOMP"
-        title_surface = big_font.render(title_text, True, YELLOW)
-        title_x = WINDOW_WIDTH // 2 - title_surface.get_width() // 2
+        title_surface = self.render_text(title_text, YELLOW, 72)
+        title_x = window_width // 2 - title_surface.get_width() // 2
         title_y = 150
         surface.blit(title_surface, (title_x, title_y))
         
         # Start instruction
         start_text = "Press ENTER to start"
-        start_surface = self.font.render(start_text, True, WHITE)
-        start_x = WINDOW_WIDTH // 2 - start_surface.get_width() // 2
+        start_surface = self.render_text(start_text, WHITE)
+        start_x = window_width // 2 - start_surface.get_width() // 2
         start_y = title_y + 100
         surface.blit(start_surface, (start_x, start_y))
         
         # Controls
         controls_title = "CONTROLS:"
-        controls_surface = self.font.render(controls_title, True, WHITE)
-        controls_x = WINDOW_WIDTH // 2 - controls_surface.get_width() // 2
+        controls_surface = self.render_text(controls_title, WHITE)
+        controls_x = window_width // 2 - controls_surface.get_width() // 2
         controls_y = start_y + 60
         surface.blit(controls_surface, (controls_x, controls_y))
         
@@ -309,8 +436,8 @@ class HUD:
         ]
         
         for i, control in enumerate(controls):
-            control_surface = self.font.render(control, True, WHITE)
-            control_x = WINDOW_WIDTH // 2 - control_surface.get_width() // 2
+            control_surface = self.render_text(control, WHITE)
+            control_x = window_width // 2 - control_surface.get_width() // 2
             control_y = controls_y + 30 + (i * 25)
             surface.blit(control_surface, (control_x, control_y))
     
@@ -321,24 +448,27 @@ class HUD:
         Args:
             surface: Pinta jolle piirretään
         """
-        # Läpinäkyvä tausta
-        pause_overlay = pygame.Surface((WINDOW_WIDTH, surface.get_height()))
-        pause_overlay.set_alpha(128)
-        pause_overlay.fill((0, 0, 0))
-        surface.blit(pause_overlay, (0, 0))
+        window_width = surface.get_width()
+        
+        # Läpinäkyvä tausta (luodaan uudelleen vain jos koko muuttuu)
+        overlay_size = (window_width, surface.get_height())
+        if self._pause_overlay is None or self._pause_overlay.get_size() != overlay_size:
+            self._pause_overlay = pygame.Surface(overlay_size)
+            self._pause_overlay.set_alpha(128)
+            self._pause_overlay.fill((0, 0, 0))
+        surface.blit(self._pause_overlay, (0, 0))
         
         # Pause text
-        big_font = pygame.font.Font(None, 48)
         pause_text = "PAUSED"
-        pause_surface = big_font.render(pause_text, True, WHITE)
-        pause_x = WINDOW_WIDTH // 2 - pause_surface.get_width() // 2
+        pause_surface = self.render_text(pause_text, WHITE, 48)
+        pause_x = window_width // 2 - pause_surface.get_width() // 2
         pause_y = 250
         surface.blit(pause_surface, (pause_x, pause_y))
         
         # Continue instruction
         continue_text = "Press SPACE to continue"
-        continue_surface = self.font.render(continue_text, True, WHITE)
-        continue_x = WINDOW_WIDTH // 2 - continue_surface.get_width() // 2
+        continue_surface = self.render_text(continue_text, WHITE)
+        continue_x = window_width // 2 - continue_surface.get_width() // 2
         continue_y = pause_y + 50
         surface.blit(continue_surface, (continue_x, continue_y))
     
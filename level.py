@@ -3,8 +3,7 @@ Tason lataus ja hallinta.
 Lukee ASCII-kartan, hallitsee ruudukkoa, pellettejä ja aloituspaikkoja.
 Päivitetty power-pellettejä, ghost_home_tile ja wrap-tunneli varten.
 """
-import pygame
-from typing import List, Tuple, Optional, Set
+from typing import Callable, Dict, List, Tuple, Optional, Set, TYPE_CHECKING
 import os
 from constants import (
     TILE, SCALE, WALL_CHAR, PELLET_CHAR, POWER_PELLET_CHAR,
@@ -14,6 +13,9 @@ from constants import (
 )
 from utils import tile_to_pixels, tile_center_pixels, scale_for_rendering
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class Level:
     """Tason tiedot ja toiminnallisuus."""
@@ -33,8 +35,34 @@ class Level:
         self.player_spawn: Tuple[int, int] = (0, 0)
         self.ghost_spawns: List[Tuple[int, int]] = []
         
+        # Piirtokerrokset skaalan mukaan: [seinät, seinät + pelletit, piirretyt pelletit, piirretyt power-pelletit]
+        self._layers: Dict[int, list] = {}
+        
+        # Kutsutaan (x, y, tyyppi) kun pelletti syödään (ks. zobrist.py)
+        self.pellet_listener: Optional[Callable[[int, int, str], None]] = None
+        
         self._load_level(level_file)
     
+    def copy(self) -> "Level":
+        """
+        Palauttaa tasosta kopion ilman tiedoston uudelleenlukua.
+        Ruudukko ja pellettijoukot kopioidaan, joten kopion muokkaus ei vaikuta alkuperäiseen.
+        
+        Returns:
+            Uusi Level-olio
+        """
+        clone = Level.__new__(Level)
+        clone.grid = [row[:] for row in self.grid]
+        clone.width = self.width
+        clone.height = self.height
+        clone.pellets = set(self.pellets)
+        clone.power_pellets = set(self.power_pellets)
+        clone.player_spawn = self.player_spawn
+        clone.ghost_spawns = list(self.ghost_spawns)
+        clone._layers = {}
+        clone.pellet_listener = None
+        return clone
+    
     def _load_level(self, level_file: str) -> None:
         """
         Lataa tason tiedostosta.
@@ -151,14 +179,17 @@ class Level:
         if pos in self.pellets:
             self.pellets.remove(pos)
             self.grid[tile_y][tile_x] = EMPTY_CHAR
-            return (PELLET_POINTS, "pellet")
-        
-        if pos in self.power_pellets:
+            eaten = (PELLET_POINTS, "pellet")
+        elif pos in self.power_pellets:
             self.power_pellets.remove(pos)
             self.grid[tile_y][tile_x] = EMPTY_CHAR
-            return (POWER_PELLET_POINTS, "power")
+            eaten = (POWER_PELLET_POINTS, "power")
+        else:
+            return (0, "")
         
-        return (0, "")
+        if self.pellet_listener is not None:
+            self.pellet_listener(tile_x, tile_y, eaten[1])
+        return eaten
     
     def pellets_left(self) -> int:
         """
@@ -226,65 +257,120 @@ class Level:
         """
         return tile_to_pixels(tile_x, tile_y)
     
-    def draw_walls(self, surface: pygame.Surface) -> None:
+    def draw_walls(self, surface: "pygame.Surface", scale: int = SCALE) -> None:
         """
         Piirtää tason seinät.
         
         Args:
             surface: Pinta jolle piirretään
+            scale: Renderöinnin skaalauskerroin (1 = looginen resoluutio)
         """
+        import pygame
+        
         for y in range(self.height):
             for x in range(self.width):
                 if self.grid[y][x] == WALL_CHAR:
                     # Laske piirtopositio
                     pixel_x, pixel_y = tile_to_pixels(x, y)
-                    render_x, render_y = scale_for_rendering(pixel_x, pixel_y)
+                    render_x, render_y = scale_for_rendering(pixel_x, pixel_y, scale)
                     
                     # Piirrä seinä
                     wall_rect = pygame.Rect(
                         render_x, render_y,
-                        TILE * SCALE, TILE * SCALE
+                        TILE * scale, TILE * scale
                     )
                     pygame.draw.rect(surface, WALL_COLOR, wall_rect)
     
-    def draw_pellets(self, surface: pygame.Surface) -> None:
+    def draw_pellets(self, surface: "pygame.Surface", scale: int = SCALE) -> None:
         """
         Piirtää tason pelletit.
         
         Args:
             surface: Pinta jolle piirretään
+            scale: Renderöinnin skaalauskerroin (1 = looginen resoluutio)
         """
+        import pygame
+        
         # Piirrä tavalliset pelletit
         for x, y in self.pellets:
             center_x, center_y = tile_center_pixels(x, y)
-            render_x, render_y = scale_for_rendering(center_x, center_y)
+            render_x, render_y = scale_for_rendering(center_x, center_y, scale)
             
             pygame.draw.circle(
                 surface, PELLET_COLOR, 
                 (render_x, render_y), 
-                PELLET_SIZE * SCALE
+                PELLET_SIZE * scale
             )
         
         # Piirrä power-pelletit
         for x, y in self.power_pellets:
             center_x, center_y = tile_center_pixels(x, y)
-            render_x, render_y = scale_for_rendering(center_x, center_y)
+            render_x, render_y = scale_for_rendering(center_x, center_y, scale)
             
             pygame.draw.circle(
                 surface, POWER_PELLET_COLOR,
                 (render_x, render_y),
-                POWER_PELLET_SIZE * SCALE
+                POWER_PELLET_SIZE * scale
             )
     
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: "pygame.Surface", scale: int = SCALE) -> None:
         """
-        Piirtää koko tason.
+        Piirtää koko tason välimuistitetusta kerroksesta.
+        Seinät piirretään kerroksiin kerran; pelletit päivitetään vain muuttuneilta ruuduilta,
+        joten suurenkin tason piirto on yksi blit-kutsu.
         
         Args:
             surface: Pinta jolle piirretään
+            scale: Renderöinnin skaalauskerroin (1 = looginen resoluutio)
+        """
+        surface.blit(self._layer(scale), (0, 0))
+    
+    def _layer(self, scale: int) -> "pygame.Surface":
         """
-        self.draw_walls(surface)
-        self.draw_pellets(surface)
+        Palauttaa skaalan seinä- ja pellettikerroksen ajan tasalla.
+        
+        Args:
+            scale: Renderöinnin skaalauskerroin
+            
+        Returns:
+            Kerros (tason kokoinen, musta tausta)
+        """
+        import pygame
+        
+        layer = self._layers.get(scale)
+        if layer is None:
+            size = (self.width * TILE * scale, self.height * TILE * scale)
+            walls = pygame.Surface(size)
+            self.draw_walls(walls, scale)
+            full = walls.copy()
+            self.draw_pellets(full, scale)
+            self._layers[scale] = [walls, full, set(self.pellets), set(self.power_pellets)]
+            return full
+        
+        walls, full, drawn_pellets, drawn_power = layer
+        if drawn_pellets == self.pellets and drawn_power == self.power_pellets:
+            return full
+        
+        # Pyyhi poistuneet pelletit palauttamalla seinäkerros niiden kohdalta
+        removed = (drawn_pellets - self.pellets) | (drawn_power - self.power_pellets)
+        radius = POWER_PELLET_SIZE * scale
+        for x, y in removed:
+            center_x, center_y = scale_for_rendering(*tile_center_pixels(x, y), scale)
+            area = pygame.Rect(center_x - radius, center_y - radius, 2 * radius + 1, 2 * radius + 1)
+            full.blit(walls, area, area)
+        
+        # Piirrä lisätyt pelletit sekä pyyhittyjen naapurit (kehä voi ulottua naapuriruutuun)
+        touched = {(x + dx, y + dy) for x, y in removed for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        for tiles, drawn, size, color in ((self.pellets, drawn_pellets, PELLET_SIZE, PELLET_COLOR),
+                                          (self.power_pellets, drawn_power, POWER_PELLET_SIZE,
+                                           POWER_PELLET_COLOR)):
+            for x, y in (tiles & touched) | (tiles - drawn):
+                center = scale_for_rendering(*tile_center_pixels(x, y), scale)
+                pygame.draw.circle(full, color, center, size * scale)
+        
+        layer[2] = set(self.pellets)
+        layer[3] = set(self.power_pellets)
+        return full
     
     def set_active_ghosts(self, num_ghosts: int) -> None:
         """
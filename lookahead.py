@@ -0,0 +1,247 @@
+"""
+Ennakoiva pelaajabotti: Monte Carlo -haku simulaation tilannekuvien päällä.
+Jokaisen risteyksen suunta valitaan ajamalla aikabudjetin puitteissa jatkoja
+(snapshot -> step -> restore) ja valitsemalla paras keskiarvo. Haamujen satunnaislähde
+arvotaan jokaiselle kierrokselle uudelleen, joten keskiarvo on odotusarvo haamujen valinnoista
+(expectimax otoksina), ja jatkot pelataan pohjapolitiikalla (rollout-algoritmi).
+"""
+import random
+import time
+from collections import deque
+from typing import List, Optional, Tuple, TYPE_CHECKING
+
+from constants import (
+    ALL_DIRECTIONS, ALL_DIRECTION_CODES, DIRECTION_CODES, DIRECTION_DX, DIRECTION_DY, DIRECTION_VECTORS,
+    SIM_TICK_RATE, TILE_FP
+)
+from controllers import AutopilotController, PlayerController
+from event_sim import EventDrivenRunner
+from sim import SimEventType
+from utils import next_center
+
+if TYPE_CHECKING:
+    from level import Level
+    from sim import Simulation
+
+
+# Pelletin etsintäraja lehtiarviossa (ruutuina)
+_PELLET_SEARCH_LIMIT: int = 40
+
+
+class LookaheadController(PlayerController):
+    """
+    Valitsee suunnan seuraavaan keskipisteeseen jatkojen keskiarvolla.
+    Jokainen kierros arpoo haamujen satunnaislähteelle siemenen ja pelaa jokaisen ehdokassuunnan
+    samalla siemenellä (yhteiset satunnaisluvut pienentävät vertailun kohinaa): tila palautetaan
+    juuren tilannekuvaan, ehdokassuunta pakotetaan päätöskeskipisteessä ja loput pelataan
+    pohjapolitiikalla (oletuksena autopilotti) horisontin loppuun tai ensimmäiseen kuolemaan.
+    Hiljaiset tikit ohitetaan EventDrivenRunnerilla, joten jatko maksaa lähinnä tapahtumatikit.
+    Arvo on pistemuutos, miinus kuolema (sitä kalliimpi mitä aiemmin) tai loppuetäisyys pellettiin.
+    Tasapelissä valitaan pohjapolitiikan oma suunta, joten haku vain parantaa sen päätöksiä.
+    Ennen jokaista jatkoa tarkistetaan, mahtuuko keskimääräinen jatko vielä aikabudjettiin, joten
+    budjetti ylittyy vain kun jatko on tavallista pidempi; kiinteällä jatkojen määrällä (rollouts) päätökset eivät riipu koneen nopeudesta
+    ja sama siemen antaa aina saman pelin.
+    """
+
+    def __init__(self, budget_ms: float = 10.0, horizon: int = 2 * SIM_TICK_RATE,
+                 death_penalty: float = 1000.0, seed: int = 0, base: Optional[PlayerController] = None,
+                 rollouts: Optional[int] = None):
+        """
+        Alustaa botin.
+
+        Args:
+            budget_ms: Hakuaika per päätös millisekunteina
+            horizon: Jatkon pituus tikkeinä
+            death_penalty: Kuoleman hinta pisteinä (horisontin lopussa; heti kuoleminen maksaa kaksinkertaisesti)
+            seed: Haun satunnaislähteen siemen (haamujen siemenet arvotaan tästä)
+            base: Jatkojen pohjapolitiikka (oletuksena AutopilotController)
+            rollouts: Jatkojen määrä per päätös aikabudjetin sijaan (toistettava), tai None
+        """
+        self.budget = budget_ms / 1000.0
+        self.fixed_rollouts = rollouts
+        self.horizon = horizon
+        self.death_penalty = death_penalty
+        self._rng = random.Random(seed)
+        self.base = base if base is not None else AutopilotController()
+        self.reset()
+
+        # Tilastot kaikista peleistä (summary)
+        self.decisions: int = 0
+        self.rollouts: int = 0
+        self.nodes: int = 0
+        self.full_steps: int = 0
+        self.search_time: float = 0.0
+        self.rollout_time: float = 0.0
+        self.max_decision_time: float = 0.0
+        self.overruns: int = 0
+
+    def reset(self) -> None:
+        """Unohtaa edellisen päätöksen."""
+        self._decision_key: Optional[Tuple] = None
+        self._decision: Optional[Tuple[int, int]] = None
+
+    def next_direction(self, sim: "Simulation") -> Optional[Tuple[int, int]]:
+        """Palauttaa haetun suunnan seuraavaan keskipisteeseen (haku kerran per keskipiste)."""
+        level = sim.level
+        player = sim.player
+        if level is None or player is None or sim.game_over or sim.game_complete:
+            return None
+
+        tile_x, tile_y, _ = next_center(player.fx, player.fy, player.current_direction, level)
+        decision_key = (tile_x, tile_y, player.current_direction, sim.current_level, sim.lives,
+                        level.pellets_left())
+        if decision_key != self._decision_key:
+            self._decision_key = decision_key
+            self._decision = self._search(sim, tile_x, tile_y)
+        return self._decision
+
+    def _search(self, sim: "Simulation", tile_x: int, tile_y: int) -> Optional[Tuple[int, int]]:
+        """
+        Ajaa jatkoja kunnes budjetti (tai kiinteä määrä) täyttyy ja palauttaa parhaan keskiarvon suunnan.
+        Simulaatio palautetaan lopuksi täsmälleen lähtötilaan.
+
+        Args:
+            sim: Simulaatio (muutetaan haun ajaksi)
+            tile_x: Päätöksen keskipiste x
+            tile_y: Päätöksen keskipiste y
+
+        Returns:
+            Suunta (dx, dy), tai None jos keskipisteestä ei pääse mihinkään
+        """
+        actions = _open_directions(sim.level, tile_x, tile_y)
+        if len(actions) <= 1:
+            return DIRECTION_VECTORS[actions[0]] if actions else None
+
+        # Pohjapolitiikan oma valinta arvioidaan ensin ja ratkaisee tasapelit
+        suggested = self.base.next_direction(sim)
+        preferred = DIRECTION_CODES.get(suggested) if suggested is not None else None
+        if preferred in actions:
+            actions.remove(preferred)
+            actions.insert(0, preferred)
+
+        start = time.perf_counter()
+        deadline = start + self.budget
+        limit = self.fixed_rollouts
+        root = sim.snapshot()
+        root_score = sim.score
+        root_lives = sim.lives
+
+        # Ajoittaja, profiloija ja latausviestit eivät kuulu tilannekuvaan: irrota haun ajaksi
+        detached = (sim.profiler, sim.ai_scheduler, sim.verbose)
+        sim.profiler, sim.ai_scheduler, sim.verbose = None, None, False
+        totals = [0.0] * len(actions)
+        counts = [0] * len(actions)
+        done = 0
+        seed = 0
+        # Jatkon keston arvio kaikista aiemmista jatkoista
+        estimate = self.rollout_time / self.rollouts if self.rollouts else 0.0
+        try:
+            # Kierros: sama haamusiemen kaikille suunnille; budjetti tarkistetaan ennen jokaista jatkoa
+            while True:
+                index = done % len(actions)
+                if limit is not None:
+                    if done >= limit:
+                        break
+                elif done and time.perf_counter() + estimate > deadline:
+                    break
+                if index == 0:
+                    seed = self._rng.getrandbits(64)
+                if done:
+                    sim.restore(root)
+                sim.rng.seed(seed)
+                rollout_start = time.perf_counter()
+                totals[index] += self._rollout(sim, actions[index], (tile_x, tile_y), root_score, root_lives)
+                self.rollout_time += time.perf_counter() - rollout_start
+                counts[index] += 1
+                done += 1
+                self.rollouts += 1
+        finally:
+            sim.restore(root)
+            sim.profiler, sim.ai_scheduler, sim.verbose = detached
+
+        elapsed = time.perf_counter() - start
+        self.decisions += 1
+        self.search_time += elapsed
+        self.max_decision_time = max(self.max_decision_time, elapsed)
+        if limit is None and elapsed > self.budget:
+            self.overruns += 1
+
+        # Arvioimattomat suunnat eivät ole ehdokkaita; järjestys suosii pohjapolitiikkaa tasapelissä
+        best = max((i for i in range(len(actions)) if counts[i]),
+                   key=lambda i: (totals[i] / counts[i], actions[i] == preferred))
+        return DIRECTION_VECTORS[actions[best]]
+
+    def _rollout(self, sim: "Simulation", action: int, decision_tile: Tuple[int, int],
+                 root_score: int, root_lives: int) -> float:
+        """
+        Pelaa yhden jatkon: ehdokassuunta päätöskeskipisteessä, sen jälkeen pohjapolitiikka.
+
+        Returns:
+            Jatkon arvo pisteinä
+        """
+        base = self.base
+        forced = [True]
+
+        def policy(state: "Simulation") -> Optional[Tuple[int, int]]:
+            # Kutsutaan tapahtumatikeillä (keskipisteeseen saapuminen on aina sellainen)
+            if forced[0]:
+                player = state.player
+                center_x, center_y, _ = next_center(player.fx, player.fy, player.current_direction, state.level)
+                if (center_x, center_y) == decision_tile:
+                    return DIRECTION_VECTORS[action]
+                forced[0] = False
+            return base.next_direction(state)
+
+        runner = EventDrivenRunner(sim)
+        runner.run(policy, self.horizon, stop_on=SimEventType.PLAYER_DIED)
+        self.nodes += runner.ticks
+        self.full_steps += runner.events
+
+        value = sim.score - root_score
+        if sim.lives < root_lives:
+            return value - self.death_penalty * (2.0 - runner.ticks / self.horizon)
+        player = sim.player
+        return value - _pellet_distance(sim.level, player.fx // TILE_FP, player.fy // TILE_FP)
+
+    def summary(self) -> str:
+        """Palauttaa tilastot yhtenä rivinä."""
+        decisions = max(self.decisions, 1)
+        seconds = max(self.search_time, 1e-9)
+        if self.fixed_rollouts is None:
+            limit = (f"budget {self.budget * 1000:.2f} ms, {self.overruns} over budget, "
+                     f"max {self.max_decision_time * 1000:.2f} ms")
+        else:
+            limit = f"{self.fixed_rollouts} rollouts, max {self.max_decision_time * 1000:.2f} ms"
+        return (f"Lookahead: {self.decisions} decisions, {self.rollouts / decisions:.1f} rollouts/decision, "
+                f"{self.rollouts / seconds:,.0f} rollouts/s, {self.nodes / seconds:,.0f} nodes/s "
+                f"({self.full_steps / seconds:,.0f} full steps/s), "
+                f"{self.search_time / decisions * 1000:.2f} ms/decision ({limit})")
+
+
+def _open_directions(level: "Level", tile_x: int, tile_y: int) -> List[int]:
+    """Suuntakoodit joihin keskipisteestä pääsee (kuten Player.update)."""
+    return [code for code in ALL_DIRECTION_CODES
+            if level.is_valid_position(tile_x + DIRECTION_DX[code], tile_y + DIRECTION_DY[code])]
+
+
+def _pellet_distance(level: "Level", tile_x: int, tile_y: int) -> int:
+    """BFS-etäisyys lähimpään pellettiin ruutuina (enintään _PELLET_SEARCH_LIMIT)."""
+    targets = level.pellets
+    power = level.power_pellets
+    if (tile_x, tile_y) in targets or (tile_x, tile_y) in power:
+        return 0
+    visited = {(tile_x, tile_y)}
+    queue = deque([(tile_x, tile_y, 0)])
+    while queue:
+        x, y, distance = queue.popleft()
+        if distance >= _PELLET_SEARCH_LIMIT:
+            break
+        for dx, dy in ALL_DIRECTIONS:
+            tile = (x + dx, y + dy)
+            if tile in visited or not level.is_valid_position(*tile):
+                continue
+            if tile in targets or tile in power:
+                return distance + 1
+            visited.add(tile)
+            queue.append((tile[0], tile[1], distance + 1))
+    return _PELLET_SEARCH_LIMIT
@@ -2,53 +2,180 @@
 Maze Chomp - Pac-Man-tyylinen peli Pygame:lla.
 Pääsilmukka ja pelin alustus.
 """
-import pygame
+import argparse
 import sys
 import os
-from typing import Optional
+import time
+from typing import Optional, List, Tuple
 
 # Lisää projektin juurihakemisto polkuun
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from constants import WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BLACK
+
+def _configure_headless_drivers() -> None:
+    """
+    Asettaa SDL:n dummy-ajurit ennen pygamen alustusta.
+    Näin peli toimii koneilla joilla ei ole näyttöä eikä äänilaitetta.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+# Headless-tila pitää valita ennen kuin pygame importataan
+if '--headless' in sys.argv:
+    _configure_headless_drivers()
+
+import pygame
+
+from constants import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BLACK, SIM_TICK_RATE, MAX_SIM_STEPS_PER_FRAME,
+    LOGICAL_RENDER, FAST_FORWARD_RENDER_EVERY, AI_BUDGET_MS, MAX_LEVEL, SOAK_GAME_SECONDS
+)
 from game_state import GameStateManager
+from profiler import FrameProfiler
+from replay import Replay, ReplayPlayer, ReplayRecorder
+from rng import new_seed
+from controllers import AutopilotController
+from sim import DEFAULT_LEVEL_FILE
+from swarm import SwarmConfig
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 
 class Game:
     """Pelin pääluokka."""
     
-    def __init__(self):
-        """Alustaa pelin."""
-        # Alusta Pygame
-        pygame.init()
+    def __init__(self, headless: bool = False, render_every: int = 0, max_frames: int = 0,
+                 tick_rate: int = SIM_TICK_RATE, max_steps_per_frame: int = MAX_SIM_STEPS_PER_FRAME,
+                 window_size: Tuple[int, int] = (WINDOW_WIDTH, WINDOW_HEIGHT),
+                 logical_render: bool = LOGICAL_RENDER, profile: bool = False,
+                 record_path: Optional[str] = None, seed: Optional[int] = None,
+                 replay: Optional[Replay] = None, seek: float = 0.0, fast_forward: bool = False,
+                 autopilot: bool = False, soak_report: int = 0, swarm: int = 0,
+                 level_file: str = DEFAULT_LEVEL_FILE, ai_budget_ms: float = AI_BUDGET_MS,
+                 soak_game_seconds: float = SOAK_GAME_SECONDS):
+        """
+        Alustaa pelin.
+        
+        Args:
+            headless: True = ei ikkunaa eikä ääntä, simulaatio täydellä nopeudella
+            render_every: Headless-tilassa renderöi joka N:s frame offscreen-pinnalle (0 = ei koskaan)
+            max_frames: Lopeta näin monen framen jälkeen (0 = ei rajaa)
+            tick_rate: Kiinteän simulaatioaskeleen taajuus (tikkiä sekunnissa)
+            max_steps_per_frame: Simulaatioaskeleiden maksimimäärä yhtä framea kohden
+            window_size: Ikkunan koko pikseleinä (leveys, korkeus)
+            logical_render: True = piirrä loogisella resoluutiolla ja skaalaa kerran ikkunan kokoon
+            profile: True = alijärjestelmien ajastimet ja overlay päälle heti (F3 kytkee)
+            record_path: Tallenna ensimmäisen pelin syötteet tähän tiedostoon
+            seed: Simulaation siemen tallennusta varten (None = satunnainen)
+            replay: Toistettava tallenne (ohittaa valikon ja käyttää tallenteen tikkitaajuutta)
+            seek: Hyppää toistossa tähän kohtaan (sekunteina)
+            fast_forward: True = toista ilman odotusta, renderöi vain joka N:s frame
+            autopilot: True = botti pelaa ja uusi peli alkaa automaattisesti (soak-ajot)
+            soak_report: Tulosta framejen kesto- ja muistitilasto joka N:s frame (0 = ei)
+            swarm: Parvitilan haamujen määrä (0 = tavalliset haamut)
+            level_file: Tason tiedoston polku
+            ai_budget_ms: Haamujen suunnanvalintojen budjetti askelta kohden (0 = ei ajoittajaa)
+            soak_game_seconds: Autopilotilla uusi peli seuraavalta tasolta näin monen pelisekunnin jälkeen
+        """
+        self.headless = headless
+        self.fast_forward = fast_forward
+        self.render_every = render_every or (FAST_FORWARD_RENDER_EVERY if fast_forward else 0)
+        self.max_frames = max_frames
+        self.frame_count: int = 0
+        self.autopilot = autopilot
+        self.soak_report = soak_report
+        self._report_start: float = time.perf_counter()
+        self._report_worst: float = 0.0
         
-        # macOS-yhteensopivuus
-        import os
-        os.environ['SDL_VIDEO_WINDOW_POS'] = '100,100'
+        if replay is not None:
+            tick_rate = replay.tick_rate
         
-        # Luo ikkuna
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Maze Chomp")
+        # Kiinteä aika-askel ja akkumulaattori
+        self.sim_dt: float = 1.0 / tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator: float = 0.0
         
-        # Varmista että ikkuna tulee näkyviin
-        pygame.display.flip()
+        if self.headless:
+            _configure_headless_drivers()
+        
+        # Alusta Pygame
+        pygame.init()
+        
+        if self.headless:
+            # Offscreen-pinta, ei display-ikkunaa
+            self.screen = pygame.Surface(window_size)
+        else:
+            # macOS-yhteensopivuus
+            os.environ['SDL_VIDEO_WINDOW_POS'] = '100,100'
+            
+            # Luo ikkuna
+            self.screen = pygame.display.set_mode(window_size)
+            pygame.display.set_caption("Maze Chomp")
+            
+            # Varmista että ikkuna tulee näkyviin
+            pygame.display.flip()
         
         # Kello FPS:n hallintaan
         self.clock = pygame.time.Clock()
         
+        # Alijärjestelmien profiloija
+        self.profiler = FrameProfiler(enabled=profile)
+        
+        # Tallennus ja toisto
+        self.record_path = record_path
+        self.recorder: Optional[ReplayRecorder] = None
+        if record_path:
+            if seed is None:
+                seed = new_seed()
+            self.recorder = ReplayRecorder(seed, tick_rate=tick_rate)
+            print(f"Recording to {record_path} (seed {seed})")
+        self.replay_player: Optional[ReplayPlayer] = None
+        if replay is not None:
+            self.replay_player = ReplayPlayer(replay, verbose=True)
+        
         # Tilamanageri
-        self.state_manager = GameStateManager()
+        self.state_manager = GameStateManager(audio_enabled=not self.headless,
+                                              logical_render=logical_render,
+                                              profiler=self.profiler,
+                                              recorder=self.recorder,
+                                              replay=self.replay_player,
+                                              controller=AutopilotController() if autopilot else None,
+                                              auto_restart=autopilot,
+                                              swarm=SwarmConfig(count=swarm) if swarm > 0 else None,
+                                              level_file=level_file,
+                                              ai_budget_ms=ai_budget_ms,
+                                              soak_game_seconds=soak_game_seconds if autopilot else 0.0)
         
         # Pelin tila
         self.running = True
         
+        if self.replay_player is not None:
+            # Toisto alkaa suoraan pelistä
+            self.state_manager.start_game()
+            if seek > 0:
+                self.replay_player.seek(int(seek * tick_rate))
+            print(f"Replaying {replay.ticks / tick_rate:.1f}s recording from {seek:.1f}s")
+        
+        if self.headless or self.autopilot:
+            # Kukaan ei paina ENTERiä - aloita peli suoraan
+            if self.replay_player is None:
+                self.state_manager.start_game()
+            if self.headless:
+                print("Maze Chomp started in headless mode")
+                return
+        
         print("Maze Chomp started!")
         print("Controls:")
         print("- Arrow keys or WASD: Move")
         print("- SPACE: Pause")
         print("- ESC: Back to menu/exit")
         print("- ENTER: Select/continue")
-        print(f"Window size: {WINDOW_WIDTH}x{WINDOW_HEIGHT}")
+        print("- F3: Toggle frame-time profiler")
+        print(f"Window size: {window_size[0]}x{window_size[1]}")
         print("Game ready, press ENTER to start!")
     
     def handle_events(self) -> None:
@@ -56,6 +183,8 @@ class Game:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle()
             else:
                 # Anna tilamanagerin käsitellä tapahtumat
                 self.state_manager.handle_event(event)
@@ -69,28 +198,86 @@ class Game:
         """
         self.state_manager.update(dt)
     
-    def render(self) -> None:
-        """Renderöi pelin."""
+    def render(self, alpha: float = 1.0) -> None:
+        """
+        Renderöi pelin.
+        
+        Args:
+            alpha: Interpolaatiokerroin edellisen ja nykyisen simulaatioaskeleen välillä
+        """
+        if self.headless or self.fast_forward:
+            # Headless/pikakelaus: renderöi vain joka N:s frame
+            if self.render_every <= 0 or self.frame_count % self.render_every != 0:
+                return
+        
         # Tyhjennä ruutu
         self.screen.fill(BLACK)
         
         # Anna tilamanagerin renderöidä
-        self.state_manager.render(self.screen)
+        self.state_manager.render(self.screen, alpha)
+        
+        # Profilointi-overlay kaiken muun päälle
+        self.profiler.draw_overlay(self.screen)
         
         # Päivitä näyttö
-        pygame.display.flip()
+        if not self.headless:
+            with self.profiler.section("present"):
+                pygame.display.flip()
+    
+    def step_simulation(self, frame_time: float) -> float:
+        """
+        Ajaa kiinteän aika-askeleen simulaatiota kertyneen ajan verran.
+        
+        Args:
+            frame_time: Edellisestä framesta kulunut aika sekunteina
+            
+        Returns:
+            Interpolaatiokerroin renderöintiä varten (0.0-1.0)
+        """
+        self.accumulator += frame_time
+        
+        steps = 0
+        while self.accumulator >= self.sim_dt and steps < self.max_steps_per_frame:
+            self.update(self.sim_dt)
+            self.accumulator -= self.sim_dt
+            steps += 1
+        
+        # Kiinniottoraja ylittyi (esim. pitkä nykäys) - pudota ylimääräinen aika
+        if self.accumulator >= self.sim_dt:
+            self.accumulator = self.accumulator % self.sim_dt
+        
+        return self.accumulator / self.sim_dt
     
     def run(self) -> None:
         """Pelin pääsilmukka."""
         try:
             while self.running:
-                # Laske delta-aika
-                dt = self.clock.tick(FPS) / 1000.0  # Muunna millisekunneista sekunneiksi
-                
-                # Pelin päivittäminen
+                frame_start = time.perf_counter()
                 self.handle_events()
-                self.update(dt)
-                self.render()
+                
+                if self.fast_forward and self.replay_player is not None and self.replay_player.finished:
+                    # Tallenne loppui - jatka reaaliajassa
+                    self.fast_forward = False
+                    print("Replay finished")
+                
+                if self.headless or self.fast_forward:
+                    # Ei odotusta eikä interpolaatiota - yksi kiinteä askel per kierros
+                    self.update(self.sim_dt)
+                    alpha = 1.0
+                else:
+                    # Laske delta-aika
+                    frame_time = self.clock.tick(FPS) / 1000.0  # Muunna millisekunneista sekunneiksi
+                    alpha = self.step_simulation(frame_time)
+                
+                self.render(alpha)
+                
+                self.frame_count += 1
+                if self.soak_report:
+                    self._report_worst = max(self._report_worst, time.perf_counter() - frame_start)
+                    if self.frame_count % self.soak_report == 0:
+                        self._print_soak_report()
+                if self.max_frames and self.frame_count >= self.max_frames:
+                    self.running = False
                 
         except KeyboardInterrupt:
             print("\nPeli keskeytetty käyttäjän toimesta")
@@ -101,27 +288,155 @@ class Game:
         finally:
             self.quit()
     
+    def _print_soak_report(self) -> None:
+        """Tulostaa framejen keskimääräisen ja pisimmän keston sekä muistin käytön (drift näkyy riveistä)."""
+        now = time.perf_counter()
+        mean_ms = (now - self._report_start) / self.soak_report * 1000.0
+        memory = ""
+        if resource is not None:
+            # ru_maxrss: kilotavuja Linuxissa, tavuja macOS:ssä
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+            memory = f", peak RSS {peak_mb:.1f} MB"
+        play_state = self.state_manager.play_state
+        level = play_state.current_level if play_state else 0
+        reached = ",".join(str(number) for number in sorted(self.state_manager.levels_reached))
+        print(f"Frame {self.frame_count}: mean {mean_ms:.3f} ms, worst {self._report_worst * 1000.0:.3f} ms, "
+              f"game {self.state_manager.games_started}, level {level} (reached {reached}){memory}")
+        if play_state is not None and play_state.ai_scheduler is not None:
+            print(f"  {play_state.ai_scheduler.summary()}")
+        self._report_start = now
+        self._report_worst = 0.0
+    
+    def _check_soak_coverage(self) -> bool:
+        """Tulostaa soak-ajon yhteenvedon ja tarkistaa että jokainen taso pelattiin."""
+        reached = self.state_manager.levels_reached
+        missing = [number for number in range(1, MAX_LEVEL + 1) if number not in reached]
+        print(f"Soak summary: {self.frame_count} frames, {self.state_manager.games_started} games, "
+              f"levels reached {','.join(str(number) for number in sorted(reached)) or '-'}")
+        if missing:
+            print(f"Soak check FAILED: levels never reached: {', '.join(map(str, missing))} "
+                  f"(run longer or lower --soak-game-seconds)")
+            return False
+        return True
+    
     def quit(self) -> None:
         """Lopettaa pelin ja vapauttaa resurssit."""
+        status = 0
+        if self.recorder is not None and self.record_path:
+            self.recorder.save(self.record_path)
+            print(f"Saved {self.recorder.ticks}-tick replay to {self.record_path}")
+        if self.autopilot and self.soak_report and not self._check_soak_coverage():
+            status = 1
         print("Closing Maze Chomp...")
         pygame.quit()
-        sys.exit()
+        sys.exit(status)
+
+
+def _parse_window_size(value: str) -> Tuple[int, int]:
+    """
+    Lukee ikkunan koon muodossa LEVEYSxKORKEUS.
+    
+    Args:
+        value: Esim. "1056x904"
+        
+    Returns:
+        Koko (leveys, korkeus)
+    """
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid window size: {value!r} (expected WxH)")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"invalid window size: {value!r}")
+    return (width, height)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Lukee komentoriviparametrit.
+    
+    Args:
+        argv: Parametrit (oletuksena sys.argv)
+        
+    Returns:
+        Parametrit
+    """
+    parser = argparse.ArgumentParser(description="Maze Chomp")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without a window or audio (SDL dummy drivers)")
+    parser.add_argument("--render-every", type=int, default=0, metavar="N",
+                        help="In headless mode, render every Nth frame offscreen (0 = never)")
+    parser.add_argument("--frames", type=int, default=0, metavar="N",
+                        help="Stop after N frames (0 = run until quit)")
+    parser.add_argument("--tick-rate", type=int, default=SIM_TICK_RATE, metavar="HZ",
+                        help=f"Fixed simulation tick rate (default {SIM_TICK_RATE})")
+    parser.add_argument("--max-catchup", type=int, default=MAX_SIM_STEPS_PER_FRAME, metavar="N",
+                        help=f"Max simulation steps per frame (default {MAX_SIM_STEPS_PER_FRAME})")
+    parser.add_argument("--profile", action="store_true",
+                        help="Start with the frame-time profiler overlay enabled (toggle with F3)")
+    parser.add_argument("--logical-render", action="store_true", default=LOGICAL_RENDER,
+                        help="Draw the maze at logical tile resolution and scale it once to the window")
+    parser.add_argument("--window-size", type=_parse_window_size,
+                        default=(WINDOW_WIDTH, WINDOW_HEIGHT), metavar="WxH",
+                        help=f"Window size (default {WINDOW_WIDTH}x{WINDOW_HEIGHT})")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Record the first game's inputs to a replay file")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Simulation seed for recording (default: random)")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="Play back a recorded replay file")
+    parser.add_argument("--seek", type=float, default=0.0, metavar="SECONDS",
+                        help="Start the replay from this point")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="Play the replay as fast as possible, rendering only every Nth frame")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="Let the built-in bot play and restart games automatically (soak testing)")
+    parser.add_argument("--soak-report", type=int, default=0, metavar="N",
+                        help="Print frame-time and memory stats every N frames (0 = off); with --autopilot, "
+                             "fail at exit unless every level was played")
+    parser.add_argument("--soak-game-seconds", type=float, default=SOAK_GAME_SECONDS, metavar="SECONDS",
+                        help="With --autopilot, start the next game on the next level after this much "
+                             "game time (0 = play games out; games cycle through the levels either way)")
+    parser.add_argument("--swarm", type=int, default=0, metavar="N",
+                        help="Replace the ghosts with a swarm of N ghosts on shared flow fields")
+    parser.add_argument("--level-file", default=None, metavar="FILE",
+                        help="Play this level file instead of level1/level1.txt")
+    parser.add_argument("--ai-budget", type=float, default=AI_BUDGET_MS, metavar="MS",
+                        help="Per-tick time budget for ghost decisions; deferred ghosts keep their "
+                             "last-known direction (0 = off, keeps games deterministic)")
+    args = parser.parse_args(argv)
+    if args.ai_budget > 0 and args.swarm > 0:
+        # Parvitila päivittää haamut omilla systeemeillään ilman ajoittajaa
+        parser.error("--ai-budget cannot be combined with --swarm")
+    return args
 
 
 def main() -> None:
     """Pelin käynnistysfunktio."""
+    args = parse_args()
     try:
         # Tarkista että level1-hakemisto löytyy
         level1_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "level1")
-        level_file = os.path.join(level1_dir, "level1.txt")
+        level_file = args.level_file or os.path.join(level1_dir, "level1.txt")
         
         if not os.path.exists(level_file):
             print(f"Error: Level file not found: {level_file}")
             print("Make sure level1/level1.txt file exists")
             return
         
+        replay = Replay.load(args.replay) if args.replay else None
+        
         # Luo ja käynnistä peli
-        game = Game()
+        game = Game(headless=args.headless, render_every=args.render_every,
+                    max_frames=args.frames, tick_rate=args.tick_rate,
+                    max_steps_per_frame=args.max_catchup,
+                    window_size=args.window_size, logical_render=args.logical_render,
+                    profile=args.profile, record_path=args.record, seed=args.seed,
+                    replay=replay, seek=args.seek, fast_forward=args.fast_forward,
+                    autopilot=args.autopilot, soak_report=args.soak_report,
+                    swarm=args.swarm, level_file=level_file, ai_budget_ms=args.ai_budget,
+                    soak_game_seconds=args.soak_game_seconds)
         game.run()
         
     except Exception as e:
@@ -1,12 +1,15 @@
 """
 Polunetsintäalgoritmit haamujen AI:ta varten.
 BFS-toteutus next_step-funktiolla ja tunnel-wrap-tuki.
+plan_ghost_moves vastaa kaikkiin framen haamukyselyihin yhdellä käänteisellä haulla per kohde.
 """
-from typing import List, Tuple, Optional, Set
+import time
+import weakref
+from typing import Dict, List, NamedTuple, Tuple, Optional, Set
 from collections import deque
 
 from level import Level
-from constants import ALL_DIRECTIONS, TILE
+from constants import ALL_DIRECTIONS
 
 
 def next_step(level: Level, start_tile: Tuple[int, int], goal_tile: Tuple[int, int], 
@@ -58,6 +61,207 @@ def next_step(level: Level, start_tile: Tuple[int, int], goal_tile: Tuple[int, i
     return None
 
 
+class MoveRequest(NamedTuple):
+    """Yhden haamun reittikysely (next_step-funktion argumentit)."""
+    start: Tuple[int, int]
+    goal: Tuple[int, int]
+    forbid_reverse_dir: Optional[Tuple[int, int]] = None
+
+
+class MovePlan(NamedTuple):
+    """plan_ghost_moves-funktion tulos ja framen suunnittelukustannus."""
+    directions: List[Optional[Tuple[int, int]]]  # Vastaukset kyselyjen järjestyksessä
+    searches: int                                 # Käänteisiä hakuja (eri kohde/kielto-pareja)
+    tiles_expanded: int                           # Haussa numeroidut ruudut yhteensä
+    seconds: float                                # Suunnitteluun kulunut aika
+
+
+# Käänteiset siirrot: kohderuutu -> [(läpikuljettava lähtöruutu, suunnan indeksi)]
+IncomingMoves = Dict[Tuple[int, int], List[Tuple[Tuple[int, int], int]]]
+
+
+class _LevelGraph(NamedTuple):
+    """Tason reittiverkon taulut suunnittelua varten."""
+    incoming: IncomingMoves                    # Saapuvat siirrot kohderuuduittain
+    component: Dict[Tuple[int, int], int]      # Läpikuljettava ruutu -> yhtenäisen alueen numero
+
+
+# Tasokohtaiset taulut (seinät eivät muutu tason aikana)
+_GRAPH_CACHE: "weakref.WeakKeyDictionary[Level, _LevelGraph]" = weakref.WeakKeyDictionary()
+
+
+def _level_graph(level: Level) -> _LevelGraph:
+    """
+    Palauttaa tason saapuvat siirrot ja yhtenäiset alueet (lasketaan kerran tasoa kohden).
+    Siirrot lasketaan kuten next_step (tunnel-wrap x-suunnassa), joten kohteena voi olla
+    myös seinä tai ruudukon ylä-/alapuolinen ruutu. Siirrot ovat symmetrisiä, joten
+    alueet ovat samat kumpaankin suuntaan kuljettaessa.
+    
+    Args:
+        level: Taso
+        
+    Returns:
+        _LevelGraph
+    """
+    graph = _GRAPH_CACHE.get(level)
+    if graph is not None:
+        return graph
+    
+    incoming: IncomingMoves = {}
+    neighbors: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for y in range(level.height):
+        for x in range(level.width):
+            if not _is_traversable((x, y), level):
+                continue
+            tile_neighbors = neighbors[(x, y)] = []
+            for code, (dx, dy) in enumerate(ALL_DIRECTIONS):
+                target = _wrap_tunnel_position((x + dx, y + dy), level.width, level.height)
+                incoming.setdefault(target, []).append(((x, y), code))
+                tile_neighbors.append(target)
+    
+    component: Dict[Tuple[int, int], int] = {}
+    for tile in neighbors:
+        if tile in component:
+            continue
+        label = len(component)
+        component[tile] = label
+        queue = deque([tile])
+        while queue:
+            for neighbor in neighbors[queue.popleft()]:
+                if neighbor in neighbors and neighbor not in component:
+                    component[neighbor] = label
+                    queue.append(neighbor)
+    
+    graph = _GRAPH_CACHE[level] = _LevelGraph(incoming, component)
+    return graph
+
+
+def prepare_planning(level: Level) -> None:
+    """
+    Laskee tason reittiverkon taulut etukäteen (esim. tason latauksessa), jotta ensimmäinen
+    plan_ghost_moves-kutsu ei maksa niitä kesken pelin.
+    
+    Args:
+        level: Taso
+    """
+    _level_graph(level)
+
+
+def _plan_group(level: Level, graph: _LevelGraph, goal: Tuple[int, int], forbid_code: int,
+                starts: List[Tuple[int, int]]) -> Tuple[Dict[Tuple[int, int], Optional[Tuple[int, int]]], int]:
+    """
+    Laskee yhteisen kohteen ja kiellon kyselyille seuraavat askeleet käänteisellä BFS:llä.
+    Etäisyys kohteeseen lasketaan samoilla säännöillä kuin next_step: viimeinen siirto
+    kohteeseen on aina sallittu, muut siirrot eivät saa kulkea kiellettyyn suuntaan.
+    Lähtöruutu on valmis heti kun se numeroidaan (edellisen kerroksen etäisyydet ovat jo
+    tiedossa), joten haku lopetetaan kesken kerroksen kun viimeinen lähtöruutu numeroidaan.
+    Kohteen alueen ulkopuoliset lähtöruudut eivät voi saavuttaa kohdetta: ne saavat vastauksen
+    None ilman hakua, jotta ne eivät pakota hakua käymään koko aluetta läpi.
+    
+    Args:
+        level: Taso
+        graph: _level_graph(level)
+        goal: Kohderuutu
+        forbid_code: Kielletyn suunnan indeksi ALL_DIRECTIONS-listassa, -1 = ei kieltoa
+        starts: Läpikuljettavat lähtöruudut (eri kuin kohde)
+        
+    Returns:
+        Tuple (lähtöruutu -> next_step-vastaus, numeroitujen ruutujen määrä)
+    """
+    incoming = graph.incoming
+    component = graph.component
+    answers: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {}
+    
+    # Kohteeseen pääsee vain niiltä alueilta, joilta on siirto kohteeseen
+    goal_components = {component[source] for source, _ in incoming.get(goal, ())}
+    pending = set()
+    for start in starts:
+        if component[start] in goal_components:
+            pending.add(start)
+        else:
+            answers[start] = None
+    
+    distance = {goal: 0}
+    frontier = [goal]
+    layer = 0
+    while frontier and pending:
+        layer += 1
+        next_frontier = []
+        for tile in frontier:
+            for source, code in incoming.get(tile, ()):
+                if source in distance or (layer > 1 and code == forbid_code):
+                    continue
+                distance[source] = layer
+                next_frontier.append(source)
+                if source in pending:
+                    pending.discard(source)
+                    if not pending:
+                        break
+            if not pending:
+                break
+        frontier = next_frontier
+    
+    # Sama valinta kuin next_step: ensimmäinen suunta (U, L, D, R) lyhimmälle polulle
+    for start in starts:
+        if start in answers:
+            continue
+        steps = distance.get(start)
+        answers[start] = None
+        if steps is None:
+            # Saman alueen ruutu jonka ainoat polut kulkevat kiellettyyn suuntaan
+            continue
+        for code, direction in enumerate(ALL_DIRECTIONS):
+            neighbor = _wrap_tunnel_position((start[0] + direction[0], start[1] + direction[1]),
+                                             level.width, level.height)
+            if distance.get(neighbor) == steps - 1 and (neighbor == goal or code != forbid_code):
+                # next_step palauttaa ensimmäisen ruudun erotuksen (tunnelissa käärityn)
+                answers[start] = direction if steps == 1 else (neighbor[0] - start[0], neighbor[1] - start[1])
+                break
+    return answers, len(distance)
+
+
+def plan_ghost_moves(level: Level, requests: List[MoveRequest]) -> MovePlan:
+    """
+    Vastaa kaikkiin framen reittikyselyihin kerralla.
+    Kyselyt ryhmitellään kohteen ja kielletyn suunnan mukaan, ja kukin ryhmä ratkaistaan
+    yhdellä käänteisellä haulla kohteesta, joten samaa kohdetta jahtaavat haamut jakavat
+    laskennan. Haku pysähtyy kun ryhmän viimeinenkin lähtöruutu on saavutettu, ja kohteen
+    yhtenäisen alueen ulkopuoliset lähdöt saavat None ilman hakua (taulut: prepare_planning).
+    Vastaukset ovat samat kuin next_step-funktiolla kysely kerrallaan.
+    
+    Args:
+        level: Taso
+        requests: Framen kyselyt
+        
+    Returns:
+        MovePlan: suunnat kyselyjen järjestyksessä ja suunnittelun kustannus
+    """
+    started = time.perf_counter()
+    graph = _level_graph(level)
+    directions: List[Optional[Tuple[int, int]]] = [None] * len(requests)
+    groups: Dict[Tuple[Tuple[int, int], int], List[int]] = {}
+    
+    for index, (start, goal, forbid) in enumerate(requests):
+        if start == goal:
+            continue
+        if not _is_traversable(start, level):
+            # Seinän sisältä lähtevä haku ei kuulu käänteiseen verkkoon: kysy suoraan
+            directions[index] = next_step(level, start, goal, forbid)
+            continue
+        forbid_code = ALL_DIRECTIONS.index(forbid) if forbid in ALL_DIRECTIONS else -1
+        groups.setdefault((goal, forbid_code), []).append(index)
+    
+    tiles_expanded = 0
+    for (goal, forbid_code), indices in groups.items():
+        starts = list(dict.fromkeys(requests[index].start for index in indices))
+        answers, expanded = _plan_group(level, graph, goal, forbid_code, starts)
+        tiles_expanded += expanded
+        for index in indices:
+            directions[index] = answers[requests[index].start]
+    
+    return MovePlan(directions, len(groups), tiles_expanded, time.perf_counter() - started)
+
+
 def _is_traversable(tile: Tuple[int, int], level: Level) -> bool:
     """
     Tarkistaa onko ruutu läpikuljettava (ei seinä).
@@ -255,4 +459,4 @@ def is_path_clear(start: Tuple[int, int], end: Tuple[int, int],
             if not _is_traversable((start[0], y), level):
                 return False
     
-    return True
\ No newline at end of file
+    return True
@@ -3,22 +3,53 @@ Pelaajan liike ja logiikka.
 Käsittelee syötteet, liikkeen ruudukossa ja törmäykset.
 Päivitetty power-pelletin syöminen ja signaali varten.
 """
-import pygame
-from typing import Tuple, Optional, Callable
+from typing import Tuple, Optional, Callable, TYPE_CHECKING
 from constants import (
-    PLAYER_COLOR, PLAYER_SPEED, TILE, SCALE,
-    DIRECTION_NONE, DIRECTION_UP, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_RIGHT
+    PLAYER_COLOR, PLAYER_SPEED, SCALE,
+    DIRECTION_UP, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_RIGHT,
+    DIR_NONE, DIRECTION_DX, DIRECTION_DY, DIRECTION_VECTORS, DIRECTION_CODES, MOUTH_OFFSETS
 )
 from utils import (
-    pixels_to_tile, tile_center_pixels, is_near_tile_center, 
-    snap_to_tile_center, scale_for_rendering, wrap_position
+    FixedPosition, pixels_to_tile, tile_center_fixed, move_along_grid, step_distance,
+    scale_for_rendering, interpolate_position
 )
 from level import Level
 
+if TYPE_CHECKING:
+    import pygame
 
-class Player:
+
+def direction_from_keys(keys: "pygame.key.ScancodeWrapper") -> Optional[Tuple[int, int]]:
+    """
+    Muuntaa näppäimistön tilan liikkumissuunnaksi.
+    
+    Args:
+        keys: Pygame:n näppäimistön tila
+        
+    Returns:
+        Suunta (dx, dy), tai None jos mitään suuntanäppäintä ei paineta
+    """
+    import pygame
+    
+    if keys[pygame.K_UP] or keys[pygame.K_w]:
+        return DIRECTION_UP
+    elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        return DIRECTION_DOWN
+    elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        return DIRECTION_LEFT
+    elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        return DIRECTION_RIGHT
+    return None
+
+
+class Player(FixedPosition):
     """Pelaajan hahmo ja sen toiminnallisuus."""
     
+    __slots__ = (
+        "fx", "fy", "prev_fx", "prev_fy", "move_remainder", "current_direction", "desired_direction",
+        "speed", "radius", "pellet_callback", "power_pellet_callback"
+    )
+    
     def __init__(self, start_x: int, start_y: int):
         """
         Alustaa pelaajan.
@@ -27,14 +58,21 @@ class Player:
             start_x: Aloitus x-koordinaatti ruutuina
             start_y: Aloitus y-koordinaatti ruutuina
         """
-        # Sijoita pelaaja ruudun keskelle
-        center_x, center_y = tile_center_pixels(start_x, start_y)
-        self.x: float = center_x
-        self.y: float = center_y
+        # Sijoita pelaaja ruudun keskelle (alipikseleinä, ks. FixedPosition)
+        center_x, center_y = tile_center_fixed(start_x, start_y)
+        self.fx: int = center_x
+        self.fy: int = center_y
         
-        # Nykyinen ja haluttu liikkumissuunta
-        self.current_direction: Tuple[int, int] = DIRECTION_NONE
-        self.desired_direction: Tuple[int, int] = DIRECTION_NONE
+        # Edellisen simulaatioaskeleen positio (renderöinnin interpolaatiota varten)
+        self.prev_fx: int = center_x
+        self.prev_fy: int = center_y
+        
+        # Askelmatkan jakojäännös (step_distance)
+        self.move_remainder: int = 0
+        
+        # Nykyinen ja haluttu liikkumissuunta (suuntakoodit, ks. DIRECTION_VECTORS)
+        self.current_direction: int = DIR_NONE
+        self.desired_direction: int = DIR_NONE
         
         # Nopeus
         self.speed: float = PLAYER_SPEED
@@ -42,9 +80,19 @@ class Player:
         # Pelaajan koko renderöintiä varten
         self.radius: int = 6
         
-        # Power-pelletin signaalifunktio
+        # Pelletin (ruutu) ja power-pelletin signaalifunktiot
+        self.pellet_callback: Optional[Callable[[int, int], None]] = None
         self.power_pellet_callback: Optional[Callable[[], None]] = None
     
+    def set_pellet_callback(self, callback: Callable[[int, int], None]) -> None:
+        """
+        Asettaa tavallisen pelletin signaalifunktion.
+        
+        Args:
+            callback: Funktio joka kutsutaan syödyn pelletin ruudulla (tile_x, tile_y)
+        """
+        self.pellet_callback = callback
+    
     def set_power_pellet_callback(self, callback: Callable[[], None]) -> None:
         """
         Asettaa power-pelletin signaalifunktion.
@@ -54,129 +102,110 @@ class Player:
         """
         self.power_pellet_callback = callback
     
-    def handle_input(self, keys: pygame.key.ScancodeWrapper) -> None:
+    def handle_input(self, keys: "pygame.key.ScancodeWrapper") -> None:
         """
         Käsittelee pelaajan syötteet.
         
         Args:
             keys: Pygame:n näppäimistön tila
         """
-        # Tallenna haluttu suunta syötteen perusteella
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.desired_direction = DIRECTION_UP
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.desired_direction = DIRECTION_DOWN
-        elif keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.desired_direction = DIRECTION_LEFT
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.desired_direction = DIRECTION_RIGHT
+        self.set_desired_direction(direction_from_keys(keys))
+    
+    def set_desired_direction(self, direction: Optional[Tuple[int, int]]) -> None:
+        """
+        Asettaa halutun liikkumissuunnan (esim. simulaatiosta tai botilta).
+        
+        Args:
+            direction: Haluttu suunta (dx, dy), tai None jos syötettä ei ole
+        """
+        # Tallenna haluttu suunta vain jos syötettä annettiin
+        if direction is not None:
+            self.desired_direction = DIRECTION_CODES[direction]
     
     def update(self, dt: float, level: Level) -> Tuple[int, str]:
         """
         Päivittää pelaajan tilan.
+        Liike kulkee ruudukkoa pitkin (move_along_grid), joten suunta vaihtuu ja pelletit
+        syödään jokaisessa ohitetussa keskipisteessä askeleen pituudesta riippumatta.
         
         Args:
             dt: Aikaerotus sekunteina
             level: Nykyinen taso
             
         Returns:
-            Tuple (pisteet, pellet_tyyppi) - (0, "") jos ei pellettejä syöty
+            Tuple (pisteet, pellet_tyyppi) - (0, "") jos ei pellettejä syöty;
+            tyyppi on "pellet" jos askeleella syötiin tavallinen pelletti, muuten "power"
         """
-        points_earned = 0
-        pellet_type = ""
+        # Tallenna edellinen positio interpolaatiota varten
+        self.prev_fx = self.fx
+        self.prev_fy = self.fy
         
-        # Tarkista nykyinen ruutu
-        current_tile_x, current_tile_y = pixels_to_tile(self.x, self.y)
+        eaten = [0, ""]
         
-        # Tarkista voiko vaihtaa suuntaa
-        if (self.desired_direction != DIRECTION_NONE and 
-            self.desired_direction != self.current_direction):
-            
-            # Jos ollaan lähellä ruudun keskustaa, tarkista voiko vaihtaa suuntaa
-            if is_near_tile_center(self.x, self.y, current_tile_x, current_tile_y):
-                next_tile_x = current_tile_x + self.desired_direction[0]
-                next_tile_y = current_tile_y + self.desired_direction[1]
-                
-                if level.is_valid_position(next_tile_x, next_tile_y):
-                    # Keskitä position ja vaihda suuntaa
-                    self.x, self.y = tile_center_pixels(current_tile_x, current_tile_y)
-                    self.current_direction = self.desired_direction
-        
-        # Liiku nykyiseen suuntaan
-        if self.current_direction != DIRECTION_NONE:
-            # Laske uusi positio
-            move_x = self.current_direction[0] * self.speed * dt
-            move_y = self.current_direction[1] * self.speed * dt
-            
-            new_x = self.x + move_x
-            new_y = self.y + move_y
+        def arrive(tile_x: int, tile_y: int, direction: int) -> int:
+            # Syö keskipisteen pelletti
+            points, pellet_type = level.eat_pellet_at(tile_x, tile_y)
+            if pellet_type:
+                eaten[0] += points
+                if eaten[1] != "pellet":
+                    eaten[1] = pellet_type
+                # Kutsu pelletin tyypin signaalifunktio
+                if pellet_type == "pellet":
+                    if self.pellet_callback:
+                        self.pellet_callback(tile_x, tile_y)
+                elif self.power_pellet_callback:
+                    self.power_pellet_callback()
             
-            # Tarkista törmäys seinään - tarkista myös ruudun rajat
-            new_tile_x, new_tile_y = pixels_to_tile(new_x, new_y)
-            
-            # Tarkista että kohderuutu on kelvollinen
-            can_move = level.is_valid_position(new_tile_x, new_tile_y)
-            
-            # Jos liikutaan ruudun rajojen yli, tarkista myös kohderuutu
-            if can_move and (new_tile_x != current_tile_x or new_tile_y != current_tile_y):
-                # Varmista että kohderuutu on todella kelvollinen
-                can_move = level.is_valid_position(new_tile_x, new_tile_y)
-            
-            if can_move:
-                # Liike on laillinen
-                self.x = new_x
-                self.y = new_y
-                
-                # Käsittele tunneli (wrap around)
-                self.x, self.y = wrap_position(self.x, self.y, level.width, level.height)
-                
-            else:
-                # Törmäys seinään - keskitä nykyiseen ruutuun ja pysähdy
-                current_center_x, current_center_y = tile_center_pixels(current_tile_x, current_tile_y)
-                self.x = current_center_x
-                self.y = current_center_y
-                self.current_direction = DIRECTION_NONE
-        
-        # Tarkista onko pelaaja ruudun keskellä ja syö pelletti
-        final_tile_x, final_tile_y = pixels_to_tile(self.x, self.y)
-        if is_near_tile_center(self.x, self.y, final_tile_x, final_tile_y):
-            points_earned, pellet_type = level.eat_pellet_at(final_tile_x, final_tile_y)
-            
-            # Jos power-pellet syöty, kutsu signaalifunktio
-            if pellet_type == "power" and self.power_pellet_callback:
-                self.power_pellet_callback()
+            # Vaihda haluttuun suuntaan jos se on auki, muuten jatka tai pysähdy
+            desired = self.desired_direction
+            if desired != DIR_NONE and level.is_valid_position(
+                    tile_x + DIRECTION_DX[desired], tile_y + DIRECTION_DY[desired]):
+                return desired
+            if direction != DIR_NONE and level.is_valid_position(
+                    tile_x + DIRECTION_DX[direction], tile_y + DIRECTION_DY[direction]):
+                return direction
+            return DIR_NONE
+        
+        distance, self.move_remainder = step_distance(self.speed, dt, self.move_remainder)
+        self.fx, self.fy, self.current_direction = move_along_grid(
+            self.fx, self.fy, self.current_direction, distance, level, arrive)
         
-        return (points_earned, pellet_type)
+        return (eaten[0], eaten[1])
     
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: "pygame.Surface", alpha: float = 1.0, scale: int = SCALE) -> None:
         """
         Piirtää pelaajan.
         
         Args:
             surface: Pinta jolle piirretään
+            alpha: Interpolaatiokerroin edellisen ja nykyisen askeleen välillä
+            scale: Renderöinnin skaalauskerroin (1 = looginen resoluutio)
         """
-        # Skaalaa positio renderöintiä varten
-        render_x, render_y = scale_for_rendering(self.x, self.y)
+        import pygame
+        
+        # Interpoloi ja skaalaa positio renderöintiä varten
+        draw_x, draw_y = interpolate_position(self.prev_x, self.prev_y, self.x, self.y, alpha)
+        render_x, render_y = scale_for_rendering(draw_x, draw_y, scale)
         
         # Piirrä pelaaja ympyränä
         pygame.draw.circle(
             surface, PLAYER_COLOR,
             (render_x, render_y),
-            self.radius * SCALE
+            self.radius * scale
         )
         
         # Lisää "suu" osoittamaan liikkumissuuntaan
-        if self.current_direction != DIRECTION_NONE:
+        if self.current_direction != DIR_NONE:
             # Laske suun positio
-            mouth_offset = 4 * SCALE
-            mouth_x = render_x + self.current_direction[0] * mouth_offset
-            mouth_y = render_y + self.current_direction[1] * mouth_offset
+            offset_x, offset_y = MOUTH_OFFSETS[self.current_direction]
+            mouth_x = render_x + offset_x * scale
+            mouth_y = render_y + offset_y * scale
             
             # Piirrä pieni musta ympyrä suuksi
             pygame.draw.circle(
                 surface, (0, 0, 0),
                 (mouth_x, mouth_y),
-                2 * SCALE
+                2 * scale
             )
     
     def get_position(self) -> Tuple[float, float]:
@@ -204,7 +233,7 @@ class Player:
         Returns:
             Liikkumissuunta (dx, dy)
         """
-        return self.current_direction
+        return DIRECTION_VECTORS[self.current_direction]
     
     def reset_position(self, start_x: int, start_y: int) -> None:
         """
@@ -214,11 +243,14 @@ class Player:
             start_x: Aloitus x-koordinaatti ruutuina
             start_y: Aloitus y-koordinaatti ruutuina
         """
-        center_x, center_y = tile_center_pixels(start_x, start_y)
-        self.x = center_x
-        self.y = center_y
-        self.current_direction = DIRECTION_NONE
-        self.desired_direction = DIRECTION_NONE
+        center_x, center_y = tile_center_fixed(start_x, start_y)
+        self.fx = center_x
+        self.fy = center_y
+        self.prev_fx = center_x
+        self.prev_fy = center_y
+        self.move_remainder = 0
+        self.current_direction = DIR_NONE
+        self.desired_direction = DIR_NONE
     
     def set_speed_multiplier(self, multiplier: float) -> None:
         """
@@ -236,4 +268,4 @@ class Player:
         Returns:
             True jos pelaaja liikkuu
         """
-        return self.current_direction != DIRECTION_NONE
\ No newline at end of file
+        return self.current_direction != DIR_NONE
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Kevyt framekohtainen profiloija.
+Mittaa alijärjestelmien (syöte, AI, piirto...) ajat ja piirtää niistä overlayn.
+"""
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from constants import WHITE, YELLOW, PROFILER_WINDOW, PROFILER_REFRESH_FRAMES
+
+if TYPE_CHECKING:
+    import pygame
+
+
+# Jaettu no-op-konteksti kun profilointi ei ole päällä
+_NULL_SECTION = nullcontext()
+
+
+class _Section:
+    """Yhden alijärjestelmän ajastin (uudelleenkäytettävä kontekstimanageri)."""
+
+    def __init__(self, window: int, active: List["_Section"]):
+        """
+        Alustaa ajastimen.
+
+        Args:
+            window: Liukuvan ikkunan koko (näytteiden määrä)
+            active: Profiloijan avoimien ajastinten pino (jaettu kaikkien ajastinten kesken)
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.parent: Optional["_Section"] = None  # Ajastin jonka sisällä tämä viimeksi avattiin
+        self._active = active
+        self._start: float = 0.0
+
+    def __enter__(self) -> "_Section":
+        self.parent = self._active[-1] if self._active else None
+        self._active.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.samples.append(time.perf_counter() - self._start)
+        self._active.pop()
+
+
+class FrameProfiler:
+    """Alijärjestelmien ajastimet, liukuvat keskiarvot ja p95/p99."""
+
+    def __init__(self, enabled: bool = False, window: int = PROFILER_WINDOW):
+        """
+        Alustaa profiloijan.
+
+        Args:
+            enabled: Onko mittaus päällä
+            window: Liukuvan ikkunan koko frameina
+        """
+        self.enabled = enabled
+        self.window = window
+        self._sections: Dict[str, _Section] = {}
+        self._active: List[_Section] = []
+
+        # Overlayn välimuisti (päivitetään vain joka N:s frame)
+        self._font: "Optional[pygame.font.Font]" = None
+        self._overlay: "Optional[pygame.Surface]" = None
+        self._frames_since_refresh: int = 0
+
+    def section(self, name: str):
+        """
+        Palauttaa kontekstimanagerin joka mittaa lohkon keston.
+
+        Args:
+            name: Alijärjestelmän nimi
+
+        Returns:
+            Ajastin, tai jaettu no-op-konteksti jos profilointi ei ole päällä
+        """
+        if not self.enabled:
+            return _NULL_SECTION
+
+        timer = self._sections.get(name)
+        if timer is None:
+            timer = _Section(self.window, self._active)
+            self._sections[name] = timer
+        return timer
+
+    def toggle(self) -> None:
+        """Kytkee profiloinnin ja overlayn päälle/pois."""
+        self.enabled = not self.enabled
+        if not self.enabled:
+            self.reset()
+
+    def reset(self) -> None:
+        """Tyhjentää kaikki mittaukset."""
+        self._sections.clear()
+        self._active.clear()
+        self._overlay = None
+        self._frames_since_refresh = 0
+
+    def stats(self) -> List[Tuple[str, int, float, float, float]]:
+        """
+        Laskee tilastot jokaiselle alijärjestelmälle. Toisen ajastimen sisällä mitattu osio
+        (esim. "ghost_planning" osion "ghosts" sisällä) on sisäkkäinen: sen aika sisältyy jo
+        ylemmän osion aikaan.
+
+        Returns:
+            Lista (nimi, syvyys, keskiarvo_ms, p95_ms, p99_ms) mittausjärjestyksessä,
+            syvyys 0 = ylimmän tason osio
+        """
+        result = []
+        for name, timer in self._sections.items():
+            if not timer.samples:
+                continue
+            depth = 0
+            parent = timer.parent
+            while parent is not None:
+                depth += 1
+                parent = parent.parent
+            ordered = sorted(timer.samples)
+            count = len(ordered)
+            avg = sum(ordered) / count
+            p95 = ordered[min(count - 1, int(count * 0.95))]
+            p99 = ordered[min(count - 1, int(count * 0.99))]
+            result.append((name, depth, avg * 1000.0, p95 * 1000.0, p99 * 1000.0))
+        return result
+
+    def draw_overlay(self, surface: "pygame.Surface") -> None:
+        """
+        Piirtää profilointitaulukon pinnan oikeaan alakulmaan.
+        Taulukko renderöidään uudelleen vain joka PROFILER_REFRESH_FRAMES:s frame.
+
+        Args:
+            surface: Pinta jolle piirretään
+        """
+        if not self.enabled:
+            return
+
+        self._frames_since_refresh += 1
+        if self._overlay is None or self._frames_since_refresh >= PROFILER_REFRESH_FRAMES:
+            self._overlay = self._render_overlay()
+            self._frames_since_refresh = 0
+
+        x = surface.get_width() - self._overlay.get_width() - 10
+        y = surface.get_height() - self._overlay.get_height() - 10
+        surface.blit(self._overlay, (x, y))
+
+    def _render_overlay(self) -> "pygame.Surface":
+        """
+        Renderöi profilointitaulukon omalle pinnalleen.
+
+        Returns:
+            Overlay-pinta
+        """
+        import pygame
+        
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+
+        rows = [("SECTION", "AVG", "P95", "P99")]
+        total = 0.0
+        for name, depth, avg, p95, p99 in self.stats():
+            # Sisäkkäiset osiot sisennettyinä ylemmän osion alle, eivät mukana summassa
+            rows.append(("  " * depth + name, f"{avg:.2f}", f"{p95:.2f}", f"{p99:.2f}"))
+            if depth == 0:
+                total += avg
+        rows.append(("total (ms)", f"{total:.2f}", "", ""))
+
+        line_height = 16
+        column_x = [6, 110, 160, 210]
+        overlay = pygame.Surface((260, line_height * len(rows) + 8))
+        overlay.set_alpha(200)
+        overlay.fill((0, 0, 0))
+
+        for row_index, row in enumerate(rows):
+            color = YELLOW if row_index == 0 else WHITE
+            for column, text in zip(column_x, row):
+                if text:
+                    text_surface = self._font.render(text, True, color)
+                    overlay.blit(text_surface, (column, 4 + row_index * line_height))
+
+        return overlay
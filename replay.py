@@ -0,0 +1,340 @@
+"""
+Syötteiden tallennus ja toisto.
+Tallenne sisältää siemenen, tason tiivisteen ja tikkikohtaiset syötteet ajonpituuskoodattuna,
+sekä säännöllisin väliajoin otetut tilannekuvat joiden avulla toistossa voi hypätä eteenpäin.
+"""
+import argparse
+import bisect
+import hashlib
+import struct
+import sys
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+from constants import ALL_DIRECTIONS, DIRECTION_NONE, SIM_TICK_RATE, REPLAY_SNAPSHOT_INTERVAL
+from sim import DEFAULT_LEVEL_FILE, Simulation
+
+
+# Tiedostomuoto: otsake + zlib-pakattu runko
+_MAGIC = b"MCRP"
+_VERSION = 2
+_HEADER = struct.Struct("<4sHq20sII")  # magic, versio, siemen, tason tiiviste, tikkitaajuus, tikkien määrä
+_SNAPSHOT_HEADER = struct.Struct("<II")  # tikki, pituus
+
+# Syötekoodit: ALL_DIRECTIONS-järjestys, 4 = DIRECTION_NONE, 5 = ei syötettä (None)
+_INPUTS: List[Optional[Tuple[int, int]]] = list(ALL_DIRECTIONS) + [DIRECTION_NONE, None]
+_INPUT_CODES = {direction: code for code, direction in enumerate(_INPUTS)}
+
+
+def level_hash(level_file: str) -> bytes:
+    """
+    Laskee tasotiedoston tiivisteen (SHA-1).
+
+    Args:
+        level_file: Tason tiedoston polku
+
+    Returns:
+        20-tavuinen tiiviste
+    """
+    with open(level_file, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Kirjoittaa etumerkittömän kokonaisluvun 7 bittiä tavua kohden."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Lukee _write_varint-muotoisen luvun. Palauttaa (arvo, uusi offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class ReplayRecorder:
+    """Tallentaa pelin syötteet tikki kerrallaan."""
+
+    def __init__(self, seed: int, level_file: str = DEFAULT_LEVEL_FILE, tick_rate: int = SIM_TICK_RATE,
+                 snapshot_interval: int = REPLAY_SNAPSHOT_INTERVAL):
+        """
+        Alustaa tallentimen.
+
+        Args:
+            seed: Simulaation satunnaislähteen siemen
+            level_file: Tason tiedoston polku
+            tick_rate: Simulaation tikkitaajuus
+            snapshot_interval: Tilannekuvien väli tikkeinä (0 = ei tilannekuvia)
+        """
+        self.seed = seed
+        self.level_hash = level_hash(level_file)
+        self.tick_rate = tick_rate
+        self.snapshot_interval = snapshot_interval
+        self.ticks: int = 0
+
+        # Ajonpituuskoodatut syötteet [(määrä, koodi)]
+        self.runs: List[List[int]] = []
+        self.snapshots: List[Tuple[int, bytes]] = []
+
+    def record(self, sim: Simulation, direction: Optional[Tuple[int, int]]) -> None:
+        """
+        Kirjaa seuraavan tikin syötteen. Kutsutaan juuri ennen sim.step()-kutsua.
+
+        Args:
+            sim: Simulaatio (tilannekuvia varten)
+            direction: Tikin syöte (None = ei syötettä)
+        """
+        if self.snapshot_interval and self.ticks % self.snapshot_interval == 0:
+            self.snapshots.append((self.ticks, sim.snapshot()))
+
+        code = _INPUT_CODES[direction]
+        if self.runs and self.runs[-1][1] == code:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, code])
+        self.ticks += 1
+
+    def to_bytes(self) -> bytes:
+        """
+        Koodaa tallenteen tiedostomuotoon.
+
+        Returns:
+            Tallenne tavuina
+        """
+        body = bytearray()
+        _write_varint(body, len(self.runs))
+        for count, code in self.runs:
+            _write_varint(body, count)
+            body.append(code)
+        _write_varint(body, len(self.snapshots))
+        for tick, data in self.snapshots:
+            body += _SNAPSHOT_HEADER.pack(tick, len(data))
+            body += data
+
+        header = _HEADER.pack(_MAGIC, _VERSION, self.seed, self.level_hash, self.tick_rate, self.ticks)
+        return header + zlib.compress(bytes(body))
+
+    def save(self, path: str) -> None:
+        """
+        Tallentaa tallenteen tiedostoon.
+
+        Args:
+            path: Tiedoston polku
+        """
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """Ladattu tallenne: syötteet ja tilannekuvat."""
+
+    def __init__(self, seed: int, level_hash: bytes, tick_rate: int, ticks: int,
+                 runs: List[Tuple[int, int]], snapshots: List[Tuple[int, bytes]]):
+        """
+        Alustaa tallenteen.
+
+        Args:
+            seed: Satunnaislähteen siemen
+            level_hash: Tasotiedoston tiiviste
+            tick_rate: Tikkitaajuus
+            ticks: Tikkien kokonaismäärä
+            runs: Ajonpituuskoodatut syötteet [(määrä, koodi)]
+            snapshots: Tilannekuvat [(tikki, data)] tikkijärjestyksessä
+        """
+        self.seed = seed
+        self.level_hash = level_hash
+        self.tick_rate = tick_rate
+        self.ticks = ticks
+        self.runs = runs
+        self.snapshots = snapshots
+
+        # Jokaisen ajon aloitustikki syötteen hakua varten
+        self._run_starts: List[int] = []
+        start = 0
+        for count, _ in runs:
+            self._run_starts.append(start)
+            start += count
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        """
+        Purkaa tallenteen tiedostomuodosta.
+
+        Raises:
+            ValueError: Jos tiedosto ei ole tuettu tallenne
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Replay file is truncated")
+        magic, version, seed, hash_bytes, tick_rate, ticks = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a Maze Chomp replay file")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+
+        body = zlib.decompress(data[_HEADER.size:])
+        num_runs, offset = _read_varint(body, 0)
+        runs = []
+        for _ in range(num_runs):
+            count, offset = _read_varint(body, offset)
+            runs.append((count, body[offset]))
+            offset += 1
+
+        num_snapshots, offset = _read_varint(body, offset)
+        snapshots = []
+        for _ in range(num_snapshots):
+            tick, length = _SNAPSHOT_HEADER.unpack_from(body, offset)
+            offset += _SNAPSHOT_HEADER.size
+            snapshots.append((tick, bytes(body[offset:offset + length])))
+            offset += length
+
+        return cls(seed, hash_bytes, tick_rate, ticks, runs, snapshots)
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        """
+        Lataa tallenteen tiedostosta.
+
+        Args:
+            path: Tiedoston polku
+        """
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def direction_at(self, tick: int) -> Optional[Tuple[int, int]]:
+        """
+        Palauttaa annetun tikin syötteen.
+
+        Args:
+            tick: Tikin indeksi (0..ticks-1)
+        """
+        run_index = bisect.bisect_right(self._run_starts, tick) - 1
+        return _INPUTS[self.runs[run_index][1]]
+
+    def iter_inputs(self, start: int = 0):
+        """Käy syötteet läpi tikistä start alkaen."""
+        run_index = max(0, bisect.bisect_right(self._run_starts, start) - 1)
+        tick = start
+        for run_start, (count, code) in zip(self._run_starts[run_index:], self.runs[run_index:]):
+            direction = _INPUTS[code]
+            for _ in range(max(0, run_start + count - tick)):
+                yield direction
+            tick = max(tick, run_start + count)
+
+
+class ReplayPlayer:
+    """Ajaa simulaatiota tallenteen syötteillä ja tukee hyppäämistä tilannekuvien avulla."""
+
+    def __init__(self, replay: Replay, level_file: str = DEFAULT_LEVEL_FILE, profiler=None,
+                 verbose: bool = False):
+        """
+        Alustaa toiston ja luo simulaation tallenteen siemenellä.
+
+        Args:
+            replay: Ladattu tallenne
+            level_file: Tason tiedoston polku
+            profiler: Valinnainen profiloija simulaatiolle
+            verbose: True = tulosta tason latausviestit
+
+        Raises:
+            ValueError: Jos tasotiedosto ei ole sama kuin tallennettaessa
+        """
+        if level_hash(level_file) != replay.level_hash:
+            raise ValueError("Level file differs from the one the replay was recorded with")
+        self.replay = replay
+        self.dt = 1.0 / replay.tick_rate
+        self.sim = Simulation(level_file, profiler=profiler, verbose=verbose, seed=replay.seed)
+        self.tick: int = 0
+        self._inputs = replay.iter_inputs(0)
+
+    @property
+    def finished(self) -> bool:
+        """True kun kaikki tallennetut tikit on toistettu."""
+        return self.tick >= self.replay.ticks
+
+    def next_direction(self) -> Optional[Tuple[int, int]]:
+        """
+        Palauttaa seuraavan tikin syötteen ja siirtää kohdistinta (PlayState ajaa askeleen itse).
+
+        Returns:
+            Syöte, tai None jos tallenne on loppunut
+        """
+        if self.finished:
+            return None
+        self.tick += 1
+        return next(self._inputs)
+
+    def step(self) -> list:
+        """
+        Ajaa yhden tallennetun tikin.
+
+        Returns:
+            Simulaation tapahtumat
+        """
+        return self.sim.step(self.dt, self.next_direction())
+
+    def seek(self, tick: int) -> None:
+        """
+        Siirtyy annettuun tikkiin: palauttaa lähimmän aiemman tilannekuvan ja simuloi loput.
+
+        Args:
+            tick: Kohdetikki (rajataan välille 0..ticks)
+        """
+        tick = max(0, min(tick, self.replay.ticks))
+        snapshot_ticks = [snapshot_tick for snapshot_tick, _ in self.replay.snapshots]
+        index = bisect.bisect_right(snapshot_ticks, tick) - 1
+
+        # Tilannekuvaa käytetään jos taaksepäin hypätään tai se säästää simulointia
+        if index >= 0 and (tick < self.tick or snapshot_ticks[index] > self.tick):
+            snapshot_tick, data = self.replay.snapshots[index]
+            self.sim.restore(data)
+            self.tick = snapshot_tick
+            self._inputs = self.replay.iter_inputs(snapshot_tick)
+        elif tick < self.tick:
+            raise ValueError("Cannot seek backwards in a replay without snapshots")
+
+        while self.tick < tick:
+            self.step()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Komentorivi: tallenteen tiedot ja nopea läpiajo."""
+    parser = argparse.ArgumentParser(description="Inspect or fast-forward a Maze Chomp replay")
+    parser.add_argument("replay", help="Replay file")
+    parser.add_argument("--seek", type=float, default=None, metavar="SECONDS",
+                        help="Seek to this point and print the game state")
+    parser.add_argument("--level-file", default=DEFAULT_LEVEL_FILE, help="Level file")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = Replay.load(args.replay)
+        player = ReplayPlayer(replay, args.level_file)
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    duration = replay.ticks / replay.tick_rate
+    print(f"Seed {replay.seed}, {replay.ticks} ticks at {replay.tick_rate} Hz ({duration:.1f}s), "
+          f"{len(replay.runs)} input runs, {len(replay.snapshots)} snapshots")
+
+    target = replay.ticks if args.seek is None else int(args.seek * replay.tick_rate)
+    start = time.perf_counter()
+    player.seek(target)
+    elapsed = time.perf_counter() - start
+    sim = player.sim
+    print(f"Tick {player.tick}: score {sim.score}, lives {sim.lives}, level {sim.current_level}, "
+          f"pellets left {sim.level.pellets_left()}, state hash {sim.state_hash:016x} ({elapsed * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
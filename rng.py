@@ -0,0 +1,128 @@
+"""
+Pelikohtaiset siemennetyt satunnaisvirrat.
+Jokainen peli omistaa oman virtansa, joten rinnakkaiset ja toistetut pelit ovat deterministisiä
+eikä globaali random-moduuli ole jaettu resurssi säikeiden välillä.
+"""
+import random
+from typing import Sequence
+
+import numpy as np
+
+
+# Siemenet mahtuvat etumerkilliseen 64-bittiseen kokonaislukuun (tallenteen otsake)
+_SEED_LIMIT: int = 2 ** 63
+
+# Pelikohtaisen puskurin koko StreamBankissa
+DEFAULT_BLOCK: int = 256
+
+
+def new_seed() -> int:
+    """
+    Arpoo uuden siemenen käyttöjärjestelmän satunnaislähteestä.
+
+    Returns:
+        Siemen välillä [0, 2^63)
+    """
+    return random.SystemRandom().randrange(_SEED_LIMIT)
+
+
+def derive_seed(base: int, index: int) -> int:
+    """
+    Johtaa perussiemenestä ja järjestysnumerosta uuden siemenen (sama kaikissa prosesseissa).
+
+    Args:
+        base: Perussiemen (>= 0)
+        index: Järjestysnumero, esim. jakson numero (>= 0)
+
+    Returns:
+        Siemen välillä [0, 2^63)
+    """
+    return int(np.random.SeedSequence((base, index)).generate_state(1, np.uint64)[0]) % _SEED_LIMIT
+
+
+class StreamRandom:
+    """
+    NumPy PCG64 -virta random.Random-yhteensopivalla choice()/random()-rajapinnalla.
+    choice() kuluttaa tasan yhden liukuluvun, joten sama virta voidaan kuluttaa
+    vektoroidusti (draw/StreamBank) ja skalaarisesti samassa järjestyksessä.
+    """
+
+    def __init__(self, seed: int):
+        """
+        Alustaa virran.
+
+        Args:
+            seed: Siemen
+        """
+        self.seed = seed
+        self._generator = np.random.default_rng(seed)
+
+    def random(self) -> float:
+        """Palauttaa seuraavan liukuluvun välillä [0, 1)."""
+        return float(self._generator.random())
+
+    def choice(self, seq: Sequence):
+        """Valitsee alkion seq[int(u * len(seq))]."""
+        return seq[int(self._generator.random() * len(seq))]
+
+    def draw(self, count: int) -> np.ndarray:
+        """
+        Ottaa virrasta count liukulukua kerralla (sama tulos kuin count random()-kutsua).
+
+        Args:
+            count: Lukujen määrä
+
+        Returns:
+            float64-taulukko välillä [0, 1)
+        """
+        return self._generator.random(count)
+
+    def getstate(self) -> dict:
+        """Palauttaa generaattorin tilan (tilannekuvia varten)."""
+        return self._generator.bit_generator.state
+
+    def setstate(self, state: dict) -> None:
+        """Palauttaa generaattorin tilan."""
+        self._generator.bit_generator.state = state
+
+
+class StreamBank:
+    """
+    N pelin virrat vektoroituun käyttöön. Jokaiselle pelille pidetään puskuria
+    valmiiksi arvotuista luvuista, joten draw() on yksi indeksointi kaikille peleille.
+    Pelin i luvut ovat samat kuin StreamRandom(seeds[i]):n peräkkäiset random()-kutsut.
+    """
+
+    def __init__(self, seeds: Sequence[int], block: int = DEFAULT_BLOCK):
+        """
+        Alustaa virrat ja täyttää puskurit.
+
+        Args:
+            seeds: Pelikohtaiset siemenet
+            block: Puskurin koko per peli
+        """
+        self.seeds = list(seeds)
+        self.block = block
+        self._generators = [np.random.default_rng(seed) for seed in self.seeds]
+        self._buffer = np.stack([generator.random(block) for generator in self._generators]) \
+            if self.seeds else np.zeros((0, block))
+        self._position = np.zeros(len(self.seeds), dtype=np.int64)
+
+    def draw(self, games: np.ndarray) -> np.ndarray:
+        """
+        Kuluttaa yhden luvun jokaisen annetun pelin virrasta.
+
+        Args:
+            games: Pelien indeksit (kukin korkeintaan kerran)
+
+        Returns:
+            Liukuluvut välillä [0, 1)
+        """
+        exhausted = games[self._position[games] >= self.block]
+        for game in exhausted:
+            self._buffer[game] = self._generators[game].random(self.block)
+            self._position[game] = 0
+
+        values = self._buffer[games, self._position[games]]
+        self._position[games] += 1
+        return values
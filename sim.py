@@ -0,0 +1,535 @@
+"""
+Pelisääntöjen simulaatioydin ilman pygamea.
+Liike, pelletit, moodiaikataulu, FRIGHTENED/EATEN-ajastimet, törmäykset ja pisteet.
+Syötteenä annetaan suunta, ulos tulee lista tapahtumia (yksi jokaisesta syödystä pelletistä).
+Pitkät askeleet ajetaan 1/SIM_TICK_RATE sekunnin sääntöaskelina, ja keskipisteeseen saapuvien
+haamujen reittikyselyt ratkaistaan yhdessä (plan_ghost_moves, last_plan).
+"""
+import os
+import random
+from contextlib import nullcontext
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from constants import (
+    INITIAL_LIVES, SPEED_INCREASE_PER_LEVEL, COLLISION_DISTANCE, COLLISION_DISTANCE_FP_SQ,
+    MODE_SCHEDULE_LEVEL_1, GHOST_CHAIN_POINTS, MAX_LEVEL, PELLET_POINTS,
+    POWER_PELLET_POINTS
+)
+from level import Level
+from rng import new_seed
+from player import Player
+from ghost import Ghost, GhostMode
+from pathfinding import MovePlan, MoveRequest, plan_ghost_moves, prepare_planning
+from snapshot import SnapshotCodec
+from spatial_hash import SpatialHash
+from zobrist import ZobristHash
+from utils import substeps, tile_center_pixels
+
+
+# Oletustaso (sama kaikilla tasoilla tässä versiossa)
+DEFAULT_LEVEL_FILE: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "level1", "level1.txt"
+)
+
+# Haamujen persoonat spawn-järjestyksessä
+GHOST_PERSONALITIES: List[str] = ["blinky", "pinky", "clyde", "inky"]
+
+
+class SimEventType(Enum):
+    """Simulaation tuottamat tapahtumat."""
+    PELLET_EATEN = "pellet_eaten"
+    POWER_PELLET_EATEN = "power_pellet_eaten"
+    GHOST_EATEN = "ghost_eaten"
+    PLAYER_DIED = "player_died"
+    GAME_OVER = "game_over"
+    LEVEL_CLEARED = "level_cleared"
+    GAME_COMPLETE = "game_complete"
+
+
+class SimEvent(NamedTuple):
+    """
+    Yksittäinen simulaatiotapahtuma.
+
+    Attributes:
+        type: Tapahtuman tyyppi
+        points: Tapahtumasta saadut pisteet
+        x: Tapahtuman x-koordinaatti pikseleinä (esim. syödyn haamun ruudun keskipiste)
+        y: Tapahtuman y-koordinaatti pikseleinä
+        chain: Ghost-ketjun indeksi (0-3) GHOST_EATEN-tapahtumassa
+        level: Taso jolla tapahtuma sattui
+    """
+    type: SimEventType
+    points: int = 0
+    x: float = 0.0
+    y: float = 0.0
+    chain: int = 0
+    level: int = 0
+
+
+class Simulation:
+    """Yhden pelin säännöt ja tila ilman renderöintiä tai ääntä."""
+
+    def __init__(self, level_file: str = DEFAULT_LEVEL_FILE, profiler=None, verbose: bool = False,
+                 rng=None, level_template: Optional[Level] = None, start_level: int = 1,
+                 ghost_personalities: Optional[List[str]] = None, seed: Optional[int] = None):
+        """
+        Alustaa simulaation ja lataa ensimmäisen tason.
+
+        Args:
+            level_file: Tason tiedoston polku
+            profiler: Valinnainen profiloija jolla on section(name)-metodi
+            verbose: True = tulosta tason latausviestit
+            rng: Haamuille annettava satunnaislähde (oletuksena oma random.Random(seed))
+            level_template: Valmiiksi ladattu taso josta jokainen taso kopioidaan (ei tiedostolukua)
+            start_level: Aloitustaso
+            ghost_personalities: Haamujen persoonat spawn-järjestyksessä (oletuksena GHOST_PERSONALITIES)
+            seed: Pelin oman satunnaisvirran siemen (None = uusi satunnainen siemen)
+        """
+        self.level_file = level_file
+        self.level_template = level_template
+        self.start_level = start_level
+        self.ghost_personalities = ghost_personalities or GHOST_PERSONALITIES
+        # Pelikohtainen satunnaisvirta (ei globaalia random-moduulia)
+        self.seed: Optional[int] = seed
+        if rng is None:
+            if self.seed is None:
+                self.seed = new_seed()
+            rng = random.Random(self.seed)
+        self.rng = rng
+        self.profiler = profiler
+        self.verbose = verbose
+
+        self.level: Optional[Level] = None
+        self.player: Optional[Player] = None
+        self.ghosts: List[Ghost] = []
+
+        # Haamujen ruutulokerot törmäysten esikarsintaan
+        self.ghost_hash = SpatialHash()
+        
+        # Tilan Zobrist-tiiviste (state_hash)
+        self.zobrist = ZobristHash()
+
+        # Suunnanvalintojen ajoittaja aikabudjetilla (None = kaikki päätökset heti, deterministinen)
+        self.ai_scheduler = None
+        
+        # Viimeisimmän framen yhteinen reittisuunnitelma (kustannus profilointia varten)
+        self.last_plan: Optional[MovePlan] = None
+
+        # Pelitiedot
+        self.score: int = 0
+        self.lives: int = INITIAL_LIVES
+        self.current_level: int = start_level
+        self.game_over: bool = False
+        self.game_complete: bool = False
+
+        # Globaali moodiajastin
+        self.mode_timer: float = 0.0
+        self.mode_schedule: List[Tuple[str, float]] = MODE_SCHEDULE_LEVEL_1.copy()
+        self.current_mode: str = self.mode_schedule[0][0]
+        self.mode_index: int = 0
+
+        # Ghost-ketjupisteet
+        self.ghost_chain_count: int = 0
+
+        # Kuluvan askeleen tapahtumat
+        self._events: List[SimEvent] = []
+
+        # Tilannekuvakoodekki (luodaan ensimmäisellä käytöllä)
+        self._snapshot_codec: Optional[SnapshotCodec] = None
+
+        self.load_level()
+
+    def load_level(self) -> None:
+        """
+        Lataa nykyisen tason ja luo pelaajan ja haamut.
+
+        Raises:
+            FileNotFoundError: Jos tasotiedostoa ei löydy
+            ValueError: Jos taso on virheellinen
+        """
+        if self.level_template is not None:
+            self.level = self.level_template.copy()
+        else:
+            self.level = Level(self.level_file)
+        # Reittiverkon taulut heti, ettei ensimmäinen frame maksa niitä
+        prepare_planning(self.level)
+
+        # Nopeus tason mukaan
+        speed_multiplier = 1.0 + (self.current_level - 1) * SPEED_INCREASE_PER_LEVEL
+        self._spawn_player(speed_multiplier)
+        self._spawn_ghosts(speed_multiplier)
+
+        # Nollaa moodiajastin
+        self._reset_mode_timer()
+        self.ghost_chain_count = 0
+        self.zobrist.attach(self)
+
+    def _spawn_player(self, speed_multiplier: float) -> None:
+        """
+        Luo pelaajan spawn-paikkaan.
+
+        Args:
+            speed_multiplier: Tason nopeuskerroin
+        """
+        spawn_x, spawn_y = self.level.get_player_spawn()
+        self.player = Player(spawn_x, spawn_y)
+        self.player.set_pellet_callback(self._on_pellet_eaten)
+        self.player.set_power_pellet_callback(self._on_power_pellet_eaten)
+        self.player.set_speed_multiplier(speed_multiplier)
+
+    def _spawn_ghosts(self, speed_multiplier: float) -> None:
+        """
+        Luo tason haamut spawn-paikkoihin.
+
+        Args:
+            speed_multiplier: Tason nopeuskerroin
+        """
+        # Haamujen määrä: Level 1 = 1 haamu, Level 2 = 2 haamua, jne.
+        # Maksimissaan niin monta kuin spawn-paikkoja on
+        self.ghosts = []
+        ghost_spawns = self.level.get_ghost_spawns()
+        max_ghosts = min(self.current_level, len(ghost_spawns))
+
+        for i in range(max_ghosts):
+            ghost_x, ghost_y = ghost_spawns[i]
+            personality = self.ghost_personalities[i % len(self.ghost_personalities)]
+            ghost = Ghost(ghost_x, ghost_y, i, personality, self.rng)
+            ghost.set_speed_multiplier(speed_multiplier)
+            self.ghosts.append(ghost)
+
+        if self.verbose:
+            print(f"Level {self.current_level}: Created {len(self.ghosts)} ghosts")
+
+        # Ylimääräiset spawn-paikat muuttuvat pelleteiksi
+        self.level.set_active_ghosts(len(self.ghosts))
+        self.ghost_hash.rebuild(self.ghosts)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Nollaa pelin alkutilaan.
+
+        Args:
+            seed: Uusi siemen satunnaisvirralle (None = jatka nykyistä virtaa)
+        """
+        if seed is not None:
+            self.seed = seed
+            self.rng = random.Random(seed)
+        self.score = 0
+        self.lives = INITIAL_LIVES
+        self.current_level = self.start_level
+        self.game_over = False
+        self.game_complete = False
+        self.ghost_chain_count = 0
+        self.load_level()
+
+    def step(self, dt: float, direction: Optional[Tuple[int, int]] = None) -> List[SimEvent]:
+        """
+        Etenee simulaatiota yhden aika-askeleen.
+        Askel ajetaan enintään 1/SIM_TICK_RATE sekunnin sääntöaskelina (utils.substeps), joten
+        törmäykset, ajastimet ja tapahtumat ovat samat kuin SIM_TICK_RATE-tahtisessa ajossa,
+        kun syöte annetaan samoina hetkinä.
+
+        Args:
+            dt: Aika-askel sekunteina
+            direction: Pelaajan haluttu suunta (dx, dy), tai None jos ei uutta syötettä
+
+        Returns:
+            Askeleen aikana syntyneet tapahtumat
+        """
+        self._events = []
+        for tick_dt in substeps(dt):
+            if self.game_over or self.game_complete or not self.level or not self.player:
+                break
+            self._tick(tick_dt, direction)
+            direction = None
+        return self._events
+
+    def _tick(self, dt: float, direction: Optional[Tuple[int, int]]) -> None:
+        """
+        Ajaa yhden sääntöaskeleen; tapahtumat kertyvät self._events-listaan.
+
+        Args:
+            dt: Sääntöaskeleen pituus sekunteina
+            direction: Pelaajan haluttu suunta, tai None jos ei uutta syötettä
+        """
+        # Päivitä moodiajastin
+        with self._section("mode_timer"):
+            self._update_mode_timer(dt)
+
+        # Päivitä pelaaja; pelletit lähettävät tapahtumansa callbackeissa
+        with self._section("player"):
+            points_earned, _ = self._update_player(dt, direction)
+        self.score += points_earned
+
+        # Päivitä haamut
+        with self._section("ghosts"):
+            self._update_ghosts(dt)
+
+        # Tarkista törmäykset
+        with self._section("collisions"):
+            self._check_collisions()
+        if self.game_over:
+            return
+
+        # Tarkista voittoehdot
+        if self.level.pellets_left() == 0:
+            self._emit(SimEventType.LEVEL_CLEARED)
+
+            if self.current_level >= MAX_LEVEL:
+                # Peli läpäisty kokonaan
+                self.game_complete = True
+                self._emit(SimEventType.GAME_COMPLETE)
+            else:
+                # Siirry seuraavaan tasoon
+                self.current_level += 1
+                self.load_level()
+
+    def snapshot(self) -> bytes:
+        """
+        Pakkaa koko muuttuvan tilan tiiviiksi tietueeksi (ks. snapshot.py).
+
+        Returns:
+            Tila bytes-tietueena
+        """
+        if self._snapshot_codec is None:
+            self._snapshot_codec = SnapshotCodec(self)
+        return self._snapshot_codec.capture(self)
+
+    def restore(self, data: bytes) -> None:
+        """
+        Palauttaa tilan snapshot()-tietueesta.
+
+        Args:
+            data: Tilannekuva
+        """
+        if self._snapshot_codec is None:
+            self._snapshot_codec = SnapshotCodec(self)
+        self._snapshot_codec.restore(self, data)
+        self.ghost_hash.rebuild(self.ghosts)
+        self.zobrist.invalidate()
+
+    @property
+    def state_hash(self) -> int:
+        """
+        Tilan 64-bittinen Zobrist-tiiviste (ks. zobrist.py): pelletit, entiteettien ruudut, suunnat
+        ja moodit, ajastinlokerot sekä pisteet ja elämät. Sama tila antaa saman arvon kaikissa
+        prosesseissa, joten toistot ja verkkopelin asiakkaat voivat verrata tiivisteitä tikeittäin.
+        """
+        return self.zobrist.update(self)
+
+    def _section(self, name: str):
+        """Palauttaa profiloijan ajastimen, tai no-op-kontekstin."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.section(name)
+
+    def _emit(self, event_type: SimEventType, points: int = 0,
+              x: float = 0.0, y: float = 0.0, chain: int = 0) -> None:
+        """Lisää tapahtuman kuluvan askeleen listaan."""
+        self._events.append(SimEvent(event_type, points, x, y, chain, self.current_level))
+
+    def _reset_mode_timer(self) -> None:
+        """Palauttaa moodiaikataulun alkuun."""
+        self.mode_timer = 0.0
+        self.mode_index = 0
+        self.current_mode = self.mode_schedule[0][0]
+
+    def _on_pellet_eaten(self, tile_x: int, tile_y: int) -> None:
+        """Kutsutaan kun tavallinen pelletti syödään; yksi tapahtuma per pelletti."""
+        center_x, center_y = tile_center_pixels(tile_x, tile_y)
+        self._emit(SimEventType.PELLET_EATEN, PELLET_POINTS, center_x, center_y)
+
+    def _on_power_pellet_eaten(self) -> None:
+        """Kutsutaan kun power-pellet syödään."""
+        self._emit(SimEventType.POWER_PELLET_EATEN, POWER_PELLET_POINTS, self.player.x, self.player.y)
+
+        self._frighten_ghosts()
+
+        # Nollaa ghost-ketjupisteet
+        self.ghost_chain_count = 0
+
+    def _frighten_ghosts(self) -> None:
+        """Asettaa kaikki haamut (paitsi EATEN) FRIGHTENED-tilaan."""
+        for ghost in self.ghosts:
+            if ghost.mode != GhostMode.EATEN:
+                ghost.set_frightened()
+
+    def _update_mode_timer(self, dt: float) -> None:
+        """Päivittää globaalin moodiajastimen."""
+        self.mode_timer += dt
+
+        # Tarkista pitääkö vaihtaa moodia
+        if self.mode_index < len(self.mode_schedule):
+            current_duration = self.mode_schedule[self.mode_index][1]
+
+            if self.mode_timer >= current_duration:
+                # Vaihda moodia
+                self.mode_timer = 0.0
+                self.mode_index += 1
+
+                if self.mode_index < len(self.mode_schedule):
+                    new_mode = self.mode_schedule[self.mode_index][0]
+                    if new_mode != self.current_mode:
+                        self.current_mode = new_mode
+                        self._on_mode_changed(new_mode)
+
+    def _on_mode_changed(self, new_mode: str) -> None:
+        """
+        Vaihtaa SCATTER/CHASE-haamut uuteen globaaliin moodiin (suunta kääntyy).
+
+        Args:
+            new_mode: Uusi globaali moodi ("SCATTER" tai "CHASE")
+        """
+        for ghost in self.ghosts:
+            if ghost.mode in [GhostMode.SCATTER, GhostMode.CHASE]:
+                ghost.set_mode(GhostMode.SCATTER if new_mode == "SCATTER" else GhostMode.CHASE)
+
+    def _update_player(self, dt: float, direction: Optional[Tuple[int, int]]) -> Tuple[int, str]:
+        """
+        Päivittää pelaajan (ks. Player.update).
+
+        Args:
+            dt: Aika-askel sekunteina
+            direction: Pelaajan haluttu suunta, tai None jos ei uutta syötettä
+
+        Returns:
+            (pisteet, pellet_tyyppi) kuten Player.update
+        """
+        self.player.set_desired_direction(direction)
+        return self.player.update(dt, self.level)
+
+    def _update_ghosts(self, dt: float) -> None:
+        """
+        Päivittää haamut ja siirtää ruudun rajan ylittäneet uuteen lokeroon.
+        Ajoittajan kanssa haamut päivitetään pelaajaa lähimmästä alkaen, jotta budjetti
+        käytetään ensin uhkaavimpiin haamuihin.
+        """
+        player_pos = self.player.get_position()
+        player_direction = self.player.current_direction
+        ghost_hash = self.ghost_hash
+        scheduler = self.ai_scheduler
+        if scheduler is None:
+            with self._section("ghost_planning"):
+                planned = self._plan_ghost_moves(dt, player_pos, player_direction)
+            for index, ghost in enumerate(self.ghosts):
+                if ghost.update(dt, self.level, player_pos, player_direction, self.current_mode,
+                                planned=planned):
+                    # Ruudun raja ylitettiin: vaihda lokero
+                    ghost_hash.relocate(index)
+            return
+
+        # Framen yhteinen suunnitelma lasketaan myös ajoittajan kanssa; sen kesto kuluttaa budjettia
+        ghosts = self.ghosts
+        order = scheduler.begin_frame(ghosts, player_pos)
+        with self._section("ghost_planning"):
+            planned = self._plan_ghost_moves(dt, player_pos, player_direction)
+        scheduler.charge(self.last_plan.seconds)
+        for index in order:
+            if ghosts[index].update(dt, self.level, player_pos, player_direction, self.current_mode, scheduler,
+                                    planned=planned):
+                ghost_hash.relocate(index)
+        scheduler.end_frame()
+
+    def _plan_ghost_moves(self, dt: float, player_pos: Tuple[float, float],
+                          player_direction: int) -> Dict[MoveRequest, Optional[Tuple[int, int]]]:
+        """
+        Kerää askeleen aikana keskipisteeseen saapuvien haamujen reittikyselyt ja ratkaisee
+        ne yhdellä plan_ghost_moves-kutsulla. Pelaaja on jo liikkunut, joten kohteet ovat samat
+        kuin päivityksessä; ennustamattomat kyselyt haamu hakee itse.
+        
+        Returns:
+            Kysely -> next_step-vastaus
+        """
+        requests = []
+        for ghost in self.ghosts:
+            request = ghost.upcoming_request(dt, self.level, player_pos, player_direction, self.current_mode)
+            if request is not None:
+                requests.append(request)
+        self.last_plan = plan_ghost_moves(self.level, requests)
+        return dict(zip(requests, self.last_plan.directions))
+    
+    def _check_collisions(self) -> None:
+        """
+        Tarkistaa törmäykset pelaajan ja haamujen välillä.
+        Vain pelaajan ja viereisten ruutujen haamut verrataan (ghost_hash), neliöetäisyyksinä
+        alipikseleissä (kokonaisluvut). Haamut käsitellään listajärjestyksessä kuten ennenkin.
+        """
+        player = self.player
+        player_fx = player.fx
+        player_fy = player.fy
+        ghosts = self.ghosts
+        ghost_hash = self.ghost_hash
+
+        next_index = 0
+        while True:
+            for index in ghost_hash.candidates(player.x, player.y, COLLISION_DISTANCE):
+                if index < next_index:
+                    continue
+                ghost = ghosts[index]
+                dx = player_fx - ghost.fx
+                dy = player_fy - ghost.fy
+                if dx * dx + dy * dy >= COLLISION_DISTANCE_FP_SQ:
+                    continue
+
+                if ghost.mode == GhostMode.FRIGHTENED:
+                    # Syö haamu
+                    self._eat_ghost(ghost)
+                elif ghost.mode != GhostMode.EATEN:
+                    # Pelaaja kuolee
+                    self._player_die()
+                    if self.game_over:
+                        return
+                    # Haamut palasivat aloituspaikoilleen: loput tarkistetaan uusista lokeroista
+                    ghost_hash.rebuild(ghosts)
+                    next_index = index + 1
+                    break
+            else:
+                return
+
+    def _eat_ghost(self, ghost: Ghost) -> None:
+        """Syö haamun ja anna pisteet."""
+        ghost.set_eaten()
+        self._award_ghost_points(*ghost.get_tile_position())
+
+    def _award_ghost_points(self, tile_x: int, tile_y: int) -> None:
+        """
+        Antaa syödystä haamusta ketjupisteet ja lähettää tapahtuman.
+
+        Args:
+            tile_x: Haamun ruutu x
+            tile_y: Haamun ruutu y
+        """
+        chain = self.ghost_chain_count
+        points = GHOST_CHAIN_POINTS[chain] if chain < len(GHOST_CHAIN_POINTS) else 0
+        self.score += points
+
+        center_x, center_y = tile_center_pixels(tile_x, tile_y)
+        self._emit(SimEventType.GHOST_EATEN, points, center_x, center_y, chain)
+
+        if chain < len(GHOST_CHAIN_POINTS):
+            self.ghost_chain_count += 1
+
+    def _player_die(self) -> None:
+        """Pelaaja kuolee."""
+        self.lives -= 1
+        self._emit(SimEventType.PLAYER_DIED, 0, self.player.x, self.player.y)
+
+        if self.lives <= 0:
+            self.game_over = True
+            self._emit(SimEventType.GAME_OVER)
+            return
+
+        self._respawn()
+
+        # Nollaa ketjupisteet ja moodiajastin
+        self.ghost_chain_count = 0
+        self._reset_mode_timer()
+
+    def _respawn(self) -> None:
+        """Palauttaa pelaajan ja haamut aloituspaikoilleen kuoleman jälkeen."""
+        spawn_x, spawn_y = self.level.get_player_spawn()
+        self.player.reset_position(spawn_x, spawn_y)
+
+        for ghost in self.ghosts:
+            ghost.reset_position()
@@ -0,0 +1,218 @@
+"""
+Pelitilan tiivis tilannekuva ja palautus (haku ja rollback).
+Koko muuttuva tila pakataan yhdeksi bytes-tietueeksi: pellettibitit, hahmojen positiot,
+suunnat, moodit, ajastimet, satunnaislähteen tila, pisteet, elämät ja moodi-indeksi.
+Palautus kirjoittaa arvot olemassa oleviin olioihin eikä luo uusia hahmoja.
+"""
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from constants import PELLET_CHAR, POWER_PELLET_CHAR, EMPTY_CHAR
+from ghost import GhostMode
+
+
+_MODES: List[GhostMode] = list(GhostMode)
+_MODE_CODES: Dict[GhostMode, int] = {mode: code for code, mode in enumerate(_MODES)}
+
+# Tietueen osat (little-endian, ei täytettä)
+# Simulaatio: score, lives, level, game_over, game_complete, mode_timer, mode_index,
+#             current_mode (0 = SCATTER, 1 = CHASE), ghost_chain_count, haamujen määrä
+_SIM = struct.Struct("<qiiBBdiBiB")
+# Pelaaja: fx, fy, prev_fx, prev_fy, move_remainder (alipikseleinä), speed,
+#          current_direction, desired_direction
+_PLAYER = struct.Struct("<iiiiidBB")
+# Haamu: fx, fy, prev_fx, prev_fy, move_remainder, speed_multiplier, fright_timer, eaten_home_timer,
+#        direction, mode
+_GHOST = struct.Struct("<iiiiidddBB")
+
+# Satunnaislähteen tyyppi tietueen lopussa
+_RNG_NONE: int = 0
+_RNG_MERSENNE: int = 1
+_RNG_PCG64: int = 2
+_MERSENNE = struct.Struct("<i625IBd")
+_PCG64 = struct.Struct("<QQQQiI")
+_MASK64: int = (1 << 64) - 1
+
+
+class SnapshotCodec:
+    """
+    Pakkaa ja purkaa Simulation-olion tilan.
+    Asettelu (kuljettavat ruudut) lasketaan kerran tasosta, joten samaa koodekkia
+    voi käyttää kaikkiin saman tasotiedoston peleihin.
+    """
+
+    def __init__(self, sim, include_rng: bool = True):
+        """
+        Alustaa koodekin simulaation tason perusteella.
+
+        Args:
+            sim: Simulation jonka tasoasettelua käytetään
+            include_rng: True = tallenna myös satunnaislähteen tila
+        """
+        level = sim.level
+        self.include_rng = include_rng
+        self.width = level.width
+        self.height = level.height
+
+        # Pelletit voivat olla vain kuljettavissa ruuduissa
+        self._tiles: List[Tuple[int, int]] = [
+            (x, y) for y in range(level.height) for x in range(level.width) if not level.is_wall(x, y)
+        ]
+        self._tile_index: Dict[Tuple[int, int], int] = {tile: i for i, tile in enumerate(self._tiles)}
+        self._bits = np.zeros(len(self._tiles), dtype=np.uint8)
+        self._pellet_bytes = (len(self._tiles) + 7) // 8
+
+    def capture(self, sim) -> bytes:
+        """
+        Ottaa tilannekuvan.
+
+        Args:
+            sim: Simulation
+
+        Returns:
+            Tila bytes-tietueena
+        """
+        parts = [
+            _SIM.pack(
+                sim.score, sim.lives, sim.current_level, sim.game_over, sim.game_complete,
+                sim.mode_timer, sim.mode_index, 0 if sim.current_mode == "SCATTER" else 1,
+                sim.ghost_chain_count, len(sim.ghosts)
+            ),
+            self._pack_tiles(sim.level.pellets),
+            self._pack_tiles(sim.level.power_pellets),
+        ]
+
+        player = sim.player
+        parts.append(_PLAYER.pack(
+            player.fx, player.fy, player.prev_fx, player.prev_fy, player.move_remainder, player.speed,
+            player.current_direction, player.desired_direction
+        ))
+
+        for ghost in sim.ghosts:
+            parts.append(_GHOST.pack(
+                ghost.fx, ghost.fy, ghost.prev_fx, ghost.prev_fy, ghost.move_remainder, ghost.speed_multiplier,
+                ghost.fright_timer, ghost.eaten_home_timer,
+                ghost.direction, _MODE_CODES[ghost.mode]
+            ))
+
+        parts.append(self._pack_rng(sim) if self.include_rng else bytes([_RNG_NONE]))
+        return b"".join(parts)
+
+    def restore(self, sim, data: bytes) -> None:
+        """
+        Palauttaa tilan tilannekuvasta olemassa oleviin olioihin.
+        Jos tilannekuva on eri tasolta (eri haamumäärä), taso ladataan ensin uudelleen.
+
+        Args:
+            sim: Simulation johon palautetaan
+            data: capture()-metodin palauttama tietue
+
+        Raises:
+            ValueError: Jos tietue on väärän kokoinen
+        """
+        (score, lives, current_level, game_over, game_complete, mode_timer, mode_index,
+         current_mode, chain, num_ghosts) = _SIM.unpack_from(data, 0)
+        offset = _SIM.size
+
+        expected = (offset + 2 * self._pellet_bytes + _PLAYER.size + num_ghosts * _GHOST.size + 1)
+        if len(data) < expected:
+            raise ValueError(f"Snapshot too short: {len(data)} bytes, expected at least {expected}")
+
+        if current_level != sim.current_level or num_ghosts != len(sim.ghosts):
+            sim.current_level = current_level
+            sim.load_level()
+
+        sim.score = score
+        sim.lives = lives
+        sim.game_over = bool(game_over)
+        sim.game_complete = bool(game_complete)
+        sim.mode_timer = mode_timer
+        sim.mode_index = mode_index
+        sim.current_mode = "SCATTER" if current_mode == 0 else "CHASE"
+        sim.ghost_chain_count = chain
+
+        level = sim.level
+        self._unpack_tiles(data, offset, level.pellets, level.grid, PELLET_CHAR)
+        offset += self._pellet_bytes
+        self._unpack_tiles(data, offset, level.power_pellets, level.grid, POWER_PELLET_CHAR)
+        offset += self._pellet_bytes
+
+        player = sim.player
+        (player.fx, player.fy, player.prev_fx, player.prev_fy, player.move_remainder, player.speed,
+         player.current_direction, player.desired_direction) = _PLAYER.unpack_from(data, offset)
+        offset += _PLAYER.size
+
+        for ghost in sim.ghosts:
+            (ghost.fx, ghost.fy, ghost.prev_fx, ghost.prev_fy, ghost.move_remainder, ghost.speed_multiplier,
+             ghost.fright_timer, ghost.eaten_home_timer,
+             ghost.direction, mode) = _GHOST.unpack_from(data, offset)
+            ghost.mode = _MODES[mode]
+            offset += _GHOST.size
+
+        self._unpack_rng(sim, data, offset)
+
+    def _pack_tiles(self, tiles) -> bytes:
+        """Pakkaa ruutujoukon bittikartaksi kuljettavien ruutujen järjestyksessä."""
+        bits = self._bits
+        bits.fill(0)
+        tile_index = self._tile_index
+        for tile in tiles:
+            bits[tile_index[tile]] = 1
+        return np.packbits(bits).tobytes()
+
+    def _unpack_tiles(self, data: bytes, offset: int, tiles: set, grid: List[List[str]], char: str) -> None:
+        """
+        Purkaa bittikartan ruutujoukkoon. Joukko ja ruudukko päivitetään vain muuttuneilta osin.
+        """
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=self._pellet_bytes, offset=offset),
+                             count=len(self._tiles))
+        all_tiles = self._tiles
+        target = {all_tiles[i] for i in np.flatnonzero(bits).tolist()}
+
+        for x, y in tiles - target:
+            grid[y][x] = EMPTY_CHAR
+        for x, y in target - tiles:
+            grid[y][x] = char
+        tiles.intersection_update(target)
+        tiles.update(target)
+
+    def _pack_rng(self, sim) -> bytes:
+        """Pakkaa satunnaislähteen tilan (random.Random tai StreamRandom)."""
+        rng = sim.rng
+        state = rng.getstate()
+        if isinstance(state, dict):
+            # NumPy PCG64 (StreamRandom)
+            inner = state["state"]
+            return bytes([_RNG_PCG64]) + _PCG64.pack(
+                inner["state"] & _MASK64, inner["state"] >> 64,
+                inner["inc"] & _MASK64, inner["inc"] >> 64,
+                state["has_uint32"], state["uinteger"]
+            )
+        version, words, gauss_next = state
+        return bytes([_RNG_MERSENNE]) + _MERSENNE.pack(
+            version, *words, gauss_next is not None, gauss_next or 0.0
+        )
+
+    def _unpack_rng(self, sim, data: bytes, offset: int) -> None:
+        """Palauttaa satunnaislähteen tilan, jos se on tallennettu."""
+        kind = data[offset]
+        offset += 1
+        if kind == _RNG_NONE:
+            return
+
+        rng = sim.rng
+        if kind == _RNG_PCG64:
+            state_low, state_high, inc_low, inc_high, has_uint32, uinteger = _PCG64.unpack_from(data, offset)
+            rng.setstate({
+                "bit_generator": "PCG64",
+                "state": {"state": state_low | (state_high << 64), "inc": inc_low | (inc_high << 64)},
+                "has_uint32": has_uint32,
+                "uinteger": uinteger,
+            })
+            return
+
+        values = _MERSENNE.unpack_from(data, offset)
+        has_gauss, gauss_next = values[-2], values[-1]
+        rng.setstate((values[0], values[1:-2], gauss_next if has_gauss else None))
@@ -0,0 +1,216 @@
+"""
+Ruutulokeroihin perustuva spatiaalinen hajautus törmäysten esikarsintaan.
+Entiteetit (joilla on x- ja y-attribuutit) tallennetaan indekseinä ruudun kokoisiin lokeroihin.
+Lokero vaihdetaan vain kun entiteetti ylittää ruudun rajan, ja kyselyt katsovat vain oman
+ja viereisten lokeroiden sisällön, joten törmäystarkistuksen hinta ei kasva haamujen määrän mukana.
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from constants import TILE
+
+
+# Lokeroavaimen rivikerroin: avain = cell_y * _ROW_STRIDE + cell_x (ei tuplea per kysely)
+_ROW_STRIDE: int = 1 << 16
+
+
+class SpatialHash:
+    """Entiteettilistan lokerot ja lähikyselyt."""
+
+    def __init__(self, cell_size: float = TILE):
+        """
+        Alustaa tyhjän hajautuksen.
+
+        Args:
+            cell_size: Lokeron koko pikseleinä (oletuksena yksi ruutu)
+        """
+        self.cell_size = cell_size
+        self._entities: Sequence = ()
+        self._buckets: Dict[int, List[int]] = {}
+        self._cell_of: List[int] = []
+
+    def _key(self, x: float, y: float) -> int:
+        """Palauttaa position lokeroavaimen."""
+        cell_size = self.cell_size
+        return int(y // cell_size) * _ROW_STRIDE + int(x // cell_size)
+
+    def rebuild(self, entities: Sequence) -> None:
+        """
+        Tyhjentää hajautuksen ja lisää entiteetit. Listaan viitataan, joten sen sisältöä
+        ei saa järjestää uudelleen ilman uutta rebuild-kutsua.
+
+        Args:
+            entities: Entiteetit (x, y -attribuutit)
+        """
+        self._entities = entities
+        self._buckets = {}
+        self._cell_of = []
+        for index, entity in enumerate(entities):
+            key = self._key(entity.x, entity.y)
+            self._cell_of.append(key)
+            self._buckets.setdefault(key, []).append(index)
+
+    def relocate(self, index: int) -> bool:
+        """
+        Siirtää yhden entiteetin nykyisen position lokeroon. Kutsutaan liikkeen jälkeen kun
+        entiteetti ylitti ruudun rajan, joten hinta riippuu ylityksistä eikä entiteettien määrästä.
+
+        Args:
+            index: Entiteetin indeksi
+
+        Returns:
+            True jos lokero vaihtui
+        """
+        entity = self._entities[index]
+        cell_size = self.cell_size
+        key = int(entity.y // cell_size) * _ROW_STRIDE + int(entity.x // cell_size)
+        old_key = self._cell_of[index]
+        if key == old_key:
+            return False
+        buckets = self._buckets
+        bucket = buckets[old_key]
+        bucket.remove(index)
+        if not bucket:
+            del buckets[old_key]
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [index]
+        else:
+            bucket.append(index)
+        self._cell_of[index] = key
+        return True
+
+    def update(self) -> int:
+        """
+        Tarkistaa kaikki entiteetit ja siirtää ruudun rajan ylittäneet uuteen lokeroon.
+        Käytetään kun liikkeen tekijä ei ilmoita ylityksiä relocate-kutsulla.
+
+        Returns:
+            Siirrettyjen entiteettien määrä
+        """
+        if len(self._cell_of) != len(self._entities):
+            self.rebuild(self._entities)
+            return len(self._entities)
+
+        cell_size = self.cell_size
+        buckets = self._buckets
+        cell_of = self._cell_of
+        moves = 0
+        for index, entity in enumerate(self._entities):
+            key = int(entity.y // cell_size) * _ROW_STRIDE + int(entity.x // cell_size)
+            old_key = cell_of[index]
+            if key != old_key:
+                bucket = buckets[old_key]
+                bucket.remove(index)
+                if not bucket:
+                    del buckets[old_key]
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = [index]
+                else:
+                    bucket.append(index)
+                cell_of[index] = key
+                moves += 1
+        return moves
+
+    def candidates(self, x: float, y: float, radius: float) -> List[int]:
+        """
+        Esikarsinta: entiteetit lokeroissa joihin radius-säteinen ympyrä voi ulottua.
+
+        Args:
+            x: Kyselypisteen x
+            y: Kyselypisteen y
+            radius: Kyselysäde pikseleinä
+
+        Returns:
+            Entiteettien indeksit nousevassa järjestyksessä (ei etäisyyssuodatusta)
+        """
+        cell_size = self.cell_size
+        buckets = self._buckets
+        span = math.ceil(radius / cell_size)
+        cell_x = int(x // cell_size)
+        cell_y = int(y // cell_size)
+        found: List[int] = []
+        for row in range(cell_y - span, cell_y + span + 1):
+            base = row * _ROW_STRIDE
+            for column in range(cell_x - span, cell_x + span + 1):
+                bucket = buckets.get(base + column)
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+    def within(self, x: float, y: float, radius: float) -> List[int]:
+        """
+        Entiteetit joiden etäisyys pisteeseen on alle radius (neliöetäisyys, ei neliöjuurta).
+
+        Args:
+            x: Kyselypisteen x
+            y: Kyselypisteen y
+            radius: Säde pikseleinä
+
+        Returns:
+            Entiteettien indeksit nousevassa järjestyksessä
+        """
+        entities = self._entities
+        radius_sq = radius * radius
+        hits = []
+        for index in self.candidates(x, y, radius):
+            entity = entities[index]
+            dx = entity.x - x
+            dy = entity.y - y
+            if dx * dx + dy * dy < radius_sq:
+                hits.append(index)
+        return hits
+
+    def pairs(self, radius: float) -> List[Tuple[int, int]]:
+        """
+        Entiteettiparit (i < j) joiden keskinäinen etäisyys on alle radius.
+        Jokainen lokero verrataan itseensä ja naapureihinsa vain kerran.
+
+        Args:
+            radius: Säde pikseleinä (enintään lokeron koko)
+
+        Returns:
+            Parit (i, j) järjestettynä
+        """
+        entities = self._entities
+        buckets = self._buckets
+        radius_sq = radius * radius
+        span = math.ceil(radius / self.cell_size)
+        # Puolet naapureista: sama rivi oikealle ja alemmat rivit (jokainen lokeropari kerran)
+        offsets = [row * _ROW_STRIDE + column
+                   for row in range(0, span + 1)
+                   for column in range(-span, span + 1)
+                   if row > 0 or column > 0]
+
+        found: List[Tuple[int, int]] = []
+        for key, bucket in buckets.items():
+            # Lokeron sisäiset parit
+            for position, i in enumerate(bucket):
+                first = entities[i]
+                for j in bucket[position + 1:]:
+                    second = entities[j]
+                    dx = first.x - second.x
+                    dy = first.y - second.y
+                    if dx * dx + dy * dy < radius_sq:
+                        found.append((i, j) if i < j else (j, i))
+            # Parit naapurilokeroiden kanssa
+            for offset in offsets:
+                other = buckets.get(key + offset)
+                if not other:
+                    continue
+                for i in bucket:
+                    first = entities[i]
+                    for j in other:
+                        second = entities[j]
+                        dx = first.x - second.x
+                        dy = first.y - second.y
+                        if dx * dx + dy * dy < radius_sq:
+                            found.append((i, j) if i < j else (j, i))
+        found.sort()
+        return found
+
+    def bucket_count(self) -> int:
+        """Palauttaa ei-tyhjien lokeroiden määrän."""
+        return len(self._buckets)
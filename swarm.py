@@ -0,0 +1,545 @@
+"""
+Parvitila: satoja tai tuhansia haamuja jaetuilla virtauskentillä.
+Haamut eivät aja omaa reitinhakuaan. Jokaiselle kohderuudulle (persoonan kotikulma, pelaajan
+ruutu, Pinkyn ennakointiruutu, kotiruutu) lasketaan yksi BFS-etäisyyskenttä ja siitä
+suuntataulukko (ruutu, nykyinen suunta) -> seuraava suunta, jota kaikki saman kohteen haamut
+lukevat. Sijainnit, suunnat, moodit ja ajastimet ovat NumPy-taulukoita ja päivitetään kerralla.
+"""
+from collections import OrderedDict, deque
+from typing import Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from constants import (
+    TILE, SCALE, ALL_DIRECTIONS, DIR_NONE, DIRECTION_DX, DIRECTION_DY, OPPOSITE_DIRECTION,
+    COLLISION_DISTANCE_SQ, FRIGHTENED_DURATION, FRIGHTENED_BLINK_LAST,
+    GHOST_COLORS, FRIGHTENED_BLUE, FRIGHTENED_BLINK
+)
+from batch_sim import MODE_SCATTER, MODE_CHASE, MODE_FRIGHTENED, MODE_EATEN, MODE_SPEEDS
+from level import Level
+from sim import Simulation, DEFAULT_LEVEL_FILE, GHOST_PERSONALITIES
+
+if TYPE_CHECKING:
+    import pygame
+
+
+# Etäisyys ruutuun johon ei päästä (äärellinen, jotta pakeneva haamu voi silti valita suunnan)
+_UNREACHABLE: float = 1e9
+
+# EATEN-tilan kotiinpaluuaika (kuten Ghost-luokassa)
+_EATEN_HOME_TIME: float = 3.0
+
+# Persoonatyypit: kohteen valinta jahdissa ja hajautuksessa
+_KIND_BLINKY: int = 0
+_KIND_PINKY: int = 1
+_KIND_OTHER: int = 2
+_KINDS: Dict[str, int] = {"blinky": _KIND_BLINKY, "pinky": _KIND_PINKY}
+
+# Aloitusruutujen vähimmäisetäisyys pelaajan aloitusruudusta (askelina)
+_MIN_PLAYER_DISTANCE: int = 6
+
+_DX = np.array(DIRECTION_DX, dtype=np.int64)
+_DY = np.array(DIRECTION_DY, dtype=np.int64)
+_OPPOSITE = np.array(OPPOSITE_DIRECTION, dtype=np.int64)
+
+
+class SwarmConfig(NamedTuple):
+    """Parvitilan asetukset."""
+    count: int = 1000
+    # Aloitusalueet (x0, y0, x1, y1) ruutuina, reunat mukaan lukien; tyhjä = G-ruutujen ympäristö
+    spawn_regions: Tuple[Tuple[int, int, int, int], ...] = ()
+    spawn_radius: int = 8               # BFS-säde G-ruuduista kun alueita ei anneta
+    personalities: Tuple[str, ...] = tuple(GHOST_PERSONALITIES)
+
+
+class FlowFields:
+    """Tason naapurigraafi ja kohderuuduittain välimuistitetut suuntataulukot."""
+
+    def __init__(self, level: Level, cache_size: int = 64):
+        """
+        Alustaa graafin.
+
+        Args:
+            level: Taso
+            cache_size: Montako suuntataulukkoa pidetään muistissa
+        """
+        self.level = level
+        self.width = level.width
+        self.height = level.height
+        count = self.width * self.height
+        self.cache_size = cache_size
+
+        tile_x = np.arange(count) % self.width
+        tile_y = np.arange(count) // self.width
+        self.open = np.array([level.is_valid_position(int(x), int(y)) for x, y in zip(tile_x, tile_y)],
+                             dtype=bool)
+
+        # Naapuri suunnittain (-1 = seinä); vaakasuunnassa tunneli kiertää reunan yli
+        self.neighbors = np.full((count, 4), -1, dtype=np.int64)
+        for code, (dx, dy) in enumerate(ALL_DIRECTIONS):
+            next_x = (tile_x + dx) % self.width
+            next_y = tile_y + dy
+            inside = (next_y >= 0) & (next_y < self.height)
+            index = np.where(inside, next_y, 0) * self.width + next_x
+            valid = self.open & inside & self.open[index]
+            self.neighbors[valid, code] = index[valid]
+        self._adjacency: List[List[int]] = [row[row >= 0].tolist() for row in self.neighbors]
+
+        self._tables: "OrderedDict[Tuple[int, bool], np.ndarray]" = OrderedDict()
+        self._nearest: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+        # Tilastot: laskettujen kenttien määrä
+        self.fields_computed: int = 0
+
+    def nearest_open(self, tile_x: int, tile_y: int) -> Tuple[int, int]:
+        """
+        Palauttaa lähimmän kuljettavan ruudun (kohde voi olla seinässä tai tason ulkopuolella).
+
+        Args:
+            tile_x: Ruutu x
+            tile_y: Ruutu y
+
+        Returns:
+            Kuljettava ruutu (x, y)
+        """
+        tile_x = min(max(tile_x, 0), self.width - 1)
+        tile_y = min(max(tile_y, 0), self.height - 1)
+        if self.open[tile_y * self.width + tile_x]:
+            return (tile_x, tile_y)
+        key = (tile_x, tile_y)
+        found = self._nearest.get(key)
+        if found is None:
+            found = key
+            for radius in range(1, max(self.width, self.height)):
+                ring = [(tile_x + dx, tile_y + dy)
+                        for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)
+                        if max(abs(dx), abs(dy)) == radius
+                        and 0 <= tile_x + dx < self.width and 0 <= tile_y + dy < self.height
+                        and self.open[(tile_y + dy) * self.width + tile_x + dx]]
+                if ring:
+                    found = min(ring, key=lambda tile: abs(tile[0] - tile_x) + abs(tile[1] - tile_y))
+                    break
+            self._nearest[key] = found
+        return found
+
+    def distance(self, tile: int) -> np.ndarray:
+        """
+        BFS-etäisyys ruudusta kaikkiin ruutuihin (graafi on symmetrinen, joten myös etäisyys ruutuun).
+
+        Args:
+            tile: Ruutuindeksi
+
+        Returns:
+            Etäisyydet askelina (_UNREACHABLE jos ei yhteyttä)
+        """
+        adjacency = self._adjacency
+        distance = [_UNREACHABLE] * len(adjacency)
+        distance[tile] = 0
+        queue = deque([tile])
+        while queue:
+            current = queue.popleft()
+            next_distance = distance[current] + 1
+            for neighbor in adjacency[current]:
+                if distance[neighbor] > next_distance:
+                    distance[neighbor] = next_distance
+                    queue.append(neighbor)
+        return np.array(distance, dtype=np.float64)
+
+    def table(self, target: Tuple[int, int], flee: bool = False) -> np.ndarray:
+        """
+        Suuntataulukko kohteeseen (tai siitä poispäin). Haamu ei käänny ympäri paitsi umpikujassa.
+
+        Args:
+            target: Kuljettava kohderuutu (x, y)
+            flee: True = valitse suunta joka vie kauimmaksi kohteesta
+
+        Returns:
+            Taulukko [ruutuindeksi, nykyinen suuntakoodi] -> uusi suuntakoodi
+        """
+        key = (target[1] * self.width + target[0], flee)
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            return table
+
+        distance = self.distance(key[0])
+        self.fields_computed += 1
+        neighbors = self.neighbors
+        valid = neighbors >= 0
+        score = np.where(valid, distance[np.maximum(neighbors, 0)], np.inf)
+        if flee:
+            score = np.where(valid, -score, np.inf)
+
+        count = len(neighbors)
+        rows = np.arange(count)
+        table = np.empty((count, DIR_NONE + 1), dtype=np.int8)
+        best = np.argmin(score, axis=1)
+        table[:, DIR_NONE] = np.where(np.isinf(score[rows, best]), DIR_NONE, best)
+        for current in range(DIR_NONE):
+            reverse = OPPOSITE_DIRECTION[current]
+            candidates = score.copy()
+            candidates[:, reverse] = np.inf
+            best = np.argmin(candidates, axis=1)
+            # Umpikuja: käänny ympäri; eristetty ruutu: pysy paikallaan
+            stuck = np.isinf(candidates[rows, best])
+            best[stuck] = np.where(valid[stuck, reverse], reverse, DIR_NONE)
+            table[:, current] = best
+
+        self._tables[key] = table
+        if len(self._tables) > self.cache_size:
+            self._tables.popitem(last=False)
+        return table
+
+
+class Swarm:
+    """Parven tila taulukkoina ja niiden yhteinen päivitys."""
+
+    def __init__(self, level: Level, config: SwarmConfig, rng, speed_multiplier: float = 1.0):
+        """
+        Alustaa parven ja sijoittaa haamut aloitusalueille.
+
+        Args:
+            level: Taso
+            config: Parven asetukset
+            rng: Pelin satunnaislähde (getrandbits); NumPy-generaattori siemennetään siitä
+            speed_multiplier: Tason nopeuskerroin
+
+        Raises:
+            ValueError: Jos aloitusalueilla ei ole kuljettavia ruutuja
+        """
+        self.level = level
+        self.config = config
+        self.fields = FlowFields(level)
+        self.speed_multiplier = speed_multiplier
+        self.count = config.count
+        self._np_rng = np.random.default_rng(rng.getrandbits(64))
+
+        tiles = self._spawn_tiles()
+        order = self._np_rng.permutation(len(tiles))
+        spawn = np.array(tiles, dtype=np.int64)[order[np.arange(self.count) % len(tiles)]]
+        self.spawn_x = (spawn[:, 0] * TILE + TILE // 2).astype(np.float64)
+        self.spawn_y = (spawn[:, 1] * TILE + TILE // 2).astype(np.float64)
+
+        indices = np.arange(self.count)
+        personalities = config.personalities
+        self.kind = np.array([_KINDS.get(personalities[i % len(personalities)], _KIND_OTHER)
+                              for i in range(self.count)], dtype=np.int64)
+        self.color_index = indices % len(GHOST_COLORS)
+
+        self._home = self.fields.nearest_open(*level.ghost_home_tile())
+        self._corners = (
+            self.fields.nearest_open(level.width - 1, 0),    # Blinky: ylä-oikea
+            self.fields.nearest_open(0, 0),                  # Pinky: ylä-vasen
+            self.fields.nearest_open(0, level.height - 1),   # Muut: ala-vasen
+        )
+        self._sprites: Dict[int, list] = {}
+
+        # Tilastot: suunnanvalinnat viimeisimmällä askeleella
+        self.decisions: int = 0
+        self.reset_positions("SCATTER")
+
+    def _spawn_tiles(self) -> List[Tuple[int, int]]:
+        """Kuljettavat aloitusruudut asetusten mukaan (ei aivan pelaajan vierestä)."""
+        fields = self.fields
+        width = fields.width
+        player_x, player_y = self.level.get_player_spawn()
+        player_distance = fields.distance(player_y * width + player_x)
+
+        if self.config.spawn_regions:
+            candidates = [(x, y) for x0, y0, x1, y1 in self.config.spawn_regions
+                          for y in range(max(y0, 0), min(y1, fields.height - 1) + 1)
+                          for x in range(max(x0, 0), min(x1, width - 1) + 1)
+                          if fields.open[y * width + x]]
+        else:
+            # G-ruutujen ympäristö spawn_radius askeleen säteellä
+            distance = np.full(len(fields.open), _UNREACHABLE)
+            for spawn_x, spawn_y in self.level.get_ghost_spawns():
+                distance = np.minimum(distance, fields.distance(spawn_y * width + spawn_x))
+            candidates = [(int(index % width), int(index // width))
+                          for index in np.nonzero(distance <= self.config.spawn_radius)[0]]
+
+        tiles = sorted(set(tile for tile in candidates
+                           if player_distance[tile[1] * width + tile[0]] >= _MIN_PLAYER_DISTANCE))
+        if not tiles:
+            raise ValueError("Swarm spawn regions contain no open tiles away from the player")
+        return tiles
+
+    def reset_positions(self, global_mode: str) -> None:
+        """
+        Palauttaa haamut aloitusruutuihin SCATTER/CHASE-tilaan satunnaisin suunnin.
+
+        Args:
+            global_mode: Simulaation nykyinen moodi ("SCATTER" tai "CHASE")
+        """
+        self.x = self.spawn_x.copy()
+        self.y = self.spawn_y.copy()
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self.direction = self._np_rng.integers(0, DIR_NONE, self.count)
+        mode = MODE_SCATTER if global_mode == "SCATTER" else MODE_CHASE
+        self.mode = np.full(self.count, mode, dtype=np.int64)
+        self.fright_timer = np.zeros(self.count)
+        self.eaten_timer = np.zeros(self.count)
+        self._global_mode = global_mode
+
+    def set_frightened(self) -> None:
+        """Power-pelletti: muut kuin syödyt haamut pelästyvät ja kääntyvät."""
+        frightened = self.mode != MODE_EATEN
+        self.mode[frightened] = MODE_FRIGHTENED
+        self.fright_timer[frightened] = FRIGHTENED_DURATION
+        self.direction[frightened] = _OPPOSITE[self.direction[frightened]]
+
+    def update(self, dt: float, sim: Simulation) -> None:
+        """
+        Päivittää kaikki haamut yhdellä askeleella.
+        Ruudun keskustan saavuttava haamu keskitetään, valitsee uuden suunnan taulukosta
+        ja kulkee askeleen loppumatkan uuteen suuntaan. Pitkällä askeleella matka voi ohittaa
+        useita keskipisteitä, ja jokaisessa valitaan suunta erikseen.
+
+        Args:
+            dt: Aika-askel
+            sim: Simulaatio (pelaaja ja globaali moodi)
+        """
+        x, y = self.x, self.y
+        self.prev_x[:] = x
+        self.prev_y[:] = y
+        mode = self.mode
+        global_code = MODE_SCATTER if sim.current_mode == "SCATTER" else MODE_CHASE
+
+        # Moodin vaihtuessa SCATTER/CHASE-haamut kääntyvät
+        if sim.current_mode != self._global_mode:
+            self._global_mode = sim.current_mode
+            switching = (mode == MODE_SCATTER) | (mode == MODE_CHASE)
+            mode[switching] = global_code
+            self.direction[switching] = _OPPOSITE[self.direction[switching]]
+
+        # Ajastimet
+        frightened = mode == MODE_FRIGHTENED
+        self.fright_timer[frightened] -= dt
+        ended = frightened & (self.fright_timer <= 0)
+        mode[ended] = global_code
+        self.fright_timer[ended] = 0.0
+        eaten = mode == MODE_EATEN
+        self.eaten_timer[eaten] -= dt
+        ended = eaten & (self.eaten_timer <= 0)
+        mode[ended] = global_code
+        self.eaten_timer[ended] = 0.0
+
+        # Liike ruudukon akseleilla
+        step = MODE_SPEEDS[mode] * (self.speed_multiplier * dt)
+        tile_x = (x // TILE).astype(np.int64)
+        tile_y = (y // TILE).astype(np.int64)
+        center_x = tile_x * TILE + TILE // 2
+        center_y = tile_y * TILE + TILE // 2
+        direction = self.direction
+        dx = _DX[direction]
+        dy = _DY[direction]
+        offset = (x - center_x) * dx + (y - center_y) * dy
+        reaching = (offset <= 0) & (offset + step >= 0)
+
+        passing = ~reaching
+        x[passing] += dx[passing] * step[passing]
+        y[passing] += dy[passing] * step[passing]
+
+        # Suunnanvalinnat keskipiste kerrallaan kunnes askeleen matka on käytetty
+        width = self.fields.width
+        index = np.nonzero(reaching)[0]
+        remaining = offset[index] + step[index]
+        tile_x = tile_x[index]
+        tile_y = tile_y[index]
+        decisions = 0
+        while len(index):
+            decisions += len(index)
+            new_direction = self._decide(index, tile_y * width + tile_x, sim)
+            direction[index] = new_direction
+            dx = _DX[new_direction]
+            dy = _DY[new_direction]
+            onward = (remaining >= TILE) & (new_direction != DIR_NONE)
+            done = ~onward
+            x[index[done]] = tile_x[done] * TILE + TILE // 2 + dx[done] * remaining[done]
+            y[index[done]] = tile_y[done] * TILE + TILE // 2 + dy[done] * remaining[done]
+            index = index[onward]
+            remaining = remaining[onward] - TILE
+            tile_x = (tile_x[onward] + dx[onward]) % width
+            tile_y = tile_y[onward] + dy[onward]
+        self.decisions = decisions
+
+        # Tunneli
+        np.mod(x, self.fields.width * TILE, out=x)
+
+    def _decide(self, index: np.ndarray, tiles: np.ndarray, sim: Simulation) -> np.ndarray:
+        """Valitsee uudet suunnat ryhmittäin (moodi, persoonatyyppi) jaetuista taulukoista."""
+        current = self.direction[index]
+        keys = self.mode[index] * 3 + self.kind[index]
+        result = np.empty(len(index), dtype=np.int64)
+        for key in np.unique(keys):
+            selected = keys == key
+            table = self._table(int(key) // 3, int(key) % 3, sim)
+            result[selected] = table[tiles[selected], current[selected]]
+        return result
+
+    def _table(self, mode: int, kind: int, sim: Simulation) -> np.ndarray:
+        """Palauttaa moodin ja persoonatyypin suuntataulukon."""
+        fields = self.fields
+        player = sim.player
+        player_tile = fields.nearest_open(int(player.x // TILE) % fields.width, int(player.y // TILE))
+
+        if mode == MODE_EATEN:
+            return fields.table(self._home)
+        if mode == MODE_FRIGHTENED:
+            return fields.table(player_tile, flee=True)
+        if mode == MODE_SCATTER:
+            return fields.table(self._corners[kind])
+        if kind == _KIND_PINKY:
+            # Pinky: 4 ruutua pelaajan suuntaan
+            direction = player.current_direction
+            return fields.table(fields.nearest_open(player_tile[0] + DIRECTION_DX[direction] * 4,
+                                                    player_tile[1] + DIRECTION_DY[direction] * 4))
+        return fields.table(player_tile)
+
+    def collisions(self, player_x: float, player_y: float) -> np.ndarray:
+        """
+        Haamut jotka koskettavat pelaajaa (syödyt ohitetaan).
+
+        Args:
+            player_x: Pelaajan x
+            player_y: Pelaajan y
+
+        Returns:
+            Haamujen indeksit nousevassa järjestyksessä
+        """
+        distance_sq = (self.x - player_x) ** 2 + (self.y - player_y) ** 2
+        return np.nonzero((distance_sq < COLLISION_DISTANCE_SQ) & (self.mode != MODE_EATEN))[0]
+
+    def eat(self, index: int) -> Tuple[int, int]:
+        """
+        Asettaa haamun EATEN-tilaan.
+
+        Args:
+            index: Haamun indeksi
+
+        Returns:
+            Haamun ruutu (x, y)
+        """
+        self.mode[index] = MODE_EATEN
+        self.eaten_timer[index] = _EATEN_HOME_TIME
+        self.fright_timer[index] = 0.0
+        return (int(self.x[index] // TILE), int(self.y[index] // TILE))
+
+    def _sprite_sheet(self, scale: int) -> list:
+        """Esipiirretyt haamukuvat: värit, pelästynyt, vilkkuva ja syödyt värit (kuten Ghost.draw)."""
+        sprites = self._sprites.get(scale)
+        if sprites is not None:
+            return sprites
+        import pygame
+
+        radius = 6 * scale
+        size = 2 * radius + 1
+
+        def sprite(color, eyes: bool) -> "pygame.Surface":
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            if eyes:
+                offset = 2 * scale
+                for eye_x in (radius - offset, radius + offset):
+                    pygame.draw.circle(surface, (255, 255, 255), (eye_x, radius - offset), 2 * scale)
+                    pygame.draw.circle(surface, (0, 0, 0), (eye_x, radius - offset), scale)
+            return surface
+
+        sprites = [sprite(color, True) for color in GHOST_COLORS]
+        sprites += [sprite(FRIGHTENED_BLUE, True), sprite(FRIGHTENED_BLINK, True)]
+        sprites += [sprite((r // 3, g // 3, b // 3), False) for r, g, b in GHOST_COLORS]
+        self._sprites[scale] = sprites
+        return sprites
+
+    def draw(self, surface: "pygame.Surface", alpha: float = 1.0, scale: int = SCALE) -> None:
+        """
+        Piirtää parven yhdellä blits-kutsulla.
+
+        Args:
+            surface: Pinta jolle piirretään
+            alpha: Interpolaatiokerroin edellisen ja nykyisen askeleen välillä
+            scale: Renderöinnin skaalauskerroin
+        """
+        sprites = self._sprite_sheet(scale)
+        radius = 6 * scale
+
+        # Interpolaatio; tunnelihypyt piirretään suoraan uuteen paikkaan
+        draw_x = self.prev_x + (self.x - self.prev_x) * alpha
+        draw_y = self.prev_y + (self.y - self.prev_y) * alpha
+        jumped = np.abs(self.x - self.prev_x) > TILE
+        draw_x[jumped] = self.x[jumped]
+        left = (draw_x * scale).astype(np.int64) - radius
+        top = (draw_y * scale).astype(np.int64) - radius
+
+        mode = self.mode
+        sprite = self.color_index.copy()
+        frightened = mode == MODE_FRIGHTENED
+        blinking = frightened & (self.fright_timer <= FRIGHTENED_BLINK_LAST) & (
+            (self.fright_timer / 0.2).astype(np.int64) % 2 == 1)
+        sprite[frightened] = len(GHOST_COLORS)
+        sprite[blinking] = len(GHOST_COLORS) + 1
+        eaten = mode == MODE_EATEN
+        sprite[eaten] = len(GHOST_COLORS) + 2 + self.color_index[eaten]
+
+        surface.blits([(sprites[s], (l, t)) for s, l, t in zip(sprite.tolist(), left.tolist(), top.tolist())],
+                      False)
+
+
+class SwarmSimulation(Simulation):
+    """Simulaatio jossa tavalliset haamut on korvattu parvella."""
+
+    def __init__(self, config: SwarmConfig = SwarmConfig(), level_file: str = DEFAULT_LEVEL_FILE, **kwargs):
+        """
+        Alustaa parvisimulaation.
+
+        Args:
+            config: Parven asetukset
+            level_file: Tason tiedoston polku
+            **kwargs: Muut Simulation-parametrit
+        """
+        self.swarm_config = config
+        self.swarm: Optional[Swarm] = None
+        super().__init__(level_file, **kwargs)
+
+    def _spawn_ghosts(self, speed_multiplier: float) -> None:
+        """Luo parven; G-ruudut jäävät aloitusalueiksi eivätkä muutu pelleteiksi."""
+        self.ghosts = []
+        self.ghost_hash.rebuild(self.ghosts)
+        self.swarm = Swarm(self.level, self.swarm_config, self.rng, speed_multiplier)
+        self.level.set_active_ghosts(len(self.level.get_ghost_spawns()))
+        if self.verbose:
+            print(f"Level {self.current_level}: Created a swarm of {self.swarm.count} ghosts")
+
+    def _update_ghosts(self, dt: float) -> None:
+        """Päivittää parven."""
+        self.swarm.update(dt, self)
+
+    def _check_collisions(self) -> None:
+        """Pelaajan ja parven kosketukset haamujen järjestyksessä."""
+        swarm = self.swarm
+        for index in swarm.collisions(self.player.x, self.player.y).tolist():
+            if swarm.mode[index] == MODE_FRIGHTENED:
+                self._award_ghost_points(*swarm.eat(index))
+            else:
+                self._player_die()
+                return
+
+    def _on_power_pellet_eaten(self) -> None:
+        """Power-pelletti pelästyttää myös parven."""
+        super()._on_power_pellet_eaten()
+        self.swarm.set_frightened()
+
+    def _player_die(self) -> None:
+        """Kuolema palauttaa myös parven aloitusalueille."""
+        super()._player_die()
+        if not self.game_over:
+            self.swarm.reset_positions(self.current_mode)
+
+    def snapshot(self) -> bytes:
+        """Parven tilaa ei pakata tilannekuviin."""
+        raise NotImplementedError("Snapshots are not supported in swarm mode")
+
+    def restore(self, data: bytes) -> None:
+        """Parven tilaa ei pakata tilannekuviin."""
+        raise NotImplementedError("Snapshots are not supported in swarm mode")
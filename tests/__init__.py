@@ -0,0 +1,4 @@
+"""
+Pariteetti- ja determinismitestit (pytest).
+Ajetaan projektin juuresta: python -m pytest
+"""
@@ -0,0 +1,5 @@
+"""Yhteiset asetukset: pygame ilman näyttöä ja äänilaitetta."""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
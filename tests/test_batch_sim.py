@@ -0,0 +1,46 @@
+"""BatchSimulation pelaa samat pelit kuin skalaarinen Simulation tikki tikiltä."""
+import numpy as np
+
+from batch_sim import (
+    BatchSimulation, NO_INPUT, MODE_SCATTER, MODE_CHASE, MODE_FRIGHTENED, MODE_EATEN
+)
+from constants import ALL_DIRECTIONS
+from ghost import GhostMode
+from rng import StreamRandom
+from sim import Simulation
+
+_MODE_CODES = {GhostMode.SCATTER: MODE_SCATTER, GhostMode.CHASE: MODE_CHASE,
+               GhostMode.FRIGHTENED: MODE_FRIGHTENED, GhostMode.EATEN: MODE_EATEN}
+
+
+def _state(batch: BatchSimulation, game: int, ghosts: int):
+    """Erän pelin tila vertailumuodossa (ghosts = skalaaripelin haamujen määrä tällä tasolla)."""
+    return (int(batch.score[game]), int(batch.lives[game]), int(batch.current_level[game]),
+            bool(batch.game_over[game]), int(batch.pellets_left[game]),
+            int(batch.player_x[game]), int(batch.player_y[game]),
+            [(int(batch.ghost_x[game, slot]), int(batch.ghost_y[game, slot]), int(batch.ghost_mode[game, slot]),
+              int(batch.ghost_dir[game, slot])) for slot in range(ghosts)])
+
+
+def _scalar_state(sim: Simulation):
+    """Skalaarisen pelin tila samassa muodossa."""
+    return (sim.score, max(sim.lives, 0), sim.current_level, sim.game_over, sim.level.pellets_left(),
+            sim.player.fx, sim.player.fy,
+            [(ghost.fx, ghost.fy, _MODE_CODES[ghost.mode], ghost.direction) for ghost in sim.ghosts])
+
+
+def test_batch_matches_scalar_games():
+    seeds = list(range(8))
+    batch = BatchSimulation(len(seeds), seeds)
+    scalars = [Simulation(rng=StreamRandom(seed)) for seed in seeds]
+    inputs = np.random.default_rng(10_000)
+    dt = 1.0 / 60.0
+
+    for tick in range(3000):
+        codes = np.where(inputs.random(len(seeds)) < 0.05, inputs.integers(0, 4, len(seeds)), NO_INPUT)
+        for game, scalar in enumerate(scalars):
+            code = int(codes[game])
+            scalar.step(dt, ALL_DIRECTIONS[code] if code != NO_INPUT else None)
+        batch.step(dt, codes)
+        for game, scalar in enumerate(scalars):
+            assert _state(batch, game, len(scalar.ghosts)) == _scalar_state(scalar), f"tick {tick}, game {game}"
@@ -0,0 +1,27 @@
+"""EcsSimulation (prototyyppi) tuottaa samat tapahtumat ja tilannekuvat kuin Simulation."""
+import random
+
+import pytest
+
+from constants import ALL_DIRECTIONS
+from controllers import AutopilotController
+from ecs import EcsSimulation
+from sim import Simulation
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_ecs_matches_simulation(seed):
+    scalar = Simulation(seed=seed)
+    ecs = EcsSimulation(seed=seed)
+    controller = AutopilotController()
+    inputs = random.Random(seed + 10_000)
+    dt = 1.0 / 60.0
+    for tick in range(4000):
+        # Botti pelaa (tasot vaihtuvat), satunnaiset syötteet sekoittavat
+        direction = controller.next_direction(scalar)
+        if inputs.random() < 0.05:
+            direction = inputs.choice(ALL_DIRECTIONS)
+        assert scalar.step(dt, direction) == ecs.step(dt, direction), f"events at tick {tick}"
+        assert scalar.snapshot() == ecs.snapshot(), f"state at tick {tick}"
+        if scalar.game_over or scalar.game_complete:
+            break
@@ -0,0 +1,34 @@
+"""Siemennetyt vektoriympäristöt pysyvät identtisinä myös automaattisten resetien yli."""
+import hashlib
+
+import numpy as np
+
+from env import MazeChompEnv, VectorEnv, NUM_ACTIONS
+
+
+def _digest(envs: int, steps: int) -> str:
+    digest = hashlib.sha256()
+    actions = np.random.default_rng(0)
+    # Lyhyet jaksot, jotta automaattinen reset tapahtuu monta kertaa
+    with VectorEnv(envs, 2, max_steps=100) as vec_env:
+        digest.update(vec_env.reset(seeds=range(envs)).tobytes())
+        for _ in range(steps):
+            obs, rewards, _, _ = vec_env.step(actions.integers(NUM_ACTIONS, size=envs))
+            digest.update(obs.tobytes())
+            digest.update(rewards.tobytes())
+    return digest.hexdigest()
+
+
+def test_seeded_vector_envs_are_reproducible():
+    assert _digest(4, 350) == _digest(4, 350)
+
+
+def test_single_env_reset_with_seed_repeats_episode():
+    env = MazeChompEnv()
+    episodes = []
+    for _ in range(2):
+        observations = [env.reset(seed=7)[0]]
+        for step in range(200):
+            observations.append(env.step(step % NUM_ACTIONS)[0])
+        episodes.append(np.stack(observations))
+    assert np.array_equal(episodes[0], episodes[1])
@@ -0,0 +1,46 @@
+"""EventDrivenRunner päätyy samaan tilaan kuin Simulation.step tikki kerrallaan."""
+import pytest
+
+from event_sim import EventDrivenRunner
+from sim import Simulation
+from tournament import greedy_bot
+
+
+def _state(sim: Simulation):
+    return (sim.score, sim.lives, sim.current_level, sim.game_over, sim.mode_index,
+            sim.player.fx, sim.player.fy, sim.player.current_direction,
+            tuple((g.fx, g.fy, g.direction, g.mode, g.fright_timer, g.eaten_home_timer) for g in sim.ghosts))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_event_driven_matches_fixed_steps(seed):
+    # Greedy-botti kutsutaan vain tapahtumatikeillä; samat syötteet ajetaan tikki kerrallaan
+    event_sim = Simulation(seed=seed)
+    runner = EventDrivenRunner(event_sim)
+    inputs = {}
+    checkpoints = {}
+
+    def on_tick(tick, direction):
+        inputs[tick] = direction
+        checkpoints[tick] = _state(event_sim)
+
+    runner.run(lambda sim: greedy_bot(sim, None), 20000, on_tick)
+
+    tick_sim = Simulation(seed=seed)
+    for tick in range(runner.ticks):
+        if tick in checkpoints:
+            assert _state(tick_sim) == checkpoints[tick], f"before tick {tick}"
+        tick_sim.step(runner.dt, inputs.get(tick))
+    assert _state(tick_sim) == _state(event_sim)
+    assert runner.events < runner.ticks
+
+
+def test_idle_game_matches_fixed_steps():
+    # Ilman syötteitä useimmat tikit ovat hiljaisia ja ajetaan kevyellä polulla
+    event_sim = Simulation(seed=0)
+    runner = EventDrivenRunner(event_sim)
+    runner.run(None, 20000)
+    tick_sim = Simulation(seed=0)
+    for _ in range(runner.ticks):
+        tick_sim.step(runner.dt)
+    assert tick_sim.snapshot() == event_sim.snapshot()
@@ -0,0 +1,33 @@
+"""Kiinteällä jatkomäärällä ennakoiva botti on toistettava eikä muuta pelin tilaa haun aikana."""
+from lookahead import LookaheadController
+from sim import Simulation
+
+
+def _play(ticks: int):
+    sim = Simulation(seed=5)
+    controller = LookaheadController(rollouts=8, horizon=60)
+    inputs = []
+    for _ in range(ticks):
+        direction = controller.next_direction(sim)
+        inputs.append(direction)
+        sim.step(1.0 / 60.0, direction)
+        if sim.game_over:
+            break
+    return sim, inputs
+
+
+def test_fixed_rollouts_are_reproducible():
+    first, first_inputs = _play(900)
+    second, second_inputs = _play(900)
+    assert first_inputs == second_inputs
+    assert first.snapshot() == second.snapshot()
+
+
+def test_search_leaves_the_game_unchanged():
+    # Samat syötteet ilman hakua antavat saman tilan: rollouts palauttavat tilan aina
+    searched, inputs = _play(900)
+    reference = Simulation(seed=5)
+    for direction in inputs:
+        reference.step(1.0 / 60.0, direction)
+    assert reference.snapshot() == searched.snapshot()
+    assert reference.state_hash == searched.state_hash
@@ -0,0 +1,40 @@
+"""Ruudukkoliike ei riipu aika-askeleesta: karkea askel ja 60 Hz tikit kulkevat samat reitit."""
+import random
+
+import pytest
+
+from constants import SIM_TICK_RATE, ALL_DIRECTION_CODES
+from ghost import Ghost
+from level import Level
+from player import Player
+from sim import DEFAULT_LEVEL_FILE, GHOST_PERSONALITIES
+
+SECONDS = 60.0
+TURN_EVERY = 6.0  # Pelaajan suunnanvaihtojen väli sekunteina (jokaisen askeleen monikerta)
+
+
+def _run(dt: float, samples: int, sample_every: int):
+    """Pelaaja vaihtaa haluttua suuntaa TURN_EVERY sekunnin välein, haamut ovat SCATTER-tilassa."""
+    level = Level(DEFAULT_LEVEL_FILE)
+    player = Player(*level.get_player_spawn())
+    ghosts = [Ghost(x, y, i, GHOST_PERSONALITIES[i % len(GHOST_PERSONALITIES)], random.Random(i))
+              for i, (x, y) in enumerate(level.get_ghost_spawns())]
+    path = []
+    steps_per_turn = round(TURN_EVERY / dt)
+    for step in range(samples * sample_every):
+        if step % steps_per_turn == 0:
+            player.desired_direction = ALL_DIRECTION_CODES[(step // steps_per_turn) % 4]
+        player.update(dt, level)
+        for ghost in ghosts:
+            ghost.update(dt, level, player.get_position(), player.current_direction, "SCATTER")
+        if (step + 1) % sample_every == 0:
+            path.append([(player.fx, player.fy)] + [(ghost.fx, ghost.fy) for ghost in ghosts]
+                        + [level.pellets_left()])
+    return path
+
+
+@pytest.mark.parametrize("dt", [0.1, 0.25, 0.3, 1.0, 1.5, 2.0])
+def test_coarse_timestep_follows_fine_path(dt):
+    ratio = round(dt * SIM_TICK_RATE)
+    samples = int(SECONDS / dt)
+    assert _run(dt, samples, 1) == _run(1.0 / SIM_TICK_RATE, samples, ratio)
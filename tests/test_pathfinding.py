@@ -0,0 +1,69 @@
+"""plan_ghost_moves antaa jokaiselle kyselylle saman vastauksen kuin haamukohtainen next_step."""
+import os
+import random
+
+from constants import ALL_DIRECTIONS, TILE, SIM_TICK_RATE
+from ghost import Ghost, GhostMode
+from level import Level
+from pathfinding import MoveRequest, next_step, plan_ghost_moves, prepare_planning
+from sim import DEFAULT_LEVEL_FILE
+from benchmarks.mazes import generate_maze, write_maze
+
+
+def _open_tiles(level: Level):
+    return [(x, y) for y in range(level.height) for x in range(level.width) if level.is_valid_position(x, y)]
+
+
+def test_plan_matches_next_step_for_every_start():
+    level = Level(DEFAULT_LEVEL_FILE)
+    tiles = _open_tiles(level)
+    rng = random.Random(0)
+    goals = rng.sample(tiles, 6) + [(-3, 0), (level.width + 2, level.height + 5)]
+    requests = [MoveRequest(start, goal, forbid)
+                for goal in goals for start in tiles for forbid in (None,) + tuple(ALL_DIRECTIONS)]
+    plan = plan_ghost_moves(level, requests)
+    assert plan.directions == [next_step(level, *request) for request in requests]
+
+
+def test_unreachable_starts_get_none(tmp_path):
+    # Oikean reunan tasku (x = 5) on suljettu muulta tasolta
+    path = tmp_path / "pocket.txt"
+    path.write_text("#######\n#P..#.#\n#.G.#.#\n#######\n", encoding="utf-8")
+    level = Level(str(path))
+    prepare_planning(level)
+    requests = [MoveRequest((5, 1), (1, 1), None), MoveRequest((5, 2), (2, 2), (0, 1)),
+                MoveRequest((3, 2), (1, 1), None)]
+    plan = plan_ghost_moves(level, requests)
+    assert plan.directions == [next_step(level, *request) for request in requests]
+    assert plan.directions[:2] == [None, None]
+
+
+def test_batched_ghosts_match_per_ghost_ghosts():
+    path = write_maze(generate_maze(41, 31, seed=0))
+    try:
+        level = Level(path)
+    finally:
+        os.remove(path)
+    tiles = _open_tiles(level)
+    player_x, player_y = level.get_player_spawn()
+    player_pos = ((player_x + 0.5) * TILE, (player_y + 0.5) * TILE)
+    dt = 1.0 / SIM_TICK_RATE
+
+    def run(batched: bool):
+        rng = random.Random(0)
+        ghosts = [Ghost(*rng.choice(tiles), i % 4, ("blinky", "pinky", "clyde")[i % 3], rng) for i in range(32)]
+        for tick in range(600):
+            mode = "SCATTER" if (tick // 200) % 2 == 0 else "CHASE"
+            if tick % 200 == 0:
+                for ghost in ghosts:
+                    ghost.set_mode(GhostMode.SCATTER if mode == "SCATTER" else GhostMode.CHASE)
+            planned = None
+            if batched:
+                requests = [request for request in (ghost.upcoming_request(dt, level, player_pos, 0, mode)
+                                                    for ghost in ghosts) if request is not None]
+                planned = dict(zip(requests, plan_ghost_moves(level, requests).directions))
+            for ghost in ghosts:
+                ghost.update(dt, level, player_pos, 0, mode, planned=planned)
+        return [(ghost.fx, ghost.fy, ghost.direction) for ghost in ghosts]
+
+    assert run(True) == run(False)
@@ -0,0 +1,49 @@
+"""SpatialHash-kyselyt ja -parit ovat samat kuin kaikkien entiteettien läpikäynnillä."""
+import random
+
+import pytest
+
+from constants import TILE, COLLISION_DISTANCE
+from spatial_hash import SpatialHash
+
+
+class _Point:
+    """Liikkuva testipiste."""
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+def _brute_force_pairs(points, radius: float):
+    radius_sq = radius * radius
+    return [(i, j) for i in range(len(points)) for j in range(i + 1, len(points))
+            if (points[i].x - points[j].x) ** 2 + (points[i].y - points[j].y) ** 2 < radius_sq]
+
+
+@pytest.mark.parametrize("count", [10, 100, 500])
+def test_queries_match_brute_force(count):
+    rng = random.Random(count)
+    extent = 40 * TILE
+    radius = COLLISION_DISTANCE
+    points = [_Point(rng.uniform(0, extent), rng.uniform(0, extent)) for _ in range(count)]
+    steps = [(rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(count)]
+    spatial = SpatialHash()
+    spatial.rebuild(points)
+    player = _Point(extent / 2, extent / 2)
+
+    for _ in range(100):
+        for index, (point, (dx, dy)) in enumerate(zip(points, steps)):
+            tile = (int(point.x // TILE), int(point.y // TILE))
+            point.x = min(max(point.x + dx, 0.0), extent - 1)
+            point.y = min(max(point.y + dy, 0.0), extent - 1)
+            # Liikkeen tekijä ilmoittaa vain ruudun rajan ylittäneet (kuten Simulation)
+            if (int(point.x // TILE), int(point.y // TILE)) != tile:
+                spatial.relocate(index)
+        expected = [index for index, point in enumerate(points)
+                    if (point.x - player.x) ** 2 + (point.y - player.y) ** 2 < radius * radius]
+        assert spatial.within(player.x, player.y, radius) == expected
+
+    assert spatial.update() == 0
+    assert spatial.pairs(radius) == _brute_force_pairs(points, radius)
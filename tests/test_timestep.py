@@ -0,0 +1,73 @@
+"""Kokonaiset pelit 0,1 s:n askelilla päätyvät samoihin tapahtumiin ja tiloihin kuin 60 Hz -ajo."""
+import numpy as np
+import pytest
+
+from batch_sim import BatchSimulation, NO_INPUT
+from sim import Simulation, SimEventType
+from tournament import greedy_bot
+
+_FINE_DT = 1.0 / 60.0
+_COARSE_DT = 0.1
+_TICKS_PER_STEP = 6
+_MAX_STEPS = 3000
+
+
+def _state(sim: Simulation):
+    return (sim.score, sim.lives, sim.current_level, sim.game_over, sim.game_complete, sim.mode_index,
+            sim.player.fx, sim.player.fy, sim.player.current_direction,
+            tuple((g.fx, g.fy, g.direction, g.mode, g.fright_timer, g.eaten_home_timer) for g in sim.ghosts))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_coarse_steps_match_60hz_games(seed):
+    # Botti päättää 0,1 s välein; hieno ajo saa saman syötteen kuuden tikin ensimmäisellä
+    coarse = Simulation(seed=seed)
+    fine = Simulation(seed=seed)
+    coarse_events = []
+    fine_events = []
+
+    for step in range(_MAX_STEPS):
+        if coarse.game_over or coarse.game_complete:
+            break
+        direction = greedy_bot(coarse, None)
+        assert greedy_bot(fine, None) == direction
+        coarse_events.extend(coarse.step(_COARSE_DT, direction))
+        for tick in range(_TICKS_PER_STEP):
+            fine_events.extend(fine.step(_FINE_DT, direction if tick == 0 else None))
+        assert _state(coarse) == _state(fine), f"after step {step}"
+
+    assert coarse.game_over or coarse.game_complete
+    assert coarse_events == fine_events
+    assert coarse.snapshot() == fine.snapshot()
+
+
+def test_pellet_events_are_one_per_pellet():
+    # 1 s:n askeleella syödään useita pellettejä; jokaisesta tulee oma tapahtumansa
+    sim = Simulation(seed=0)
+    start = sim.level.pellets_left()
+    events = []
+    while not sim.game_over and sim.current_level == 1:
+        events.extend(sim.step(1.0, greedy_bot(sim, None)))
+    eaten = start if sim.current_level > 1 else start - sim.level.pellets_left()
+
+    pellet_types = (SimEventType.PELLET_EATEN, SimEventType.POWER_PELLET_EATEN)
+    assert sum(event.type in pellet_types for event in events) == eaten
+    assert sim.score == sum(event.points for event in events)
+
+
+def test_batch_coarse_steps_match_60hz():
+    seeds = list(range(4))
+    coarse = BatchSimulation(len(seeds), seeds)
+    fine = BatchSimulation(len(seeds), seeds)
+    inputs = np.random.default_rng(7)
+
+    for _ in range(1500):
+        codes = np.where(inputs.random(len(seeds)) < 0.3, inputs.integers(0, 4, len(seeds)), NO_INPUT)
+        coarse.step(_COARSE_DT, codes)
+        fine.step(_FINE_DT, codes)
+        for _ in range(_TICKS_PER_STEP - 1):
+            fine.step(_FINE_DT)
+
+    for name in ("score", "lives", "current_level", "game_over", "pellets_left", "pellets_eaten",
+                 "player_x", "player_y", "ghost_x", "ghost_y", "ghost_mode", "ghost_dir", "ticks"):
+        assert np.array_equal(getattr(coarse, name), getattr(fine, name)), name
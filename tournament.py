@@ -0,0 +1,384 @@
+"""
+Turnausajuri: ajaa tuhansia headless-pelejä rinnakkain prosessipoolissa.
+Jokainen peli on yhdistelmä (pelaajabotti, haamukonfiguraatio, aloitustaso, siemen).
+Tulokset virtaavat takaisin pääprosessiin ja kootaan yhteenvedoksi.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from constants import ALL_DIRECTIONS, MAX_LEVEL, SIM_TICK_RATE, TILE
+from controllers import AutopilotController, PlayerController
+from level import Level
+from lookahead import LookaheadController
+from sim import DEFAULT_LEVEL_FILE, GHOST_PERSONALITIES, Simulation, SimEventType
+
+
+# Pelin maksimipituus tikkeinä (oletus 10 minuuttia pelaajan aikaa)
+DEFAULT_MAX_TICKS: int = SIM_TICK_RATE * 600
+
+# Montako peliä työprosessi ajaa yhdellä kutsulla (vähentää IPC-kuormaa)
+DEFAULT_CHUNK_SIZE: int = 16
+
+# Ennakoivan botin jatkot per päätös (kiinteä määrä aikabudjetin sijaan, jotta tulokset toistuvat)
+LOOKAHEAD_ROLLOUTS: int = 16
+
+# Haamukonfiguraatiot: persoonat spawn-järjestyksessä
+GHOST_CONFIGS: Dict[str, List[str]] = {
+    "classic": GHOST_PERSONALITIES,
+    "blinky": ["blinky"],
+    "pinky": ["pinky"],
+}
+
+
+class GameSpec(NamedTuple):
+    """Yhden turnauspelin parametrit."""
+    bot: str
+    ghosts: str
+    level: int
+    seed: int
+
+
+class GameResult(NamedTuple):
+    """
+    Yhden turnauspelin tulos.
+
+    Attributes:
+        bot: Pelaajabotin nimi
+        ghosts: Haamukonfiguraation nimi
+        level: Aloitustaso
+        seed: Siemen
+        score: Loppupisteet
+        lives_lost: Menetetyt elämät
+        ticks: Simuloidut tikit
+        pellets_eaten: Syödyt pelletit (myös power-pelletit)
+        ghosts_eaten: Syödyt haamut
+        best_chain: Pisin ghost-ketju yhden power-pelletin aikana
+        levels_cleared: Läpäistyt tasot
+        outcome: "game_over", "complete" tai "timeout"
+    """
+    bot: str
+    ghosts: str
+    level: int
+    seed: int
+    score: int
+    lives_lost: int
+    ticks: int
+    pellets_eaten: int
+    ghosts_eaten: int
+    best_chain: int
+    levels_cleared: int
+    outcome: str
+
+
+# ----------------------------------------------------------------------
+# Pelaajabotit: bot(sim, rng) -> suunta tai None (ei uutta syötettä)
+# ----------------------------------------------------------------------
+
+def idle_bot(sim: Simulation, rng: random.Random) -> Optional[Tuple[int, int]]:
+    """Ei koskaan anna syötettä (lähtötaso vertailuun)."""
+    return None
+
+
+def random_bot(sim: Simulation, rng: random.Random) -> Optional[Tuple[int, int]]:
+    """Vaihtaa satunnaiseen suuntaan keskimäärin kahdesti sekunnissa."""
+    if rng.random() < 2.0 / SIM_TICK_RATE:
+        return rng.choice(ALL_DIRECTIONS)
+    return None
+
+
+def greedy_bot(sim: Simulation, rng: random.Random) -> Optional[Tuple[int, int]]:
+    """Kulkee BFS:llä lähimmän pelletin suuntaan (ei väistä haamuja)."""
+    level = sim.level
+    player = sim.player
+    start = (int(player.x // TILE), int(player.y // TILE))
+    targets = level.pellets | level.power_pellets
+
+    queue = deque([(start, None)])
+    visited = {start}
+    while queue:
+        (x, y), first = queue.popleft()
+        if first is not None and (x, y) in targets:
+            return first
+        for direction in ALL_DIRECTIONS:
+            next_tile = (x + direction[0], y + direction[1])
+            if next_tile not in visited and level.is_valid_position(*next_tile):
+                visited.add(next_tile)
+                queue.append((next_tile, first or direction))
+    return None
+
+
+BOTS: Dict[str, Callable[[Simulation, random.Random], Optional[Tuple[int, int]]]] = {
+    "idle": idle_bot,
+    "random": random_bot,
+    "greedy": greedy_bot,
+}
+
+# Tilalliset botit: tehdas(siemen) -> PlayerController, uusi ohjain jokaiselle pelille
+CONTROLLER_BOTS: Dict[str, Callable[[int], PlayerController]] = {
+    "autopilot": lambda seed: AutopilotController(),
+    "lookahead": lambda seed: LookaheadController(rollouts=LOOKAHEAD_ROLLOUTS, seed=seed),
+}
+
+
+# ----------------------------------------------------------------------
+# Työprosessi
+# ----------------------------------------------------------------------
+
+# Työprosessin kerran lataama taso
+_worker_level: Optional[Level] = None
+
+
+def _init_worker(level_file: str) -> None:
+    """Lataa tason kerran jokaisessa työprosessissa."""
+    global _worker_level
+    _worker_level = Level(level_file)
+
+
+def play_game(spec: GameSpec, level_template: Level, max_ticks: int = DEFAULT_MAX_TICKS) -> GameResult:
+    """
+    Pelaa yhden headless-pelin loppuun.
+
+    Args:
+        spec: Pelin parametrit
+        level_template: Ladattu taso josta pelin tasot kopioidaan
+        max_ticks: Maksimipituus tikkeinä
+
+    Returns:
+        Pelin tulos
+    """
+    # Pelillä ja botilla on omat virtansa samasta siemenestä
+    rng = random.Random(f"bot:{spec.seed}")
+    sim = Simulation(seed=spec.seed, level_template=level_template, start_level=spec.level,
+                     ghost_personalities=GHOST_CONFIGS[spec.ghosts])
+    if spec.bot in CONTROLLER_BOTS:
+        controller = CONTROLLER_BOTS[spec.bot](spec.seed)
+        bot = lambda state, bot_rng: controller.next_direction(state)
+    else:
+        bot = BOTS[spec.bot]
+    dt = 1.0 / SIM_TICK_RATE
+
+    pellets_eaten = 0
+    ghosts_eaten = 0
+    best_chain = 0
+    levels_cleared = 0
+    lives_lost = 0
+    ticks = 0
+
+    while ticks < max_ticks and not (sim.game_over or sim.game_complete):
+        events = sim.step(dt, bot(sim, rng))
+        ticks += 1
+        for event in events:
+            if event.type in (SimEventType.PELLET_EATEN, SimEventType.POWER_PELLET_EATEN):
+                pellets_eaten += 1
+            elif event.type == SimEventType.GHOST_EATEN:
+                ghosts_eaten += 1
+                best_chain = max(best_chain, event.chain + 1)
+            elif event.type == SimEventType.PLAYER_DIED:
+                lives_lost += 1
+            elif event.type == SimEventType.LEVEL_CLEARED:
+                levels_cleared += 1
+
+    if sim.game_complete:
+        outcome = "complete"
+    elif sim.game_over:
+        outcome = "game_over"
+    else:
+        outcome = "timeout"
+
+    return GameResult(spec.bot, spec.ghosts, spec.level, spec.seed, sim.score, lives_lost, ticks,
+                      pellets_eaten, ghosts_eaten, best_chain, levels_cleared, outcome)
+
+
+def _run_chunk(specs: List[GameSpec], max_ticks: int) -> List[GameResult]:
+    """Työprosessin tehtävä: pelaa joukon pelejä saman tason pohjalta."""
+    return [play_game(spec, _worker_level, max_ticks) for spec in specs]
+
+
+# ----------------------------------------------------------------------
+# Pääprosessi
+# ----------------------------------------------------------------------
+
+def build_specs(bots: Sequence[str], ghost_configs: Sequence[str], levels: Sequence[int],
+                seeds: Sequence[int]) -> List[GameSpec]:
+    """
+    Muodostaa kaikki (botti × haamut × taso × siemen) -yhdistelmät.
+
+    Raises:
+        ValueError: Jos botti, haamukonfiguraatio tai taso on tuntematon
+    """
+    for bot in bots:
+        if bot not in BOTS and bot not in CONTROLLER_BOTS:
+            raise ValueError(f"Unknown bot '{bot}' (choose from {', '.join([*BOTS, *CONTROLLER_BOTS])})")
+    for ghosts in ghost_configs:
+        if ghosts not in GHOST_CONFIGS:
+            raise ValueError(f"Unknown ghost config '{ghosts}' (choose from {', '.join(GHOST_CONFIGS)})")
+    for level in levels:
+        if not 1 <= level <= MAX_LEVEL:
+            raise ValueError(f"Level must be between 1 and {MAX_LEVEL}")
+    return [GameSpec(*combo) for combo in itertools.product(bots, ghost_configs, levels, seeds)]
+
+
+def run_tournament(specs: Sequence[GameSpec], workers: Optional[int] = None,
+                   level_file: str = DEFAULT_LEVEL_FILE, max_ticks: int = DEFAULT_MAX_TICKS,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[GameResult]:
+    """
+    Ajaa pelit prosessipoolissa ja palauttaa tulokset sitä mukaa kun ne valmistuvat.
+
+    Args:
+        specs: Pelattavat pelit
+        workers: Työprosessien määrä (oletuksena CPU-ytimien määrä, 1 = samassa prosessissa)
+        level_file: Tason tiedoston polku
+        max_ticks: Pelin maksimipituus tikkeinä
+        chunk_size: Pelejä per työtehtävä
+
+    Yields:
+        GameResult valmistumisjärjestyksessä
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [list(specs[i:i + chunk_size]) for i in range(0, len(specs), chunk_size)]
+
+    if workers == 1:
+        _init_worker(level_file)
+        for chunk in chunks:
+            yield from _run_chunk(chunk, max_ticks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(level_file,)) as executor:
+        futures = [executor.submit(_run_chunk, chunk, max_ticks) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def summarize(results: Sequence[GameResult]) -> List[Dict[str, object]]:
+    """
+    Kokoaa tulokset (botti, haamut, taso) -ryhmittäin.
+
+    Args:
+        results: Pelien tulokset
+
+    Returns:
+        Lista yhteenvetoriveistä
+    """
+    groups: Dict[Tuple[str, str, int], List[GameResult]] = {}
+    for result in results:
+        groups.setdefault((result.bot, result.ghosts, result.level), []).append(result)
+
+    summary = []
+    for (bot, ghosts, level), group in sorted(groups.items()):
+        scores = [result.score for result in group]
+        summary.append({
+            "bot": bot,
+            "ghosts": ghosts,
+            "level": level,
+            "games": len(group),
+            "score_mean": statistics.fmean(scores),
+            "score_stdev": statistics.pstdev(scores),
+            "score_min": min(scores),
+            "score_max": max(scores),
+            "lives_lost_mean": statistics.fmean(result.lives_lost for result in group),
+            "ticks_mean": statistics.fmean(result.ticks for result in group),
+            "pellets_mean": statistics.fmean(result.pellets_eaten for result in group),
+            "ghosts_eaten_mean": statistics.fmean(result.ghosts_eaten for result in group),
+            "best_chain": max(result.best_chain for result in group),
+            "levels_cleared_mean": statistics.fmean(result.levels_cleared for result in group),
+            "completed": sum(result.outcome == "complete" for result in group),
+            "timeouts": sum(result.outcome == "timeout" for result in group),
+        })
+    return summary
+
+
+def _print_summary(summary: List[Dict[str, object]]) -> None:
+    """Tulostaa yhteenvedon taulukkona."""
+    header = (f"{'bot':<9} {'ghosts':<8} {'lvl':>3} {'games':>6} {'score':>9} {'stdev':>8} "
+              f"{'lives':>6} {'ticks':>8} {'pellets':>8} {'ghosts':>7} {'chain':>5} {'done':>5}")
+    print(header)
+    print("-" * len(header))
+    for row in summary:
+        print(f"{row['bot']:<9} {row['ghosts']:<8} {row['level']:>3} {row['games']:>6} "
+              f"{row['score_mean']:>9.1f} {row['score_stdev']:>8.1f} {row['lives_lost_mean']:>6.2f} "
+              f"{row['ticks_mean']:>8.0f} {row['pellets_mean']:>8.1f} {row['ghosts_eaten_mean']:>7.2f} "
+              f"{row['best_chain']:>5} {row['completed']:>5}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Jäsentää komentoriviargumentit."""
+    parser = argparse.ArgumentParser(description="Run a headless Maze Chomp tournament across CPU cores")
+    parser.add_argument("--bots", default="greedy,random",
+                        help=f"Comma-separated player bots ({', '.join([*BOTS, *CONTROLLER_BOTS])})")
+    parser.add_argument("--ghosts", default="classic",
+                        help=f"Comma-separated ghost configs ({', '.join(GHOST_CONFIGS)})")
+    parser.add_argument("--levels", default="1", help="Comma-separated starting levels")
+    parser.add_argument("--seeds", type=int, default=100, help="Seeds per combination")
+    parser.add_argument("--seed-offset", type=int, default=0, help="First seed")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Games per worker task")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS, help="Tick limit per game")
+    parser.add_argument("--level-file", default=DEFAULT_LEVEL_FILE, help="Level file")
+    parser.add_argument("--results", help="Write per-game results to this CSV file")
+    parser.add_argument("--summary-json", help="Write the summary to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Komentorivin pääfunktio."""
+    args = parse_args(argv)
+    try:
+        specs = build_specs(
+            [name for name in args.bots.split(",") if name],
+            [name for name in args.ghosts.split(",") if name],
+            [int(level) for level in args.levels.split(",") if level],
+            range(args.seed_offset, args.seed_offset + args.seeds),
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Running {len(specs)} games on {workers} worker(s)...")
+
+    results: List[GameResult] = []
+    writer = None
+    results_file = open(args.results, "w", newline="", encoding="utf-8") if args.results else None
+    start = time.perf_counter()
+    try:
+        if results_file:
+            writer = csv.writer(results_file)
+            writer.writerow(GameResult._fields)
+        for result in run_tournament(specs, workers, args.level_file, args.max_ticks, args.chunk_size):
+            results.append(result)
+            if writer:
+                writer.writerow(result)
+            if len(results) % 100 == 0:
+                print(f"  {len(results)}/{len(specs)} games done", end="\r", flush=True)
+    finally:
+        if results_file:
+            results_file.close()
+    elapsed = time.perf_counter() - start
+    if len(results) >= 100:
+        print()
+
+    total_ticks = sum(result.ticks for result in results)
+    print(f"Finished {len(results)} games in {elapsed:.1f}s "
+          f"({len(results) / elapsed:.1f} games/s, {total_ticks / elapsed:,.0f} ticks/s)")
+
+    summary = summarize(results)
+    _print_summary(summary)
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,15 @@
 """
 Apufunktiot ruudukkokäsittelyyn ja vektorilaskentaan.
-Sisältää koordinaattimuunnokset ja liikkeen apufunktiot.
+Sisältää koordinaattimuunnokset ja liikkeen apufunktiot. Positiot ovat kokonaislukuja
+alipikseleinä (SUBPIXEL) ja askeleen pituus lasketaan kokonaisina aikayksikköinä
+(MOVE_TIME_BASE), joten move_along_grid kulkee saman reitin millä tahansa aika-askeleella.
 """
 import math
-from typing import Tuple
-from constants import TILE, SCALE, SNAP_THRESHOLD
+from typing import Callable, List, Tuple
+from constants import (
+    TILE, SCALE, SUBPIXEL, MOVE_TIME_BASE, MAX_SUBSTEP_UNITS, TILE_FP, HALF_TILE_FP, DIR_NONE,
+    DIRECTION_DX, DIRECTION_DY
+)
 
 
 def tile_to_pixels(tile_x: int, tile_y: int) -> Tuple[float, float]:
@@ -51,24 +56,6 @@ def tile_center_pixels(tile_x: int, tile_y: int) -> Tuple[float, float]:
     return (float(center_x), float(center_y))
 
 
-def is_near_tile_center(pixel_x: float, pixel_y: float, tile_x: int, tile_y: int) -> bool:
-    """
-    Tarkistaa onko pikselipositio lähellä ruudun keskustaa.
-    
-    Args:
-        pixel_x: Nykyinen x-koordinaatti
-        pixel_y: Nykyinen y-koordinaatti
-        tile_x: Kohderuudun x-koordinaatti
-        tile_y: Kohderuudun y-koordinaatti
-        
-    Returns:
-        True jos lähellä keskustaa
-    """
-    center_x, center_y = tile_center_pixels(tile_x, tile_y)
-    distance = math.sqrt((pixel_x - center_x) ** 2 + (pixel_y - center_y) ** 2)
-    return distance <= SNAP_THRESHOLD
-
-
 def snap_to_tile_center(pixel_x: float, pixel_y: float) -> Tuple[float, float]:
     """
     Keskittää position lähimpään ruudun keskustaan.
@@ -84,21 +71,6 @@ def snap_to_tile_center(pixel_x: float, pixel_y: float) -> Tuple[float, float]:
     return tile_center_pixels(tile_x, tile_y)
 
 
-def distance_to_tile_center(pixel_x: float, pixel_y: float) -> float:
-    """
-    Laskee etäisyyden lähimpään ruudun keskustaan.
-    
-    Args:
-        pixel_x: Nykyinen x-koordinaatti
-        pixel_y: Nykyinen y-koordinaatti
-        
-    Returns:
-        Etäisyys pikseleinä
-    """
-    center_x, center_y = snap_to_tile_center(pixel_x, pixel_y)
-    return math.sqrt((pixel_x - center_x) ** 2 + (pixel_y - center_y) ** 2)
-
-
 def add_vectors(v1: Tuple[float, float], v2: Tuple[float, float]) -> Tuple[float, float]:
     """
     Laskee kahden vektorin summan.
@@ -143,31 +115,19 @@ def normalize_vector(vector: Tuple[float, float]) -> Tuple[float, float]:
     return (vector[0] / length, vector[1] / length)
 
 
-def get_opposite_direction(direction: Tuple[int, int]) -> Tuple[int, int]:
-    """
-    Palauttaa vastakkaisen suunnan.
-    
-    Args:
-        direction: Alkuperäinen suunta (dx, dy)
-        
-    Returns:
-        Vastakkainen suunta (-dx, -dy)
-    """
-    return (-direction[0], -direction[1])
-
-
-def scale_for_rendering(x: float, y: float) -> Tuple[int, int]:
+def scale_for_rendering(x: float, y: float, scale: int = SCALE) -> Tuple[int, int]:
     """
     Skaalaa koordinaatit renderöintiä varten.
     
     Args:
         x: X-koordinaatti skaalaamattomassa avaruudessa
         y: Y-koordinaatti skaalaamattomassa avaruudessa
+        scale: Skaalauskerroin (1 = looginen resoluutio)
         
     Returns:
         Skaalatut koordinaatit renderöintiä varten
     """
-    return (int(x * SCALE), int(y * SCALE))
+    return (int(x * scale), int(y * scale))
 
 
 def wrap_position(x: float, y: float, level_width: int, level_height: int) -> Tuple[float, float]:
@@ -190,3 +150,241 @@ def wrap_position(x: float, y: float, level_width: int, level_height: int) -> Tu
         x = TILE // 2
     
     return (x, y)
+
+
+def to_fixed(pixels: float) -> int:
+    """
+    Muuntaa pikselit alipikseleiksi (lähimpään kokonaislukuun).
+    
+    Args:
+        pixels: Arvo pikseleinä
+        
+    Returns:
+        Arvo 1/SUBPIXEL pikselin yksiköissä
+    """
+    return round(pixels * SUBPIXEL)
+
+
+def tile_center_fixed(tile_x: int, tile_y: int) -> Tuple[int, int]:
+    """
+    Palauttaa ruudun keskipisteen alipikseleinä.
+    
+    Args:
+        tile_x: Ruudun x-koordinaatti
+        tile_y: Ruudun y-koordinaatti
+        
+    Returns:
+        Keskipisteen koordinaatit (fx, fy)
+    """
+    return (tile_x * TILE_FP + HALF_TILE_FP, tile_y * TILE_FP + HALF_TILE_FP)
+
+
+def time_units(dt: float) -> int:
+    """
+    Muuntaa aika-askeleen liikkeen aikayksiköiksi (MOVE_TIME_BASE sekunnissa).
+    
+    Args:
+        dt: Aika-askel sekunteina (>= 0)
+        
+    Returns:
+        Askeleen pituus kokonaisina aikayksikköinä
+        
+    Raises:
+        ValueError: Jos dt on negatiivinen tai ei äärellinen
+    """
+    if not 0.0 <= dt < math.inf:
+        raise ValueError(f"timestep must be a finite non-negative number of seconds, got {dt!r}")
+    return round(dt * MOVE_TIME_BASE)
+
+
+def substeps(dt: float) -> List[float]:
+    """
+    Jakaa aika-askeleen sääntöaskeliksi (enintään MAX_SUBSTEP_UNITS aikayksikköä kukin).
+    Osat lasketaan kokonaisista aikayksiköistä, joten 0,1 s:n askel antaa täsmälleen samat
+    kuusi 1/60 s:n askelta kuin 60 Hz -ajo. Nollan pituinen askel on yksi nolla-askel.
+    
+    Args:
+        dt: Aika-askel sekunteina (>= 0)
+        
+    Returns:
+        Sääntöaskelten pituudet sekunteina
+        
+    Raises:
+        ValueError: Jos dt on negatiivinen tai ei äärellinen
+    """
+    full, rest = divmod(time_units(dt), MAX_SUBSTEP_UNITS)
+    steps = [MAX_SUBSTEP_UNITS / MOVE_TIME_BASE] * full
+    if rest or not steps:
+        steps.append(rest / MOVE_TIME_BASE)
+    return steps
+
+
+def step_distance(speed: float, dt: float, remainder: int) -> Tuple[int, int]:
+    """
+    Laskee askeleen matkan alipikseleinä kokonaislukuaritmetiikalla.
+    Nopeus pyöristetään alipikseleiksi sekunnissa ja kerrotaan askeleen aikayksiköillä
+    (time_units); MOVE_TIME_BASE:lla jaon jakojäännös siirtyy seuraavalle askeleelle.
+    Matka hetkeen t on siten aina floor(nopeus * t) riippumatta siitä, monessako ja kuinka
+    pitkässä askeleessa t kuljettiin, kunhan askeleet ovat kokonaisia aikayksiköitä.
+    
+    Args:
+        speed: Nopeus pikseleinä sekunnissa
+        dt: Aika-askel sekunteina
+        remainder: Edellisen askeleen jakojäännös
+        
+    Returns:
+        Tuple (matka alipikseleinä, uusi jakojäännös)
+    """
+    return divmod(to_fixed(speed) * time_units(dt) + remainder, MOVE_TIME_BASE)
+
+
+class FixedPosition:
+    """
+    Kokonaislukupositio (fx, fy ja edellisen askeleen prev_fx, prev_fy alipikseleinä).
+    x, y, prev_x ja prev_y ovat pikseliarvoja samoista kentistä, joten lukijat (törmäykset,
+    renderöinti, botit) näkevät liukuluvut ja simulaation tila pysyy bittitarkkana.
+    """
+    
+    __slots__ = ()
+    
+    @property
+    def x(self) -> float:
+        """X-koordinaatti pikseleinä."""
+        return self.fx / SUBPIXEL
+    
+    @x.setter
+    def x(self, value: float) -> None:
+        self.fx = to_fixed(value)
+    
+    @property
+    def y(self) -> float:
+        """Y-koordinaatti pikseleinä."""
+        return self.fy / SUBPIXEL
+    
+    @y.setter
+    def y(self, value: float) -> None:
+        self.fy = to_fixed(value)
+    
+    @property
+    def prev_x(self) -> float:
+        """Edellisen askeleen x-koordinaatti pikseleinä."""
+        return self.prev_fx / SUBPIXEL
+    
+    @prev_x.setter
+    def prev_x(self, value: float) -> None:
+        self.prev_fx = to_fixed(value)
+    
+    @property
+    def prev_y(self) -> float:
+        """Edellisen askeleen y-koordinaatti pikseleinä."""
+        return self.prev_fy / SUBPIXEL
+    
+    @prev_y.setter
+    def prev_y(self, value: float) -> None:
+        self.prev_fy = to_fixed(value)
+
+
+def move_along_grid(fx: int, fy: int, direction: int, distance: int, level,
+                    arrive: Callable[[int, int, int], int]) -> Tuple[int, int, int]:
+    """
+    Liikuttaa entiteettiä käytäviä pitkin distance alipikseliä.
+    Matka kuljetaan ruudun keskipisteestä toiseen: jokaisessa saavutetussa keskipisteessä
+    kutsutaan arrive, joka palauttaa jatkosuunnan, ja loppumatka jatkuu siihen suuntaan.
+    Askeleen pituudella ei siis ole ylärajaa, eikä käännöksiä tai seiniä voi ohittaa.
+    Paikallaan keskipisteessä oleva (ei suuntaa tai seinä edessä) kysyy suunnan kerran.
+    Kaikki laskenta on kokonaislukuja, keskipisteen etäisyys saadaan modulona.
+    
+    Args:
+        fx: X-koordinaatti alipikseleinä
+        fy: Y-koordinaatti alipikseleinä
+        direction: Nykyinen suuntakoodi
+        distance: Kuljettava matka alipikseleinä
+        level: Taso (is_valid_position)
+        arrive: Kutsu (ruutu x, ruutu y, suunta) -> uusi suunta keskipisteessä
+        
+    Returns:
+        Tuple (fx, fy, suunta) liikkeen jälkeen
+    """
+    asked = False
+    while True:
+        tile_x = fx // TILE_FP
+        tile_y = fy // TILE_FP
+        dx = DIRECTION_DX[direction]
+        dy = DIRECTION_DY[direction]
+        
+        # Matka seuraavaan keskipisteeseen liikesuunnassa
+        offset = (fx % TILE_FP - HALF_TILE_FP) * dx + (fy % TILE_FP - HALF_TILE_FP) * dy
+        if direction != DIR_NONE and offset < 0:
+            gap = -offset
+        elif direction != DIR_NONE and level.is_valid_position(tile_x + dx, tile_y + dy):
+            gap = TILE_FP - offset
+        else:
+            # Paikallaan keskipisteessä: kysy suunta (kerran per kutsu)
+            fx = tile_x * TILE_FP + HALF_TILE_FP
+            fy = tile_y * TILE_FP + HALF_TILE_FP
+            if asked:
+                return (fx, fy, direction)
+            direction = arrive(tile_x, tile_y, direction)
+            asked = True
+            continue
+        
+        if distance < gap:
+            return (fx + dx * distance, fy + dy * distance, direction)
+        
+        # Saavutaan keskipisteeseen tasan ja valitaan jatkosuunta
+        distance -= gap
+        if offset >= 0:
+            tile_x += dx
+            tile_y += dy
+        fx = tile_x * TILE_FP + HALF_TILE_FP
+        fy = tile_y * TILE_FP + HALF_TILE_FP
+        direction = arrive(tile_x, tile_y, direction)
+        asked = True
+
+
+def next_center(fx: int, fy: int, direction: int, level) -> Tuple[int, int, int]:
+    """
+    Seuraava keskipiste jossa move_along_grid kysyy suunnan (sama laskenta kuin sen ensimmäinen kierros).
+    
+    Args:
+        fx: X-koordinaatti alipikseleinä
+        fy: Y-koordinaatti alipikseleinä
+        direction: Nykyinen suuntakoodi
+        level: Taso (is_valid_position)
+        
+    Returns:
+        Tuple (ruutu x, ruutu y, matka alipikseleinä); matka 0 = paikallaan, kysyy heti
+    """
+    tile_x = fx // TILE_FP
+    tile_y = fy // TILE_FP
+    if direction == DIR_NONE:
+        return (tile_x, tile_y, 0)
+    dx = DIRECTION_DX[direction]
+    dy = DIRECTION_DY[direction]
+    offset = (fx % TILE_FP - HALF_TILE_FP) * dx + (fy % TILE_FP - HALF_TILE_FP) * dy
+    if offset < 0:
+        return (tile_x, tile_y, -offset)
+    if level.is_valid_position(tile_x + dx, tile_y + dy):
+        return (tile_x + dx, tile_y + dy, TILE_FP - offset)
+    return (tile_x, tile_y, 0)
+
+
+def interpolate_position(prev_x: float, prev_y: float, x: float, y: float,
+                         alpha: float) -> Tuple[float, float]:
+    """
+    Interpoloi renderöintiposition kahden simulaatioaskeleen välillä.
+    Tunnelihypyt ja teleportit (yli ruudun siirtymä) piirretään suoraan uuteen paikkaan.
+    
+    Args:
+        prev_x: Edellisen askeleen x-koordinaatti
+        prev_y: Edellisen askeleen y-koordinaatti
+        x: Nykyisen askeleen x-koordinaatti
+        y: Nykyisen askeleen y-koordinaatti
+        alpha: Interpolaatiokerroin (0.0 = edellinen, 1.0 = nykyinen)
+        
+    Returns:
+        Interpoloitu positio (x, y)
+    """
+    if abs(x - prev_x) > TILE or abs(y - prev_y) > TILE:
+        return (x, y)
+    return (prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha)
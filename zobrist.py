@@ -0,0 +1,195 @@
+"""
+Zobrist-tiiviste pelitilasta transpositiotauluja ja desync-tarkistuksia varten.
+Jokaisella tilan osalla (pelletti, entiteetin ruututila, globaali moodi ja ajastinlokerot)
+on oma 64-bittinen avaimensa, ja tiiviste on avainten XOR. Muutos päivitetään poistamalla
+vanha avain ja lisäämällä uusi, joten hinta riippuu muutoksista eikä tilan koosta.
+"""
+from typing import List, Tuple
+
+from constants import TILE_FP, ZOBRIST_TIMER_BUCKET
+from ghost import GhostMode
+
+
+_MASK: int = (1 << 64) - 1
+
+# Avainten siemen: kiinteä, jotta eri prosessit (toisto, verkkopelin asiakkaat) saavat samat avaimet
+_SEED: int = 0x5A0B_2157_4D43_C0DE
+
+# Osien tunnisteet avaimen ensimmäisenä osana
+_PELLET: int = 1
+_POWER_PELLET: int = 2
+_ENTITY: int = 3
+_GLOBAL: int = 4
+
+_PELLET_KINDS = {"pellet": _PELLET, "power": _POWER_PELLET}
+_MODE_CODES = {mode: code for code, mode in enumerate(GhostMode)}
+
+
+def _mix(value: int) -> int:
+    """SplitMix64-sekoitus: 64-bittinen luku -> tasaisesti jakautunut 64-bittinen luku."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def zobrist_key(*parts: int) -> int:
+    """
+    Palauttaa tilan osan avaimen. Avaimet lasketaan osista eikä arvota tauluun, joten
+    entiteettien ja ruutujen määrä on rajaton ja avaimet ovat samat kaikissa prosesseissa.
+
+    Args:
+        parts: Osan tunniste ja kokonaislukuarvot
+
+    Returns:
+        64-bittinen avain
+    """
+    key = _SEED
+    for part in parts:
+        key = _mix(key ^ (part & _MASK))
+    return key
+
+
+def _timer_bucket(seconds: float) -> int:
+    """Ajastimen lokero (ZOBRIST_TIMER_BUCKET sekunnin välein)."""
+    return int(seconds // ZOBRIST_TIMER_BUCKET)
+
+
+def _entity_states(sim) -> List[Tuple[int, ...]]:
+    """
+    Entiteettien diskreetit tilat: pelaaja ensin, sitten haamut listajärjestyksessä.
+    Positio otetaan ruutuna, joten ruudun sisäinen liike ei muuta tiivistettä.
+    """
+    player = sim.player
+    states = [(player.fx // TILE_FP, player.fy // TILE_FP,
+               player.current_direction, player.desired_direction)]
+    for ghost in sim.ghosts:
+        mode = ghost.mode
+        if mode == GhostMode.FRIGHTENED:
+            bucket = _timer_bucket(ghost.fright_timer)
+        elif mode == GhostMode.EATEN:
+            bucket = _timer_bucket(ghost.eaten_home_timer)
+        else:
+            bucket = 0
+        states.append((ghost.fx // TILE_FP, ghost.fy // TILE_FP, ghost.direction, _MODE_CODES[mode], bucket))
+    return states
+
+
+def _global_state(sim) -> Tuple[int, ...]:
+    """Pelin globaalit osat: taso, elämät, pisteet, lopputila ja moodiaikataulun kohta."""
+    return (sim.current_level, sim.lives, sim.score, int(sim.game_over), int(sim.game_complete),
+            sim.mode_index, int(sim.current_mode == "CHASE"), _timer_bucket(sim.mode_timer),
+            sim.ghost_chain_count)
+
+
+class ZobristHash:
+    """
+    Simulaation inkrementaalinen tiiviste.
+    Pelletit päivitetään Level.eat_pellet_at-kuuntelijasta heti syönnin yhteydessä; entiteettien
+    ja globaalien osien tilat verrataan edelliseen lukukertaan, ja vain muuttuneiden osien avaimet
+    vaihdetaan. Tilannekuvan palautus vain merkitsee tiivisteen vanhentuneeksi, ja se lasketaan
+    kokonaan vasta seuraavalla lukukerralla. Ilman lukijoita tiiviste ei siis maksa askelta eikä
+    palautusta kohden mitään.
+    """
+
+    def __init__(self):
+        """Alustaa tyhjän tiivisteen (attach() laskee arvon)."""
+        self._pellets: int = 0
+        self._entities: int = 0
+        self._entity_states: List[Tuple[int, ...]] = []
+        self._global: int = 0
+        self._global_state: Tuple[int, ...] = ()
+        self._stale: bool = True
+
+    def attach(self, sim) -> None:
+        """
+        Laskee tiivisteen kokonaan ja kuuntelee tason pellettien syöntiä.
+        Kutsutaan kun taso ladataan, ja update() kutsuu sitä kun tiiviste on vanhentunut.
+
+        Args:
+            sim: Simulaatio
+        """
+        level = sim.level
+        pellets = 0
+        for x, y in level.pellets:
+            pellets ^= zobrist_key(_PELLET, x, y)
+        for x, y in level.power_pellets:
+            pellets ^= zobrist_key(_POWER_PELLET, x, y)
+        self._pellets = pellets
+        level.pellet_listener = self._pellet_eaten
+
+        self._entity_states = _entity_states(sim)
+        entities = 0
+        for slot, state in enumerate(self._entity_states):
+            entities ^= zobrist_key(_ENTITY, slot, *state)
+        self._entities = entities
+
+        self._global_state = _global_state(sim)
+        self._global = zobrist_key(_GLOBAL, *self._global_state)
+        self._stale = False
+
+    def invalidate(self) -> None:
+        """
+        Merkitsee tiivisteen vanhentuneeksi (tila palautettiin tilannekuvasta).
+        Seuraava update() laskee sen kokonaan, joten peräkkäiset palautukset ilman lukuja
+        (haun jatkot, rollback) eivät maksa täyttä laskentaa.
+        """
+        self._stale = True
+
+    def _pellet_eaten(self, tile_x: int, tile_y: int, pellet_type: str) -> None:
+        """Level.eat_pellet_at-kuuntelija: poistaa syödyn pelletin avaimen."""
+        self._pellets ^= zobrist_key(_PELLET_KINDS[pellet_type], tile_x, tile_y)
+
+    def update(self, sim) -> int:
+        """
+        Päivittää muuttuneet osat ja palauttaa tiivisteen.
+
+        Args:
+            sim: Simulaatio johon attach() on kutsuttu
+
+        Returns:
+            64-bittinen tiiviste
+        """
+        if self._stale:
+            self.attach(sim)
+            return self._pellets ^ self._entities ^ self._global
+
+        states = _entity_states(sim)
+        previous = self._entity_states
+        if len(states) != len(previous):
+            # Entiteettien määrä muuttui ilman tason latausta: laske entiteetit uudelleen
+            self.attach(sim)
+        else:
+            entities = self._entities
+            for slot, (state, old) in enumerate(zip(states, previous)):
+                if state != old:
+                    entities ^= zobrist_key(_ENTITY, slot, *old) ^ zobrist_key(_ENTITY, slot, *state)
+            self._entities = entities
+            self._entity_states = states
+
+        state = _global_state(sim)
+        if state != self._global_state:
+            self._global = zobrist_key(_GLOBAL, *state)
+            self._global_state = state
+        return self._pellets ^ self._entities ^ self._global
+
+
+def compute_hash(sim) -> int:
+    """
+    Laskee tiivisteen alusta (vertailukohta inkrementaaliselle päivitykselle).
+    Ei muuta simulaation kuuntelijoita.
+
+    Args:
+        sim: Simulaatio
+
+    Returns:
+        64-bittinen tiiviste
+    """
+    value = 0
+    for x, y in sim.level.pellets:
+        value ^= zobrist_key(_PELLET, x, y)
+    for x, y in sim.level.power_pellets:
+        value ^= zobrist_key(_POWER_PELLET, x, y)
+    for slot, state in enumerate(_entity_states(sim)):
+        value ^= zobrist_key(_ENTITY, slot, *state)
+    return value ^ zobrist_key(_GLOBAL, *_global_state(sim))